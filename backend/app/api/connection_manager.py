@@ -0,0 +1,394 @@
+"""
+Gestionnaire des connexions WebSocket
+Index session <-> connexion en O(1), file d'envoi bornée et tâche d'écriture
+par connexion, abonnement au bus d'événements pour chaque session liée : les
+événements publiés par l'orchestrateur (phase, Tom, corruption, fin) sont
+poussés au client sans qu'il ait à interroger le serveur.
+
+Un client lent ne ralentit jamais l'émetteur : les états remplacés (dernier
+game_state, dernière corruption) sont fusionnés dans la file, et une file
+pleine ou un envoi bloqué applique la politique configurée (perte du plus
+ancien, du plus récent, ou déconnexion : le client se reconnecte et reprend
+sa session).
+
+Le serveur envoie un heartbeat à chaque intervalle : une connexion restée
+muette au-delà (intervalle + délai) est fermée. Les sessions sans client sont
+signalées au suivi de présence (l'orchestrateur), qui les suspend après un
+délai de reconnexion.
+"""
+from collections import deque
+from fastapi import WebSocket
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple, Union
+import asyncio
+import time
+
+from ..config import settings
+from ..services.event_bus import EventBus, get_event_bus
+from .wire_protocol import (
+    WireCodec, EncodedMessage, JSON_CODEC, negotiate, transport_compressed, send_frame
+)
+
+
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "drop_newest", "disconnect")
+CLOSE_TRY_AGAIN_LATER = 1013  # Client trop lent : fermeture, reconnexion automatique
+CLOSE_HEARTBEAT_TIMEOUT = 4408  # Aucun message ni réponse au heartbeat dans le délai
+
+
+class ConnectionOutbox:
+    """
+    File d'envoi bornée d'une connexion
+    Un message d'un type fusionnable (état complet) remplace à sa place celui
+    de la même session encore en attente : seul le plus récent est envoyé.
+    """
+
+    def __init__(self, maxsize: int, coalesce_types: Iterable[str] = ()):
+        self.maxsize = maxsize
+        self.coalesce_types = set(coalesce_types)
+        self._entries: Deque[list] = deque()  # [message, instant de dépôt, clé de fusion]
+        self._pending: Dict[Tuple[str, Any], list] = {}  # Clé de fusion -> entrée en attente
+        self._ready = asyncio.Event()
+        self.high_watermark = 0
+        self.coalesced = 0
+
+    def _coalesce_key(self, message: EncodedMessage) -> Optional[Tuple[str, Any]]:
+        message_type = message.message.get("type")
+        if message_type in self.coalesce_types:
+            return (message_type, message.message.get("session_id"))
+        return None
+
+    def put(self, message: EncodedMessage) -> bool:
+        """Dépose un message ; False si la file est pleine"""
+        key = self._coalesce_key(message)
+        if key is not None:
+            entry = self._pending.get(key)
+            if entry is not None:
+                # Même position, attente comptée depuis le premier dépôt
+                entry[0] = message
+                self.coalesced += 1
+                return True
+
+        if len(self._entries) >= self.maxsize:
+            return False
+
+        entry = [message, time.perf_counter(), key]
+        self._entries.append(entry)
+        if key is not None:
+            self._pending[key] = entry
+        self.high_watermark = max(self.high_watermark, len(self._entries))
+        self._ready.set()
+        return True
+
+    def drop_oldest(self) -> bool:
+        """Retire le message le plus ancien de la file"""
+        if not self._entries:
+            return False
+        self._forget(self._entries.popleft())
+        return True
+
+    async def get(self) -> Tuple[EncodedMessage, float]:
+        """Prochain message et son instant de dépôt (attend s'il n'y en a pas)"""
+        while not self._entries:
+            self._ready.clear()
+            await self._ready.wait()
+        entry = self._entries.popleft()
+        self._forget(entry)
+        return entry[0], entry[1]
+
+    def _forget(self, entry: list):
+        if entry[2] is not None and self._pending.get(entry[2]) is entry:
+            del self._pending[entry[2]]
+
+    def qsize(self) -> int:
+        return len(self._entries)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class ConnectionManager:
+    """Gestionnaire des connexions WebSocket"""
+
+    def __init__(
+        self,
+        event_bus: Optional[EventBus] = None,
+        queue_size: Optional[int] = None,
+        slow_consumer_policy: Optional[str] = None,
+        send_timeout: Optional[float] = None,
+        presence: Optional[Any] = None,
+        ping_interval: Optional[float] = None,
+        ping_timeout: Optional[float] = None
+    ):
+        self.active_connections: Dict[str, WebSocket] = {}
+        self.session_connections: Dict[str, str] = {}  # session_id -> connection_id
+        self.connection_sessions: Dict[str, Set[str]] = {}  # connection_id -> sessions liées
+        self.connection_codecs: Dict[str, WireCodec] = {}  # connection_id -> encodage négocié
+
+        # File d'envoi bornée et tâche d'écriture de chaque connexion
+        self.queue_size = queue_size or settings.websocket_send_queue_size
+        self.slow_consumer_policy = slow_consumer_policy or settings.websocket_slow_consumer_policy
+        if self.slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Politique de client lent inconnue: {self.slow_consumer_policy}")
+        self.send_timeout = send_timeout or settings.websocket_send_timeout_seconds
+        self.outboxes: Dict[str, ConnectionOutbox] = {}
+        self.writers: Dict[str, asyncio.Task] = {}
+
+        # Abonnements au bus d'événements (un par session liée)
+        self.event_bus = event_bus or get_event_bus()
+        self.session_subscriptions: Dict[str, int] = {}
+
+        # Statistiques du protocole (trames et octets envoyés par encodage)
+        self.frames_sent: Dict[str, int] = {}
+        self.bytes_sent: Dict[str, int] = {}
+        self.events_pushed = 0
+        self.messages_dropped = 0
+        
+        # Clients lents : messages fusionnés, déconnexions, latence dépôt -> envoi
+        self.messages_coalesced = 0
+        self.slow_consumer_disconnects = 0
+        self.send_timeouts = 0
+        self.send_errors = 0
+        self.queue_high_watermark = 0
+        self.send_latencies_ms: Deque[float] = deque(maxlen=1024)
+        
+        # Heartbeat serveur : dernier message reçu de chaque connexion
+        self.ping_interval = settings.websocket_ping_interval if ping_interval is None else ping_interval
+        self.ping_timeout = settings.websocket_ping_timeout if ping_timeout is None else ping_timeout
+        self.last_seen: Dict[str, float] = {}
+        self.heartbeat_task: Optional[asyncio.Task] = None
+        self.heartbeats_sent = 0
+        self.heartbeat_timeouts = 0
+        self.heartbeat_rtts_ms: Deque[float] = deque(maxlen=1024)
+        
+        # Suivi de présence des sessions (client_connected / client_disconnected)
+        self.presence = presence
+        
+        # Arrêt en cours : nouvelles connexions refusées
+        self.draining = False
+
+    async def connect(self, websocket: WebSocket, connection_id: str):
+        """Accepte une nouvelle connexion et démarre sa tâche d'écriture"""
+        await websocket.accept()
+        self.active_connections[connection_id] = websocket
+        self.connection_sessions[connection_id] = set()
+
+        outbox = ConnectionOutbox(self.queue_size, settings.websocket_coalesce_types)
+        self.outboxes[connection_id] = outbox
+        self.writers[connection_id] = asyncio.create_task(self._writer(connection_id, websocket, outbox))
+        self.last_seen[connection_id] = time.monotonic()
+        
+        if self.ping_interval > 0 and (self.heartbeat_task is None or self.heartbeat_task.done()):
+            self.heartbeat_task = asyncio.create_task(self._heartbeat())
+        print(f"🔗 Connexion WebSocket établie: {connection_id}")
+
+    def disconnect(self, connection_id: str):
+        """Déconnecte un client (sans effet si déjà déconnecté)"""
+        if self.active_connections.pop(connection_id, None) is None:
+            return
+        self.connection_codecs.pop(connection_id, None)
+        self.last_seen.pop(connection_id, None)
+        outbox = self.outboxes.pop(connection_id, None)
+        if outbox is not None:
+            self.messages_coalesced += outbox.coalesced
+            self.queue_high_watermark = max(self.queue_high_watermark, outbox.high_watermark)
+
+        writer = self.writers.pop(connection_id, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+
+        # Sessions de cette connexion : index inverse, pas de parcours
+        for session_id in self.connection_sessions.pop(connection_id, ()):
+            if self.session_connections.get(session_id) == connection_id:
+                del self.session_connections[session_id]
+                self.event_bus.unsubscribe(self.session_subscriptions.pop(session_id, None))
+                if self.presence is not None:
+                    self.presence.client_disconnected(session_id)
+
+        print(f"🔌 Connexion WebSocket fermée: {connection_id}")
+
+    async def close_all(self, code: int = 1012):
+        """Ferme toutes les connexions (1012 : redémarrage, le client se reconnecte)"""
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+        for connection_id, websocket in list(self.active_connections.items()):
+            try:
+                await websocket.close(code=code)
+            except Exception:
+                pass
+            self.disconnect(connection_id)
+    
+    def negotiate_encoding(self, connection_id: str, requested: Iterable[str]) -> WireCodec:
+        """Retient l'encodage d'une connexion parmi ceux annoncés par le client"""
+        websocket = self.active_connections.get(connection_id)
+        codec = negotiate(requested, websocket is not None and transport_compressed(websocket))
+        self.connection_codecs[connection_id] = codec
+        print(f"📦 Encodage WebSocket {codec.name} pour {connection_id}")
+        return codec
+
+    def _enqueue(self, message: Union[dict, EncodedMessage], connection_id: str) -> bool:
+        """Dépose un message dans la file de la connexion (sans attendre ; file pleine : politique de client lent)"""
+        outbox = self.outboxes.get(connection_id)
+        if outbox is None:
+            return False
+        if not isinstance(message, EncodedMessage):
+            message = EncodedMessage(message)
+        if outbox.put(message):
+            return True
+
+        if self.slow_consumer_policy == "disconnect":
+            print(f"🐢 File d'envoi pleine, client lent déconnecté: {connection_id}")
+            self.slow_consumer_disconnects += 1
+            self._drop_connection(connection_id, CLOSE_TRY_AGAIN_LATER)
+            return False
+
+        self.messages_dropped += 1
+        if self.slow_consumer_policy == "drop_oldest" and outbox.drop_oldest():
+            return outbox.put(message)
+        print(f"⚠️ File d'envoi pleine, message perdu pour {connection_id}")
+        return False
+
+    def _drop_connection(self, connection_id: str, code: int):
+        """Ferme une connexion côté serveur (code != 1000 : le client se reconnecte et reprend sa session)"""
+        websocket = self.active_connections.get(connection_id)
+        if websocket is None:
+            return
+        self.disconnect(connection_id)
+        asyncio.create_task(self._close_quietly(websocket, code))
+
+    async def _close_quietly(self, websocket: WebSocket, code: int):
+        try:
+            await asyncio.wait_for(websocket.close(code=code), timeout=1.0)
+        except Exception:
+            pass
+
+    async def _writer(self, connection_id: str, websocket: WebSocket, outbox: ConnectionOutbox):
+        """Tâche d'écriture : envoie les messages de la file dans l'ordre"""
+        try:
+            while True:
+                message, enqueued_at = await outbox.get()
+                codec = self.connection_codecs.get(connection_id, JSON_CODEC)
+                await asyncio.wait_for(send_frame(websocket, message.encode(codec)), timeout=self.send_timeout)
+                self.send_latencies_ms.append((time.perf_counter() - enqueued_at) * 1000)
+                self.frames_sent[codec.name] = self.frames_sent.get(codec.name, 0) + 1
+                self.bytes_sent[codec.name] = self.bytes_sent.get(codec.name, 0) + message.size(codec)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            # Envoi bloqué (tampon TCP plein) : le client ne lit plus
+            self.send_timeouts += 1
+            self.slow_consumer_disconnects += 1
+            print(f"🐢 Envoi bloqué depuis {self.send_timeout:.0f}s, client lent déconnecté: {connection_id}")
+            self._drop_connection(connection_id, CLOSE_TRY_AGAIN_LATER)
+        except Exception as e:
+            self.send_errors += 1
+            print(f"❌ Erreur envoi message WebSocket: {e}")
+            self.disconnect(connection_id)
+
+    async def _heartbeat(self):
+        """Heartbeat de toutes les connexions ; ferme celles restées muettes au-delà du délai"""
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            now = time.monotonic()
+            for connection_id in list(self.active_connections):
+                silent = now - self.last_seen.get(connection_id, now)
+                if silent > self.ping_interval + self.ping_timeout:
+                    self.heartbeat_timeouts += 1
+                    print(f"💀 Connexion muette depuis {silent:.0f}s, fermée: {connection_id}")
+                    self._drop_connection(connection_id, CLOSE_HEARTBEAT_TIMEOUT)
+                elif self._enqueue({"type": "heartbeat", "sent_at": time.time()}, connection_id):
+                    self.heartbeats_sent += 1
+
+    def touch(self, connection_id: str):
+        """Message reçu du client : la connexion est vivante"""
+        if connection_id in self.last_seen:
+            self.last_seen[connection_id] = time.monotonic()
+
+    def record_heartbeat_ack(self, connection_id: str, sent_at: Optional[float]):
+        """Réponse du client au heartbeat : aller-retour mesuré"""
+        self.touch(connection_id)
+        if isinstance(sent_at, (int, float)):
+            self.heartbeat_rtts_ms.append(max(time.time() - sent_at, 0.0) * 1000)
+
+    async def send_personal_message(self, message: Union[dict, EncodedMessage], connection_id: str):
+        """Envoie un message à une connexion spécifique (via sa file d'envoi)"""
+        self._enqueue(message, connection_id)
+
+    async def broadcast(self, message: dict, connection_ids: Iterable[str]):
+        """Envoie un même message à plusieurs connexions (sérialisé une fois par encodage)"""
+        encoded = EncodedMessage(message)
+        for connection_id in list(connection_ids):
+            self._enqueue(encoded, connection_id)
+
+    async def send_to_session(self, message: Union[dict, EncodedMessage], session_id: str):
+        """Envoie un message à une session spécifique"""
+        connection_id = self.session_connections.get(session_id)
+        if connection_id is not None:
+            self._enqueue(message, connection_id)
+
+    def _push_event(self, event: Dict[str, Any]):
+        """Abonné du bus : pousse l'événement au client de la session"""
+        connection_id = self.session_connections.get(event["session_id"])
+        if connection_id is not None and self._enqueue(event, connection_id):
+            self.events_pushed += 1
+
+    def link_session(self, session_id: str, connection_id: str):
+        """Lie une session à une connexion et l'abonne aux événements de la session"""
+        previous = self.session_connections.get(session_id)
+        if previous is not None and previous != connection_id:
+            self.connection_sessions.get(previous, set()).discard(session_id)
+
+        self.session_connections[session_id] = connection_id
+        self.connection_sessions.setdefault(connection_id, set()).add(session_id)
+        if session_id not in self.session_subscriptions:
+            self.session_subscriptions[session_id] = self.event_bus.subscribe(session_id, self._push_event)
+        if self.presence is not None:
+            self.presence.client_connected(session_id)
+        print(f"🔗 Session {session_id} liée à la connexion {connection_id}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Encodages négociés, volume envoyé, files d'envoi et clients lents"""
+        encodings: Dict[str, int] = {}
+        for codec in self.connection_codecs.values():
+            encodings[codec.name] = encodings.get(codec.name, 0) + 1
+        depths = [outbox.qsize() for outbox in self.outboxes.values()]
+        latencies = list(self.send_latencies_ms)
+        rtts = list(self.heartbeat_rtts_ms)
+        return {
+            "encodings": encodings,
+            "frames_sent": dict(self.frames_sent),
+            "bytes_sent": dict(self.bytes_sent),
+            "per_message_deflate": settings.websocket_per_message_deflate,
+            "events_pushed": self.events_pushed,
+            "messages_dropped": self.messages_dropped,
+            "queued_messages": sum(depths),
+            "queue_depth": {
+                "max": max(depths, default=0),
+                "high_watermark": max(
+                    [self.queue_high_watermark] + [outbox.high_watermark for outbox in self.outboxes.values()]
+                ),
+                "capacity": self.queue_size,
+            },
+            "send_latency_ms": {
+                "p50": _percentile(latencies, 0.5),
+                "p99": _percentile(latencies, 0.99),
+                "max": max(latencies, default=0.0),
+            },
+            "messages_coalesced": self.messages_coalesced + sum(
+                outbox.coalesced for outbox in self.outboxes.values()
+            ),
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "send_timeouts": self.send_timeouts,
+            "send_errors": self.send_errors,
+            "heartbeat": {
+                "interval": self.ping_interval,
+                "timeout": self.ping_timeout,
+                "sent": self.heartbeats_sent,
+                "timeouts": self.heartbeat_timeouts,
+                "rtt_ms": {"p50": _percentile(rtts, 0.5), "p99": _percentile(rtts, 0.99)},
+            },
+            "draining": self.draining,
+        }
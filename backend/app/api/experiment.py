@@ -3,15 +3,20 @@ Routes API pour l'expérimentation et l'analyse des données
 Endpoints pour les données scientifiques et les métriques des biais
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, case, select
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
+import csv
+import io
 import json
 
-from ..database import get_db
-from ..models import GameSession, ExperimentData, BiasSnapshot, PlayerAction
+from ..database import get_async_reader_db
+from ..models import GameSession, ExperimentData, BiasSnapshot, BiasSnapshotRollup, PlayerAction
 from ..services.bias_analyzer import BiasAnalyzer
+from ..services.research_export import get_research_exporter
 
 router = APIRouter()
 
@@ -22,14 +27,14 @@ bias_analyzer = BiasAnalyzer()
 @router.get("/sessions/{session_id}/bias-analysis")
 async def get_bias_analysis(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_reader_db)
 ):
     """
     Récupère l'analyse complète des biais pour une session
     """
     try:
         # Vérifier que la session existe
-        session = db.query(GameSession).filter(GameSession.id == session_id).first()
+        session = await db.get(GameSession, session_id)
         if not session:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -37,16 +42,39 @@ async def get_bias_analysis(
             )
         
         # Récupérer les données expérimentales
-        experiment_data = db.query(ExperimentData)\
-            .filter(ExperimentData.session_id == session_id)\
-            .order_by(ExperimentData.measurement_timestamp.desc())\
-            .all()
+        experiment_data = (await db.execute(
+            select(ExperimentData)
+            .where(ExperimentData.session_id == session_id)
+            .order_by(ExperimentData.measurement_timestamp.desc())
+        )).scalars().all()
         
         # Récupérer les snapshots de biais
-        bias_snapshots = db.query(BiasSnapshot)\
-            .filter(BiasSnapshot.session_id == session_id)\
-            .order_by(BiasSnapshot.timestamp.desc())\
-            .all()
+        bias_snapshots = (await db.execute(
+            select(BiasSnapshot)
+            .where(BiasSnapshot.session_id == session_id)
+            .order_by(BiasSnapshot.timestamp.desc())
+        )).scalars().all()
+        
+        # Snapshots anciens agrégés par la rétention : rollups par minute tant
+        # qu'ils existent, sinon par phase
+        rollups = (await db.execute(
+            select(BiasSnapshotRollup)
+            .where(BiasSnapshotRollup.session_id == session_id)
+            .order_by(BiasSnapshotRollup.tier, BiasSnapshotRollup.bucket_start.desc())
+        )).scalars().all()
+        minute_rollups = [rollup for rollup in rollups if rollup.tier == "minute"]
+        phase_rollups = [rollup for rollup in rollups if rollup.tier == "phase"]
+        
+        snapshot_series = [snapshot.to_dict() for snapshot in bias_snapshots]
+        snapshot_series.extend(rollup.to_dict() for rollup in minute_rollups or phase_rollups)
+        snapshot_series.sort(key=lambda snapshot: snapshot["timestamp"], reverse=True)
+        
+        if not rollups:
+            snapshot_resolution = "raw"
+        elif bias_snapshots:
+            snapshot_resolution = "mixed"
+        else:
+            snapshot_resolution = "minute" if minute_rollups else "phase"
         
         # Calculer les métriques finales
         final_metrics = None
@@ -70,7 +98,9 @@ async def get_bias_analysis(
             },
             "final_metrics": final_metrics,
             "experiment_data": [data.to_dict() for data in experiment_data],
-            "bias_snapshots": [snapshot.to_dict() for snapshot in bias_snapshots],
+            "bias_snapshots": snapshot_series,
+            "snapshot_resolution": snapshot_resolution,
+            "phase_summary": [rollup.to_dict() for rollup in reversed(phase_rollups)],
             "total_measurements": len(experiment_data)
         }
     
@@ -83,93 +113,110 @@ async def get_bias_analysis(
         )
 
 
+BIAS_SCORE_FIELDS = [
+    ("automation_bias", "automation_bias_score"),
+    ("trust_calibration", "trust_calibration_score"),
+    ("cognitive_offloading", "cognitive_offloading_score"),
+    ("authority_compliance", "authority_compliance_score")
+]
+
+
+def _ending_label():
+    """Type de fin normalisé en SQL (NULL ou vide -> "unknown")"""
+    return func.coalesce(func.nullif(GameSession.ending_type, ""), "unknown")
+
+
+def _zero_if_null(column):
+    """COALESCE(column, 0) : équivalent SQL de `valeur or 0`"""
+    return func.coalesce(column, 0)
+
+
 @router.get("/experiment/aggregate-stats")
 async def get_aggregate_experiment_stats(
     condition: Optional[str] = None,
     ending_type: Optional[str] = None,
     days_back: int = 30,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_reader_db)
 ):
     """
     Récupère les statistiques agrégées de l'expérience
+    Calculées en SQL (AVG/COUNT/GROUP BY) : seules des lignes scalaires sont chargées
     """
     try:
         # Date limite
         date_limit = datetime.now() - timedelta(days=days_back)
         
-        # Query de base
-        query = db.query(GameSession).filter(GameSession.created_at >= date_limit)
+        # Filtres communs
+        filters = [GameSession.created_at >= date_limit]
         
         if condition:
-            query = query.filter(GameSession.condition == condition)
+            filters.append(GameSession.condition == condition)
         
         if ending_type:
-            query = query.filter(GameSession.ending_type == ending_type)
+            filters.append(GameSession.ending_type == ending_type)
+        
+        completed = GameSession.is_completed == True
+        
+        # Sessions "avec biais" : au moins un score non nul
+        has_bias = or_(*[
+            and_(getattr(GameSession, field_name) != None, getattr(GameSession, field_name) != 0)
+            for _, field_name in BIAS_SCORE_FIELDS
+        ])
+        
+        totals = (await db.execute(select(
+            func.count(GameSession.id),
+            func.sum(case((completed, 1), else_=0)),
+            func.sum(case((completed, _zero_if_null(GameSession.duration_seconds)), else_=0)),
+            func.sum(case((completed, _zero_if_null(GameSession.obedience_rate)), else_=0)),
+            func.sum(_zero_if_null(GameSession.corruption_level)),
+            func.sum(case((and_(completed, has_bias), 1), else_=0)),
+            *[
+                func.sum(case((and_(completed, has_bias), _zero_if_null(getattr(GameSession, field_name))), else_=0))
+                for _, field_name in BIAS_SCORE_FIELDS
+            ]
+        ).where(*filters))).one()
         
-        sessions = query.all()
+        total_sessions = totals[0] or 0
         
-        if not sessions:
+        if not total_sessions:
             return {
                 "total_sessions": 0,
                 "aggregate_stats": {},
                 "filters": {"condition": condition, "ending_type": ending_type, "days_back": days_back}
             }
         
-        # Calculer les statistiques agrégées
-        total_sessions = len(sessions)
-        completed_sessions = [s for s in sessions if s.is_completed]
+        completed_count = totals[1] or 0
         
         # Métriques générales
-        avg_duration = sum(s.duration_seconds or 0 for s in completed_sessions) / max(len(completed_sessions), 1) / 60
-        avg_obedience_rate = sum(s.obedience_rate or 0 for s in completed_sessions) / max(len(completed_sessions), 1)
-        avg_corruption_level = sum(s.corruption_level or 0 for s in sessions) / max(len(sessions), 1)
+        avg_duration = (totals[2] or 0) / max(completed_count, 1) / 60
+        avg_obedience_rate = (totals[3] or 0) / max(completed_count, 1)
+        avg_corruption_level = (totals[4] or 0) / total_sessions
         
         # Distribution des fins
-        ending_distribution = {}
-        for session in completed_sessions:
-            ending = session.ending_type or "unknown"
-            ending_distribution[ending] = ending_distribution.get(ending, 0) + 1
-        
-        # Métriques des biais (moyennes)
+        ending_rows = (await db.execute(
+            select(_ending_label(), func.count(GameSession.id))
+            .where(*filters, completed)
+            .group_by(_ending_label())
+        )).all()
+        ending_distribution = {ending: count for ending, count in ending_rows}
+        
+        # Métriques des biais (moyennes sur les sessions avec biais)
+        sessions_with_bias = totals[5] or 0
         bias_metrics = {
-            "automation_bias": 0.0,
-            "trust_calibration": 0.0,
-            "cognitive_offloading": 0.0,
-            "authority_compliance": 0.0
+            bias_name: (float(totals[6 + index] or 0) / sessions_with_bias if sessions_with_bias else 0.0)
+            for index, (bias_name, _) in enumerate(BIAS_SCORE_FIELDS)
         }
         
-        sessions_with_bias = [s for s in completed_sessions if any([
-            s.automation_bias_score, s.trust_calibration_score,
-            s.cognitive_offloading_score, s.authority_compliance_score
-        ])]
-        
-        if sessions_with_bias:
-            bias_metrics["automation_bias"] = sum(
-                s.automation_bias_score or 0 for s in sessions_with_bias
-            ) / len(sessions_with_bias)
-            
-            bias_metrics["trust_calibration"] = sum(
-                s.trust_calibration_score or 0 for s in sessions_with_bias
-            ) / len(sessions_with_bias)
-            
-            bias_metrics["cognitive_offloading"] = sum(
-                s.cognitive_offloading_score or 0 for s in sessions_with_bias
-            ) / len(sessions_with_bias)
-            
-            bias_metrics["authority_compliance"] = sum(
-                s.authority_compliance_score or 0 for s in sessions_with_bias
-            ) / len(sessions_with_bias)
-        
         return {
             "total_sessions": total_sessions,
-            "completed_sessions": len(completed_sessions),
+            "completed_sessions": completed_count,
             "aggregate_stats": {
                 "avg_duration_minutes": round(avg_duration, 2),
                 "avg_obedience_rate": round(avg_obedience_rate, 3),
                 "avg_corruption_level": round(avg_corruption_level, 3),
                 "ending_distribution": ending_distribution,
                 "bias_metrics": bias_metrics,
-                "completion_rate": len(completed_sessions) / total_sessions if total_sessions > 0 else 0
+                "completion_rate": completed_count / total_sessions if total_sessions > 0 else 0
             },
             "filters": {
                 "condition": condition,
@@ -191,33 +238,50 @@ async def compare_bias_by_condition(
     condition_a: str = "confident",
     condition_b: str = "oracle",
     days_back: int = 30,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_reader_db)
 ):
     """
     Compare les biais entre deux conditions expérimentales
+    Une requête groupée par condition et une pour la distribution des fins
     """
     try:
         date_limit = datetime.now() - timedelta(days=days_back)
         
-        # Récupérer les sessions pour chaque condition
-        sessions_a = db.query(GameSession)\
-            .filter(and_(
-                GameSession.condition == condition_a,
-                GameSession.created_at >= date_limit,
-                GameSession.is_completed == True
-            ))\
-            .all()
-        
-        sessions_b = db.query(GameSession)\
-            .filter(and_(
-                GameSession.condition == condition_b,
-                GameSession.created_at >= date_limit,
-                GameSession.is_completed == True
-            ))\
-            .all()
-        
-        def calculate_condition_stats(sessions, condition_name):
-            if not sessions:
+        filters = [
+            GameSession.condition.in_([condition_a, condition_b]),
+            GameSession.created_at >= date_limit,
+            GameSession.is_completed == True
+        ]
+        
+        # Agrégats par condition (AVG/MIN/MAX ignorent les scores NULL)
+        bias_columns = []
+        for _, field_name in BIAS_SCORE_FIELDS:
+            column = getattr(GameSession, field_name)
+            bias_columns.extend([func.avg(column), func.count(column), func.min(column), func.max(column)])
+        
+        rows = (await db.execute(select(
+            GameSession.condition,
+            func.count(GameSession.id),
+            func.sum(_zero_if_null(GameSession.obedience_rate)),
+            func.sum(_zero_if_null(GameSession.duration_seconds)),
+            func.sum(_zero_if_null(GameSession.corruption_level)),
+            *bias_columns
+        ).where(*filters).group_by(GameSession.condition))).all()
+        
+        ending_rows = (await db.execute(
+            select(GameSession.condition, _ending_label(), func.count(GameSession.id))
+            .where(*filters)
+            .group_by(GameSession.condition, _ending_label())
+        )).all()
+        
+        aggregates = {row[0]: row for row in rows}
+        endings: Dict[str, Dict[str, int]] = {}
+        for condition_name, ending, count in ending_rows:
+            endings.setdefault(condition_name, {})[ending] = count
+        
+        def calculate_condition_stats(condition_name):
+            row = aggregates.get(condition_name)
+            if row is None:
                 return {
                     "condition": condition_name,
                     "sample_size": 0,
@@ -225,47 +289,36 @@ async def compare_bias_by_condition(
                     "behavioral_metrics": {}
                 }
             
-            # Calculer les moyennes des biais
-            bias_scores = {}
-            bias_fields = [
-                ("automation_bias", "automation_bias_score"),
-                ("trust_calibration", "trust_calibration_score"),
-                ("cognitive_offloading", "cognitive_offloading_score"),
-                ("authority_compliance", "authority_compliance_score")
-            ]
+            sample_size = row[1]
             
-            for bias_name, field_name in bias_fields:
-                scores = [getattr(s, field_name) for s in sessions if getattr(s, field_name) is not None]
+            # Moyennes des biais
+            bias_scores = {}
+            for index, (bias_name, _) in enumerate(BIAS_SCORE_FIELDS):
+                mean, count, minimum, maximum = row[5 + index * 4:9 + index * 4]
                 bias_scores[bias_name] = {
-                    "mean": sum(scores) / len(scores) if scores else 0.0,
-                    "sample_size": len(scores),
-                    "min": min(scores) if scores else 0.0,
-                    "max": max(scores) if scores else 0.0
+                    "mean": float(mean) if count else 0.0,
+                    "sample_size": count,
+                    "min": minimum if count else 0.0,
+                    "max": maximum if count else 0.0
                 }
             
             # Métriques comportementales
             behavioral_metrics = {
-                "avg_obedience_rate": sum(s.obedience_rate or 0 for s in sessions) / len(sessions),
-                "avg_duration_minutes": sum(s.duration_seconds or 0 for s in sessions) / len(sessions) / 60,
-                "avg_corruption_level": sum(s.corruption_level or 0 for s in sessions) / len(sessions),
-                "ending_distribution": {}
+                "avg_obedience_rate": (row[2] or 0) / sample_size,
+                "avg_duration_minutes": (row[3] or 0) / sample_size / 60,
+                "avg_corruption_level": (row[4] or 0) / sample_size,
+                "ending_distribution": endings.get(condition_name, {})
             }
             
-            # Distribution des fins
-            for session in sessions:
-                ending = session.ending_type or "unknown"
-                behavioral_metrics["ending_distribution"][ending] = \
-                    behavioral_metrics["ending_distribution"].get(ending, 0) + 1
-            
             return {
                 "condition": condition_name,
-                "sample_size": len(sessions),
+                "sample_size": sample_size,
                 "bias_scores": bias_scores,
                 "behavioral_metrics": behavioral_metrics
             }
         
-        stats_a = calculate_condition_stats(sessions_a, condition_a)
-        stats_b = calculate_condition_stats(sessions_b, condition_b)
+        stats_a = calculate_condition_stats(condition_a)
+        stats_b = calculate_condition_stats(condition_b)
         
         # Calculer les différences
         differences = {}
@@ -304,22 +357,23 @@ async def analyze_behavioral_patterns(
     session_id: Optional[str] = None,
     condition: Optional[str] = None,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_reader_db)
 ):
     """
     Analyse les patterns comportementaux
     """
     try:
         # Query de base pour les actions
-        query = db.query(PlayerAction)
+        query = select(PlayerAction)
         
         if session_id:
-            query = query.filter(PlayerAction.session_id == session_id)
+            query = query.where(PlayerAction.session_id == session_id)
         elif condition:
             # Joindre avec GameSession pour filtrer par condition
-            query = query.join(GameSession).filter(GameSession.condition == condition)
+            query = query.join(GameSession).where(GameSession.condition == condition)
         
-        actions = query.order_by(PlayerAction.timestamp.desc()).limit(limit).all()
+        result = await db.execute(query.order_by(PlayerAction.timestamp.desc()).limit(limit))
+        actions = result.scalars().all()
         
         if not actions:
             return {
@@ -408,78 +462,169 @@ async def analyze_behavioral_patterns(
         )
 
 
+# Colonnes de l'export (ordre des colonnes CSV)
+EXPORT_FIELDS = [
+    "session_id", "condition", "game_phase", "duration_minutes", "ending_type",
+    "corruption_level", "obedience_rate", "total_actions", "created_at",
+    "automation_bias_score", "trust_calibration_score",
+    "cognitive_offloading_score", "authority_compliance_score",
+    "composite_bias_score",
+]
+
+EXPORT_MEDIA_TYPES = {
+    "json": "application/json",
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Nombre de lignes lues par aller-retour avec la base pendant l'export
+EXPORT_BATCH_SIZE = 1000
+
+
+def _latest_experiment_data():
+    """
+    Sous-requête : dernière mesure ExperimentData de chaque session
+    (fonction de fenêtre, remplace une requête par session)
+    """
+    ranked = select(
+        ExperimentData.session_id.label("session_id"),
+        ExperimentData.id.label("experiment_id"),
+        *[getattr(ExperimentData, field_name).label(field_name) for _, field_name in BIAS_SCORE_FIELDS],
+        func.row_number().over(
+            partition_by=ExperimentData.session_id,
+            order_by=(ExperimentData.measurement_timestamp.desc(), ExperimentData.id.desc())
+        ).label("rank"),
+    ).subquery()
+
+    return select(ranked).where(ranked.c.rank == 1).subquery()
+
+
+def _export_row(row, anonymize: bool) -> Dict[str, Any]:
+    """Construit une ligne d'export (mêmes règles que GameSession/ExperimentData)"""
+    session_data = {
+        "session_id": row.id if not anonymize else f"anon_{hash(row.id) % 10000}",
+        "condition": row.condition,
+        "game_phase": row.game_phase,
+        "duration_minutes": row.duration_seconds / 60.0 if row.duration_seconds else 0.0,
+        "ending_type": row.ending_type,
+        "corruption_level": row.corruption_level,
+        "obedience_rate": row.obedience_rate,
+        "total_actions": row.total_actions,
+        "created_at": row.created_at.isoformat() if not anonymize else None
+    }
+
+    # Ajouter les métriques de biais si disponibles
+    if row.experiment_id is not None:
+        scores = [getattr(row, field_name) for _, field_name in BIAS_SCORE_FIELDS]
+        valid_scores = [s for s in scores if s is not None]
+        session_data.update({field_name: score for (_, field_name), score in zip(BIAS_SCORE_FIELDS, scores)})
+        session_data["composite_bias_score"] = sum(valid_scores) / len(valid_scores) if valid_scores else 0.0
+
+    return session_data
+
+
+async def _stream_export(result, format: str, anonymize: bool, metadata: Dict[str, Any]):
+    """
+    Générateur de l'export : les lignes sont lues par lots depuis le curseur
+    et écrites au fil de l'eau, la mémoire reste constante
+    """
+    total_sessions = 0
+    try:
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            yield buffer.getvalue()
+        elif format == "json":
+            yield '{"export_format": "json", "data": ['
+
+        async for partition in result.partitions():
+            chunk = []
+            for row in partition:
+                session_data = _export_row(row, anonymize)
+
+                if format == "csv":
+                    buffer.seek(0)
+                    buffer.truncate()
+                    writer.writerow(session_data)
+                    chunk.append(buffer.getvalue())
+                elif format == "jsonl":
+                    chunk.append(json.dumps(session_data, ensure_ascii=False) + "\n")
+                else:
+                    separator = ", " if total_sessions else ""
+                    chunk.append(separator + json.dumps(session_data, ensure_ascii=False))
+
+                total_sessions += 1
+
+            yield "".join(chunk)
+
+        if format == "json":
+            # Métadonnées en fin de document : le total n'est connu qu'après lecture
+            yield '], "metadata": %s}' % json.dumps({
+                **metadata, "total_sessions": total_sessions,
+                "exported_at": datetime.now().isoformat()
+            }, ensure_ascii=False)
+    finally:
+        await result.close()
+
+
 @router.get("/experiment/export-data")
 async def export_experiment_data(
     format: str = "json",
     condition: Optional[str] = None,
     days_back: int = 30,
     anonymize: bool = True,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_reader_db)
 ):
     """
     Exporte les données expérimentales pour analyse externe
+    Réponse en flux : 'json' (document complet), 'jsonl' (une session par ligne)
+    ou 'csv', en une seule requête jointe à la dernière mesure de chaque session
     """
     try:
-        if format not in ["json", "csv"]:
+        if format not in EXPORT_MEDIA_TYPES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Format doit être 'json' ou 'csv'"
+                detail="Format doit être 'json', 'jsonl' ou 'csv'"
             )
         
         date_limit = datetime.now() - timedelta(days=days_back)
-        
-        # Récupérer les sessions
-        query = db.query(GameSession).filter(GameSession.created_at >= date_limit)
+        latest = _latest_experiment_data()
+        
+        # Sessions et dernière mesure expérimentale, colonnes scalaires uniquement
+        query = select(
+            GameSession.id,
+            GameSession.condition,
+            GameSession.game_phase,
+            GameSession.duration_seconds,
+            GameSession.ending_type,
+            GameSession.corruption_level,
+            GameSession.obedience_rate,
+            GameSession.total_actions,
+            GameSession.created_at,
+            latest.c.experiment_id,
+            *[latest.c[field_name] for _, field_name in BIAS_SCORE_FIELDS],
+        ).outerjoin(latest, latest.c.session_id == GameSession.id)\
+            .where(GameSession.created_at >= date_limit)\
+            .order_by(GameSession.created_at, GameSession.id)
         if condition:
-            query = query.filter(GameSession.condition == condition)
-        
-        sessions = query.all()
+            query = query.where(GameSession.condition == condition)
         
-        # Préparer les données d'export
-        export_data = []
+        # Curseur côté serveur : lecture par lots de EXPORT_BATCH_SIZE lignes
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
         
-        for session in sessions:
-            # Récupérer les données expérimentales associées
-            experiment_data = db.query(ExperimentData)\
-                .filter(ExperimentData.session_id == session.id)\
-                .order_by(ExperimentData.measurement_timestamp.desc())\
-                .first()
-            
-            session_data = {
-                "session_id": session.id if not anonymize else f"anon_{hash(session.id) % 10000}",
-                "condition": session.condition,
-                "game_phase": session.game_phase,
-                "duration_minutes": session.duration_minutes,
-                "ending_type": session.ending_type,
-                "corruption_level": session.corruption_level,
-                "obedience_rate": session.obedience_rate,
-                "total_actions": session.total_actions,
-                "created_at": session.created_at.isoformat() if not anonymize else None
-            }
-            
-            # Ajouter les métriques de biais si disponibles
-            if experiment_data:
-                session_data.update({
-                    "automation_bias_score": experiment_data.automation_bias_score,
-                    "trust_calibration_score": experiment_data.trust_calibration_score,
-                    "cognitive_offloading_score": experiment_data.cognitive_offloading_score,
-                    "authority_compliance_score": experiment_data.authority_compliance_score,
-                    "composite_bias_score": experiment_data.calculate_composite_bias_score()
-                })
-            
-            export_data.append(session_data)
-        
-        return {
-            "export_format": format,
-            "data": export_data,
-            "metadata": {
-                "total_sessions": len(export_data),
-                "condition_filter": condition,
-                "days_back": days_back,
-                "anonymized": anonymize,
-                "exported_at": datetime.now().isoformat()
-            }
+        metadata = {
+            "condition_filter": condition,
+            "days_back": days_back,
+            "anonymized": anonymize,
         }
+        filename = f"experiment_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+        
+        return StreamingResponse(
+            _stream_export(result, format, anonymize, metadata),
+            media_type=EXPORT_MEDIA_TYPES[format],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
     
     except HTTPException:
         raise
@@ -490,10 +635,56 @@ async def export_experiment_data(
         )
 
 
+@router.post("/experiment/columnar-export")
+async def export_columnar_data(
+    tables: Optional[str] = Query(None, description="Tables séparées par des virgules (toutes par défaut)"),
+    full: bool = False
+):
+    """
+    Exporte les journaux bruts (actions, interactions Tom, snapshots, mesures)
+    en fichiers Parquet partitionnés par condition et par date, de façon
+    incrémentale depuis le dernier export sauf si `full`
+    """
+    exporter = get_research_exporter()
+    table_names = [name.strip() for name in tables.split(",") if name.strip()] if tables else None
+
+    if exporter.is_running:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Un export de recherche est déjà en cours"
+        )
+
+    try:
+        # Export synchrone (lecture SQL + écriture Parquet) hors de la boucle d'événements
+        return await run_in_threadpool(exporter.export, table_names, full)
+    
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur export colonnaire: {str(e)}"
+        )
+
+
+@router.get("/experiment/columnar-export")
+async def get_columnar_export_status():
+    """
+    État de l'export colonnaire : filigranes par table et métriques
+    """
+    exporter = get_research_exporter()
+    return {
+        "watermarks": exporter.get_watermarks(),
+        "stats": exporter.get_stats()
+    }
+
+
 @router.get("/experiment/research-summary")
 async def get_research_summary(
     days_back: int = 30,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_reader_db)
 ):
     """
     Génère un résumé de recherche avec les principales découvertes
@@ -502,12 +693,12 @@ async def get_research_summary(
         date_limit = datetime.now() - timedelta(days=days_back)
         
         # Sessions complètes uniquement
-        sessions = db.query(GameSession)\
-            .filter(and_(
+        sessions = (await db.execute(
+            select(GameSession).where(and_(
                 GameSession.created_at >= date_limit,
                 GameSession.is_completed == True
-            ))\
-            .all()
+            ))
+        )).scalars().all()
         
         if not sessions:
             return {
@@ -3,17 +3,24 @@ Routes API REST pour le jeu REMOTE
 Endpoints pour la gestion des sessions et des données de jeu
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import uuid
 
-from ..database import get_db
-from ..models import GameSession, PlayerAction, TomInteraction
+from ..database import get_async_db
+from ..models import GameSession, PlayerAction, TomInteraction, SessionSummary, BiasSnapshotRollup
 from ..services.game_orchestrator import get_game_orchestrator
 from ..services.tom_ai_service import get_tom_service
+from ..services.telemetry import get_telemetry_hub
 from ..services.os_simulator import OSSimulator
 from ..core.corruption_system import CorruptionSystem
+from .pagination import (
+    apply_keyset, model_fields, page_size, paginate, parse_fields, projected_key, projected_row,
+    projection, stream_page
+)
 
 router = APIRouter()
 
@@ -21,17 +28,51 @@ router = APIRouter()
 os_simulator = OSSimulator()
 corruption_system = CorruptionSystem()
 
+# Lignes lues par lot pour les pages en flux
+STREAM_BATCH_SIZE = 1000
+
+# Champs projetables (`fields=`) des listages
+ACTION_FIELDS = model_fields(PlayerAction)
+INTERACTION_FIELDS = model_fields(TomInteraction)
+SESSION_FIELDS = {
+    **model_fields(GameSession),
+    # Compteur du résumé incrémental, à jour même en cours de partie
+    "total_actions": func.coalesce(SessionSummary.total_actions, GameSession.total_actions),
+}
+
+
+async def _listing_response(db, query, limit, stream, key, serialize, head, items_name, total_name):
+    """Page complète, ou en flux pour les grandes pages"""
+    if stream:
+        result = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        return StreamingResponse(
+            stream_page(result, limit, key, serialize, head, items_name, total_name),
+            media_type="application/json"
+        )
+
+    rows = (await db.execute(query)).all()
+    items, next_cursor = paginate(rows, limit, key, serialize)
+    return {**head, items_name: items, total_name: len(items), "next_cursor": next_cursor}
+
 
 @router.post("/sessions/create")
 async def create_game_session(
     player_name: Optional[str] = None,
+    session_id: Optional[str] = None,
     orchestrator = Depends(get_game_orchestrator),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Crée une nouvelle session de jeu
+    (session_id attribué par le routeur de sessions quand il est présent)
     """
-    session_id = str(uuid.uuid4())
+    if orchestrator.draining:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serveur en cours d'arrêt, réessayez dans quelques secondes"
+        )
+    
+    session_id = session_id or str(uuid.uuid4())
     
     try:
         # Créer la session avec l'orchestrateur
@@ -58,7 +99,7 @@ async def create_game_session(
 async def get_session_info(
     session_id: str,
     orchestrator = Depends(get_game_orchestrator),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Récupère les informations d'une session
@@ -69,7 +110,7 @@ async def get_session_info(
         
         if not session_status["exists"]:
             # Tenter de récupérer depuis la base de données
-            db_session = db.query(GameSession).filter(GameSession.id == session_id).first()
+            db_session = await db.get(GameSession, session_id)
             if not db_session:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -102,7 +143,7 @@ async def end_game_session(
     session_id: str,
     ending_type: str = "manual",
     orchestrator = Depends(get_game_orchestrator),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Termine une session de jeu
@@ -128,24 +169,41 @@ async def end_game_session(
 async def get_session_actions(
     session_id: str,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Récupère les actions d'une session
+    Récupère les actions d'une session, des plus récentes aux plus anciennes
+    Pagination par curseur (`next_cursor`), projection `fields=id,timestamp,...`
+    et réponse en flux (`stream=true`) pour les grandes pages
     """
     try:
-        actions = db.query(PlayerAction)\
-            .filter(PlayerAction.session_id == session_id)\
-            .order_by(PlayerAction.timestamp.desc())\
-            .limit(limit)\
-            .all()
+        limit = page_size(limit, stream)
+        selected = parse_fields(fields, ACTION_FIELDS)
         
-        return {
-            "session_id": session_id,
-            "actions": [action.to_dict() for action in actions],
-            "total_actions": len(actions)
-        }
+        if selected is None:
+            query = select(PlayerAction)
+            key = lambda row: (row[0].timestamp, row[0].id)
+            serialize = lambda row: row[0].to_dict()
+        else:
+            query = select(*projection(selected, ACTION_FIELDS, PlayerAction.timestamp, PlayerAction.id))
+            key = projected_key
+            serialize = lambda row: projected_row(row, selected)
+        
+        query = apply_keyset(
+            query.where(PlayerAction.session_id == session_id),
+            PlayerAction.timestamp, PlayerAction.id, cursor, limit
+        )
+        
+        return await _listing_response(
+            db, query, limit, stream, key, serialize,
+            {"session_id": session_id}, "actions", "total_actions"
+        )
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -157,24 +215,40 @@ async def get_session_actions(
 async def get_tom_interactions(
     session_id: str,
     limit: int = 30,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Récupère les interactions avec Tom pour une session
+    Récupère les interactions avec Tom pour une session (mêmes options de
+    pagination, projection et flux que les actions)
     """
     try:
-        interactions = db.query(TomInteraction)\
-            .filter(TomInteraction.session_id == session_id)\
-            .order_by(TomInteraction.timestamp.desc())\
-            .limit(limit)\
-            .all()
+        limit = page_size(limit, stream)
+        selected = parse_fields(fields, INTERACTION_FIELDS)
         
-        return {
-            "session_id": session_id,
-            "interactions": [interaction.to_dict() for interaction in interactions],
-            "total_interactions": len(interactions)
-        }
+        if selected is None:
+            query = select(TomInteraction)
+            key = lambda row: (row[0].timestamp, row[0].id)
+            serialize = lambda row: row[0].to_dict()
+        else:
+            query = select(*projection(selected, INTERACTION_FIELDS, TomInteraction.timestamp, TomInteraction.id))
+            key = projected_key
+            serialize = lambda row: projected_row(row, selected)
+        
+        query = apply_keyset(
+            query.where(TomInteraction.session_id == session_id),
+            TomInteraction.timestamp, TomInteraction.id, cursor, limit
+        )
+        
+        return await _listing_response(
+            db, query, limit, stream, key, serialize,
+            {"session_id": session_id}, "interactions", "total_interactions"
+        )
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -210,6 +284,30 @@ async def get_os_state(session_id: str):
         )
 
 
+@router.get("/sessions/{session_id}/telemetry")
+async def get_session_telemetry(session_id: str, recent: int = 0):
+    """
+    Agrégats de télémétrie d'une session en cours (distance du curseur,
+    fréquence des clics, hésitations) et, si demandé, ses derniers événements
+    """
+    telemetry_hub = get_telemetry_hub()
+    metrics = telemetry_hub.get_metrics(session_id)
+    
+    if metrics is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Aucune télémétrie pour cette session"
+        )
+    
+    response = {
+        "session_id": session_id,
+        "telemetry": metrics
+    }
+    if recent > 0:
+        response["recent_events"] = telemetry_hub.recent_events(session_id, recent)
+    return response
+
+
 @router.get("/sessions/{session_id}/corruption")
 async def get_corruption_state(session_id: str):
     """
@@ -264,51 +362,40 @@ async def generate_tom_message(
 @router.get("/sessions/{session_id}/stats")
 async def get_session_stats(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Récupère les statistiques d'une session
     """
     try:
-        # Récupérer la session
-        session = db.query(GameSession).filter(GameSession.id == session_id).first()
-        if not session:
+        # Session et résumé incrémental : une lecture par clé primaire
+        row = (await db.execute(
+            select(GameSession, SessionSummary)
+            .outerjoin(SessionSummary, SessionSummary.session_id == GameSession.id)
+            .where(GameSession.id == session_id)
+        )).first()
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Session non trouvée"
             )
         
-        # Compter les actions
-        total_actions = db.query(PlayerAction)\
-            .filter(PlayerAction.session_id == session_id)\
-            .count()
-        
-        obedient_actions = db.query(PlayerAction)\
-            .filter(PlayerAction.session_id == session_id)\
-            .filter(PlayerAction.was_obedient == True)\
-            .count()
-        
-        meta_actions = db.query(PlayerAction)\
-            .filter(PlayerAction.session_id == session_id)\
-            .filter(PlayerAction.action_type.like("meta_%"))\
-            .count()
-        
-        # Compter les interactions Tom
-        tom_interactions = db.query(TomInteraction)\
-            .filter(TomInteraction.session_id == session_id)\
-            .count()
-        
-        obedience_rate = (obedient_actions / total_actions) if total_actions > 0 else 0.0
+        session, summary = row
+        summary = summary or SessionSummary(session_id=session_id)
         
         return {
             "session_id": session_id,
             "session_info": session.to_dict(),
             "stats": {
-                "total_actions": total_actions,
-                "obedient_actions": obedient_actions,
-                "meta_actions": meta_actions,
-                "tom_interactions": tom_interactions,
-                "obedience_rate": obedience_rate,
+                "total_actions": summary.total_actions,
+                "obedient_actions": summary.obedient_actions,
+                "meta_actions": summary.meta_actions,
+                "tom_interactions": summary.tom_interactions,
+                "obedience_rate": summary.obedience_rate,
+                "max_obedience_streak": summary.max_obedience_streak,
+                "max_gravity": summary.max_gravity,
+                "average_reaction_time": summary.average_reaction_time,
+                "reaction_time_stddev": summary.reaction_time_stddev,
                 "session_completed": session.is_completed,
                 "ending_type": session.ending_type,
                 "corruption_level": session.corruption_level,
@@ -329,28 +416,42 @@ async def get_session_stats(
 async def list_sessions(
     limit: int = 20,
     completed_only: bool = False,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Liste les sessions de jeu
+    Liste les sessions de jeu, des plus récentes aux plus anciennes
+    Pagination par curseur sur (created_at, id), projection et flux comme les actions
     """
     try:
-        query = db.query(GameSession)
+        limit = page_size(limit, stream)
+        selected = parse_fields(fields, SESSION_FIELDS)
+        
+        if selected is None:
+            query = select(GameSession, SessionSummary)
+            key = lambda row: (row[0].created_at, row[0].id)
+            serialize = _session_with_summary
+        else:
+            query = select(*projection(selected, SESSION_FIELDS, GameSession.created_at, GameSession.id))
+            key = projected_key
+            serialize = lambda row: projected_row(row, selected)
+        
+        # Résumé joint par clé primaire : compteurs à jour même en cours de partie
+        query = query.select_from(GameSession)\
+            .outerjoin(SessionSummary, SessionSummary.session_id == GameSession.id)
         
         if completed_only:
-            query = query.filter(GameSession.is_completed == True)
+            query = query.where(GameSession.is_completed == True)
         
-        sessions = query.order_by(GameSession.created_at.desc()).limit(limit).all()
+        query = apply_keyset(query, GameSession.created_at, GameSession.id, cursor, limit)
         
-        return {
-            "sessions": [session.to_dict() for session in sessions],
-            "total_found": len(sessions),
-            "filters": {
-                "limit": limit,
-                "completed_only": completed_only
-            }
-        }
+        head = {"filters": {"limit": limit, "completed_only": completed_only}}
+        return await _listing_response(db, query, limit, stream, key, serialize, head, "sessions", "total_found")
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -358,11 +459,21 @@ async def list_sessions(
         )
 
 
+def _session_with_summary(row) -> Dict[str, Any]:
+    """Session complète et son résumé incrémental"""
+    session, summary = row
+    session_data = session.to_dict()
+    if summary is not None:
+        session_data["total_actions"] = summary.total_actions
+        session_data["summary"] = summary.to_dict()
+    return session_data
+
+
 @router.delete("/sessions/{session_id}")
 async def delete_session(
     session_id: str,
     orchestrator = Depends(get_game_orchestrator),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Supprime une session et toutes ses données associées
@@ -375,17 +486,23 @@ async def delete_session(
             pass  # La session n'était peut-être pas active
         
         # Supprimer de la base de données
-        session = db.query(GameSession).filter(GameSession.id == session_id).first()
+        session = await db.get(GameSession, session_id)
         if session:
             # Supprimer les actions associées
-            db.query(PlayerAction).filter(PlayerAction.session_id == session_id).delete()
+            await db.execute(delete(PlayerAction).where(PlayerAction.session_id == session_id))
             
             # Supprimer les interactions Tom
-            db.query(TomInteraction).filter(TomInteraction.session_id == session_id).delete()
+            await db.execute(delete(TomInteraction).where(TomInteraction.session_id == session_id))
+            
+            # Supprimer le résumé
+            await db.execute(delete(SessionSummary).where(SessionSummary.session_id == session_id))
+            
+            # Supprimer les agrégats de snapshots de biais
+            await db.execute(delete(BiasSnapshotRollup).where(BiasSnapshotRollup.session_id == session_id))
             
             # Supprimer la session
-            db.delete(session)
-            db.commit()
+            await db.delete(session)
+            await db.commit()
         
         # Nettoyer les services
         os_simulator.cleanup_session(session_id)
@@ -398,7 +515,7 @@ async def delete_session(
         }
     
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur suppression session: {str(e)}"
@@ -0,0 +1,147 @@
+"""
+Pagination par curseur (keyset) et projection des champs pour les listages
+Les pages sont triées par (horodatage, id) décroissants ; le curseur encode la
+clé de la dernière ligne servie, la page suivante reprend juste après par un
+parcours d'index : coût constant quelle que soit la profondeur
+"""
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+import base64
+import json
+
+# Taille maximum d'une page (réponse en flux : pages plus grandes acceptées)
+MAX_PAGE_SIZE = 1000
+MAX_STREAM_PAGE_SIZE = 100000
+
+# Libellés des colonnes de clé ajoutées aux requêtes projetées
+CURSOR_TIMESTAMP = "cursor_timestamp"
+CURSOR_ID = "cursor_id"
+
+
+def encode_cursor(timestamp: datetime, row_id: str) -> str:
+    """Curseur opaque de la ligne (horodatage, id)"""
+    payload = json.dumps([timestamp.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Clé (horodatage, id) d'un curseur ; 400 si le curseur est invalide"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(timestamp), str(row_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide"
+        )
+
+
+def page_size(limit: int, stream: bool = False) -> int:
+    """Taille de page bornée"""
+    return max(1, min(limit, MAX_STREAM_PAGE_SIZE if stream else MAX_PAGE_SIZE))
+
+
+def model_fields(model, exclude: Tuple[str, ...] = ()) -> Dict[str, Any]:
+    """Champs projetables d'un modèle : ses colonnes"""
+    return {column.name: column for column in model.__table__.columns if column.name not in exclude}
+
+
+def parse_fields(fields: Optional[str], available: Dict[str, Any]) -> Optional[List[str]]:
+    """Champs demandés (`fields=a,b,c`) ; None = représentation complète"""
+    if not fields:
+        return None
+
+    selected = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in selected if name not in available]
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Champs inconnus: {', '.join(unknown)} (disponibles: {', '.join(available)})"
+        )
+    return selected
+
+
+def projection(selected: List[str], available: Dict[str, Any], timestamp_column, id_column) -> list:
+    """Colonnes d'une requête projetée, suivies de la clé du curseur"""
+    return [available[name].label(name) for name in selected] + [
+        timestamp_column.label(CURSOR_TIMESTAMP),
+        id_column.label(CURSOR_ID),
+    ]
+
+
+def apply_keyset(query, timestamp_column, id_column, cursor: Optional[str], limit: int):
+    """Tri (horodatage, id) décroissant, reprise après le curseur, une ligne de plus que la page"""
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        # Borne sur l'horodatage seul d'abord : l'index (…, timestamp) sert de point de départ
+        query = query.where(
+            timestamp_column <= timestamp,
+            or_(timestamp_column < timestamp, and_(timestamp_column == timestamp, id_column < row_id))
+        )
+    return query.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def projected_row(row, selected: List[str]) -> Dict[str, Any]:
+    """Ligne projetée en dictionnaire (dates en ISO 8601)"""
+    mapping = row._mapping
+    return {
+        name: value.isoformat() if isinstance(value, datetime) else value
+        for name, value in ((name, mapping[name]) for name in selected)
+    }
+
+
+def projected_key(row) -> Tuple[datetime, str]:
+    """Clé du curseur d'une ligne projetée"""
+    return row._mapping[CURSOR_TIMESTAMP], row._mapping[CURSOR_ID]
+
+
+def paginate(
+    rows: List[Any],
+    limit: int,
+    key: Callable[[Any], Tuple[datetime, str]],
+    serialize: Callable[[Any], Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Page sérialisée et curseur de la page suivante (None en fin de liste)"""
+    next_cursor = encode_cursor(*key(rows[limit - 1])) if len(rows) > limit else None
+    return [serialize(row) for row in rows[:limit]], next_cursor
+
+
+async def stream_page(
+    result,
+    limit: int,
+    key: Callable[[Any], Tuple[datetime, str]],
+    serialize: Callable[[Any], Dict[str, Any]],
+    head: Dict[str, Any],
+    items_name: str,
+    total_name: str
+) -> AsyncIterator[str]:
+    """
+    Page en flux : document JSON de même forme que la réponse complète, lignes
+    écrites au fil de la lecture ; total et curseur en fin de document
+    """
+    count = 0
+    last = None
+    has_more = False
+    try:
+        yield json.dumps(head, ensure_ascii=False)[:-1] + (", " if head else "") + f'"{items_name}": ['
+
+        async for partition in result.partitions():
+            chunk = []
+            for row in partition:
+                if count == limit:
+                    has_more = True
+                    break
+                chunk.append((", " if count else "") + json.dumps(serialize(row), ensure_ascii=False, default=str))
+                last = row
+                count += 1
+            yield "".join(chunk)
+            if has_more:
+                break
+
+        next_cursor = encode_cursor(*key(last)) if has_more else None
+        yield f'], "{total_name}": {count}, "next_cursor": {json.dumps(next_cursor)}}}'
+    finally:
+        await result.close()
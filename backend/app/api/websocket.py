@@ -3,19 +3,25 @@ Routes API pour les endpoints WebSocket
 Gestion des connexions temps réel
 """
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import json
 import uuid
 from datetime import datetime
 
 from ..services.game_orchestrator import get_game_orchestrator
 from ..services.tom_ai_service import get_tom_service
+from .wire_protocol import (
+    WireCodec, EncodedMessage, JSON_CODEC, negotiate, transport_compressed,
+    send_frame, receive_message
+)
 
 router = APIRouter()
 
 # Stockage temporaire des connexions actives
 # (Sera géré par le ConnectionManager dans main.py)
 active_connections: Dict[str, WebSocket] = {}
+# Encodage négocié à l'initialisation de session (JSON par défaut)
+connection_codecs: Dict[str, WireCodec] = {}
 
 
 @router.websocket("/connect/{connection_id}")
@@ -36,7 +42,7 @@ async def websocket_endpoint(
     try:
         while True:
             # Recevoir les messages du client
-            data = await websocket.receive_json()
+            data = await receive_message(websocket)
             
             # Router le message selon son type
             response = await route_websocket_message(
@@ -45,17 +51,20 @@ async def websocket_endpoint(
             
             # Envoyer la réponse
             if response:
-                await websocket.send_json(response)
+                codec = connection_codecs.get(connection_id, JSON_CODEC)
+                await send_frame(websocket, EncodedMessage(response).encode(codec))
     
     except WebSocketDisconnect:
         print(f"🔌 Connexion WebSocket fermée: {connection_id}")
         if connection_id in active_connections:
             del active_connections[connection_id]
+        connection_codecs.pop(connection_id, None)
     
     except Exception as e:
         print(f"❌ Erreur WebSocket {connection_id}: {e}")
         if connection_id in active_connections:
             del active_connections[connection_id]
+        connection_codecs.pop(connection_id, None)
 
 
 async def route_websocket_message(
@@ -63,9 +72,9 @@ async def route_websocket_message(
     connection_id: str,
     orchestrator,
     tom_service
-) -> Dict[str, Any]:
+) -> Optional[Dict[str, Any]]:
     """
-    Route les messages WebSocket selon leur type
+    Route les messages WebSocket selon leur type (None : pas de réponse)
     """
     message_type = data.get("type")
     
@@ -76,6 +85,9 @@ async def route_websocket_message(
         elif message_type == "player_action":
             return await handle_player_action(data, connection_id, orchestrator)
         
+        elif message_type == "telemetry_batch":
+            return await handle_telemetry_batch(data, connection_id, orchestrator)
+        
         elif message_type == "player_hesitation":
             return await handle_player_hesitation(data, connection_id, orchestrator)
         
@@ -126,10 +138,19 @@ async def handle_session_init(
             websocket_manager=None  # Sera implémenté plus tard
         )
         
+        # Encodage des messages suivants (et de cette réponse, qui porte l'état de l'OS)
+        websocket = active_connections.get(connection_id)
+        codec = negotiate(
+            data.get("encodings") or [],
+            websocket is not None and transport_compressed(websocket)
+        )
+        connection_codecs[connection_id] = codec
+        
         return {
             "type": "session_ready",
             "session_id": session_id,
             "session_data": session_data,
+            "encoding": codec.name,
             "timestamp": datetime.now().isoformat()
         }
     
@@ -167,6 +188,10 @@ async def handle_player_action(
             websocket_manager=None
         )
         
+        # Événement de télémétrie isolé : agrégé, pas d'accusé de traitement
+        if result.get("telemetry"):
+            return None
+        
         return {
             "type": "action_processed",
             "session_id": session_id,
@@ -183,6 +208,28 @@ async def handle_player_action(
         }
 
 
+async def handle_telemetry_batch(
+    data: Dict[str, Any], 
+    connection_id: str, 
+    orchestrator
+) -> Optional[Dict[str, Any]]:
+    """
+    Gère un lot d'événements d'entrée (souris, clics, focus)
+    Pas de réponse : le lot est agrégé dans le tampon de télémétrie de la session
+    """
+    session_id = data.get("session_id")
+    
+    if not session_id:
+        return {
+            "type": "telemetry_error",
+            "message": "session_id requis",
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    orchestrator.ingest_telemetry(session_id, data.get("events") or [])
+    return None
+
+
 async def handle_player_hesitation(
     data: Dict[str, Any], 
     connection_id: str, 
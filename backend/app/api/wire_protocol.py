@@ -0,0 +1,187 @@
+"""
+Protocole de transport WebSocket négocié à l'initialisation de session
+Le client annonce ses encodages dans `session_init`, le serveur retient le
+premier de sa liste de préférence que le client accepte :
+  - "msgpack" : trames binaires MessagePack (si le module msgpack est installé)
+  - "deflate" : JSON compressé (deflate brut) en trame binaire
+  - "json"    : trames texte JSON (repli, comportement historique)
+
+Les trames binaires commencent par un octet de format : elles se décodent sans
+connaître l'encodage négocié, une trame texte est toujours du JSON. Les petits
+messages restent en clair (la compression ne paie pas sous le seuil), et quand
+permessage-deflate compresse déjà la connexion, la compression applicative est
+ignorée à la négociation.
+
+Un message sérialisé pour un encodage (EncodedMessage) est réutilisé pour tous
+les destinataires : une trame n'est sérialisée qu'une fois.
+"""
+from fastapi import WebSocket, WebSocketDisconnect
+from typing import Any, Dict, Iterable, List, Optional, Union
+import zlib
+import orjson
+
+from ..config import settings
+
+try:
+    import msgpack
+except ImportError:  # Encodage binaire optionnel : repli sur JSON
+    msgpack = None
+
+# Octet de format des trames binaires
+FORMAT_DEFLATE_JSON = 0x01
+FORMAT_MSGPACK = 0x02
+FORMAT_DEFLATE_MSGPACK = 0x03
+
+# Trame encodée : texte (JSON) ou binaire (octet de format + charge utile)
+Frame = Union[str, bytes]
+
+
+def dumps_json(message: Dict[str, Any]) -> bytes:
+    """JSON compact en UTF-8 (dates en ISO 8601, valeurs inconnues en texte)"""
+    return orjson.dumps(message, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _deflate(payload: bytes) -> bytes:
+    """Deflate brut (sans en-tête zlib), décodable par DecompressionStream('deflate-raw')"""
+    compressor = zlib.compressobj(settings.websocket_compression_level, zlib.DEFLATED, -15)
+    return compressor.compress(payload) + compressor.flush()
+
+
+class WireCodec:
+    """Encodage des messages d'une connexion"""
+
+    def __init__(self, name: str, binary: bool = False, compress: bool = False):
+        self.name = name
+        self.binary = binary
+        self.compress = compress
+
+    def serialize(self, message: Dict[str, Any]) -> bytes:
+        """Charge utile non compressée"""
+        if self.binary:
+            return msgpack.packb(message, default=str)
+        return dumps_json(message)
+
+    def frame(self, payload: bytes) -> Frame:
+        """Trame à partir de la charge utile sérialisée"""
+        compress = self.compress and len(payload) >= settings.websocket_compression_threshold
+        if self.binary:
+            if compress:
+                return bytes([FORMAT_DEFLATE_MSGPACK]) + _deflate(payload)
+            return bytes([FORMAT_MSGPACK]) + payload
+        if compress:
+            return bytes([FORMAT_DEFLATE_JSON]) + _deflate(payload)
+        return payload.decode("utf-8")
+
+    def encode(self, message: Dict[str, Any]) -> Frame:
+        return self.frame(self.serialize(message))
+
+    def __repr__(self):
+        return f"<WireCodec({self.name})>"
+
+
+JSON_CODEC = WireCodec("json")
+DEFLATE_CODEC = WireCodec("deflate", compress=True)
+MSGPACK_CODEC = WireCodec("msgpack", binary=True, compress=True)
+# Connexion déjà compressée par permessage-deflate : pas de seconde compression
+MSGPACK_PLAIN_CODEC = WireCodec("msgpack", binary=True)
+
+CODECS: Dict[str, WireCodec] = {
+    "json": JSON_CODEC,
+    "deflate": DEFLATE_CODEC,
+    "msgpack": MSGPACK_CODEC,
+}
+
+
+def available_encodings() -> List[str]:
+    """Encodages proposés par le serveur, dans son ordre de préférence"""
+    return [
+        name for name in settings.websocket_encodings
+        if name in CODECS and (name != "msgpack" or msgpack is not None)
+    ]
+
+
+def transport_compressed(websocket: WebSocket) -> bool:
+    """La connexion est-elle compressée par l'extension permessage-deflate ?"""
+    extensions = websocket.headers.get("sec-websocket-extensions", "")
+    return settings.websocket_per_message_deflate and "permessage-deflate" in extensions
+
+
+def negotiate(requested: Optional[Iterable[str]], compressed_transport: bool = False) -> WireCodec:
+    """
+    Encodage d'une connexion : premier encodage du serveur accepté par le client
+    (client sans liste ou liste inconnue : JSON)
+    """
+    accepted = set(requested or ())
+    for name in available_encodings():
+        if name not in accepted:
+            continue
+        if compressed_transport:
+            # La compression applicative ne ferait que doubler le travail
+            if name == "deflate":
+                continue
+            if name == "msgpack":
+                return MSGPACK_PLAIN_CODEC
+        return CODECS[name]
+    return JSON_CODEC
+
+
+class EncodedMessage:
+    """
+    Message sérialisé une seule fois : la charge utile de chaque format et la
+    trame de chaque encodage sont conservées pour les envois suivants
+    """
+
+    __slots__ = ("message", "_payloads", "_frames")
+
+    def __init__(self, message: Dict[str, Any]):
+        self.message = message
+        self._payloads: Dict[bool, bytes] = {}
+        self._frames: Dict[int, Frame] = {}
+
+    def encode(self, codec: WireCodec) -> Frame:
+        frame = self._frames.get(id(codec))
+        if frame is None:
+            payload = self._payloads.get(codec.binary)
+            if payload is None:
+                payload = self._payloads[codec.binary] = codec.serialize(self.message)
+            frame = self._frames[id(codec)] = codec.frame(payload)
+        return frame
+
+    def size(self, codec: WireCodec) -> int:
+        """Octets de la trame d'un encodage (avant permessage-deflate)"""
+        frame = self.encode(codec)
+        return len(frame) if isinstance(frame, bytes) else len(self._payloads[False])
+
+
+def decode(frame: Frame) -> Dict[str, Any]:
+    """Message d'une trame texte (JSON) ou binaire (octet de format)"""
+    if isinstance(frame, str):
+        return orjson.loads(frame)
+
+    kind, payload = frame[0], frame[1:]
+    if kind == FORMAT_DEFLATE_JSON:
+        return orjson.loads(zlib.decompress(payload, -15))
+    if kind in (FORMAT_MSGPACK, FORMAT_DEFLATE_MSGPACK) and msgpack is not None:
+        if kind == FORMAT_DEFLATE_MSGPACK:
+            payload = zlib.decompress(payload, -15)
+        return msgpack.unpackb(payload)
+    raise ValueError(f"Format de trame inconnu: {kind}")
+
+
+async def send_frame(websocket: WebSocket, frame: Frame):
+    """Envoie une trame encodée"""
+    if isinstance(frame, bytes):
+        await websocket.send_bytes(frame)
+    else:
+        await websocket.send_text(frame)
+
+
+async def receive_message(websocket: WebSocket) -> Dict[str, Any]:
+    """Reçoit et décode le prochain message (trame texte ou binaire)"""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    if message.get("text") is not None:
+        return decode(message["text"])
+    return decode(message["bytes"])
+
@@ -19,9 +19,46 @@ class Settings(BaseSettings):
     host: str = "localhost"
     port: int = 8000
     reload: bool = True
+    workers: int = 1  # Workers uvicorn (> 1 : état des sessions partagé requis, sans rechargement)
+    worker_id: str = ""  # Identité du worker derrière le routeur (points de reprise restaurés par worker)
+    shutdown_drain_seconds: float = 10.0  # Attente des réponses Tom en cours avant l'arrêt
     
     # Configuration base de données
     database_url: str = "sqlite:///./database/game.db"
+    database_pool_size: int = 10  # Connexions asynchrones permanentes
+    database_max_overflow: int = 20  # Connexions supplémentaires en pointe
+    database_pool_timeout: float = 30.0  # Attente maximum d'une connexion libre
+    database_pool_recycle: int = 1800  # Renouvellement des connexions (secondes)
+    database_auto_migrate: bool = True  # Migrations en ligne au démarrage
+    database_migration_pause_seconds: float = 0.5  # Pause entre deux constructions d'index
+    database_storage_profile: str = "production"  # "production" (WAL, pragmas, lecteurs séparés) ou "default"
+    database_reader_pool_size: int = 8  # Connexions en lecture seule pour les analyses
+    database_sqlite_synchronous: str = "NORMAL"  # NORMAL suffit en WAL (FULL = fsync à chaque commit)
+    database_sqlite_cache_size_kb: int = 65536  # Cache de pages par connexion
+    database_sqlite_mmap_size_mb: int = 256  # Lecture des pages par mmap
+    database_sqlite_busy_timeout_ms: int = 5000  # Attente maximum du verrou d'écriture
+    
+    # Configuration de la persistance différée (write-behind)
+    persistence_queue_size: int = 10000  # Opérations en attente avant backpressure
+    persistence_batch_size: int = 200  # Opérations maximum par transaction
+    
+    # État des sessions (orchestrateur, Tom, OS, corruption)
+    session_store_backend: str = "memory"  # "memory" (un seul worker) ou "sqlite" (partagé entre workers)
+    session_store_path: str = "./database/session_state.db"
+    
+    # Points de reprise des sessions (redémarrage sans perte des parties en cours)
+    session_checkpoint_enabled: bool = True
+    session_checkpoint_path: str = "./database/session_checkpoints.db"
+    session_checkpoint_interval_seconds: float = 30.0  # En plus du point de reprise après chaque action
+    session_checkpoint_compression_level: int = 1  # zlib : 1 = le plus rapide
+    
+    # Routeur de sessions : hachage cohérent du session_id vers plusieurs workers
+    router_workers: list = []  # URLs des workers (ex. ["http://127.0.0.1:8101"])
+    router_worker_base_port: int = 8101  # Premier port des workers lancés par run.py --router N
+    router_virtual_nodes: int = 160  # Positions de chaque worker sur l'anneau
+    router_health_interval_seconds: float = 5.0  # Vérification de l'état des workers
+    router_request_timeout: float = 60.0  # Requêtes HTTP transmises (génération Tom comprise)
+    router_max_sticky_sessions: int = 100000  # Sessions dont le routeur retient le worker détenteur
     
     # Configuration OpenAI
     openai_api_key: Optional[str] = None
@@ -43,19 +80,61 @@ class Settings(BaseSettings):
     ]
     
     # Configuration WebSocket
-    websocket_ping_interval: int = 20
-    websocket_ping_timeout: int = 10
+    websocket_ping_interval: int = 20  # Heartbeat envoyé par le serveur (secondes)
+    websocket_ping_timeout: int = 10  # Silence toléré au-delà d'un intervalle : connexion morte
+    websocket_per_message_deflate: bool = True  # Extension permessage-deflate proposée par uvicorn
+    websocket_encodings: list = ["msgpack", "deflate", "json"]  # Ordre de préférence du serveur
+    websocket_compression_threshold: int = 512  # Octets sous lesquels une trame reste en clair
+    websocket_compression_level: int = 6
+    websocket_send_queue_size: int = 256  # Messages en attente d'envoi par connexion
+    websocket_coalesce_types: list = ["game_state", "corruption_update", "heartbeat"]  # États remplacés : seul le dernier est envoyé
+    websocket_slow_consumer_policy: str = "disconnect"  # File pleine : "drop_oldest", "drop_newest" ou "disconnect"
+    websocket_send_timeout_seconds: float = 10.0  # Envoi bloqué au-delà : client lent déconnecté
+    
+    # Présence des clients : session suspendue sans client, close si le joueur ne revient pas
+    session_reconnect_grace_seconds: float = 30.0
+    session_abandon_seconds: float = 600.0
+    
+    # Télémétrie des entrées (souris, clics, focus) regroupée par le client
+    telemetry_buffer_size: int = 2000  # Événements conservés par session (tampon circulaire)
+    telemetry_hesitation_seconds: float = 3.0  # Pause sans entrée comptée comme hésitation
+    telemetry_max_sessions: int = 1000  # Sessions suivies en mémoire
+    telemetry_max_clock_ahead_seconds: float = 5.0  # Avance maximale d'un horodatage client sur l'horloge du serveur
     
     # Configuration expérimentale
     collect_experiment_data: bool = True
     anonymize_data: bool = True
     
+    # Export colonnaire (Parquet) pour l'analyse de recherche
+    research_export_path: str = "./exports/research"
+    research_export_batch_size: int = 50000  # Lignes lues par lot
+    
+    # Rétention par niveaux des snapshots de biais
+    bias_retention_enabled: bool = True
+    bias_retention_raw_hours: float = 24  # Snapshots bruts conservés après le dernier snapshot d'une session
+    bias_retention_minute_days: float = 90  # Rollups par minute conservés (ceux par phase sont permanents)
+    bias_retention_interval_seconds: int = 3600  # Intervalle entre deux passages
+    bias_retention_batch_sessions: int = 100  # Sessions agrégées par transaction
+    
     # Configuration Tom AI
     tom_personality_condition: str = "confident"  # "confident" ou "oracle"
     tom_response_delay_min: float = 0.5  # Délai minimum entre les réponses
     tom_response_delay_max: float = 2.0  # Délai maximum entre les réponses
     tom_typing_speed: float = 0.05  # Vitesse de frappe simulée (secondes par caractère)
     
+    # Cache des générations de Tom
+    tom_cache_enabled: bool = True
+    tom_cache_max_entries: int = 1000  # Entrées maximum avant éviction LRU
+    tom_cache_ttl_seconds: int = 86400  # Durée de vie d'une entrée
+    tom_cache_variants: int = 3  # Variantes générées par clé avant de servir depuis le cache
+    tom_cache_path: Optional[str] = "./database/tom_cache.db"  # Vide = cache mémoire uniquement
+    
+    # Réserve pré-générée de personnalités/introductions de Tom
+    tom_pool_enabled: bool = True
+    tom_pool_size: int = 8  # Entrées par condition
+    tom_pool_low_water: int = 3  # Seuil de déclenchement du remplissage
+    tom_pool_path: Optional[str] = "./database/tom_pool.json"  # Vide = pas de sauvegarde
+    
     # Configuration du jeu
     game_duration_minutes: int = 10
     corruption_intensity_max: float = 1.0
@@ -7,6 +7,10 @@ import math
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+from ..services.event_bus import get_event_bus
+from ..services.session_store import SessionStateMap
+
+
 class CorruptionSystem:
     """
     Système de corruption pour REMOTE
@@ -14,10 +18,14 @@ class CorruptionSystem:
     """
     
     def __init__(self):
-        self.session_corruption = {}  # Niveau de corruption par session
-        self.corruption_history = {}  # Historique des corruptions
+        # Niveau et historique par session (partagés entre workers)
+        self.session_corruption = SessionStateMap("corruption_level")
+        self.corruption_history = SessionStateMap("corruption_history")
         self.max_corruption = 1.0
         
+        # Mises à jour poussées au client de la session
+        self.event_bus = get_event_bus()
+        
         # Types d'effets de corruption
         self.corruption_effects = {
             "pixel_corruption": {
@@ -89,6 +97,11 @@ class CorruptionSystem:
         # Stocker le niveau pour cette session
         self.session_corruption[session_id] = new_level
         
+        await self.event_bus.publish(session_id, {
+            "type": "corruption_update",
+            "corruption_data": corruption_data
+        })
+        
         return corruption_data
     
     def _calculate_corruption_increase(self, action_analysis: Dict[str, Any]) -> float:
@@ -229,9 +242,6 @@ class CorruptionSystem:
         """
         Enregistre un événement de corruption dans l'historique
         """
-        if session_id not in self.corruption_history:
-            self.corruption_history[session_id] = []
-        
         event = {
             "timestamp": datetime.now().isoformat(),
             "trigger_action": action_analysis.get("type", "unknown"),
@@ -242,11 +252,11 @@ class CorruptionSystem:
             "effect_types": [effect["type"] for effect in effects]
         }
         
-        self.corruption_history[session_id].append(event)
+        history = self.corruption_history.get(session_id, [])
+        history.append(event)
         
         # Limiter l'historique à 50 événements
-        if len(self.corruption_history[session_id]) > 50:
-            self.corruption_history[session_id] = self.corruption_history[session_id][-50:]
+        self.corruption_history[session_id] = history[-50:]
     
     async def get_corruption_data_for_frontend(self, session_id: str) -> Dict[str, Any]:
         """
@@ -6,6 +6,9 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 import re
 
+from ..services.event_bus import get_event_bus
+
+
 class EndingSystem:
     """
     Système de gestion des fins de jeu REMOTE
@@ -13,6 +16,9 @@ class EndingSystem:
     """
     
     def __init__(self):
+        # Fin de partie poussée au client de la session
+        self.event_bus = get_event_bus()
+        
         # Configuration des fins
         self.ending_types = {
             "detective": {
@@ -101,6 +107,17 @@ class EndingSystem:
         # Aucune fin détectée
         return {"triggered": False}
     
+    async def announce_ending(self, session_id: str, ending_content: Dict[str, Any]):
+        """
+        Annonce la fin de partie au client (session_status "ended")
+        """
+        await self.event_bus.publish(session_id, {
+            "type": "session_status",
+            "status": "ended",
+            "ending_type": ending_content.get("ending_type"),
+            "ending_data": ending_content
+        })
+    
     def _check_detective_ending(self, action_data: Dict[str, Any], game_state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Vérifie la condition de fin du Détective
@@ -1,24 +1,244 @@
 """
 Configuration de la base de données SQLAlchemy
 """
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, event, MetaData, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from contextlib import contextmanager
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Any, Optional
 import os
+import threading
+import time
 
 from .config import settings
 
-# Configuration du moteur SQLAlchemy
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
-    echo=settings.debug,  # Log des requêtes SQL en mode debug
-)
+
+class LockWaitStats:
+    """
+    Attente du verrou d'écriture SQLite : durée du BEGIN IMMEDIATE de chaque
+    transaction du rédacteur, et erreurs « database is locked »
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Remet les compteurs à zéro"""
+        with self._lock:
+            self.transactions = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self.slow_waits = 0  # Attentes > 10 ms
+            self.busy_errors = 0
+
+    def record_wait(self, wait_ms: float):
+        """Enregistre l'attente du verrou d'une transaction d'écriture"""
+        with self._lock:
+            self.transactions += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            if wait_ms > 10:
+                self.slow_waits += 1
+
+    def record_busy(self):
+        """Enregistre une erreur « database is locked »"""
+        with self._lock:
+            self.busy_errors += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Métriques d'attente du verrou"""
+        with self._lock:
+            return {
+                "write_transactions": self.transactions,
+                "lock_wait_total_ms": round(self.total_wait_ms, 1),
+                "lock_wait_avg_ms": round(self.total_wait_ms / self.transactions, 3) if self.transactions else 0.0,
+                "lock_wait_max_ms": round(self.max_wait_ms, 1),
+                "slow_lock_waits": self.slow_waits,
+                "busy_errors": self.busy_errors,
+            }
+
+
+# Attentes de verrou des moteurs de l'application
+lock_wait_stats = LockWaitStats()
+
+
+def is_sqlite_file(database_url: str) -> bool:
+    """Base SQLite sur fichier (les profils ne s'appliquent pas à :memory:)"""
+    return database_url.startswith("sqlite") and ":memory:" not in database_url and \
+        not database_url.split("?")[0].endswith("://")
+
+
+def sqlite_pragmas(role: str) -> list:
+    """
+    Pragmas du profil production appliqués à chaque nouvelle connexion :
+    WAL (lecteurs jamais bloqués par le rédacteur), synchronous NORMAL,
+    cache et mmap plus grands, attente bornée du verrou
+    """
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(settings.database_sqlite_busy_timeout_ms)}",
+        f"PRAGMA synchronous = {settings.database_sqlite_synchronous}",
+        f"PRAGMA cache_size = -{int(settings.database_sqlite_cache_size_kb)}",
+        f"PRAGMA mmap_size = {int(settings.database_sqlite_mmap_size_mb) * 1024 * 1024}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if role == "writer":
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")
+    elif role == "reader":
+        pragmas.append("PRAGMA query_only = ON")
+    return pragmas
+
+
+def configure_sqlite_engine(sync_engine, role: str, stats: Optional[LockWaitStats] = None):
+    """
+    Branche le profil production sur un moteur SQLite (synchrone ou
+    `async_engine.sync_engine`) selon son rôle :
+      - writer : WAL, transactions en BEGIN IMMEDIATE (verrou pris au début,
+        attente mesurée) ; une seule connexion
+      - reader : connexions en lecture seule (query_only) pour les analyses
+      - session : pragmas seuls (routes de jeu, lectures et rares écritures)
+    """
+    stats = stats or lock_wait_stats
+    pragmas = sqlite_pragmas(role)
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        if role == "writer":
+            # Transactions gérées par l'événement begin ci-dessous
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    if role == "writer":
+        @event.listens_for(sync_engine, "begin")
+        def on_begin(connection):
+            start = time.perf_counter()
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            stats.record_wait((time.perf_counter() - start) * 1000)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def on_error(context):
+        if "database is locked" in str(context.original_exception):
+            stats.record_busy()
+
+
+def create_database_engine(
+    database_url: str,
+    role: str = "writer",
+    profile: Optional[str] = None,
+    stats: Optional[LockWaitStats] = None,
+    **options
+):
+    """
+    Moteur synchrone (threads : write-behind, migrations, export de recherche)
+    En profil production SQLite, le rédacteur n'a qu'une connexion : les
+    écritures concurrentes attendent dans le pool plutôt que sur le verrou
+    """
+    profile = profile or settings.database_storage_profile
+    sqlite = database_url.startswith("sqlite")
+    production = profile == "production" and is_sqlite_file(database_url)
+
+    if sqlite:
+        options.setdefault("connect_args", {"check_same_thread": False})
+    if production:
+        options.setdefault("poolclass", QueuePool)
+        if role == "writer":
+            options.update({"pool_size": 1, "max_overflow": 0})
+        else:
+            options.update({"pool_size": settings.database_reader_pool_size, "max_overflow": 0})
+        options.setdefault("pool_timeout", settings.database_pool_timeout)
+
+    sync_engine = create_engine(database_url, **{"echo": settings.debug, **options})
+    if production:
+        configure_sqlite_engine(sync_engine, role, stats)
+    return sync_engine
+
+
+# Configuration du moteur SQLAlchemy (rédacteur)
+engine = create_database_engine(settings.database_url, role="writer")
+
+# Lecteurs synchrones (export colonnaire)
+reader_engine = create_database_engine(settings.database_url, role="reader")
 
 # Configuration des sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    URL du pilote asynchrone équivalent : aiosqlite en local, asyncpg pour Postgres
+    """
+    for prefix, async_prefix in (
+        ("sqlite://", "sqlite+aiosqlite://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+    ):
+        if database_url.startswith(prefix):
+            return async_prefix + database_url[len(prefix):]
+    return database_url
+
+
+def create_async_database_engine(
+    database_url: str,
+    role: str = "session",
+    profile: Optional[str] = None,
+    stats: Optional[LockWaitStats] = None,
+    **options
+):
+    """
+    Moteur asynchrone avec pool de connexions réglé
+    (aiosqlite ouvrirait sinon une connexion et un thread par session)
+    """
+    profile = profile or settings.database_storage_profile
+    async_url = get_async_database_url(database_url)
+    in_memory = async_url.startswith("sqlite") and not is_sqlite_file(database_url)
+    production = profile == "production" and not in_memory and async_url.startswith("sqlite")
+    
+    if not in_memory:
+        pool_size = settings.database_pool_size
+        max_overflow = settings.database_max_overflow
+        if production and role == "reader":
+            pool_size, max_overflow = settings.database_reader_pool_size, 0
+        options = {
+            "poolclass": AsyncAdaptedQueuePool,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": settings.database_pool_timeout,
+            "pool_recycle": settings.database_pool_recycle,
+            "pool_pre_ping": not async_url.startswith("sqlite"),
+            **options,
+        }
+    
+    async_engine = create_async_engine(async_url, **{"echo": settings.debug, **options})
+    if production:
+        configure_sqlite_engine(async_engine.sync_engine, role, stats)
+    return async_engine
+
+
+# Moteur et sessions asynchrones (routes FastAPI et services)
+async_engine = create_async_database_engine(settings.database_url)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Lecteurs asynchrones en lecture seule (endpoints /experiment/*)
+async_reader_engine = create_async_database_engine(settings.database_url, role="reader")
+
+AsyncReaderSessionLocal = async_sessionmaker(
+    async_reader_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Base pour les modèles
 Base = declarative_base()
 
@@ -37,6 +257,38 @@ def get_db() -> Session:
         db.close()
 
 
+async def get_async_db() -> AsyncSession:
+    """
+    Générateur de session asynchrone pour FastAPI : les requêtes ne
+    bloquent pas la boucle d'événements qui sert aussi les WebSockets
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_reader_db() -> AsyncSession:
+    """
+    Session en lecture seule pour les analyses : pool de lecteurs séparé,
+    les requêtes des chercheurs n'attendent pas le verrou des écritures du jeu
+    """
+    async with AsyncReaderSessionLocal() as db:
+        yield db
+
+
+@asynccontextmanager
+async def get_async_db_context():
+    """
+    Context manager asynchrone pour les sessions des services
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
 @contextmanager
 def get_db_context():
     """
@@ -92,9 +344,8 @@ async def check_database_connection():
     Vérifie la connexion à la base de données
     """
     try:
-        from sqlalchemy import text
-        with engine.connect() as connection:
-            connection.execute(text("SELECT 1"))
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
         print("✅ Connexion à la base de données réussie")
         return True
     except Exception as e:
@@ -111,3 +362,24 @@ def get_database_info():
         "engine": str(engine.url),
         "tables": list(Base.metadata.tables.keys()) if Base.metadata.tables else [],
     }
+
+
+def get_pool_stats(pool) -> Dict[str, Any]:
+    """Occupation d'un pool de connexions"""
+    return {
+        "size": pool.size() if hasattr(pool, "size") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "overflow": max(pool.overflow(), 0) if hasattr(pool, "overflow") else None,
+    }
+
+
+def get_storage_stats() -> Dict[str, Any]:
+    """
+    Profil de stockage, attentes de verrou et occupation des pools (pour /health)
+    """
+    return {
+        "profile": settings.database_storage_profile if is_sqlite_file(settings.database_url) else "default",
+        "lock_wait": lock_wait_stats.as_dict(),
+        "writer_pool": get_pool_stats(engine.pool),
+        "reader_pool": get_pool_stats(async_reader_engine.pool),
+    }
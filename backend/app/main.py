@@ -7,13 +7,29 @@ from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import uvicorn
 import asyncio
-from typing import Dict, List
+import time
+import uuid
+from typing import Dict, List, Any, Set
 
 from .config import settings, print_startup_info, validate_openai_config
-from .database import create_tables, check_database_connection
+from .database import create_tables, check_database_connection, get_storage_stats
+from .migrations import get_migration_runner
 from .models import GameSession
+from .models.compression import get_compression_dictionaries
 from .services.tom_ai_service import get_tom_service
+from .services.write_behind import get_write_queue
+from .services.session_scheduler import get_scheduler
+from .services.response_cache import get_response_cache
+from .services.personality_pool import get_personality_pool
+from .services.bias_retention import get_bias_retention
+from .services.telemetry import get_telemetry_hub, is_telemetry_action, event_from_action
 from .api import game, experiment
+from .api.wire_protocol import receive_message
+from .api.connection_manager import ConnectionManager
+from .services.event_bus import get_event_bus
+from .services.session_store import get_session_store
+from .services.session_checkpoint import get_session_checkpoints
+from .services.game_orchestrator import orchestrator as game_orchestrator, get_game_orchestrator
 
 
 # Gestionnaire de cycle de vie de l'application
@@ -32,6 +48,11 @@ async def lifespan(app: FastAPI):
     # Initialisation de la base de données
     print("🗄️ Initialisation de la base de données...")
     create_tables()
+    get_compression_dictionaries().load()
+    
+    # Index et migrations : construits en ligne, sans retarder le démarrage
+    if settings.database_auto_migrate:
+        get_migration_runner().start()
     
     if await check_database_connection():
         print("✅ Base de données prête")
@@ -40,8 +61,17 @@ async def lifespan(app: FastAPI):
     
     # Initialisation des services
     tom_service = await get_tom_service()
+    await get_response_cache().preload()
+    await get_personality_pool().start()
     print("🤖 Service Tom initialisé")
     
+    # Agrégation périodique des snapshots de biais des sessions terminées
+    await get_bias_retention().start()
+    
+    # Parties en cours avant l'arrêt : restaurées avec leurs échéances
+    orchestrator = await get_game_orchestrator()
+    await orchestrator.restore_sessions()
+    
     print("🎮 REMOTE est prêt à jouer !")
     print(f"📍 Interface disponible sur: http://{settings.host}:{settings.port}")
     
@@ -49,6 +79,26 @@ async def lifespan(app: FastAPI):
     
     # Arrêt
     print("🛑 Arrêt de REMOTE...")
+    
+    # Drainage : plus de nouvelles connexions ni sessions, réponses Tom en cours terminées
+    manager.draining = True
+    orchestrator.draining = True
+    if streaming_tasks:
+        await asyncio.wait(list(streaming_tasks), timeout=settings.shutdown_drain_seconds)
+    for task in list(streaming_tasks):
+        task.cancel()
+    
+    # Points de reprise de toutes les parties en cours, puis clients prévenus du redémarrage
+    saved = orchestrator.checkpoint_all()
+    print(f"💾 {saved} sessions sauvegardées pour la reprise")
+    await manager.close_all(code=1012)
+    
+    # Arrêter les échéances puis vider les écritures différées avant de quitter
+    await get_personality_pool().shutdown()
+    await get_bias_retention().shutdown()
+    await get_scheduler().shutdown()
+    await get_write_queue().shutdown()
+    
     print("👋 À bientôt !")
 
 
@@ -69,61 +119,73 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Gestionnaire de connexions WebSocket
-class ConnectionManager:
-    """Gestionnaire des connexions WebSocket"""
-    
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.session_connections: Dict[str, str] = {}  # session_id -> connection_id
-    
-    async def connect(self, websocket: WebSocket, connection_id: str):
-        """Accepte une nouvelle connexion"""
-        await websocket.accept()
-        self.active_connections[connection_id] = websocket
-        print(f"🔗 Connexion WebSocket établie: {connection_id}")
-    
-    def disconnect(self, connection_id: str):
-        """Déconnecte un client"""
-        if connection_id in self.active_connections:
-            del self.active_connections[connection_id]
-        
-        # Nettoyer l'association session
-        session_to_remove = None
-        for session_id, conn_id in self.session_connections.items():
-            if conn_id == connection_id:
-                session_to_remove = session_id
-                break
-        
-        if session_to_remove:
-            del self.session_connections[session_to_remove]
-        
-        print(f"🔌 Connexion WebSocket fermée: {connection_id}")
+# Instance globale du gestionnaire de connexions
+manager = ConnectionManager(presence=game_orchestrator)
+
+
+# Tâches de streaming Tom en cours (référence forte jusqu'à leur fin)
+streaming_tasks: Set[asyncio.Task] = set()
+
+
+async def stream_tom_message(
+    tom_service, 
+    session_id: str, 
+    trigger_type: str, 
+    context_data: Dict[str, Any], 
+    connection_id: str
+):
+    """
+    Transmet une réponse de Tom au joueur au fil de sa génération
+    tom_message_start -> tom_message_chunk (n) -> tom_message_complete
+    """
+    message_id = f"tom_{uuid.uuid4().hex[:12]}"
+    start_time = time.time()
+    first_chunk_time = None
+    chunk_index = 0
     
-    async def send_personal_message(self, message: dict, connection_id: str):
-        """Envoie un message à une connexion spécifique"""
-        if connection_id in self.active_connections:
-            websocket = self.active_connections[connection_id]
-            try:
-                await websocket.send_json(message)
-            except Exception as e:
-                print(f"❌ Erreur envoi message WebSocket: {e}")
-                self.disconnect(connection_id)
+    await manager.send_personal_message({
+        "type": "tom_message_start",
+        "session_id": session_id,
+        "message_id": message_id
+    }, connection_id)
     
-    async def send_to_session(self, message: dict, session_id: str):
-        """Envoie un message à une session spécifique"""
-        if session_id in self.session_connections:
-            connection_id = self.session_connections[session_id]
-            await self.send_personal_message(message, connection_id)
+    try:
+        async for event in tom_service.stream_response(
+            session_id=session_id,
+            trigger_type=trigger_type,
+            context_data=context_data
+        ):
+            if event["type"] == "chunk":
+                if first_chunk_time is None:
+                    first_chunk_time = time.time() - start_time
+                
+                await manager.send_personal_message({
+                    "type": "tom_message_chunk",
+                    "session_id": session_id,
+                    "message_id": message_id,
+                    "index": chunk_index,
+                    "text": event["text"]
+                }, connection_id)
+                chunk_index += 1
+            
+            elif event["type"] == "complete":
+                await manager.send_personal_message({
+                    "type": "tom_message_complete",
+                    "session_id": session_id,
+                    "message_id": message_id,
+                    "message_data": event["response"],
+                    "chunks": chunk_index,
+                    "time_to_first_chunk": first_chunk_time,
+                    "generation_time": time.time() - start_time
+                }, connection_id)
     
-    def link_session(self, session_id: str, connection_id: str):
-        """Lie une session à une connexion"""
-        self.session_connections[session_id] = connection_id
-        print(f"🔗 Session {session_id} liée à la connexion {connection_id}")
-
-
-# Instance globale du gestionnaire de connexions
-manager = ConnectionManager()
+    except Exception as e:
+        print(f"❌ Erreur streaming Tom: {e}")
+        await manager.send_personal_message({
+            "type": "error",
+            "message_id": message_id,
+            "message": f"Erreur génération Tom: {str(e)}"
+        }, connection_id)
 
 
 # Routes de base
@@ -156,6 +218,19 @@ async def health_check():
         "openai": "configured" if openai_status else "missing",
         "active_connections": len(manager.active_connections),
         "active_sessions": len(manager.session_connections),
+        "websocket": manager.get_stats(),
+        "persistence": get_write_queue().get_stats(),
+        "scheduler": get_scheduler().get_stats(),
+        "tom_cache": get_response_cache().get_stats(),
+        "tom_pool": get_personality_pool().get_stats(),
+        "migrations": get_migration_runner().get_status(),
+        "storage": get_storage_stats(),
+        "bias_retention": get_bias_retention().get_stats(),
+        "telemetry": get_telemetry_hub().get_stats(),
+        "event_bus": get_event_bus().get_stats(),
+        "session_store": get_session_store().get_stats(),
+        "checkpoints": get_session_checkpoints().get_stats(),
+        "presence": game_orchestrator.get_presence_stats(),
         "timestamp": "2025-01-27T20:00:00Z"  # Placeholder
     }
 
@@ -164,12 +239,18 @@ async def health_check():
 @app.websocket("/ws/{connection_id}")
 async def websocket_endpoint(websocket: WebSocket, connection_id: str):
     """Point d'entrée WebSocket principal"""
+    if manager.draining:
+        # Arrêt en cours : le client se reconnectera au serveur redémarré
+        await websocket.close(code=1012)
+        return
+    
     await manager.connect(websocket, connection_id)
     
     try:
         while True:
             # Recevoir un message du client
-            data = await websocket.receive_json()
+            data = await receive_message(websocket)
+            manager.touch(connection_id)
             
             # Router le message selon son type
             message_type = data.get("type")
@@ -181,26 +262,51 @@ async def websocket_endpoint(websocket: WebSocket, connection_id: str):
                 
                 if session_id:
                     manager.link_session(session_id, connection_id)
+                    codec = manager.negotiate_encoding(connection_id, data.get("encodings") or [])
                     
-                    # Initialiser Tom pour cette session
                     tom_service = await get_tom_service()
-                    tom_init = await tom_service.initialize_session(session_id, player_name)
+                    tom_context = tom_service.conversation_history.get(session_id)
                     
-                    response = {
-                        "type": "session_ready",
-                        "session_id": session_id,
-                        "tom_introduction": tom_init["introduction"],
-                        "tom_personality": tom_init["personality"]
-                    }
+                    if tom_context is not None:
+                        # Reconnexion ou session restaurée : Tom reprend où il en était
+                        response = {
+                            "type": "session_ready",
+                            "session_id": session_id,
+                            "resumed": True,
+                            "tom_personality": tom_context["personality"],
+                            "encoding": codec.name
+                        }
+                    else:
+                        # Initialiser Tom pour cette session
+                        tom_init = await tom_service.initialize_session(session_id, player_name)
+                        
+                        response = {
+                            "type": "session_ready",
+                            "session_id": session_id,
+                            "tom_introduction": tom_init["introduction"],
+                            "tom_personality": tom_init["personality"],
+                            "timings_ms": tom_init.get("timings_ms", {}),
+                            "encoding": codec.name
+                        }
                     
                     await manager.send_personal_message(response, connection_id)
             
+            elif message_type == "telemetry_batch":
+                # Lot d'entrées à haute fréquence : agrégé, sans réponse
+                session_id = data.get("session_id")
+                if session_id:
+                    get_telemetry_hub().ingest(session_id, data.get("events") or [])
+            
             elif message_type == "player_action":
                 # Action du joueur
                 session_id = data.get("session_id")
                 action_data = data.get("action_data")
                 
-                if session_id and action_data:
+                if session_id and action_data and is_telemetry_action(action_data):
+                    # Client sans lots de télémétrie : même agrégation, sans accusé
+                    get_telemetry_hub().ingest(session_id, [event_from_action(action_data)])
+                
+                elif session_id and action_data:
                     # Traiter l'action (sera implémenté dans game_orchestrator)
                     response = {
                         "type": "action_acknowledged",
@@ -215,7 +321,20 @@ async def websocket_endpoint(websocket: WebSocket, connection_id: str):
                 session_id = data.get("session_id")
                 context = data.get("context", {})
                 
-                if session_id:
+                if session_id and data.get("stream"):
+                    # Réponse streamée : la boucle de réception reste disponible
+                    tom_service = await get_tom_service()
+                    task = asyncio.create_task(stream_tom_message(
+                        tom_service,
+                        session_id=session_id,
+                        trigger_type=context.get("trigger_type", "general"),
+                        context_data=context.get("action", {}),
+                        connection_id=connection_id
+                    ))
+                    streaming_tasks.add(task)
+                    task.add_done_callback(streaming_tasks.discard)
+                
+                elif session_id:
                     tom_service = await get_tom_service()
                     try:
                         message_data = await tom_service.generate_response(
@@ -244,6 +363,10 @@ async def websocket_endpoint(websocket: WebSocket, connection_id: str):
                 # Ping/Pong pour maintenir la connexion
                 await manager.send_personal_message({"type": "pong"}, connection_id)
             
+            elif message_type == "heartbeat_ack":
+                # Réponse au heartbeat du serveur
+                manager.record_heartbeat_ack(connection_id, data.get("sent_at"))
+            
             else:
                 # Message non reconnu
                 error_response = {
@@ -273,13 +396,21 @@ def start_server():
     """Lance le serveur de développement"""
     print("🔧 Mode développement - Lancement avec Uvicorn")
     
+    # Plusieurs workers : l'état des sessions doit être partagé entre eux
+    workers = settings.workers
+    if workers > 1 and not get_session_store().shared:
+        print("⚠️ État des sessions en mémoire - un seul worker (SESSION_STORE_BACKEND=sqlite pour plusieurs)")
+        workers = 1
+    
     uvicorn.run(
         "app.main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.reload,
+        reload=settings.reload and workers == 1,
+        workers=workers,
         log_level="info" if settings.debug else "warning",
-        access_log=settings.debug
+        access_log=settings.debug,
+        ws_per_message_deflate=settings.websocket_per_message_deflate
     )
 
 
@@ -0,0 +1,298 @@
+"""
+Migrations versionnées du schéma de la base de données
+Chaque migration porte un numéro de version ; les versions appliquées sont
+enregistrées dans la table schema_migrations. Les index sont construits un par
+un, chacun dans sa propre transaction, dans un thread dédié, et les
+conversions de données valident chaque lot séparément : la base de production
+reste utilisable pendant la migration (les écritures du jeu passent par la
+file write-behind et attendent au plus un index ou un lot)
+
+Usage hors ligne : python -m app.migrations [status|upgrade]
+"""
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+
+from sqlalchemy import Index, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from .config import settings
+from .database import Base, engine as default_engine
+
+
+class Migration:
+    """
+    Migration de schéma : index déclarés sur les modèles (par nom) et/ou
+    fonction `upgrade(engine, pause_seconds)` qui valide ses lots un par un
+    (une transaction par lot, pause entre deux lots)
+    """
+
+    def __init__(
+        self,
+        version: int,
+        name: str,
+        indexes: Optional[List[str]] = None,
+        upgrade: Optional[Callable[[Engine, float], None]] = None
+    ):
+        self.version = version
+        self.name = name
+        self.indexes = indexes or []
+        self.upgrade = upgrade
+
+    def __repr__(self):
+        return f"<Migration(version={self.version}, name={self.name})>"
+
+
+def backfill_session_summaries(engine: Engine, pause_seconds: float = 0.0):
+    """Crée et remplit session_summary depuis les journaux existants"""
+    from .models import SessionSummary
+    from .services.session_summary import rebuild_summaries_in_batches
+
+    with engine.begin() as connection:
+        SessionSummary.__table__.create(connection, checkfirst=True)
+    count = rebuild_summaries_in_batches(engine, pause_seconds=pause_seconds)
+    print(f"   📋 {count} résumé(s) de session calculé(s)")
+
+
+def compress_large_columns(engine: Engine, pause_seconds: float = 0.0):
+    """Entraîne les dictionnaires (prompts de Tom, données d'action) puis compresse les valeurs stockées en clair"""
+    from .models import CompressionDictionary
+    from .services.column_compression import train_dictionaries, compress_existing_rows
+
+    with engine.begin() as connection:
+        CompressionDictionary.__table__.create(connection, checkfirst=True)
+        dictionaries = train_dictionaries(connection)
+    converted = compress_existing_rows(engine, dictionaries, pause_seconds=pause_seconds)
+    print(f"   🗜️ {sum(converted.values())} valeur(s) compressée(s)")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "index_session_timelines", indexes=[
+        "ix_player_actions_session_timestamp",
+        "ix_player_actions_timestamp",
+        "ix_tom_interactions_session_timestamp",
+        "ix_bias_snapshots_session_timestamp",
+        "ix_experiment_data_session_measurement",
+    ]),
+    Migration(2, "index_experiment_filters", indexes=[
+        "ix_game_sessions_created_filters",
+        "ix_game_sessions_condition_completed",
+        "ix_game_sessions_completed_created",
+    ]),
+    Migration(3, "index_export_watermarks", indexes=[
+        "ix_player_actions_created_at",
+        "ix_tom_interactions_created_at",
+        "ix_bias_snapshots_created_at",
+        "ix_experiment_data_created_at",
+    ]),
+    Migration(4, "session_summary_backfill", upgrade=backfill_session_summaries),
+    Migration(5, "index_bias_rollups", indexes=[
+        "ix_bias_snapshot_rollups_session_tier",
+    ]),
+    Migration(6, "compress_large_columns", upgrade=compress_large_columns),
+]
+
+
+def get_model_index(name: str) -> Index:
+    """Retrouve un index déclaré dans __table_args__ d'un modèle"""
+    for table in Base.metadata.tables.values():
+        for index in table.indexes:
+            if index.name == name:
+                return index
+    raise KeyError(f"Index inconnu: {name}")
+
+
+class MigrationRunner:
+    """
+    Applique les migrations en attente, en ligne (thread dédié) ou hors ligne
+    """
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        migrations: Optional[List[Migration]] = None,
+        pause_seconds: Optional[float] = None
+    ):
+        self.engine = engine or default_engine
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda migration: migration.version)
+        self.pause_seconds = settings.database_migration_pause_seconds if pause_seconds is None else pause_seconds
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._done = threading.Event()
+
+        # Métriques
+        self.stats = {
+            "applied": 0,
+            "indexes_built": 0,
+            "last_error": None,
+            "last_duration_seconds": None,
+        }
+
+    @property
+    def latest_version(self) -> int:
+        """Version la plus récente connue du code"""
+        return self.migrations[-1].version if self.migrations else 0
+
+    def applied_versions(self) -> Dict[int, Dict[str, Any]]:
+        """Versions déjà appliquées sur la base"""
+        with self.engine.begin() as connection:
+            self._ensure_version_table(connection)
+            rows = connection.execute(text(
+                "SELECT version, name, applied_at, duration_seconds FROM schema_migrations ORDER BY version"
+            )).fetchall()
+        return {
+            row[0]: {"name": row[1], "applied_at": row[2], "duration_seconds": row[3]}
+            for row in rows
+        }
+
+    def pending(self) -> List[Migration]:
+        """Migrations pas encore appliquées"""
+        applied = self.applied_versions()
+        return [migration for migration in self.migrations if migration.version not in applied]
+
+    def upgrade(self) -> List[int]:
+        """Applique les migrations en attente, dans l'ordre ; retourne les versions appliquées"""
+        applied_now = []
+
+        with self._lock:
+            start = time.perf_counter()
+            try:
+                for migration in self.pending():
+                    self._apply(migration)
+                    applied_now.append(migration.version)
+                self.stats["last_error"] = None
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+                print(f"❌ Erreur migration du schéma: {e}")
+                raise
+            finally:
+                self.stats["last_duration_seconds"] = round(time.perf_counter() - start, 3)
+
+        return applied_now
+
+    def start(self):
+        """Lance la migration en ligne dans un thread dédié (sans bloquer le démarrage)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._done.clear()
+        self._thread = threading.Thread(target=self._run, name="schema-migrations", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Attend la fin de la migration en ligne ; False si le délai expire"""
+        if self._thread is None:
+            return True
+        return self._done.wait(timeout)
+
+    def get_status(self) -> Dict[str, Any]:
+        """État des migrations (pour /health)"""
+        try:
+            applied = self.applied_versions()
+        except Exception as e:
+            return {**self.stats, "error": str(e)}
+
+        return {
+            **self.stats,
+            "current_version": max(applied) if applied else 0,
+            "latest_version": self.latest_version,
+            "pending": [migration.version for migration in self.migrations if migration.version not in applied],
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
+
+    def _run(self):
+        """Corps du thread de migration en ligne"""
+        try:
+            versions = self.upgrade()
+            if versions:
+                print(f"✅ Schéma migré (versions {', '.join(map(str, versions))})")
+        except Exception:
+            pass
+        finally:
+            self._done.set()
+
+    def _apply(self, migration: Migration):
+        """Applique une migration : un index par transaction, puis l'upgrade éventuel"""
+        start = time.perf_counter()
+        print(f"🔧 Migration {migration.version} ({migration.name})...")
+
+        for name in migration.indexes:
+            index = get_model_index(name)
+            with self.engine.begin() as connection:
+                existing = {item["name"] for item in inspect(connection).get_indexes(index.table.name)}
+                if name in existing:
+                    continue
+                index_start = time.perf_counter()
+                index.create(connection)
+            self.stats["indexes_built"] += 1
+            print(f"   📇 {name} construit en {time.perf_counter() - index_start:.2f}s")
+
+            # Laisser passer les écritures en attente entre deux index
+            if self.pause_seconds:
+                time.sleep(self.pause_seconds)
+
+        # Conversion des données : l'upgrade valide chaque lot dans sa propre transaction
+        if migration.upgrade is not None:
+            migration.upgrade(self.engine, self.pause_seconds)
+
+        with self.engine.begin() as connection:
+            connection.execute(
+                text(
+                    "INSERT INTO schema_migrations (version, name, applied_at, duration_seconds) "
+                    "VALUES (:version, :name, :applied_at, :duration_seconds)"
+                ),
+                {
+                    "version": migration.version,
+                    "name": migration.name,
+                    "applied_at": datetime.now().isoformat(),
+                    "duration_seconds": round(time.perf_counter() - start, 3),
+                }
+            )
+
+        self.stats["applied"] += 1
+
+    @staticmethod
+    def _ensure_version_table(connection: Connection):
+        """Crée la table des versions si nécessaire"""
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " version INTEGER PRIMARY KEY,"
+            " name VARCHAR(100) NOT NULL,"
+            " applied_at VARCHAR(32) NOT NULL,"
+            " duration_seconds FLOAT)"
+        ))
+
+
+# Instance globale du gestionnaire de migrations
+migration_runner = MigrationRunner()
+
+
+def get_migration_runner() -> MigrationRunner:
+    """Retourne l'instance du gestionnaire de migrations"""
+    return migration_runner
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    runner = get_migration_runner()
+
+    if command == "upgrade":
+        Base.metadata.create_all(bind=runner.engine, checkfirst=True)
+        versions = runner.upgrade()
+        print(f"✅ {len(versions)} migration(s) appliquée(s)" if versions else "✅ Schéma à jour")
+    elif command == "status":
+        status = runner.get_status()
+        print(f"📋 Version du schéma : {status['current_version']} / {status['latest_version']}")
+        for migration in runner.migrations:
+            state = "en attente" if migration.version in status["pending"] else "appliquée"
+            print(f"   {migration.version:>3} {migration.name:<32} {state}")
+    else:
+        print("Usage : python -m app.migrations [status|upgrade]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
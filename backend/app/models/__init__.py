@@ -4,7 +4,9 @@ Modèles de données pour le jeu REMOTE
 
 from .game_session import GameSession
 from .player_actions import PlayerAction, TomInteraction
-from .experiment_data import ExperimentData, BiasSnapshot
+from .experiment_data import ExperimentData, BiasSnapshot, BiasSnapshotRollup
+from .session_summary import SessionSummary
+from .compression import CompressionDictionary, CompressedJSON, CompressedText
 
 # Export de tous les modèles
 __all__ = [
@@ -12,5 +14,10 @@ __all__ = [
     "PlayerAction", 
     "TomInteraction",
     "ExperimentData",
-    "BiasSnapshot"
+    "BiasSnapshot",
+    "BiasSnapshotRollup",
+    "SessionSummary",
+    "CompressionDictionary",
+    "CompressedJSON",
+    "CompressedText"
 ]
@@ -0,0 +1,238 @@
+"""
+Colonnes compressées pour les gros champs JSON et texte
+Les valeurs sont stockées en binaire : un octet de format, puis le contenu
+(JSON compact ou texte UTF-8) compressé en deflate, avec un dictionnaire
+prédéfini pour les champs très répétitifs (prompts de Tom). Les lignes
+antérieures à la migration (JSON ou texte en clair) restent lisibles
+"""
+from sqlalchemy import Column, String, DateTime, Integer, LargeBinary
+from sqlalchemy.types import TypeDecorator
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+import json
+import re
+import struct
+import threading
+import zlib
+
+from ..database import Base
+
+# Formats (premier octet de la valeur stockée)
+FORMAT_PLAIN = 0  # Trop court pour gagner à la compression
+FORMAT_DEFLATE = 1
+FORMAT_DEFLATE_DICTIONARY = 2  # Suivi de l'identifiant du dictionnaire (2 octets)
+
+# En dessous de cette taille, l'en-tête deflate coûte plus qu'il ne rapporte
+MIN_COMPRESSED_SIZE = 64
+COMPRESSION_LEVEL = 6
+
+# Taille maximum d'un dictionnaire deflate (fenêtre de 32 Ko)
+MAX_DICTIONARY_SIZE = 32768
+
+_DICTIONARY_HEADER = struct.Struct(">BH")
+
+# Découpage des échantillons en fragments (fins de ligne, éléments JSON)
+_FRAGMENT_BOUNDARY = re.compile(r"(?<=[\n,{}\[\]])")
+
+
+class CompressionDictionary(Base):
+    """
+    Dictionnaire de compression entraîné sur des échantillons d'une colonne ;
+    les valeurs compressées référencent leur dictionnaire par identifiant
+    """
+    __tablename__ = "compression_dictionaries"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), nullable=False)  # "tom_prompts"
+    data = Column(LargeBinary, nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+
+    def __repr__(self):
+        return f"<CompressionDictionary(id={self.id}, name={self.name}, size={len(self.data or b'')})>"
+
+
+class CompressionDictionaries:
+    """
+    Dictionnaires connus du processus ; le plus récent de chaque nom sert à la
+    compression, tous restent disponibles pour la décompression
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[int, bytes] = {}
+        self._active: Dict[str, int] = {}
+
+    def register(self, dictionary_id: int, name: str, data: bytes):
+        """Ajoute un dictionnaire (actif pour son nom s'il est le plus récent)"""
+        with self._lock:
+            self._data[dictionary_id] = data
+            if dictionary_id >= self._active.get(name, 0):
+                self._active[name] = dictionary_id
+
+    def active(self, name: Optional[str]) -> Optional[Tuple[int, bytes]]:
+        """Dictionnaire à utiliser pour compresser, ou None"""
+        if name is None:
+            return None
+        dictionary_id = self._active.get(name)
+        if dictionary_id is None:
+            return None
+        return dictionary_id, self._data[dictionary_id]
+
+    def get(self, dictionary_id: int) -> bytes:
+        """Dictionnaire d'une valeur à décompresser (chargé depuis la base au besoin)"""
+        data = self._data.get(dictionary_id)
+        if data is None:
+            # Dictionnaire entraîné par un autre processus
+            from ..database import reader_engine
+            self.load(reader_engine)
+            data = self._data.get(dictionary_id)
+            if data is None:
+                raise LookupError(f"Dictionnaire de compression inconnu: {dictionary_id}")
+        return data
+
+    def load(self, bind=None) -> int:
+        """Charge les dictionnaires enregistrés en base ; retourne leur nombre"""
+        if bind is None:
+            from ..database import engine as bind
+        table = CompressionDictionary.__table__
+        with bind.connect() as connection:
+            if not bind.dialect.has_table(connection, table.name):
+                return 0
+            rows = connection.execute(
+                table.select().with_only_columns(table.c.id, table.c.name, table.c.data)
+            ).fetchall()
+        for dictionary_id, name, data in rows:
+            self.register(dictionary_id, name, data)
+        return len(rows)
+
+    def clear(self):
+        """Oublie tous les dictionnaires"""
+        with self._lock:
+            self._data.clear()
+            self._active.clear()
+
+
+# Instance globale des dictionnaires de compression
+compression_dictionaries = CompressionDictionaries()
+
+
+def get_compression_dictionaries() -> CompressionDictionaries:
+    """Retourne l'instance des dictionnaires de compression"""
+    return compression_dictionaries
+
+
+def compress(payload: bytes, dictionary: Optional[Tuple[int, bytes]] = None) -> bytes:
+    """Compresse un contenu au format stocké (octet de format en tête)"""
+    if len(payload) < MIN_COMPRESSED_SIZE:
+        return bytes((FORMAT_PLAIN,)) + payload
+
+    if dictionary is not None:
+        dictionary_id, data = dictionary
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -15, zdict=data)
+        header = _DICTIONARY_HEADER.pack(FORMAT_DEFLATE_DICTIONARY, dictionary_id)
+    else:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -15)
+        header = bytes((FORMAT_DEFLATE,))
+    return header + compressor.compress(payload) + compressor.flush()
+
+
+def decompress(value: bytes) -> bytes:
+    """Contenu d'une valeur stockée"""
+    value_format = value[0]
+    if value_format == FORMAT_PLAIN:
+        return value[1:]
+    if value_format == FORMAT_DEFLATE:
+        return zlib.decompress(value[1:], -15)
+    if value_format == FORMAT_DEFLATE_DICTIONARY:
+        _, dictionary_id = _DICTIONARY_HEADER.unpack_from(value)
+        decompressor = zlib.decompressobj(-15, zdict=compression_dictionaries.get(dictionary_id))
+        return decompressor.decompress(value[_DICTIONARY_HEADER.size:]) + decompressor.flush()
+    raise ValueError(f"Format de valeur compressée inconnu: {value_format}")
+
+
+def train_dictionary(samples: Iterable[str], size: int = MAX_DICTIONARY_SIZE) -> bytes:
+    """
+    Dictionnaire deflate à partir d'échantillons : les fragments (lignes,
+    éléments JSON) présents dans plusieurs échantillons, les plus rentables
+    (occurrences × longueur) en fin de dictionnaire, là où les références
+    sont les plus courtes
+    """
+    counts: Counter = Counter()
+    for sample in samples:
+        counts.update({fragment for fragment in _FRAGMENT_BOUNDARY.split(sample) if len(fragment.strip()) > 3})
+
+    chosen = []
+    total = 0
+    for fragment, count in sorted(counts.items(), key=lambda item: item[1] * len(item[0]), reverse=True):
+        if count < 2:
+            continue
+        encoded = fragment.encode("utf-8")
+        if total + len(encoded) > size:
+            continue
+        chosen.append(encoded)
+        total += len(encoded)
+
+    return b"".join(reversed(chosen))
+
+
+class CompressedType(TypeDecorator):
+    """Base des colonnes compressées (stockage binaire)"""
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, dictionary: Optional[str] = None):
+        super().__init__()
+        self.dictionary = dictionary
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress(self.serialize(value), compression_dictionaries.active(self.dictionary))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, (bytes, memoryview)):
+            return self.deserialize(decompress(bytes(value)))
+        # Ligne pas encore convertie par la migration
+        return self.legacy(value)
+
+    def serialize(self, value) -> bytes:
+        raise NotImplementedError
+
+    def deserialize(self, payload: bytes):
+        raise NotImplementedError
+
+    def legacy(self, value):
+        return value
+
+
+class CompressedJSON(CompressedType):
+    """Valeur JSON compressée"""
+    cache_ok = True
+
+    def serialize(self, value) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def deserialize(self, payload: bytes):
+        return json.loads(payload)
+
+    def legacy(self, value):
+        # JSON en clair (affinité NUMERIC de SQLite : les scalaires reviennent convertis)
+        return json.loads(value) if isinstance(value, str) else value
+
+
+class CompressedText(CompressedType):
+    """Texte compressé"""
+    cache_ok = True
+
+    def serialize(self, value) -> bytes:
+        return value.encode("utf-8")
+
+    def deserialize(self, payload: bytes):
+        return payload.decode("utf-8")
+
+    def legacy(self, value):
+        return str(value)
@@ -1,13 +1,14 @@
 """
 Modèle pour les données expérimentales et mesures des biais cognitifs
 """
-from sqlalchemy import Column, String, DateTime, Integer, Float, Boolean, Text, JSON, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, Integer, Float, Boolean, Text, JSON, ForeignKey, Index
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from datetime import datetime
 import uuid
 
 from ..database import Base
+from .compression import CompressedJSON
 
 
 class ExperimentData(Base):
@@ -15,6 +16,12 @@ class ExperimentData(Base):
     Modèle pour les données expérimentales collectées
     """
     __tablename__ = "experiment_data"
+    __table_args__ = (
+        # Dernière mesure d'une session (migration 1)
+        Index("ix_experiment_data_session_measurement", "session_id", "measurement_timestamp", "id"),
+        # Filigrane de l'export de recherche (migration 3)
+        Index("ix_experiment_data_created_at", "created_at", "id"),
+    )
     
     # Identifiant unique
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -74,8 +81,8 @@ class ExperimentData(Base):
     corruption_incidents = Column(Integer, default=0)  # Nombre d'incidents de corruption
     corruption_tolerance = Column(Float, nullable=True)  # Tolérance à la corruption
     
-    # Données brutes pour analyse avancée
-    raw_metrics = Column(JSON, nullable=True)
+    # Données brutes pour analyse avancée (compressées, chargées et décompressées seulement à l'accès)
+    raw_metrics = deferred(Column(CompressedJSON(), nullable=True))
     calculation_details = Column(JSON, nullable=True)
     
     # Métadonnées
@@ -155,6 +162,10 @@ class BiasSnapshot(Base):
     Modèle pour les snapshots ponctuels des biais (mesures fréquentes)
     """
     __tablename__ = "bias_snapshots"
+    __table_args__ = (
+        Index("ix_bias_snapshots_session_timestamp", "session_id", "timestamp"),
+        Index("ix_bias_snapshots_created_at", "created_at", "id"),
+    )
     
     # Identifiant unique
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -205,3 +216,95 @@ class BiasSnapshot(Base):
             "instantaneous_trust_level": self.instantaneous_trust_level,
             "instantaneous_compliance": self.instantaneous_compliance,
         }
+
+
+# Métriques des snapshots agrégées par les rollups (colonne BiasSnapshot -> préfixe)
+ROLLUP_METRICS = {
+    "instantaneous_automation_bias": "automation_bias",
+    "instantaneous_trust_level": "trust_level",
+    "instantaneous_compliance": "compliance",
+    "corruption_level": "corruption_level",
+}
+
+
+class BiasSnapshotRollup(Base):
+    """
+    Agrégat de snapshots de biais pour les sessions anciennes
+    (niveau "minute" : une ligne par minute ; niveau "phase" : une ligne par phase)
+    min/max/moyenne/dernière valeur de chaque métrique sur l'intervalle
+    """
+    __tablename__ = "bias_snapshot_rollups"
+    __table_args__ = (
+        # Série d'une session par niveau (migration 5)
+        Index("ix_bias_snapshot_rollups_session_tier", "session_id", "tier", "bucket_start"),
+    )
+    
+    # Identifiant unique
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    
+    # Liaison avec la session
+    session_id = Column(String, ForeignKey("game_sessions.id"), nullable=False)
+    
+    # Intervalle agrégé
+    tier = Column(String(10), nullable=False)  # "minute" ou "phase"
+    game_phase = Column(String(20), nullable=False)  # Phase du dernier snapshot de l'intervalle
+    bucket_start = Column(DateTime, nullable=False)  # Premier snapshot de l'intervalle
+    bucket_end = Column(DateTime, nullable=False)  # Dernier snapshot de l'intervalle
+    game_time_start = Column(Float, nullable=False)
+    game_time_end = Column(Float, nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    
+    # Métriques agrégées
+    automation_bias_min = Column(Float, nullable=True)
+    automation_bias_max = Column(Float, nullable=True)
+    automation_bias_mean = Column(Float, nullable=True)
+    automation_bias_last = Column(Float, nullable=True)
+    trust_level_min = Column(Float, nullable=True)
+    trust_level_max = Column(Float, nullable=True)
+    trust_level_mean = Column(Float, nullable=True)
+    trust_level_last = Column(Float, nullable=True)
+    compliance_min = Column(Float, nullable=True)
+    compliance_max = Column(Float, nullable=True)
+    compliance_mean = Column(Float, nullable=True)
+    compliance_last = Column(Float, nullable=True)
+    corruption_level_min = Column(Float, nullable=True)
+    corruption_level_max = Column(Float, nullable=True)
+    corruption_level_mean = Column(Float, nullable=True)
+    corruption_level_last = Column(Float, nullable=True)
+    
+    # Métadonnées
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<BiasSnapshotRollup(session_id={self.session_id}, tier={self.tier}, start={self.bucket_start})>"
+    
+    def to_dict(self) -> dict:
+        """
+        Convertit l'agrégat au format d'un snapshot (moyennes de l'intervalle),
+        avec le détail min/max/moyenne/dernière valeur par métrique
+        """
+        return {
+            "id": self.id,
+            "session_id": self.session_id,
+            "timestamp": self.bucket_end.isoformat(),
+            "game_time_seconds": self.game_time_end,
+            "current_obedience_streak": None,
+            "recent_reaction_time": None,
+            "recent_hesitation_duration": None,
+            "trigger_event": f"rollup_{self.tier}",
+            "game_phase": self.game_phase,
+            "corruption_level": self.corruption_level_mean,
+            "instantaneous_automation_bias": self.automation_bias_mean,
+            "instantaneous_trust_level": self.trust_level_mean,
+            "instantaneous_compliance": self.compliance_mean,
+            "resolution": self.tier,
+            "bucket_start": self.bucket_start.isoformat(),
+            "sample_count": self.sample_count,
+            "rollup": {
+                metric: {
+                    statistic: getattr(self, f"{metric}_{statistic}")
+                    for statistic in ("min", "max", "mean", "last")
+                }
+                for metric in ROLLUP_METRICS.values()
+            },
+        }
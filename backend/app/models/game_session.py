@@ -1,12 +1,14 @@
 """
 Modèle pour les sessions de jeu
 """
-from sqlalchemy import Column, String, DateTime, Integer, Float, Boolean, Text, JSON
+from sqlalchemy import Column, String, DateTime, Integer, Float, Boolean, Text, JSON, Index
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from datetime import datetime
 import uuid
 
 from ..database import Base
+from .compression import CompressedJSON
 
 
 class GameSession(Base):
@@ -14,6 +16,12 @@ class GameSession(Base):
     Modèle représentant une session de jeu complète
     """
     __tablename__ = "game_sessions"
+    __table_args__ = (
+        # Filtres des endpoints d'expérience : période, condition, fin (migration 2)
+        Index("ix_game_sessions_created_filters", "created_at", "condition", "is_completed", "ending_type"),
+        Index("ix_game_sessions_condition_completed", "condition", "is_completed", "created_at", "ending_type"),
+        Index("ix_game_sessions_completed_created", "is_completed", "created_at"),
+    )
     
     # Identifiant unique
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -49,9 +57,9 @@ class GameSession(Base):
     cognitive_offloading_score = Column(Float, nullable=True)  # 0-1, plus haut = plus de délestage
     authority_compliance_score = Column(Float, nullable=True)  # Score de soumission à l'autorité
     
-    # Données brutes pour analyse
-    raw_action_data = Column(JSON, nullable=True)  # Actions détaillées du joueur
-    tom_interaction_log = Column(JSON, nullable=True)  # Log des interactions avec Tom
+    # Données brutes pour analyse (compressées, chargées et décompressées seulement à l'accès)
+    raw_action_data = deferred(Column(CompressedJSON(), nullable=True))  # Actions détaillées du joueur
+    tom_interaction_log = deferred(Column(CompressedJSON(), nullable=True))  # Log des interactions avec Tom
     
     # Métadonnées techniques
     user_agent = Column(Text, nullable=True)
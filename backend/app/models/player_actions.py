@@ -1,13 +1,14 @@
 """
 Modèle pour les actions du joueur
 """
-from sqlalchemy import Column, String, DateTime, Integer, Float, Boolean, Text, JSON, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, Integer, Float, Boolean, Text, JSON, ForeignKey, Index
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from datetime import datetime
 import uuid
 
 from ..database import Base
+from .compression import CompressedJSON, CompressedText
 
 
 class PlayerAction(Base):
@@ -15,6 +16,13 @@ class PlayerAction(Base):
     Modèle représentant une action spécifique du joueur
     """
     __tablename__ = "player_actions"
+    __table_args__ = (
+        # Journal d'une session trié par horodatage (migration 1)
+        Index("ix_player_actions_session_timestamp", "session_id", "timestamp"),
+        Index("ix_player_actions_timestamp", "timestamp"),
+        # Filigrane de l'export de recherche (migration 3)
+        Index("ix_player_actions_created_at", "created_at", "id"),
+    )
     
     # Identifiant unique
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -56,7 +64,7 @@ class PlayerAction(Base):
     triggered_corruption = Column(Boolean, default=False, nullable=False)  # A déclenché une corruption ?
     
     # Données détaillées
-    action_data = Column(JSON, nullable=True)  # Données spécifiques à l'action
+    action_data = Column(CompressedJSON(dictionary="player_action_data"), nullable=True)  # Données spécifiques à l'action
     
     # Métadonnées
     created_at = Column(DateTime, default=func.now(), nullable=False)
@@ -123,6 +131,10 @@ class TomInteraction(Base):
     Modèle pour les interactions avec Tom
     """
     __tablename__ = "tom_interactions"
+    __table_args__ = (
+        Index("ix_tom_interactions_session_timestamp", "session_id", "timestamp"),
+        Index("ix_tom_interactions_created_at", "created_at", "id"),
+    )
     
     # Identifiant unique
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -149,8 +161,9 @@ class TomInteraction(Base):
     player_state = Column(String(30), nullable=True)  # État du joueur détecté
     
     # Génération LLM
-    llm_prompt = Column(Text, nullable=True)  # Prompt utilisé pour générer le message
-    llm_response_raw = Column(Text, nullable=True)  # Réponse brute du LLM
+    # (compressés, chargés et décompressés seulement à l'accès)
+    llm_prompt = deferred(Column(CompressedText(dictionary="tom_prompts"), nullable=True))  # Prompt utilisé pour générer le message
+    llm_response_raw = deferred(Column(CompressedText(), nullable=True))  # Réponse brute du LLM
     generation_time_seconds = Column(Float, nullable=True)  # Temps de génération
     
     # Métadonnées
@@ -0,0 +1,137 @@
+"""
+Modèle pour le résumé incrémental des sessions
+"""
+from sqlalchemy import Column, String, DateTime, Integer, Float, ForeignKey
+from datetime import datetime
+import math
+
+from ..database import Base
+
+
+class SessionSummary(Base):
+    """
+    Projection par session des journaux bruts (actions et interactions Tom),
+    mise à jour à chaque écriture : les statistiques d'une session en cours
+    se lisent par clé primaire au lieu de compter les journaux
+    """
+    __tablename__ = "session_summary"
+
+    # Session résumée
+    session_id = Column(String, ForeignKey("game_sessions.id"), primary_key=True)
+
+    # Compteurs d'actions
+    total_actions = Column(Integer, default=0, nullable=False)
+    obedient_actions = Column(Integer, default=0, nullable=False)  # was_obedient vrai
+    disobedient_actions = Column(Integer, default=0, nullable=False)  # was_obedient faux
+    meta_actions = Column(Integer, default=0, nullable=False)  # action_type "meta_*"
+    tom_interactions = Column(Integer, default=0, nullable=False)
+
+    # Séries d'obéissance (une désobéissance remet la série à zéro)
+    current_obedience_streak = Column(Integer, default=0, nullable=False)
+    max_obedience_streak = Column(Integer, default=0, nullable=False)
+
+    # Gravité
+    max_gravity = Column(Integer, default=0, nullable=False)
+    gravity_sum = Column(Integer, default=0, nullable=False)
+
+    # Temps de réaction (somme et somme des carrés : moyenne et écart-type)
+    reaction_time_count = Column(Integer, default=0, nullable=False)
+    reaction_time_sum = Column(Float, default=0.0, nullable=False)
+    reaction_time_sumsq = Column(Float, default=0.0, nullable=False)
+
+    # Horodatages
+    last_action_at = Column(DateTime, nullable=True)
+    last_tom_interaction_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.now, nullable=False)
+
+    def __init__(self, **kwargs):
+        # Compteurs à zéro dès la création (les défauts de colonne ne s'appliquent qu'à l'insertion)
+        for column in self.__table__.columns:
+            if column.default is not None and column.name not in kwargs and not callable(column.default.arg):
+                kwargs[column.name] = column.default.arg
+        super().__init__(**kwargs)
+
+    def __repr__(self):
+        return f"<SessionSummary(session_id={self.session_id}, actions={self.total_actions})>"
+
+    def record_action(self, action):
+        """Ajoute une action du joueur (PlayerAction ou équivalent) au résumé"""
+        self.total_actions += 1
+
+        if action.was_obedient is True:
+            self.obedient_actions += 1
+            self.current_obedience_streak += 1
+            self.max_obedience_streak = max(self.max_obedience_streak, self.current_obedience_streak)
+        elif action.was_obedient is False:
+            self.disobedient_actions += 1
+            self.current_obedience_streak = 0
+
+        if action.action_type and action.action_type.startswith("meta_"):
+            self.meta_actions += 1
+
+        gravity = action.gravity_score or 0
+        self.gravity_sum += gravity
+        self.max_gravity = max(self.max_gravity, gravity)
+
+        if action.reaction_time_seconds is not None:
+            self.reaction_time_count += 1
+            self.reaction_time_sum += action.reaction_time_seconds
+            self.reaction_time_sumsq += action.reaction_time_seconds ** 2
+
+        if action.timestamp is not None and (self.last_action_at is None or action.timestamp > self.last_action_at):
+            self.last_action_at = action.timestamp
+        self.updated_at = datetime.now()
+
+    def record_tom_interaction(self, interaction):
+        """Ajoute une interaction Tom au résumé"""
+        self.tom_interactions += 1
+
+        timestamp = interaction.timestamp
+        if timestamp is not None and (self.last_tom_interaction_at is None or timestamp > self.last_tom_interaction_at):
+            self.last_tom_interaction_at = timestamp
+        self.updated_at = datetime.now()
+
+    @property
+    def obedience_rate(self) -> float:
+        """Part des actions obéissantes sur l'ensemble des actions"""
+        return self.obedient_actions / self.total_actions if self.total_actions else 0.0
+
+    @property
+    def average_gravity(self) -> float:
+        """Gravité moyenne des actions"""
+        return self.gravity_sum / self.total_actions if self.total_actions else 0.0
+
+    @property
+    def average_reaction_time(self) -> float:
+        """Temps de réaction moyen (secondes)"""
+        return self.reaction_time_sum / self.reaction_time_count if self.reaction_time_count else 0.0
+
+    @property
+    def reaction_time_stddev(self) -> float:
+        """Écart-type (population) des temps de réaction"""
+        if not self.reaction_time_count:
+            return 0.0
+        mean = self.average_reaction_time
+        return math.sqrt(max(self.reaction_time_sumsq / self.reaction_time_count - mean * mean, 0.0))
+
+    def to_dict(self) -> dict:
+        """Convertit le résumé en dictionnaire"""
+        return {
+            "session_id": self.session_id,
+            "total_actions": self.total_actions,
+            "obedient_actions": self.obedient_actions,
+            "disobedient_actions": self.disobedient_actions,
+            "meta_actions": self.meta_actions,
+            "tom_interactions": self.tom_interactions,
+            "obedience_rate": self.obedience_rate,
+            "current_obedience_streak": self.current_obedience_streak,
+            "max_obedience_streak": self.max_obedience_streak,
+            "max_gravity": self.max_gravity,
+            "average_gravity": self.average_gravity,
+            "reaction_time_count": self.reaction_time_count,
+            "average_reaction_time": self.average_reaction_time,
+            "reaction_time_stddev": self.reaction_time_stddev,
+            "last_action_at": self.last_action_at.isoformat() if self.last_action_at else None,
+            "last_tom_interaction_at": self.last_tom_interaction_at.isoformat() if self.last_tom_interaction_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
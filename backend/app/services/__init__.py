@@ -6,6 +6,19 @@ from .tom_ai_service import tom_service, get_tom_service
 from .game_orchestrator import orchestrator, get_game_orchestrator  
 from .bias_analyzer import BiasAnalyzer
 from .os_simulator import OSSimulator
+from .write_behind import write_queue, get_write_queue
+from .session_scheduler import scheduler, get_scheduler
+from .response_cache import tom_response_cache, get_response_cache
+from .personality_pool import TomPersonalityPool, tom_personality_pool, get_personality_pool
+from .research_export import ResearchExporter, research_exporter, get_research_exporter
+from .session_summary import rebuild_summaries, verify_summaries
+from .bias_retention import BiasRetention, bias_retention, get_bias_retention
+from .telemetry import TelemetryHub, telemetry_hub, get_telemetry_hub
+from .event_bus import EventBus, event_bus, get_event_bus
+from .session_store import (
+    InMemorySessionStore, SQLiteSessionStore, SessionStateMap, session_store, get_session_store
+)
+from .session_checkpoint import SessionCheckpointStore, session_checkpoints, get_session_checkpoints
 
 __all__ = [
     "tom_service",
@@ -13,5 +26,36 @@ __all__ = [
     "orchestrator",
     "get_game_orchestrator",
     "BiasAnalyzer",
-    "OSSimulator"
+    "OSSimulator",
+    "write_queue",
+    "get_write_queue",
+    "scheduler",
+    "get_scheduler",
+    "tom_response_cache",
+    "get_response_cache",
+    "TomPersonalityPool",
+    "tom_personality_pool",
+    "get_personality_pool",
+    "ResearchExporter",
+    "research_exporter",
+    "get_research_exporter",
+    "rebuild_summaries",
+    "verify_summaries",
+    "BiasRetention",
+    "bias_retention",
+    "get_bias_retention",
+    "TelemetryHub",
+    "telemetry_hub",
+    "get_telemetry_hub",
+    "EventBus",
+    "event_bus",
+    "get_event_bus",
+    "InMemorySessionStore",
+    "SQLiteSessionStore",
+    "SessionStateMap",
+    "session_store",
+    "get_session_store",
+    "SessionCheckpointStore",
+    "session_checkpoints",
+    "get_session_checkpoints"
 ]
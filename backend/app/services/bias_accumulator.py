@@ -0,0 +1,289 @@
+"""
+Accumulateur incrémental des biais cognitifs par session
+Maintient les compteurs nécessaires aux 4 mesures du BiasAnalyzer en O(1) par action
+"""
+from collections import deque
+from dataclasses import dataclass
+import statistics
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterable
+
+from ..models import PlayerAction
+
+
+@dataclass
+class ActionRecord:
+    """Sous-ensemble des colonnes d'une PlayerAction utilisé par les mesures de biais"""
+    timestamp: datetime
+    action_type: str
+    action_description: str
+    gravity_score: int
+    reaction_time_seconds: Optional[float]
+    was_obedient: Optional[bool]
+    triggered_corruption: bool
+    corruption_level_after: Optional[float]
+    action_id: Optional[str] = None
+
+    @classmethod
+    def from_model(cls, action: PlayerAction) -> "ActionRecord":
+        """Extrait un enregistrement depuis une PlayerAction (avant commit)"""
+        return cls(
+            timestamp=action.timestamp,
+            action_type=action.action_type,
+            action_description=action.action_description,
+            gravity_score=action.gravity_score if action.gravity_score is not None else 0,
+            reaction_time_seconds=action.reaction_time_seconds,
+            was_obedient=action.was_obedient,
+            triggered_corruption=bool(action.triggered_corruption),
+            corruption_level_after=action.corruption_level_after,
+            action_id=action.id,
+        )
+
+    @property
+    def is_meta_action(self) -> bool:
+        """Même définition que PlayerAction.is_meta_action"""
+        return self.action_type in ["meta_detective", "meta_poet", "meta_hacker"]
+
+
+class _Incident:
+    """Incident de corruption et fenêtre de 30 secondes qui le suit"""
+
+    __slots__ = ("timestamp", "post_actions", "obedient_post_actions")
+
+    def __init__(self, timestamp: datetime):
+        self.timestamp = timestamp
+        self.post_actions = 0
+        self.obedient_post_actions = 0
+
+
+class SessionBiasAccumulator:
+    """
+    État incrémental des biais pour une session
+
+    Les actions doivent arriver dans l'ordre chronologique (celui de
+    `ORDER BY timestamp`). Une action arrivant avec un timestamp antérieur au
+    dernier vu marque l'accumulateur comme invalide : le BiasAnalyzer le
+    reconstruit alors depuis la base.
+    """
+
+    # Fenêtres reprises des mesures complètes du BiasAnalyzer
+    POST_INCIDENT_WINDOW_SECONDS = 30
+    RECENT_INCIDENTS = 3
+    REACTION_WINDOW = 5
+    CRITICAL_INCIDENT_LEVEL = 0.5
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.incident_threshold = analyzer.thresholds["incident_corruption"]
+        self.investigation_actions = set(analyzer.thresholds["investigation_actions"])
+        self.needs_rebuild = False
+
+        # Ordre chronologique et égalités de timestamps en fin de séquence
+        self.last_timestamp: Optional[datetime] = None
+        self.tail_run = 0  # Actions partageant last_timestamp
+
+        # Cognitive offloading
+        self.total_actions = 0
+        self.investigation_count = 0
+
+        # Automation bias : 3 derniers incidents et leurs fenêtres post-incident
+        self.recent_incidents: deque = deque(maxlen=self.RECENT_INCIDENTS)
+
+        # Trust calibration
+        self.critical_timestamp: Optional[datetime] = None
+        self.pre_reactions: deque = deque()  # (timestamp, temps de réaction) avant incident critique
+        self.pre_reaction_count = 0
+        self.pre_tail_run = 0  # Entrées de pre_reactions partageant le dernier timestamp
+        self.post_reactions: List[float] = []  # 5 premiers temps après incident critique
+        self.post_reaction_count = 0
+
+        # Authority compliance
+        self.rupture: Optional[ActionRecord] = None
+        self.actions_before_rupture = 0
+        self.max_gravity = 0
+
+    @classmethod
+    def from_actions(cls, analyzer, actions: Iterable[Any]) -> "SessionBiasAccumulator":
+        """Reconstruit l'accumulateur depuis l'historique complet (démarrage à froid)"""
+        accumulator = cls(analyzer)
+        for action in actions:
+            record = action if isinstance(action, ActionRecord) else ActionRecord.from_model(action)
+            accumulator.add(record)
+        return accumulator
+
+    def add(self, record: ActionRecord):
+        """Intègre une nouvelle action en O(1)"""
+        timestamp = record.timestamp
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            # Hors ordre : les fenêtres ne sont plus exactes
+            self.needs_rebuild = True
+            return
+
+        # Nombre d'actions strictement antérieures à celle-ci
+        if timestamp == self.last_timestamp:
+            self.tail_run += 1
+        else:
+            self.tail_run = 1
+        self.last_timestamp = timestamp
+        strictly_before = self.total_actions - (self.tail_run - 1)
+
+        self.total_actions += 1
+        if record.action_type in self.investigation_actions:
+            self.investigation_count += 1
+
+        # Automation bias : l'action compte dans la fenêtre de chaque incident récent
+        for incident in self.recent_incidents:
+            if (timestamp > incident.timestamp and
+                    (timestamp - incident.timestamp).total_seconds() <= self.POST_INCIDENT_WINDOW_SECONDS):
+                incident.post_actions += 1
+                if record.was_obedient:
+                    incident.obedient_post_actions += 1
+
+        if record.triggered_corruption and record.corruption_level_after >= self.incident_threshold:
+            self.recent_incidents.append(_Incident(timestamp))
+
+        # Trust calibration
+        reaction_time = record.reaction_time_seconds
+        if self.critical_timestamp is None:
+            if record.triggered_corruption and record.corruption_level_after >= self.CRITICAL_INCIDENT_LEVEL:
+                self.critical_timestamp = timestamp
+                self._freeze_pre_reactions(timestamp)
+            elif reaction_time is not None:
+                self._push_pre_reaction(timestamp, reaction_time)
+        elif reaction_time is not None and timestamp > self.critical_timestamp:
+            self.post_reaction_count += 1
+            if len(self.post_reactions) < self.REACTION_WINDOW:
+                self.post_reactions.append(reaction_time)
+
+        # Authority compliance
+        if self.rupture is None and record.is_meta_action:
+            self.rupture = record
+            self.actions_before_rupture = strictly_before
+        if record.gravity_score > self.max_gravity:
+            self.max_gravity = record.gravity_score
+
+    def _push_pre_reaction(self, timestamp: datetime, reaction_time: float):
+        """
+        Conserve les 5 derniers temps de réaction strictement antérieurs à un
+        futur incident critique, plus ceux partageant le timestamp courant
+        """
+        if self.pre_reactions and self.pre_reactions[-1][0] == timestamp:
+            self.pre_tail_run += 1
+        else:
+            self.pre_tail_run = 1
+        self.pre_reactions.append((timestamp, reaction_time))
+        self.pre_reaction_count += 1
+
+        while len(self.pre_reactions) - self.pre_tail_run > self.REACTION_WINDOW:
+            self.pre_reactions.popleft()
+
+    def _freeze_pre_reactions(self, critical_timestamp: datetime):
+        """Écarte les temps de réaction simultanés à l'incident critique"""
+        if self.pre_reactions and self.pre_reactions[-1][0] == critical_timestamp:
+            for _ in range(self.pre_tail_run):
+                self.pre_reactions.pop()
+            self.pre_reaction_count -= self.pre_tail_run
+        while len(self.pre_reactions) > self.REACTION_WINDOW:
+            self.pre_reactions.popleft()
+        self.pre_tail_run = 0
+
+    # Mesures (mêmes sorties que les méthodes _measure_* du BiasAnalyzer)
+
+    def automation_bias(self) -> Dict[str, Any]:
+        """Équivalent incrémental de BiasAnalyzer._measure_automation_bias"""
+        if not self.recent_incidents:
+            return {
+                "score": None,
+                "reason": "no_corruption_incidents",
+                "measurement": "insufficient_data"
+            }
+
+        total_post_incident_actions = sum(i.post_actions for i in self.recent_incidents)
+        obedient_post_incident_actions = sum(i.obedient_post_actions for i in self.recent_incidents)
+
+        if total_post_incident_actions == 0:
+            return {
+                "score": None,
+                "reason": "no_post_incident_actions",
+                "measurement": "insufficient_data"
+            }
+
+        obedience_rate_post_incident = obedient_post_incident_actions / total_post_incident_actions
+
+        return {
+            "score": obedience_rate_post_incident,
+            "incidents_analyzed": len(self.recent_incidents),
+            "post_incident_actions": total_post_incident_actions,
+            "obedient_post_incident": obedient_post_incident_actions,
+            "measurement": "obedience_rate_post_corruption",
+            "interpretation": self.analyzer._interpret_automation_bias(obedience_rate_post_incident)
+        }
+
+    def trust_calibration(self) -> Dict[str, Any]:
+        """Équivalent incrémental de BiasAnalyzer._measure_trust_calibration"""
+        if self.critical_timestamp is None:
+            return {
+                "score": None,
+                "reason": "no_critical_incidents",
+                "measurement": "insufficient_data"
+            }
+
+        if self.pre_reaction_count < 3 or self.post_reaction_count < 3:
+            return {
+                "score": None,
+                "reason": "insufficient_reaction_time_data",
+                "measurement": "insufficient_data"
+            }
+
+        avg_reaction_pre = statistics.mean([rt for _, rt in self.pre_reactions])
+        avg_reaction_post = statistics.mean(self.post_reactions)
+        return self.analyzer._trust_calibration_result(avg_reaction_pre, avg_reaction_post)
+
+    def cognitive_offloading(self) -> Dict[str, Any]:
+        """Équivalent incrémental de BiasAnalyzer._measure_cognitive_offloading"""
+        if self.total_actions < 5:
+            return {
+                "score": None,
+                "reason": "insufficient_total_actions",
+                "measurement": "insufficient_data"
+            }
+
+        investigation_rate = self.investigation_count / self.total_actions
+        offloading_score = max(0, 1 - (investigation_rate * 3))
+
+        return {
+            "score": offloading_score,
+            "total_actions": self.total_actions,
+            "investigation_actions": self.investigation_count,
+            "investigation_rate": investigation_rate,
+            "measurement": "investigation_frequency_inverse",
+            "interpretation": self.analyzer._interpret_cognitive_offloading(offloading_score)
+        }
+
+    def authority_compliance(self, game_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Équivalent incrémental de BiasAnalyzer._measure_authority_compliance"""
+        if self.rupture is not None:
+            rupture_score = self.rupture.gravity_score
+            return {
+                "score": rupture_score,
+                "rupture_action_type": self.rupture.action_type,
+                "rupture_action_description": self.rupture.action_description,
+                "actions_before_rupture": self.actions_before_rupture,
+                "measurement": "gravity_score_at_rupture",
+                "interpretation": self.analyzer._interpret_authority_compliance(rupture_score)
+            }
+
+        if game_state.get("is_completed", False):
+            return {
+                "score": self.max_gravity,
+                "rupture_action_type": "session_completed",
+                "rupture_action_description": "Session terminée sans méta-action",
+                "measurement": "max_gravity_reached",
+                "interpretation": self.analyzer._interpret_authority_compliance(self.max_gravity)
+            }
+
+        return {
+            "score": None,
+            "reason": "no_rupture_detected",
+            "measurement": "session_ongoing"
+        }
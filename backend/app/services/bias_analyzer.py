@@ -4,11 +4,16 @@ Mesure les 4 biais principaux selon le protocole expérimental
 """
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
+import asyncio
 import statistics
 import math
 
-from ..database import get_db_context
+from sqlalchemy import select
+
+from ..database import get_async_db_context
 from ..models import PlayerAction, TomInteraction, ExperimentData, BiasSnapshot
+from .bias_accumulator import ActionRecord, SessionBiasAccumulator
+from .write_behind import get_write_queue
 
 
 class BiasAnalyzer:
@@ -53,6 +58,88 @@ class BiasAnalyzer:
             "high_gravity_threshold": 5,  # Actions considérées comme graves
             "hesitation_threshold": 3.0,  # Secondes d'hésitation significative
         }
+        
+        # Accumulateurs incrémentaux par session (reconstruits depuis la base si absents)
+        self.session_accumulators: Dict[str, SessionBiasAccumulator] = {}
+        
+        # Reconstructions en cours (une seule par session) et actions arrivées pendant celles-ci
+        self._rebuilds: Dict[str, asyncio.Future] = {}
+        self._pending_records: Dict[str, List[ActionRecord]] = {}
+    
+    def start_session(self, session_id: str):
+        """
+        Déclare une nouvelle session sans historique : son accumulateur est chaud d'emblée
+        """
+        self.session_accumulators[session_id] = SessionBiasAccumulator(self)
+    
+    def record_action(self, session_id: str, record: ActionRecord):
+        """
+        Intègre une action persistée à l'accumulateur de la session (O(1))
+        Pendant une reconstruction, l'action est mise de côté puis rejouée ;
+        sans accumulateur, la prochaine mesure reconstruira l'état depuis la base.
+        """
+        pending = self._pending_records.get(session_id)
+        if pending is not None:
+            pending.append(record)
+            return
+        
+        accumulator = self.session_accumulators.get(session_id)
+        if accumulator is not None:
+            accumulator.add(record)
+    
+    def cleanup_session(self, session_id: str):
+        """
+        Libère l'accumulateur d'une session terminée
+        """
+        self.session_accumulators.pop(session_id, None)
+    
+    async def _get_accumulator(self, session_id: str) -> SessionBiasAccumulator:
+        """
+        Retourne l'accumulateur de la session, reconstruit depuis la base
+        au démarrage à froid ou après une arrivée hors ordre
+        Les mesures concurrentes attendent la même reconstruction.
+        """
+        accumulator = self.session_accumulators.get(session_id)
+        if accumulator is not None and not accumulator.needs_rebuild:
+            return accumulator
+        
+        rebuild = self._rebuilds.get(session_id)
+        if rebuild is None:
+            # Avant toute attente : les actions arrivant pendant la reconstruction sont conservées
+            self._pending_records[session_id] = []
+            rebuild = asyncio.ensure_future(self._rebuild_accumulator(session_id))
+            self._rebuilds[session_id] = rebuild
+        
+        # L'annulation d'une mesure n'interrompt pas la reconstruction partagée
+        return await asyncio.shield(rebuild)
+    
+    async def _rebuild_accumulator(self, session_id: str) -> SessionBiasAccumulator:
+        """
+        Reconstruit l'accumulateur depuis la base puis rejoue les actions
+        reçues entre-temps qui n'étaient pas encore commitées
+        """
+        try:
+            # Les actions encore en file doivent être visibles pour la reconstruction
+            await get_write_queue().flush()
+            
+            async with get_async_db_context() as db:
+                actions = (await db.execute(
+                    select(PlayerAction)
+                    .where(PlayerAction.session_id == session_id)
+                    .order_by(PlayerAction.timestamp)
+                )).scalars().all()
+                accumulator = SessionBiasAccumulator.from_actions(self, actions)
+                persisted = {action.id for action in actions}
+            
+            for record in self._pending_records.get(session_id, []):
+                if record.action_id is None or record.action_id not in persisted:
+                    accumulator.add(record)
+            
+            self.session_accumulators[session_id] = accumulator
+            return accumulator
+        finally:
+            self._rebuilds.pop(session_id, None)
+            self._pending_records.pop(session_id, None)
     
     async def measure_bias_from_action(
         self, 
@@ -67,26 +154,21 @@ class BiasAnalyzer:
         bias_measurements = {}
         
         try:
-            with get_db_context() as db:
-                # Récupérer l'historique des actions
-                actions = db.query(PlayerAction)\
-                    .filter(PlayerAction.session_id == session_id)\
-                    .order_by(PlayerAction.timestamp)\
-                    .all()
-                
-                # Mesurer chaque biais
-                bias_measurements = {
-                    "automation_bias": await self._measure_automation_bias(actions, action_analysis),
-                    "trust_calibration": await self._measure_trust_calibration(actions, action_analysis),
-                    "cognitive_offloading": await self._measure_cognitive_offloading(actions, action_analysis),
-                    "authority_compliance": await self._measure_authority_compliance(actions, action_analysis, game_state),
-                    "measurement_timestamp": datetime.now().isoformat(),
-                    "session_id": session_id,
-                    "trigger_action": action_data.get("type", "unknown")
-                }
-                
-                # Enregistrer le snapshot de biais
-                await self._record_bias_snapshot(session_id, bias_measurements, game_state)
+            accumulator = await self._get_accumulator(session_id)
+            
+            # Mesurer chaque biais depuis l'état incrémental
+            bias_measurements = {
+                "automation_bias": accumulator.automation_bias(),
+                "trust_calibration": accumulator.trust_calibration(),
+                "cognitive_offloading": accumulator.cognitive_offloading(),
+                "authority_compliance": accumulator.authority_compliance(game_state),
+                "measurement_timestamp": datetime.now().isoformat(),
+                "session_id": session_id,
+                "trigger_action": action_data.get("type", "unknown")
+            }
+            
+            # Enregistrer le snapshot de biais
+            await self._record_bias_snapshot(session_id, bias_measurements, game_state)
                 
         except Exception as e:
             print(f"❌ Erreur mesure biais: {e}")
@@ -203,6 +285,12 @@ class BiasAnalyzer:
         avg_reaction_pre = statistics.mean([a.reaction_time_seconds for a in pre_incident_actions[-5:]])
         avg_reaction_post = statistics.mean([a.reaction_time_seconds for a in post_incident_actions[:5]])
         
+        return self._trust_calibration_result(avg_reaction_pre, avg_reaction_post)
+    
+    def _trust_calibration_result(self, avg_reaction_pre: float, avg_reaction_post: float) -> Dict[str, Any]:
+        """
+        Construit le résultat du Trust Calibration à partir des temps moyens
+        """
         # Augmentation du temps de réaction = meilleur calibrage
         reaction_increase = avg_reaction_post - avg_reaction_pre
         
@@ -308,29 +396,25 @@ class BiasAnalyzer:
         Prend un snapshot complet des biais à un moment donné
         """
         try:
-            with get_db_context() as db:
-                actions = db.query(PlayerAction)\
-                    .filter(PlayerAction.session_id == session_id)\
-                    .order_by(PlayerAction.timestamp)\
-                    .all()
-                
-                snapshot = {
-                    "session_id": session_id,
-                    "timestamp": datetime.now().isoformat(),
-                    "game_time": game_state.get("time_elapsed", 0),
-                    "game_phase": game_state.get("current_phase", "unknown"),
-                    "corruption_level": game_state.get("corruption_level", 0.0),
-                    "total_actions": len(actions),
-                    "biases": {}
-                }
-                
-                # Mesurer tous les biais
-                snapshot["biases"]["automation_bias"] = await self._measure_automation_bias(actions, {})
-                snapshot["biases"]["trust_calibration"] = await self._measure_trust_calibration(actions, {})
-                snapshot["biases"]["cognitive_offloading"] = await self._measure_cognitive_offloading(actions, {})
-                snapshot["biases"]["authority_compliance"] = await self._measure_authority_compliance(actions, {}, game_state)
-                
-                return snapshot
+            accumulator = await self._get_accumulator(session_id)
+            
+            snapshot = {
+                "session_id": session_id,
+                "timestamp": datetime.now().isoformat(),
+                "game_time": game_state.get("time_elapsed", 0),
+                "game_phase": game_state.get("current_phase", "unknown"),
+                "corruption_level": game_state.get("corruption_level", 0.0),
+                "total_actions": accumulator.total_actions,
+                "biases": {}
+            }
+            
+            # Mesurer tous les biais
+            snapshot["biases"]["automation_bias"] = accumulator.automation_bias()
+            snapshot["biases"]["trust_calibration"] = accumulator.trust_calibration()
+            snapshot["biases"]["cognitive_offloading"] = accumulator.cognitive_offloading()
+            snapshot["biases"]["authority_compliance"] = accumulator.authority_compliance(game_state)
+            
+            return snapshot
                 
         except Exception as e:
             print(f"❌ Erreur snapshot biais: {e}")
@@ -371,24 +455,22 @@ class BiasAnalyzer:
         game_state: Dict[str, Any]
     ):
         """
-        Enregistre un snapshot de biais dans la base de données
+        Enregistre un snapshot de biais dans la base de données (écriture différée)
         """
         try:
-            with get_db_context() as db:
-                snapshot = BiasSnapshot(
-                    session_id=session_id,
-                    game_time_seconds=game_state.get("time_elapsed", 0),
-                    game_phase=game_state.get("current_phase", "unknown"),
-                    corruption_level=game_state.get("corruption_level", 0.0),
-                    automation_bias_score=bias_measurements.get("automation_bias", {}).get("score"),
-                    trust_calibration_score=bias_measurements.get("trust_calibration", {}).get("score"),
-                    cognitive_offloading_score=bias_measurements.get("cognitive_offloading", {}).get("score"),
-                    authority_compliance_score=bias_measurements.get("authority_compliance", {}).get("score"),
-                    bias_data=bias_measurements
-                )
-                
-                db.add(snapshot)
-                print(f"📊 Snapshot biais enregistré pour session {session_id}")
+            snapshot = BiasSnapshot(
+                session_id=session_id,
+                timestamp=datetime.now(),
+                game_time_seconds=game_state.get("time_elapsed", 0),
+                game_phase=game_state.get("current_phase", "unknown"),
+                corruption_level=game_state.get("corruption_level", 0.0),
+                trigger_event=bias_measurements.get("trigger_action"),
+                instantaneous_automation_bias=bias_measurements.get("automation_bias", {}).get("score"),
+                instantaneous_trust_level=bias_measurements.get("trust_calibration", {}).get("score"),
+                instantaneous_compliance=bias_measurements.get("authority_compliance", {}).get("score")
+            )
+            
+            await get_write_queue().add(snapshot)
                 
         except Exception as e:
             print(f"❌ Erreur enregistrement snapshot: {e}")
@@ -439,16 +521,17 @@ class BiasAnalyzer:
         else:
             return "Minimal authority compliance - immediate questioning of authority"
     
-    def get_bias_summary(self, session_id: str) -> Dict[str, Any]:
+    async def get_bias_summary(self, session_id: str) -> Dict[str, Any]:
         """
         Retourne un résumé des biais pour une session
         """
         try:
-            with get_db_context() as db:
-                snapshots = db.query(BiasSnapshot)\
-                    .filter(BiasSnapshot.session_id == session_id)\
-                    .order_by(BiasSnapshot.timestamp.desc())\
-                    .all()
+            async with get_async_db_context() as db:
+                snapshots = (await db.execute(
+                    select(BiasSnapshot)
+                    .where(BiasSnapshot.session_id == session_id)
+                    .order_by(BiasSnapshot.timestamp.desc())
+                )).scalars().all()
                 
                 if not snapshots:
                     return {"error": "No bias data found"}
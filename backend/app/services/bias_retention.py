@@ -0,0 +1,300 @@
+"""
+Rétention par niveaux des snapshots de biais
+Les sessions actives ou récentes gardent leurs snapshots bruts ; au-delà de
+`bias_retention_raw_hours` sans nouveau snapshot, une session est agrégée en
+rollups par minute et par phase (min/max/moyenne/dernière valeur par métrique)
+puis ses snapshots bruts sont supprimés. Les rollups par minute sont eux-mêmes
+supprimés après `bias_retention_minute_days` : seuls restent ceux par phase
+
+Usage hors ligne : python -m app.services.bias_retention [run|status]
+"""
+import asyncio
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import select, delete, func
+
+from ..config import settings
+from ..database import engine as default_engine
+from ..models import BiasSnapshot, BiasSnapshotRollup
+from ..models.experiment_data import ROLLUP_METRICS
+
+# Niveaux d'agrégation, du plus fin au plus grossier
+ROLLUP_TIERS = ("minute", "phase")
+
+
+class _RollupBucket:
+    """Agrégation en cours d'un intervalle de snapshots"""
+
+    __slots__ = ("first", "last", "count", "minimums", "maximums", "sums", "counts", "lasts")
+
+    def __init__(self):
+        self.first = None
+        self.last = None
+        self.count = 0
+        self.minimums: Dict[str, float] = {}
+        self.maximums: Dict[str, float] = {}
+        self.sums: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.lasts: Dict[str, float] = {}
+
+    def add(self, snapshot):
+        """Ajoute un snapshot (dans l'ordre chronologique)"""
+        if self.first is None:
+            self.first = snapshot
+        self.last = snapshot
+        self.count += 1
+
+        for column, metric in ROLLUP_METRICS.items():
+            value = getattr(snapshot, column)
+            if value is None:
+                continue
+            self.minimums[metric] = min(self.minimums.get(metric, value), value)
+            self.maximums[metric] = max(self.maximums.get(metric, value), value)
+            self.sums[metric] = self.sums.get(metric, 0.0) + value
+            self.counts[metric] = self.counts.get(metric, 0) + 1
+            self.lasts[metric] = value
+
+    def to_row(self, session_id: str, tier: str, created_at: datetime) -> Dict[str, Any]:
+        """Ligne de BiasSnapshotRollup"""
+        row = {
+            "id": str(uuid.uuid4()),
+            "session_id": session_id,
+            "tier": tier,
+            "game_phase": self.last.game_phase,
+            "bucket_start": self.first.timestamp,
+            "bucket_end": self.last.timestamp,
+            "game_time_start": self.first.game_time_seconds,
+            "game_time_end": self.last.game_time_seconds,
+            "sample_count": self.count,
+            "created_at": created_at,
+        }
+        for metric in ROLLUP_METRICS.values():
+            count = self.counts.get(metric)
+            row[f"{metric}_min"] = self.minimums.get(metric)
+            row[f"{metric}_max"] = self.maximums.get(metric)
+            row[f"{metric}_mean"] = self.sums[metric] / count if count else None
+            row[f"{metric}_last"] = self.lasts.get(metric)
+        return row
+
+
+def build_rollups(session_id: str, snapshots: List[Any], created_at: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Rollups par minute et par phase des snapshots (chronologiques) d'une session"""
+    created_at = created_at or datetime.now()
+    minutes: Dict[datetime, _RollupBucket] = {}
+    phases: Dict[str, _RollupBucket] = {}
+
+    for snapshot in snapshots:
+        minute = snapshot.timestamp.replace(second=0, microsecond=0)
+        minutes.setdefault(minute, _RollupBucket()).add(snapshot)
+        phases.setdefault(snapshot.game_phase, _RollupBucket()).add(snapshot)
+
+    return [
+        bucket.to_row(session_id, "minute", created_at) for bucket in minutes.values()
+    ] + [
+        bucket.to_row(session_id, "phase", created_at) for bucket in phases.values()
+    ]
+
+
+class BiasRetention:
+    """
+    Agrégation et purge périodiques des snapshots de biais, par lots de sessions
+    (une transaction courte par lot : les écritures du jeu ne sont pas bloquées)
+    """
+
+    def __init__(
+        self,
+        engine=None,
+        raw_hours: Optional[float] = None,
+        minute_days: Optional[float] = None,
+        batch_sessions: Optional[int] = None,
+        interval_seconds: Optional[float] = None
+    ):
+        self.engine = engine or default_engine
+        self.raw_hours = settings.bias_retention_raw_hours if raw_hours is None else raw_hours
+        self.minute_days = settings.bias_retention_minute_days if minute_days is None else minute_days
+        self.batch_sessions = batch_sessions or settings.bias_retention_batch_sessions
+        self.interval_seconds = interval_seconds or settings.bias_retention_interval_seconds
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        # Métriques
+        self.stats = {
+            "runs": 0,
+            "sessions_rolled_up": 0,
+            "snapshots_pruned": 0,
+            "rollups_written": 0,
+            "minute_rollups_pruned": 0,
+            "last_run_at": None,
+            "last_duration_seconds": None,
+            "last_error": None,
+        }
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Agrège les sessions sans snapshot récent puis purge les rollups par
+        minute expirés ; retourne le résumé du passage
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("Une rétention des snapshots est déjà en cours")
+
+        try:
+            start = time.perf_counter()
+            now = now or datetime.now()
+            raw_cutoff = now - timedelta(hours=self.raw_hours)
+            summary = {"sessions_rolled_up": 0, "snapshots_pruned": 0, "rollups_written": 0, "minute_rollups_pruned": 0}
+
+            while True:
+                session_ids = self._eligible_sessions(raw_cutoff)
+                if not session_ids:
+                    break
+                rollups, pruned = self._roll_up(session_ids, raw_cutoff, now)
+                summary["sessions_rolled_up"] += len(session_ids)
+                summary["snapshots_pruned"] += pruned
+                summary["rollups_written"] += rollups
+
+            with self.engine.begin() as connection:
+                summary["minute_rollups_pruned"] = connection.execute(
+                    delete(BiasSnapshotRollup).where(
+                        BiasSnapshotRollup.tier == "minute",
+                        BiasSnapshotRollup.bucket_end < now - timedelta(days=self.minute_days)
+                    )
+                ).rowcount
+
+            duration = time.perf_counter() - start
+            self.stats["runs"] += 1
+            for key, value in summary.items():
+                self.stats[key] += value
+            self.stats["last_run_at"] = now.isoformat()
+            self.stats["last_duration_seconds"] = round(duration, 3)
+            self.stats["last_error"] = None
+
+            if summary["sessions_rolled_up"] or summary["minute_rollups_pruned"]:
+                print(
+                    f"🗜️ Rétention des biais : {summary['sessions_rolled_up']} session(s) agrégée(s), "
+                    f"{summary['snapshots_pruned']} snapshot(s) purgé(s) en {duration:.2f}s"
+                )
+            return {**summary, "duration_seconds": round(duration, 3)}
+        except Exception as e:
+            self.stats["last_error"] = str(e)
+            raise
+        finally:
+            self._lock.release()
+
+    async def start(self):
+        """Lance la rétention périodique en arrière-plan"""
+        if not settings.bias_retention_enabled:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run_periodically())
+
+    async def shutdown(self):
+        """Arrête la rétention périodique"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne les métriques de rétention"""
+        return {
+            **self.stats,
+            "raw_hours": self.raw_hours,
+            "minute_days": self.minute_days,
+            "running": self._lock.locked(),
+            "scheduled": self._task is not None and not self._task.done(),
+        }
+
+    async def _run_periodically(self):
+        """Un passage par intervalle, hors de la boucle d'événements"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.run)
+            except Exception as e:
+                print(f"❌ Erreur rétention des snapshots de biais: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def _eligible_sessions(self, raw_cutoff: datetime) -> List[str]:
+        """Sessions dont le snapshot le plus récent est plus ancien que la limite"""
+        query = select(BiasSnapshot.session_id)\
+            .group_by(BiasSnapshot.session_id)\
+            .having(func.max(BiasSnapshot.timestamp) < raw_cutoff)\
+            .limit(self.batch_sessions)
+        with self.engine.connect() as connection:
+            return [row[0] for row in connection.execute(query)]
+
+    def _roll_up(self, session_ids: List[str], raw_cutoff: datetime, now: datetime):
+        """Écrit les rollups d'un lot de sessions et supprime leurs snapshots bruts"""
+        columns = [
+            BiasSnapshot.session_id, BiasSnapshot.timestamp, BiasSnapshot.game_time_seconds,
+            BiasSnapshot.game_phase, *[getattr(BiasSnapshot, column) for column in ROLLUP_METRICS]
+        ]
+        rows = []
+
+        with self.engine.begin() as connection:
+            snapshots = connection.execute(
+                select(*columns)
+                .where(BiasSnapshot.session_id.in_(session_ids), BiasSnapshot.timestamp < raw_cutoff)
+                .order_by(BiasSnapshot.session_id, BiasSnapshot.timestamp, BiasSnapshot.id)
+            ).all()
+
+            by_session: Dict[str, list] = {}
+            for snapshot in snapshots:
+                by_session.setdefault(snapshot.session_id, []).append(snapshot)
+            for session_id, session_snapshots in by_session.items():
+                rows.extend(build_rollups(session_id, session_snapshots, now))
+
+            if rows:
+                connection.execute(BiasSnapshotRollup.__table__.insert(), rows)
+            connection.execute(
+                delete(BiasSnapshot).where(
+                    BiasSnapshot.session_id.in_(session_ids), BiasSnapshot.timestamp < raw_cutoff
+                )
+            )
+
+        return len(rows), len(snapshots)
+
+
+# Instance globale de la rétention des snapshots
+bias_retention = BiasRetention()
+
+
+def get_bias_retention() -> BiasRetention:
+    """Retourne l'instance de la rétention des snapshots de biais"""
+    return bias_retention
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    retention = get_bias_retention()
+
+    if command == "run":
+        result = retention.run()
+        print(f"✅ {result['sessions_rolled_up']} session(s) agrégée(s), "
+              f"{result['snapshots_pruned']} snapshot(s) purgé(s), "
+              f"{result['minute_rollups_pruned']} rollup(s) par minute expiré(s)")
+    elif command == "status":
+        with retention.engine.connect() as connection:
+            raw = connection.execute(select(func.count(BiasSnapshot.id))).scalar_one()
+            tiers = dict(connection.execute(
+                select(BiasSnapshotRollup.tier, func.count(BiasSnapshotRollup.id)).group_by(BiasSnapshotRollup.tier)
+            ).all())
+        print(f"📋 Snapshots bruts : {raw}")
+        for tier in ROLLUP_TIERS:
+            print(f"   Rollups {tier:<7}: {tiers.get(tier, 0)}")
+    else:
+        print("Usage : python -m app.services.bias_retention [run|status]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
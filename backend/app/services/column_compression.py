@@ -0,0 +1,192 @@
+"""
+Compression des colonnes JSON et texte volumineuses
+Entraînement du dictionnaire des prompts de Tom, conversion des lignes
+stockées en clair (migration) et rapport de taille sur disque
+
+Usage : python -m app.services.column_compression [report|train|compress]
+"""
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import event, select, func, case, desc
+from sqlalchemy.engine import Connection, Engine
+
+from ..database import Base, engine, reader_engine
+from ..models.compression import (
+    CompressionDictionary, compress, get_compression_dictionaries, train_dictionary, CompressedType
+)
+
+# Lignes converties par aller-retour
+COMPRESS_BATCH_SIZE = 2000
+
+# Échantillons lus pour entraîner un dictionnaire
+TRAINING_SAMPLE_LIMIT = 2000
+TRAINING_MIN_SAMPLES = 50
+
+
+def compressed_columns() -> List[Tuple[Any, Any]]:
+    """Colonnes (table, colonne) stockées compressées"""
+    return [
+        (table, column)
+        for table in Base.metadata.sorted_tables
+        for column in table.columns
+        if isinstance(column.type, CompressedType)
+    ]
+
+
+def train_column_dictionary(
+    connection: Connection,
+    table,
+    column,
+    min_samples: int = TRAINING_MIN_SAMPLES
+) -> Optional[Tuple[int, bytes]]:
+    """
+    Entraîne et enregistre le dictionnaire d'une colonne compressée sur ses
+    valeurs les plus récentes ; None s'il n'y a pas assez d'échantillons. Le
+    dictionnaire n'est utilisé pour compresser qu'après le commit
+    """
+    name = column.type.dictionary
+    values = connection.execute(
+        select(column).where(column.isnot(None)).order_by(desc(table.c.created_at)).limit(TRAINING_SAMPLE_LIMIT)
+    ).scalars().all()
+    samples = [column.type.serialize(value).decode("utf-8") for value in values]
+    if len(samples) < min_samples:
+        return None
+
+    data = train_dictionary(samples)
+    if not data:
+        return None
+
+    dictionary_id = connection.execute(
+        CompressionDictionary.__table__.insert().values(
+            name=name, data=data, sample_count=len(samples), created_at=datetime.now()
+        )
+    ).inserted_primary_key[0]
+
+    # Actif pour les nouvelles écritures une fois la transaction validée
+    event.listen(
+        connection, "commit",
+        lambda _: get_compression_dictionaries().register(dictionary_id, name, data),
+        once=True
+    )
+    return dictionary_id, data
+
+
+def train_dictionaries(connection: Connection) -> Dict[str, Tuple[int, bytes]]:
+    """Entraîne le dictionnaire de chaque colonne qui en déclare un"""
+    dictionaries = {}
+    for table, column in compressed_columns():
+        if column.type.dictionary is None:
+            continue
+        dictionary = train_column_dictionary(connection, table, column)
+        if dictionary is not None:
+            dictionaries[column.type.dictionary] = dictionary
+    return dictionaries
+
+
+def compress_existing_rows(
+    engine: Engine,
+    dictionaries: Optional[Dict[str, Tuple[int, bytes]]] = None,
+    batch_size: int = COMPRESS_BATCH_SIZE,
+    pause_seconds: float = 0.0
+) -> Dict[str, int]:
+    """
+    Convertit les valeurs encore stockées en clair (SQLite : typeof() != 'blob'),
+    par lots dans l'ordre de la clé primaire, une transaction par lot (le verrou
+    d'écriture est rendu entre deux lots) ; retourne les lignes converties par
+    colonne. Relançable : les valeurs déjà compressées sont ignorées
+    """
+    dictionaries = dictionaries or {}
+    converted = {}
+
+    for table, column in compressed_columns():
+        column_type = column.type
+        dictionary = dictionaries.get(column_type.dictionary) or get_compression_dictionaries().active(column_type.dictionary)
+        query = (
+            f"SELECT id, {column.name} FROM {table.name} "
+            f"WHERE id > ? AND {column.name} IS NOT NULL AND typeof({column.name}) != 'blob' "
+            f"ORDER BY id LIMIT ?"
+        )
+        update = f"UPDATE {table.name} SET {column.name} = ? WHERE id = ?"
+
+        count = 0
+        last_id = ""
+        while True:
+            with engine.begin() as connection:
+                rows = connection.exec_driver_sql(query, (last_id, batch_size)).fetchall()
+                if not rows:
+                    break
+                connection.exec_driver_sql(update, [
+                    (compress(column_type.serialize(column_type.legacy(value)), dictionary), row_id)
+                    for row_id, value in rows
+                ])
+            count += len(rows)
+            last_id = rows[-1][0]
+
+            # Laisser passer les écritures en attente entre deux lots
+            if pause_seconds:
+                time.sleep(pause_seconds)
+
+        converted[f"{table.name}.{column.name}"] = count
+
+    return converted
+
+
+def storage_report(connection: Connection) -> Dict[str, Any]:
+    """Taille sur disque de la base et des colonnes compressées"""
+    page_size = connection.exec_driver_sql("PRAGMA page_size").scalar()
+    page_count = connection.exec_driver_sql("PRAGMA page_count").scalar()
+    freelist_count = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+
+    columns = {}
+    for table, column in compressed_columns():
+        rows, stored_bytes, compressed_rows = connection.execute(select(
+            func.count(column),
+            func.coalesce(func.sum(func.length(column)), 0),
+            func.coalesce(func.sum(case((func.typeof(column) == "blob", 1), else_=0)), 0),
+        ).select_from(table)).one()
+        columns[f"{table.name}.{column.name}"] = {
+            "rows": rows,
+            "stored_bytes": stored_bytes,
+            "compressed_rows": compressed_rows,
+        }
+
+    return {
+        "database_bytes": page_size * page_count,
+        "free_bytes": page_size * freelist_count,
+        "columns": columns,
+    }
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    command = sys.argv[1] if len(sys.argv) > 1 else "report"
+
+    if command == "report":
+        with reader_engine.connect() as connection:
+            report = storage_report(connection)
+        print(f"📋 Base : {report['database_bytes'] / 1e6:.1f} Mo ({report['free_bytes'] / 1e6:.1f} Mo libres)")
+        for name, column in report["columns"].items():
+            print(f"   {name:<40} {column['rows']:>9} lignes  {column['stored_bytes'] / 1e6:>8.1f} Mo  "
+                  f"{column['compressed_rows']:>9} compressées")
+    elif command == "train":
+        CompressionDictionary.__table__.create(bind=engine, checkfirst=True)
+        with engine.begin() as connection:
+            dictionaries = train_dictionaries(connection)
+        if not dictionaries:
+            print("⚠️ Pas assez d'échantillons pour entraîner un dictionnaire")
+        for name, (dictionary_id, data) in dictionaries.items():
+            print(f"✅ Dictionnaire {name} ({dictionary_id}) entraîné : {len(data)} octets")
+    elif command == "compress":
+        get_compression_dictionaries().load(engine)
+        converted = compress_existing_rows(engine)
+        print(f"✅ {sum(converted.values())} valeur(s) compressée(s)")
+    else:
+        print("Usage : python -m app.services.column_compression [report|train|compress]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
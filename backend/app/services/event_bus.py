@@ -0,0 +1,101 @@
+"""
+Bus d'événements interne (publication/abonnement par session)
+L'orchestrateur, le système de corruption et le système de fins publient les
+événements d'une session (transition de phase, message de Tom, corruption,
+fin de partie) ; le gestionnaire WebSocket s'abonne aux sessions liées à une
+connexion et les pousse au client, qui n'a plus à interroger le serveur.
+
+Les abonnés sont appelés dans la boucle d'événements : un abonné ne doit pas
+bloquer (le gestionnaire WebSocket dépose l'événement dans la file bornée de
+la connexion). Les éditeurs peuvent consulter `has_subscribers` pour ne pas
+calculer un événement que personne ne recevra (ex. génération LLM).
+"""
+import inspect
+import itertools
+from typing import Any, Callable, Dict, Optional
+
+# Abonnement à toutes les sessions (journalisation, métriques)
+ALL_SESSIONS = "*"
+
+
+class EventBus:
+    """Bus d'événements en mémoire, indexé par session"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Dict[int, Callable[[Dict[str, Any]], Any]]] = {}
+        self._topics: Dict[int, str] = {}  # jeton -> session
+        self._tokens = itertools.count(1)
+
+        self.stats = {
+            "published": 0,
+            "delivered": 0,
+            "unrouted": 0,  # Événements sans abonné
+            "handler_errors": 0,
+        }
+
+    def subscribe(self, session_id: str, handler: Callable[[Dict[str, Any]], Any]) -> int:
+        """Abonne un gestionnaire aux événements d'une session ; retourne le jeton d'abonnement"""
+        token = next(self._tokens)
+        self._subscribers.setdefault(session_id, {})[token] = handler
+        self._topics[token] = session_id
+        return token
+
+    def unsubscribe(self, token: Optional[int]):
+        """Retire un abonnement (jeton inconnu : sans effet)"""
+        session_id = self._topics.pop(token, None)
+        if session_id is None:
+            return
+        handlers = self._subscribers.get(session_id)
+        if handlers is not None:
+            handlers.pop(token, None)
+            if not handlers:
+                del self._subscribers[session_id]
+
+    def has_subscribers(self, session_id: str) -> bool:
+        """Quelqu'un reçoit-il les événements de cette session ?"""
+        return session_id in self._subscribers or ALL_SESSIONS in self._subscribers
+
+    async def publish(self, session_id: str, event: Dict[str, Any]) -> int:
+        """
+        Publie un événement de session ; retourne le nombre d'abonnés atteints
+        Une erreur d'abonné est journalisée sans interrompre la diffusion.
+        """
+        self.stats["published"] += 1
+        handlers = [
+            *self._subscribers.get(session_id, {}).values(),
+            *self._subscribers.get(ALL_SESSIONS, {}).values(),
+        ]
+        if not handlers:
+            self.stats["unrouted"] += 1
+            return 0
+
+        event = {**event, "session_id": session_id}
+        delivered = 0
+        for handler in handlers:
+            try:
+                result = handler(event)
+                if inspect.isawaitable(result):
+                    await result
+                delivered += 1
+            except Exception as e:
+                self.stats["handler_errors"] += 1
+                print(f"❌ Erreur abonné bus d'événements ({event.get('type')}): {e}")
+
+        self.stats["delivered"] += delivered
+        return delivered
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "sessions": len(self._subscribers),
+            "subscriptions": len(self._topics),
+        }
+
+
+# Instance globale
+event_bus = EventBus()
+
+
+def get_event_bus() -> EventBus:
+    """Retourne le bus d'événements global"""
+    return event_bus
@@ -5,16 +5,24 @@ Coordonne toutes les phases du jeu et les interactions entre les systèmes
 import asyncio
 import time
 import json
+import uuid
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 
 from ..config import settings
-from ..models import GameSession, PlayerAction, ExperimentData
-from ..database import get_db_context
+from ..models import GameSession, PlayerAction, ExperimentData, TomInteraction
 from .tom_ai_service import get_tom_service
 from .bias_analyzer import BiasAnalyzer
+from .bias_accumulator import ActionRecord
 from .os_simulator import OSSimulator
+from .write_behind import get_write_queue
+from .session_scheduler import get_scheduler
+from .stage_timer import StageTimer
+from .telemetry import get_telemetry_hub, is_telemetry_action, event_from_action
+from .event_bus import get_event_bus
+from .session_store import SessionStateMap
+from .session_checkpoint import get_session_checkpoints
 from ..core.action_engine import ActionEngine
 from ..core.corruption_system import CorruptionSystem
 from ..core.ending_system import EndingSystem
@@ -37,6 +45,34 @@ class GameState:
     obeyed_orders: int = 0
     hesitation_events: int = 0
     meta_actions_performed: int = 0
+    
+    def refresh_elapsed(self) -> float:
+        """Recalcule le temps écoulé depuis le début de la session"""
+        self.time_elapsed = time.time() - self.start_time.timestamp()
+        return self.time_elapsed
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Sérialise l'état (stockage partagé entre workers)"""
+        data = asdict(self)
+        data["start_time"] = self.start_time.isoformat()
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GameState":
+        """Reconstruit l'état sérialisé par `to_dict`"""
+        return cls(**{**data, "start_time": datetime.fromisoformat(data["start_time"])})
+
+
+# Échéances des transitions de phase (secondes depuis le début de la session)
+PHASE_SCHEDULE = [
+    (3 * 60, "dissonance"),
+    (7 * 60, "rupture"),
+]
+
+
+def presence_key(session_id: str) -> str:
+    """Clé des échéances de présence (reconnexion, abandon), distincte des échéances de jeu"""
+    return f"{session_id}:presence"
 
 
 class GameOrchestrator:
@@ -45,7 +81,10 @@ class GameOrchestrator:
     """
     
     def __init__(self):
-        self.active_sessions: Dict[str, GameState] = {}
+        # État des sessions : mémoire du processus ou stockage partagé entre workers
+        self.active_sessions: SessionStateMap = SessionStateMap(
+            "game_state", encode=GameState.to_dict, decode=GameState.from_dict
+        )
         self.tom_service = None
         self.bias_analyzer = BiasAnalyzer()
         self.os_simulator = OSSimulator()
@@ -53,9 +92,25 @@ class GameOrchestrator:
         self.corruption_system = CorruptionSystem()
         self.ending_system = EndingSystem()
         
-        # Timers et tâches asyncio
-        self.session_timers: Dict[str, asyncio.Task] = {}
-        self.bias_measurement_tasks: Dict[str, asyncio.Task] = {}
+        # Persistance différée : aucune écriture disque dans la boucle d'événements
+        self.write_queue = get_write_queue()
+        
+        # Échéances (phases, timeout, mesures) gérées par un planificateur partagé
+        self.scheduler = get_scheduler()
+        
+        # Entrées à haute fréquence agrégées hors du pipeline des actions
+        self.telemetry = get_telemetry_hub()
+        
+        # Événements de session poussés aux clients abonnés
+        self.event_bus = get_event_bus()
+        
+        # Points de reprise : après chaque action, périodiquement et à l'arrêt
+        self.checkpoints = get_session_checkpoints()
+        self.draining = False  # Arrêt en cours : plus de nouvelles sessions
+        
+        # Sessions sans client connecté : échéances arrêtées, horloge de jeu en pause
+        self.suspended_sessions: Dict[str, float] = {}  # session_id -> instant de suspension
+        self.presence_stats = {"suspended": 0, "resumed": 0, "abandoned": 0}
     
     async def initialize(self):
         """Initialise l'orchestrateur"""
@@ -71,7 +126,11 @@ class GameOrchestrator:
         """
         Démarre une nouvelle session de jeu
         """
+        if self.draining:
+            raise RuntimeError("Serveur en cours d'arrêt")
+        
         print(f"🎯 Démarrage nouvelle session: {session_id}")
+        timer = StageTimer()
         
         # Créer l'état de session
         game_state = GameState(
@@ -86,31 +145,45 @@ class GameOrchestrator:
         )
         
         self.active_sessions[session_id] = game_state
+        self.bias_analyzer.start_session(session_id)
         
-        # Créer la session en base
-        with get_db_context() as db:
-            db_session = GameSession(
-                id=session_id,
-                player_name=player_name,
-                condition="confident",  # Condition B
-                game_phase="adhesion",
-                corruption_level=0.0
+        try:
+            # Étapes indépendantes en parallèle : insertion en base (écriture différée),
+            # OS initial et Tom (personnalité + introduction) se recouvrent
+            _, os_initial_state, tom_init = await timer.gather(
+                db_insert=self.write_queue.add(GameSession(
+                    id=session_id,
+                    player_name=player_name,
+                    condition="confident",  # Condition B
+                    game_phase="adhesion",
+                    corruption_level=0.0
+                )),
+                os_generation=self.os_simulator.generate_initial_os(
+                    session_id=session_id,
+                    player_name=player_name
+                ),
+                tom_init=self.tom_service.initialize_session(session_id, player_name)
             )
-            db.add(db_session)
-        
-        # Générer l'OS initial
-        os_initial_state = await self.os_simulator.generate_initial_os(
-            session_id=session_id,
-            player_name=player_name
-        )
+            
+            for stage in ("personality", "introduction"):
+                if stage in tom_init.get("timings_ms", {}):
+                    timer.record(f"tom_{stage}", tom_init["timings_ms"][stage] / 1000)
+            
+            # Démarrer les timers et mesures
+            await timer.run("monitoring", self._start_session_monitoring(session_id, websocket_manager))
+        except Exception as e:
+            # Pas de session à moitié initialisée : l'appelant reçoit l'erreur
+            print(f"❌ Échec du démarrage de la session {session_id}: {e}")
+            self._abort_session_start(session_id)
+            raise
         
-        # Initialiser Tom
-        tom_init = await self.tom_service.initialize_session(session_id, player_name)
+        self._checkpoint(session_id)
         
-        # Démarrer les timers et mesures
-        await self._start_session_monitoring(session_id, websocket_manager)
+        # Délai de connexion du client : sans lui, la session est suspendue
+        self.client_disconnected(session_id)
         
-        print(f"✅ Session {session_id} démarrée avec succès")
+        timings = timer.as_milliseconds()
+        print(f"✅ Session {session_id} démarrée avec succès ({timings['total']:.0f} ms)")
         
         return {
             "session_id": session_id,
@@ -118,6 +191,7 @@ class GameOrchestrator:
             "os_state": os_initial_state,
             "tom_introduction": tom_init["introduction"],
             "tom_personality": tom_init["personality"],
+            "timings_ms": timings,
             "game_config": {
                 "duration_minutes": settings.game_duration_minutes,
                 "condition": "confident",
@@ -125,6 +199,15 @@ class GameOrchestrator:
             }
         }
     
+    def _abort_session_start(self, session_id: str):
+        """Retire l'état créé par un démarrage de session interrompu"""
+        self.scheduler.cancel_key(session_id)
+        self.active_sessions.pop(session_id, None)
+        self.bias_analyzer.cleanup_session(session_id)
+        self.os_simulator.cleanup_session(session_id)
+        if self.tom_service:
+            self.tom_service.cleanup_session(session_id)
+    
     async def process_player_action(
         self, 
         session_id: str, 
@@ -137,9 +220,13 @@ class GameOrchestrator:
         if session_id not in self.active_sessions:
             raise ValueError(f"Session {session_id} non active")
         
+        # Souris, clics sur le bureau, focus : télémétrie agrégée, pas d'action en base
+        if is_telemetry_action(action_data):
+            self.telemetry.ingest(session_id, [event_from_action(action_data)])
+            return {"action_processed": False, "telemetry": True}
+        
         game_state = self.active_sessions[session_id]
-        current_time = time.time()
-        game_time = current_time - game_state.start_time.timestamp()
+        game_time = game_state.refresh_elapsed()
         
         print(f"🎬 Traitement action: {action_data.get('type', 'unknown')}")
         
@@ -150,11 +237,15 @@ class GameOrchestrator:
             game_state=game_state.__dict__
         )
         
+        # Signaux dérivés de la télémétrie (distance du curseur, pause avant l'action)
+        signals = self.telemetry.action_signals(session_id, action_data.get("client_time"))
+        
         # Enregistrer l'action en base
-        await self._record_player_action(session_id, action_data, action_analysis, game_time)
+        await self._record_player_action(session_id, action_data, action_analysis, game_time, signals)
         
         # Mettre à jour l'état du jeu
         await self._update_game_state(session_id, action_analysis)
+        self.active_sessions.sync(session_id)
         
         # Vérifier les conditions de fin
         ending_check = await self.ending_system.check_ending_conditions(
@@ -194,6 +285,8 @@ class GameOrchestrator:
         )
         
         game_state.last_action_time = game_time
+        self.active_sessions.sync(session_id)
+        self._checkpoint(session_id)
         
         return {
             "action_processed": True,
@@ -221,14 +314,17 @@ class GameOrchestrator:
             return {"error": "Session non active"}
         
         game_state = self.active_sessions[session_id]
+        game_state.refresh_elapsed()
         hesitation_duration = hesitation_data.get("duration", 5.0)
         
         print(f"🤔 Hésitation détectée: {hesitation_duration:.1f}s")
         
         # Incrémenter le compteur d'hésitations
         game_state.hesitation_events += 1
+        self.active_sessions.sync(session_id)
         
         # Générer la réponse empathique de Tom
+        start_time = time.time()
         tom_response = await self.tom_service.generate_response(
             session_id=session_id,
             trigger_type="player_hesitation",
@@ -239,6 +335,10 @@ class GameOrchestrator:
                 "hesitation_count": game_state.hesitation_events
             }
         )
+        await self._record_tom_interaction(
+            session_id, "player_hesitation", tom_response, time.time() - start_time
+        )
+        self._checkpoint(session_id)
         
         # Mesurer l'impact sur les biais
         bias_impact = await self.bias_analyzer.measure_hesitation_impact(
@@ -253,71 +353,196 @@ class GameOrchestrator:
             "bias_impact": bias_impact
         }
     
+    def ingest_telemetry(self, session_id: str, events: List[Any]) -> Dict[str, Any]:
+        """
+        Intègre un lot d'événements d'entrée (souris, clics, focus) au tampon
+        de la session, sans passer par le pipeline des actions
+        """
+        accepted = self.telemetry.ingest(session_id, events)
+        return {"accepted": accepted, "metrics": self.telemetry.get_metrics(session_id)}
+    
     async def _start_session_monitoring(self, session_id: str, websocket_manager):
+        """Démarre le suivi de la session"""
+        self._arm_session_timers(session_id, websocket_manager)
+    
+    def _arm_session_timers(self, session_id: str, websocket_manager = None):
         """
-        Démarre le monitoring de la session (timers, mesures périodiques)
+        Planifie les échéances de la session : transitions de phase,
+        fin par timeout et mesures périodiques des biais
         """
-        # Timer principal du jeu
-        self.session_timers[session_id] = asyncio.create_task(
-            self._session_timer(session_id, websocket_manager)
+        game_state = self.active_sessions[session_id]
+        elapsed = game_state.refresh_elapsed()
+        
+        # Transitions de phase aux échéances exactes
+        for phase_start, _ in PHASE_SCHEDULE:
+            if phase_start > elapsed:
+                self.scheduler.schedule(
+                    phase_start - elapsed, self._on_phase_deadline, session_id,
+                    key=session_id
+                )
+        
+        # Fin par timeout (10 minutes max)
+        max_duration = settings.game_duration_minutes * 60
+        self.scheduler.schedule(
+            max_duration - elapsed, self._on_session_timeout, session_id, websocket_manager,
+            key=session_id
         )
         
         # Mesures périodiques des biais
-        self.bias_measurement_tasks[session_id] = asyncio.create_task(
-            self._periodic_bias_measurement(session_id)
+        self.scheduler.schedule(
+            settings.bias_measurement_interval, self._on_bias_measurement, session_id,
+            key=session_id
+        )
+        
+        # Point de reprise périodique (modifications hors actions : streaming Tom, API)
+        self.scheduler.schedule(
+            settings.session_checkpoint_interval_seconds, self._on_checkpoint, session_id,
+            key=session_id
         )
         
         print(f"⏰ Monitoring démarré pour session {session_id}")
     
-    async def _session_timer(self, session_id: str, websocket_manager):
+    async def _on_phase_deadline(self, session_id: str):
+        """
+        Échéance de transition de phase
+        """
+        game_state = self.active_sessions.get(session_id)
+        if not game_state or not game_state.is_active:
+            return
+        
+        new_phase = self._calculate_game_phase(game_state.refresh_elapsed())
+        if new_phase != game_state.current_phase:
+            await self._transition_game_phase(session_id, new_phase)
+    
+    async def _on_session_timeout(self, session_id: str, websocket_manager):
+        """
+        Échéance de fin de partie : temps écoulé
+        """
+        game_state = self.active_sessions.get(session_id)
+        if not game_state or not game_state.is_active:
+            return
+        
+        game_state.refresh_elapsed()
+        await self._handle_timeout_ending(session_id, websocket_manager)
+    
+    async def _on_bias_measurement(self, session_id: str):
         """
-        Timer principal de la session (10 minutes max)
+        Mesure périodique des biais cognitifs, replanifiée après chaque mesure
         """
+        game_state = self.active_sessions.get(session_id)
+        if not game_state or not game_state.is_active:
+            return
+        
         try:
-            game_state = self.active_sessions[session_id]
-            max_duration = settings.game_duration_minutes * 60  # Convertir en secondes
+            game_state.refresh_elapsed()
             
-            while game_state.is_active and game_state.time_elapsed < max_duration:
-                await asyncio.sleep(1)  # Vérifier chaque seconde
-                
-                current_time = time.time()
-                game_state.time_elapsed = current_time - game_state.start_time.timestamp()
-                
-                # Vérifier le changement de phase basé sur le temps
-                new_phase = self._calculate_game_phase(game_state.time_elapsed)
-                if new_phase != game_state.current_phase:
-                    await self._transition_game_phase(session_id, new_phase)
+            # Mesurer les biais actuels
+            bias_snapshot = await self.bias_analyzer.take_bias_snapshot(
+                session_id=session_id,
+                game_state=game_state.__dict__
+            )
             
-            # Temps écoulé - fin par timeout
-            if game_state.is_active:
-                await self._handle_timeout_ending(session_id, websocket_manager)
-                
+            # Enregistrer en base
+            await self._record_bias_snapshot(session_id, bias_snapshot)
         except Exception as e:
-            print(f"❌ Erreur timer session {session_id}: {e}")
+            print(f"❌ Erreur mesure biais {session_id}: {e}")
+        
+        # Prochaine mesure, si la session n'a pas été terminée entre-temps
+        if session_id in self.active_sessions and game_state.is_active:
+            self.scheduler.schedule(
+                settings.bias_measurement_interval, self._on_bias_measurement, session_id,
+                key=session_id
+            )
     
-    async def _periodic_bias_measurement(self, session_id: str):
+    async def _on_checkpoint(self, session_id: str):
         """
-        Mesures périodiques des biais cognitifs
+        Point de reprise périodique, replanifié tant que la session est active
         """
-        try:
-            while session_id in self.active_sessions:
-                game_state = self.active_sessions[session_id]
-                
-                if game_state.is_active:
-                    # Mesurer les biais actuels
-                    bias_snapshot = await self.bias_analyzer.take_bias_snapshot(
-                        session_id=session_id,
-                        game_state=game_state.__dict__
-                    )
-                    
-                    # Enregistrer en base
-                    await self._record_bias_snapshot(session_id, bias_snapshot)
-                
-                # Attendre avant la prochaine mesure
-                await asyncio.sleep(settings.bias_measurement_interval)
-                
-        except Exception as e:
-            print(f"❌ Erreur mesure biais {session_id}: {e}")
+        game_state = self.active_sessions.get(session_id)
+        if not game_state or not game_state.is_active:
+            return
+        
+        self._checkpoint(session_id)
+        self.scheduler.schedule(
+            settings.session_checkpoint_interval_seconds, self._on_checkpoint, session_id,
+            key=session_id
+        )
+    
+    def client_connected(self, session_id: str):
+        """Un client est lié à la session : reprise si elle était suspendue"""
+        self.scheduler.cancel_key(presence_key(session_id))
+        if session_id not in self.suspended_sessions:
+            return
+        
+        game_state = self._resume_clock(session_id)
+        if game_state is None:
+            return
+        self._arm_session_timers(session_id)
+        self.presence_stats["resumed"] += 1
+        print(f"▶️ Session {session_id} reprise ({game_state.time_elapsed:.0f}s de jeu)")
+    
+    def client_disconnected(self, session_id: str):
+        """Plus aucun client pour la session : suspension après le délai de reconnexion"""
+        game_state = self.active_sessions.get(session_id)
+        if not game_state or not game_state.is_active or session_id in self.suspended_sessions:
+            return
+        
+        self.scheduler.cancel_key(presence_key(session_id))
+        self.scheduler.schedule(
+            settings.session_reconnect_grace_seconds, self._on_reconnect_grace_expired, session_id,
+            key=presence_key(session_id)
+        )
+    
+    async def _on_reconnect_grace_expired(self, session_id: str):
+        """
+        Délai de reconnexion écoulé : échéances, mesures de biais, points de
+        reprise périodiques et messages de Tom arrêtés, horloge de jeu en pause
+        """
+        game_state = self.active_sessions.get(session_id)
+        if not game_state or not game_state.is_active:
+            return
+        
+        self.scheduler.cancel_key(session_id)
+        self._checkpoint(session_id)
+        self.suspended_sessions[session_id] = time.time()
+        self.presence_stats["suspended"] += 1
+        
+        # Sans retour du joueur, la partie est close comme abandonnée
+        self.scheduler.schedule(
+            settings.session_abandon_seconds, self._on_session_abandoned, session_id,
+            key=presence_key(session_id)
+        )
+        print(f"⏸️ Session {session_id} suspendue (aucun client connecté)")
+    
+    async def _on_session_abandoned(self, session_id: str):
+        """Session suspendue trop longtemps : fin de partie"""
+        if session_id not in self.suspended_sessions:
+            return
+        
+        self._resume_clock(session_id)
+        self.presence_stats["abandoned"] += 1
+        await self.end_session(session_id, "abandoned")
+    
+    def _resume_clock(self, session_id: str) -> Optional[GameState]:
+        """Retire la suspension et décale le début de partie de sa durée"""
+        suspended_at = self.suspended_sessions.pop(session_id)
+        game_state = self.active_sessions.get(session_id)
+        if game_state is None:
+            return None
+        
+        game_state.start_time += timedelta(seconds=time.time() - suspended_at)
+        game_state.refresh_elapsed()
+        self.active_sessions.sync(session_id)
+        return game_state
+    
+    def get_presence_stats(self) -> Dict[str, Any]:
+        """Sessions suspendues faute de client, reprises et abandonnées"""
+        return {
+            **self.presence_stats,
+            "currently_suspended": len(self.suspended_sessions),
+            "reconnect_grace_seconds": settings.session_reconnect_grace_seconds,
+            "abandon_seconds": settings.session_abandon_seconds,
+        }
     
     def _calculate_game_phase(self, time_elapsed: float) -> str:
         """
@@ -339,17 +564,25 @@ class GameOrchestrator:
         game_state = self.active_sessions[session_id]
         old_phase = game_state.current_phase
         game_state.current_phase = new_phase
+        self.active_sessions.sync(session_id)
+        self._checkpoint(session_id)
         
         print(f"🔄 Transition phase: {old_phase} -> {new_phase}")
         
         # Mettre à jour en base
-        with get_db_context() as db:
-            session = db.query(GameSession).filter(GameSession.id == session_id).first()
-            if session:
-                session.game_phase = new_phase
-        
-        # Notifier Tom du changement de phase
-        if self.tom_service:
+        await self.write_queue.update(GameSession, session_id, {"game_phase": new_phase})
+        
+        await self.event_bus.publish(session_id, {
+            "type": "session_status",
+            "status": "phase_transition",
+            "phase": new_phase,
+            "old_phase": old_phase,
+            "time_elapsed": game_state.time_elapsed
+        })
+        
+        # Message de Tom sur le changement de phase : généré seulement si un
+        # client de la session peut le recevoir
+        if self.tom_service and self.event_bus.has_subscribers(session_id):
             phase_context = {
                 "old_phase": old_phase,
                 "new_phase": new_phase,
@@ -357,11 +590,20 @@ class GameOrchestrator:
                 "corruption_level": game_state.corruption_level
             }
             
+            start_time = time.time()
             tom_response = await self.tom_service.generate_response(
                 session_id=session_id,
                 trigger_type="phase_transition",
                 context_data=phase_context
             )
+            await self._record_tom_interaction(
+                session_id, "phase_transition", tom_response, time.time() - start_time
+            )
+            
+            await self.event_bus.publish(session_id, {
+                "type": "tom_message_generated",
+                "message_data": tom_response
+            })
     
     async def end_session(self, session_id: str, ending_type: str = "manual"):
         """
@@ -372,39 +614,41 @@ class GameOrchestrator:
         
         game_state = self.active_sessions[session_id]
         game_state.is_active = False
+        game_state.refresh_elapsed()
         
         print(f"🏁 Fin de session {session_id}: {ending_type}")
         
-        # Annuler les tâches
-        if session_id in self.session_timers:
-            self.session_timers[session_id].cancel()
-            del self.session_timers[session_id]
-        
-        if session_id in self.bias_measurement_tasks:
-            self.bias_measurement_tasks[session_id].cancel()
-            del self.bias_measurement_tasks[session_id]
-        
-        # Finaliser en base
-        with get_db_context() as db:
-            session = db.query(GameSession).filter(GameSession.id == session_id).first()
-            if session:
-                session.session_end = datetime.now()
-                session.duration_seconds = int(game_state.time_elapsed)
-                session.is_completed = True
-                session.ending_type = ending_type
-                session.corruption_level = game_state.corruption_level
-                session.total_actions = game_state.total_orders
-                session.obedience_rate = (
-                    game_state.obeyed_orders / game_state.total_orders 
-                    if game_state.total_orders > 0 else 0.0
-                )
+        # Annuler les échéances de la session (et l'attente de reconnexion)
+        self.scheduler.cancel_key(session_id)
+        self.scheduler.cancel_key(presence_key(session_id))
+        self.suspended_sessions.pop(session_id, None)
+        
+        # Finaliser en base puis vider la file pour cette fin de session
+        await self.write_queue.update(GameSession, session_id, {
+            "session_end": datetime.now(),
+            "duration_seconds": int(game_state.time_elapsed),
+            "is_completed": True,
+            "ending_type": ending_type,
+            "corruption_level": game_state.corruption_level,
+            "total_actions": game_state.total_orders,
+            "obedience_rate": (
+                game_state.obeyed_orders / game_state.total_orders 
+                if game_state.total_orders > 0 else 0.0
+            )
+        })
+        
+        # Mesure finale : biais et agrégats de télémétrie de la session
+        await self._record_experiment_data(session_id, self.telemetry.cleanup_session(session_id))
+        await self.write_queue.flush()
         
         # Nettoyer les services
         if self.tom_service:
             self.tom_service.cleanup_session(session_id)
+        self.bias_analyzer.cleanup_session(session_id)
         
-        # Supprimer de la mémoire
+        # Supprimer de la mémoire (et le point de reprise, la partie est close)
         del self.active_sessions[session_id]
+        self.checkpoints.delete(session_id)
         
         print(f"✅ Session {session_id} terminée et nettoyée")
     
@@ -413,41 +657,302 @@ class GameOrchestrator:
         session_id: str, 
         action_data: Dict[str, Any], 
         action_analysis: Dict[str, Any],
-        game_time: float
+        game_time: float,
+        signals: Optional[Dict[str, Any]] = None
     ):
-        """Enregistre une action du joueur en base"""
+        """Enregistre une action du joueur en base (écriture différée)"""
         try:
-            with get_db_context() as db:
-                game_state = self.active_sessions[session_id]
-                
-                action = PlayerAction(
-                    session_id=session_id,
-                    game_time_seconds=game_time,
-                    action_type=action_data.get("type", "unknown"),
-                    action_category=action_analysis.get("category", "unknown"),
-                    action_description=action_analysis.get("description", ""),
-                    target_element=action_data.get("target", ""),
-                    gravity_score=action_analysis.get("gravity_score", 0),
-                    reaction_time_seconds=action_data.get("reaction_time"),
-                    hesitation_time_seconds=action_data.get("hesitation_time"),
-                    corruption_level_before=game_state.corruption_level,
-                    game_phase=game_state.current_phase,
-                    was_successful=action_analysis.get("success", True),
-                    was_obedient=action_analysis.get("obedient", None),
-                    action_data=action_data
-                )
-                
-                db.add(action)
+            game_state = self.active_sessions[session_id]
+            signals = signals or {}
+            hesitation_time = action_data.get("hesitation_time")
+            if hesitation_time is None:
+                hesitation_time = signals.get("pause_before_action")
+            
+            action = PlayerAction(
+                id=str(uuid.uuid4()),  # Connu avant le commit : dédoublonne la reconstruction des biais
+                session_id=session_id,
+                timestamp=datetime.now(),  # Explicite pour l'accumulateur de biais
+                game_time_seconds=game_time,
+                action_type=action_data.get("type", "unknown"),
+                action_category=action_analysis.get("category", "unknown"),
+                action_description=action_analysis.get("description", ""),
+                target_element=action_data.get("target", ""),
+                gravity_score=action_analysis.get("gravity_score", 0),
+                reaction_time_seconds=action_data.get("reaction_time"),
+                hesitation_time_seconds=hesitation_time,
+                cursor_movement_distance=signals.get("cursor_movement_distance"),
+                corruption_level_before=game_state.corruption_level,
+                game_phase=game_state.current_phase,
+                was_successful=action_analysis.get("success", True),
+                was_obedient=action_analysis.get("obedient", None),
+                action_data=action_data
+            )
+            
+            # Extraire avant la mise en file : le thread d'écriture expire l'objet au commit
+            record = ActionRecord.from_model(action)
+            await self.write_queue.add(action)
+            
+            # Alimenter l'accumulateur de biais
+            self.bias_analyzer.record_action(session_id, record)
                 
         except Exception as e:
             print(f"❌ Erreur enregistrement action: {e}")
     
+    async def _record_experiment_data(self, session_id: str, telemetry: Optional[Dict[str, Any]]):
+        """Enregistre la mesure de fin de session (écriture différée)"""
+        game_state = self.active_sessions[session_id]
+        try:
+            snapshot = await self.bias_analyzer.take_bias_snapshot(session_id, game_state.__dict__)
+            biases = snapshot.get("biases", {})
+            telemetry = telemetry or {}
+            
+            await self.write_queue.add(ExperimentData(
+                session_id=session_id,
+                measurement_timestamp=datetime.now(),
+                game_time_seconds=game_state.time_elapsed,
+                condition="confident",  # Condition B
+                game_phase=game_state.current_phase,
+                automation_bias_score=biases.get("automation_bias", {}).get("score"),
+                trust_calibration_score=biases.get("trust_calibration", {}).get("score"),
+                cognitive_offloading_score=biases.get("cognitive_offloading", {}).get("score"),
+                authority_compliance_score=biases.get("authority_compliance", {}).get("score"),
+                total_orders_received=game_state.total_orders,
+                total_orders_obeyed=game_state.obeyed_orders,
+                obedience_rate=(
+                    game_state.obeyed_orders / game_state.total_orders
+                    if game_state.total_orders > 0 else None
+                ),
+                hesitation_events=game_state.hesitation_events,
+                cursor_movement_total=telemetry.get("cursor_movement_total"),
+                click_frequency=telemetry.get("click_frequency"),
+                exploration_actions=game_state.meta_actions_performed,
+                corruption_level=game_state.corruption_level,
+                raw_metrics={"telemetry": telemetry} if telemetry else None
+            ))
+        except Exception as e:
+            print(f"❌ Erreur enregistrement mesure de fin de session: {e}")
+    
+    async def _update_game_state(self, session_id: str, action_analysis: Dict[str, Any]):
+        """Met à jour les compteurs de la session après une action"""
+        game_state = self.active_sessions[session_id]
+        
+        if action_analysis.get("obedient") is not None:
+            game_state.total_orders += 1
+            if action_analysis["obedient"]:
+                game_state.obeyed_orders += 1
+        
+        if action_analysis.get("meta_action"):
+            game_state.meta_actions_performed += 1
+    
+    async def _update_session_corruption(self, session_id: str, corruption_updates: Dict[str, Any]):
+        """Répercute le nouveau niveau de corruption en base (écriture différée)"""
+        await self.write_queue.update(GameSession, session_id, {
+            "corruption_level": corruption_updates["new_level"]
+        })
+    
+    async def _record_bias_snapshot(self, session_id: str, bias_snapshot: Dict[str, Any]):
+        """Enregistre un snapshot périodique des biais"""
+        if "error" in bias_snapshot:
+            return
+        
+        game_state = self.active_sessions[session_id]
+        await self.bias_analyzer._record_bias_snapshot(
+            session_id,
+            {**bias_snapshot["biases"], "trigger_action": "periodic"},
+            game_state.__dict__
+        )
+    
+    async def _generate_tom_response(
+        self, 
+        session_id: str, 
+        action_analysis: Dict[str, Any], 
+        game_state: GameState
+    ) -> Optional[Dict[str, Any]]:
+        """Génère la réponse de Tom à une action si l'analyse le demande"""
+        if not self.tom_service or not action_analysis.get("triggers_tom_response"):
+            return None
+        
+        trigger_type = (
+            "corruption_incident" if action_analysis.get("triggers_corruption") 
+            else "action_completed"
+        )
+        
+        start_time = time.time()
+        tom_response = await self.tom_service.generate_response(
+            session_id=session_id,
+            trigger_type=trigger_type,
+            context_data={
+                "action": action_analysis.get("type"),
+                "game_phase": game_state.current_phase,
+                "corruption_level": game_state.corruption_level
+            }
+        )
+        
+        await self._record_tom_interaction(
+            session_id, trigger_type, tom_response, time.time() - start_time
+        )
+        
+        return tom_response
+    
+    async def _record_tom_interaction(
+        self, 
+        session_id: str, 
+        trigger_type: str, 
+        tom_response: Dict[str, Any],
+        generation_time: float = None
+    ):
+        """Enregistre un message de Tom en base (écriture différée)"""
+        if session_id not in self.active_sessions or not tom_response:
+            return
+        
+        game_state = self.active_sessions[session_id]
+        
+        try:
+            await self.write_queue.add(TomInteraction(
+                session_id=session_id,
+                timestamp=datetime.now(),
+                game_time_seconds=time.time() - game_state.start_time.timestamp(),
+                interaction_type="response",
+                trigger_type=trigger_type,
+                message_text=tom_response.get("message", ""),
+                message_intent=tom_response.get("intent"),
+                game_phase=game_state.current_phase,
+                corruption_level=game_state.corruption_level,
+                generation_time_seconds=generation_time
+            ))
+        except Exception as e:
+            print(f"❌ Erreur enregistrement interaction Tom: {e}")
+    
+    async def _handle_game_ending(
+        self, 
+        session_id: str, 
+        ending_check: Dict[str, Any], 
+        websocket_manager = None
+    ) -> Dict[str, Any]:
+        """Termine la session sur une fin détectée par l'EndingSystem"""
+        ending_type = ending_check["ending_type"]
+        ending_content = self.ending_system.generate_ending_content(
+            ending_type, ending_check.get("ending_data", {})
+        )
+        
+        await self.end_session(session_id, ending_type)
+        await self.ending_system.announce_ending(session_id, ending_content)
+        
+        return {
+            "action_processed": True,
+            "game_ended": True,
+            "ending": ending_content,
+            "message": ending_check.get("message")
+        }
+    
+    async def _handle_timeout_ending(self, session_id: str, websocket_manager = None) -> Dict[str, Any]:
+        """Termine la session à l'expiration du temps de jeu"""
+        game_state = self.active_sessions[session_id]
+        ending_content = self.ending_system.generate_ending_content("timeout", {
+            "duration_seconds": game_state.time_elapsed,
+            "final_phase": game_state.current_phase,
+            "final_corruption": game_state.corruption_level,
+            "actions_completed": game_state.total_orders,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+        await self.end_session(session_id, "timeout")
+        await self.ending_system.announce_ending(session_id, ending_content)
+        
+        return {
+            "game_ended": True,
+            "ending": ending_content
+        }
+    
+    def export_session_state(self, session_id: str) -> Dict[str, Any]:
+        """
+        État complet d'une session pour son point de reprise
+        (le temps écoulé est recalculé à la reprise depuis start_time)
+        """
+        game_state = self.active_sessions[session_id].to_dict()
+        del game_state["time_elapsed"]
+        
+        return {
+            "game_state": game_state,
+            "tom_context": (
+                self.tom_service.conversation_history.get(session_id) if self.tom_service else None
+            ),
+            "os_state": self.os_simulator.session_states.get(session_id),
+            "corruption": {
+                "level": self.corruption_system.session_corruption.get(session_id),
+                "history": self.corruption_system.corruption_history.get(session_id),
+            },
+            "suspended_at": self.suspended_sessions.get(session_id),
+        }
+    
+    def _checkpoint(self, session_id: str):
+        """Enregistre le point de reprise d'une session (une erreur ne bloque pas le jeu)"""
+        try:
+            self.checkpoints.save(session_id, self.export_session_state(session_id))
+        except Exception as e:
+            print(f"❌ Erreur point de reprise {session_id}: {e}")
+    
+    def checkpoint_all(self) -> int:
+        """Points de reprise de toutes les sessions actives (arrêt du serveur)"""
+        for session_id in list(self.active_sessions):
+            self._checkpoint(session_id)
+        return len(self.active_sessions)
+    
+    async def restore_sessions(self) -> int:
+        """
+        Restaure les sessions des points de reprise et réarme leurs échéances
+        avec le temps restant (une session expirée pendant l'arrêt se termine
+        aussitôt, une phase manquée est appliquée)
+        """
+        restored = []
+        for session_id, saved_at, state in self.checkpoints.load_all():
+            try:
+                self._import_session_state(session_id, state)
+                await self._start_session_monitoring(session_id, None)
+                restored.append(session_id)
+            except Exception as e:
+                print(f"❌ Restauration impossible pour {session_id}: {e}")
+                self.checkpoints.delete(session_id)
+        
+        for session_id in restored:
+            await self._on_phase_deadline(session_id)
+            # Les clients ont été déconnectés par l'arrêt : délai de reconnexion
+            self.client_disconnected(session_id)
+        
+        self.checkpoints.stats["restored"] += len(restored)
+        if restored:
+            print(f"♻️ {len(restored)} sessions restaurées depuis les points de reprise")
+        return len(restored)
+    
+    def _import_session_state(self, session_id: str, state: Dict[str, Any]):
+        """Réinstalle l'état d'une session exporté par `export_session_state`"""
+        game_state = GameState.from_dict({**state["game_state"], "time_elapsed": 0.0})
+        if state.get("suspended_at"):
+            # Horloge en pause depuis la suspension, arrêt du serveur compris
+            game_state.start_time += timedelta(seconds=time.time() - state["suspended_at"])
+        game_state.refresh_elapsed()
+        self.active_sessions[session_id] = game_state
+        # Pas d'accumulateur neuf : la première mesure le reconstruit depuis les actions en base
+        self.bias_analyzer.cleanup_session(session_id)
+        
+        if state.get("tom_context") is not None and self.tom_service:
+            self.tom_service.conversation_history[session_id] = state["tom_context"]
+        if state.get("os_state") is not None:
+            self.os_simulator.session_states[session_id] = state["os_state"]
+        
+        corruption = state.get("corruption") or {}
+        if corruption.get("level") is not None:
+            self.corruption_system.session_corruption[session_id] = corruption["level"]
+        if corruption.get("history") is not None:
+            self.corruption_system.corruption_history[session_id] = corruption["history"]
+    
     def get_session_status(self, session_id: str) -> Dict[str, Any]:
         """Retourne le statut d'une session"""
         if session_id not in self.active_sessions:
             return {"exists": False}
         
         game_state = self.active_sessions[session_id]
+        game_state.refresh_elapsed()
         
         return {
             "exists": True,
@@ -463,7 +968,8 @@ class GameOrchestrator:
             "obedience_rate": (
                 game_state.obeyed_orders / game_state.total_orders 
                 if game_state.total_orders > 0 else 0.0
-            )
+            ),
+            "telemetry": self.telemetry.get_metrics(session_id)
         }
 
 
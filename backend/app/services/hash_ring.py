@@ -0,0 +1,63 @@
+"""
+Anneau de hachage cohérent (affectation des sessions aux workers)
+Chaque worker occupe plusieurs points de l'anneau (nœuds virtuels) : une
+session appartient au premier point qui suit le hachage de son identifiant.
+Ajouter ou retirer un worker ne déplace que les sessions des arcs concernés
+(environ 1/N des sessions), les autres restent sur leur worker.
+"""
+import bisect
+import hashlib
+from typing import Dict, Iterable, List, Optional
+
+from ..config import settings
+
+
+def stable_hash(key: str) -> int:
+    """Hachage stable entre processus (contrairement à hash())"""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Anneau de hachage cohérent avec nœuds virtuels"""
+
+    def __init__(self, nodes: Iterable[str] = (), virtual_nodes: Optional[int] = None):
+        self.virtual_nodes = virtual_nodes or settings.router_virtual_nodes
+        self._points: List[int] = []  # Positions triées
+        self._owners: Dict[int, str] = {}  # Position -> nœud
+        self.nodes: List[str] = []
+
+        for node in nodes:
+            self.add_node(node)
+
+    def add_node(self, node: str):
+        """Ajoute un nœud (sans effet s'il est déjà présent)"""
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for index in range(self.virtual_nodes):
+            point = stable_hash(f"{node}#{index}")
+            if point in self._owners:
+                continue  # Collision : le premier nœud garde la position
+            self._owners[point] = node
+            bisect.insort(self._points, point)
+
+    def remove_node(self, node: str):
+        """Retire un nœud et ses positions"""
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+        self._points = [point for point in self._points if self._owners[point] != node]
+        self._owners = {point: owner for point, owner in self._owners.items() if owner != node}
+
+    def node_for(self, key: str) -> Optional[str]:
+        """Nœud propriétaire d'une clé (None si l'anneau est vide)"""
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, stable_hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
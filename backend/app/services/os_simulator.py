@@ -8,6 +8,9 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from .session_store import SessionStateMap
+
+
 class OSSimulator:
     """
     Simulateur de système d'exploitation pour REMOTE
@@ -15,7 +18,7 @@ class OSSimulator:
     """
     
     def __init__(self):
-        self.session_states = {}  # États OS par session
+        self.session_states = SessionStateMap("os_state")  # États OS par session (partagés entre workers)
         self.default_theme = self._create_default_theme()
         self.file_templates = self._create_file_templates()
         self.widget_templates = self._create_widget_templates()
@@ -68,6 +71,7 @@ class OSSimulator:
         
         # Appliquer les mises à jour de manière récursive
         self._deep_update(self.session_states[session_id], updates)
+        self.session_states.sync(session_id)
         
         return self.session_states[session_id]
     
@@ -86,6 +90,7 @@ class OSSimulator:
         # Appliquer les effets
         for effect in effects:
             self._apply_corruption_effect(os_state, effect)
+        self.session_states.sync(session_id)
         
         return os_state
     
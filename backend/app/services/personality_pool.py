@@ -0,0 +1,332 @@
+"""
+Réserve pré-générée de personnalités et d'introductions de Tom
+Les paires (personnalité, introduction) sont générées à l'avance par condition
+expérimentale, hors du chemin critique, puis personnalisées localement avec le
+nom du joueur au démarrage de la session
+"""
+import asyncio
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Awaitable, Callable, Deque, Optional
+
+from ..config import settings
+
+
+# Nom fictif utilisé pour générer les entrées, remplacé par celui du joueur
+POOL_PLAYER_NAME = "Camille"
+
+# Attente avant une nouvelle tentative après un échec de génération
+REFILL_RETRY_SECONDS = 30.0
+
+_NAME_PATTERN = re.compile(r"\b%s\b" % POOL_PLAYER_NAME)
+_NAME_WITH_SPACE_PATTERN = re.compile(r"\s*\b%s\b" % POOL_PLAYER_NAME)
+
+
+def personalize(value: Any, player_name: Optional[str]) -> Any:
+    """Remplace le nom fictif par celui du joueur (ou le retire s'il est inconnu)"""
+    if isinstance(value, str):
+        if player_name:
+            return _NAME_PATTERN.sub(player_name, value)
+        return _NAME_WITH_SPACE_PATTERN.sub("", value)
+    if isinstance(value, list):
+        return [personalize(item, player_name) for item in value]
+    if isinstance(value, dict):
+        return {key: personalize(item, player_name) for key, item in value.items()}
+    return value
+
+
+class TomPersonalityPool:
+    """
+    Réserve de paires personnalité + introduction par condition
+
+    Sous le seuil bas (`low_water`), une tâche de fond régénère des entrées
+    jusqu'à `size`, en respectant le LLMRateLimiter. La réserve est sauvegardée
+    sur disque pour qu'un redémarrage à froid serve immédiatement ; lecture et
+    écriture du fichier se font dans un thread dédié, hors de la boucle d'événements
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        low_water: Optional[int] = None,
+        path: Optional[str] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.size = size or settings.tom_pool_size
+        self.low_water = min(low_water or settings.tom_pool_low_water, self.size)
+        self.path = settings.tom_pool_path if path is None else path
+        self.enabled = settings.tom_pool_enabled if enabled is None else enabled
+
+        self._pools: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._generators: Dict[str, Callable[[], Awaitable[Optional[Dict[str, Any]]]]] = {}
+        self._loaded = False
+        self._loading: Optional[asyncio.Future] = None
+        self._dirty = False
+        self._file_executor: Optional[ThreadPoolExecutor] = None
+        self._rate_limiter = None
+        self._rate_limiter_resolved = False
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+        # Métriques
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "generated": 0,
+            "generation_errors": 0,
+            "loaded_from_disk": 0,
+        }
+
+    def register(self, condition: str, generator: Callable[[], Awaitable[Optional[Dict[str, Any]]]]):
+        """
+        Déclare le générateur d'une condition : coroutine retournant
+        {"personality": ..., "introduction": ...} pour POOL_PLAYER_NAME, ou None
+        """
+        self._generators[condition] = generator
+        self._pools.setdefault(condition, deque())
+
+    async def start(self):
+        """Charge la réserve sauvegardée et lance le remplissage en arrière-plan"""
+        if not self.enabled:
+            return
+        await self.preload()
+        self._request_refill()
+
+    def pop(self, condition: str, player_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Retire une entrée personnalisée pour le joueur, None si la réserve est vide"""
+        if not self.enabled:
+            return None
+        self._ensure_loaded()
+
+        pool = self._pools.get(condition)
+        entry = pool.popleft() if pool else None
+
+        if entry is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+            self._dirty = True
+
+        self._request_refill()
+
+        if entry is None:
+            return None
+        return {
+            "personality": personalize(entry["personality"], player_name),
+            "introduction": personalize(entry["introduction"], player_name),
+        }
+
+    def available(self, condition: str) -> int:
+        """Nombre d'entrées prêtes pour une condition"""
+        return len(self._pools.get(condition, ()))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne les métriques de la réserve"""
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "size": self.size,
+            "low_water": self.low_water,
+            "available": {condition: len(pool) for condition, pool in self._pools.items()},
+            "refilling": self._task is not None and not self._task.done(),
+        }
+
+    async def shutdown(self):
+        """Arrête le remplissage et sauvegarde la réserve"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._dirty:
+            await self._save()
+
+    def _request_refill(self):
+        """Réveille la tâche de remplissage (démarrée à la première demande)"""
+        if not self._generators:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        self._wakeup.set()
+
+    async def _run(self):
+        """Boucle de remplissage : régénère les conditions passées sous le seuil bas"""
+        while True:
+            self._wakeup.clear()
+            failed = False
+
+            for condition, generator in list(self._generators.items()):
+                if not await self._refill(condition, generator):
+                    failed = True
+
+            if self._dirty:
+                await self._save()
+
+            if failed:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=REFILL_RETRY_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await self._wakeup.wait()
+
+    async def _refill(self, condition: str, generator) -> bool:
+        """Complète une condition jusqu'à `size` ; retourne False sur échec de génération"""
+        pool = self._pools.setdefault(condition, deque())
+        if len(pool) >= self.low_water:
+            return True
+
+        if not self._rate_limiter_resolved:
+            self._rate_limiter = _get_rate_limiter()
+            self._rate_limiter_resolved = True
+        rate_limiter = self._rate_limiter
+
+        while len(pool) < self.size:
+            # Une entrée = deux requêtes LLM (personnalité + introduction)
+            if rate_limiter is not None:
+                await rate_limiter.wait_if_needed()
+                await rate_limiter.wait_if_needed()
+
+            try:
+                entry = await generator()
+            except Exception as e:
+                print(f"❌ Erreur génération réserve Tom ({condition}): {e}")
+                entry = None
+
+            if entry is None:
+                self.stats["generation_errors"] += 1
+                return False
+
+            pool.append({
+                **entry,
+                "model": settings.openai_model,
+                "generated_at": time.time(),
+            })
+            self.stats["generated"] += 1
+            self._dirty = True
+
+        print(f"🧰 Réserve Tom '{condition}' remplie ({len(pool)} entrées)")
+        return True
+
+    async def preload(self):
+        """Charge la réserve sauvegardée hors de la boucle d'événements"""
+        if self._loaded:
+            return
+        if self._loading is None or self._loading.done():
+            loop = asyncio.get_running_loop()
+            self._loading = loop.run_in_executor(self._get_file_executor(), self._read_file)
+        self._install_loaded(await self._loading)
+
+    def _ensure_loaded(self):
+        """
+        Recharge la réserve sauvegardée à la première utilisation
+        Depuis la boucle d'événements, la lecture part en arrière-plan et la
+        réserve reste vide (miss) jusqu'à son arrivée
+        """
+        if self._loaded:
+            return
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._install_loaded(self._get_file_executor().submit(self._read_file).result())
+            return
+
+        if self._loading is None or self._loading.done():
+            asyncio.ensure_future(self.preload())
+
+    def _read_file(self) -> Dict[str, Any]:
+        """Lecture du fichier de la réserve (thread de la réserve)"""
+        if not self.path or not Path(self.path).exists():
+            return {}
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"❌ Erreur chargement réserve Tom: {e}")
+            return {}
+
+    def _install_loaded(self, data: Dict[str, Any]):
+        """Ajoute les entrées lues sur le disque à la suite de celles déjà générées"""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        for condition, entries in data.get("conditions", {}).items():
+            pool = self._pools.setdefault(condition, deque())
+            for entry in entries:
+                # Les entrées d'un autre modèle ne sont pas réutilisées
+                if entry.get("model") == settings.openai_model:
+                    pool.append(entry)
+                    self.stats["loaded_from_disk"] += 1
+
+        if self.stats["loaded_from_disk"]:
+            print(f"💾 Réserve Tom : {self.stats['loaded_from_disk']} entrées rechargées")
+
+    async def _save(self):
+        """Sauvegarde de la réserve : copie sur la boucle, écriture dans le thread de la réserve"""
+        self._dirty = False
+        if not self.path:
+            return
+
+        data = {"conditions": {condition: list(pool) for condition, pool in self._pools.items()}}
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._get_file_executor(), self._write_file, data)
+
+    def _write_file(self, data: Dict[str, Any]):
+        """Écriture atomique (fichier temporaire puis renommage)"""
+        try:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde réserve Tom: {e}")
+
+    def _get_file_executor(self) -> ThreadPoolExecutor:
+        """Thread unique des accès au fichier (écritures dans l'ordre), créé à la première utilisation"""
+        if self._file_executor is None:
+            self._file_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tom-pool")
+        return self._file_executor
+
+
+def _get_rate_limiter():
+    """
+    Limiteur de débit partagé des requêtes LLM
+    Import différé : llm_helpers charge les encodages tiktoken à l'import
+    """
+    try:
+        from ..utils.llm_helpers import get_rate_limiter
+        return get_rate_limiter()
+    except Exception as e:
+        print(f"⚠️ Limiteur de débit LLM indisponible: {e}")
+        return None
+
+
+# Instance globale de la réserve
+tom_personality_pool = TomPersonalityPool()
+
+
+def get_personality_pool() -> TomPersonalityPool:
+    """Retourne l'instance de la réserve de personnalités"""
+    return tom_personality_pool
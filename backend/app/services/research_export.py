@@ -0,0 +1,334 @@
+"""
+Export colonnaire (Parquet) des journaux bruts pour l'analyse de recherche
+Les tables PlayerAction, TomInteraction, BiasSnapshot et ExperimentData sont
+écrites en fichiers Parquet partitionnés par condition et par date
+(`<table>/condition=<c>/date=<AAAA-MM-JJ>/part-<export>.parquet`), avec un
+export incrémental depuis le dernier filigrane (created_at, id) de chaque table
+
+Lecture côté recherche : pandas.read_parquet("<dossier>/player_actions")
+"""
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import select, and_, or_, type_coerce, Boolean, DateTime, Float, Integer, JSON, String
+
+from ..config import settings
+from ..database import reader_engine as default_engine
+from ..models import GameSession, PlayerAction, TomInteraction, BiasSnapshot, ExperimentData, CompressedJSON
+
+
+# Tables exportables, dans l'ordre d'export
+EXPORT_MODELS = {
+    "player_actions": PlayerAction,
+    "tom_interactions": TomInteraction,
+    "bias_snapshots": BiasSnapshot,
+    "experiment_data": ExperimentData,
+}
+
+# Colonnes portées par le chemin des fichiers (partitionnement Hive)
+PARTITION_COLUMNS = ("condition", "date")
+
+WATERMARKS_FILE = "_watermarks.json"
+
+_UNSAFE_PARTITION_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def _load_pyarrow():
+    """Import différé de pyarrow (dépendance réservée à l'export de recherche)"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError as e:
+        raise RuntimeError("pyarrow est requis pour l'export Parquet (pip install pyarrow)") from e
+
+
+def _partition_value(value: Any) -> str:
+    """Valeur de partition utilisable dans un nom de dossier"""
+    if value is None or value == "":
+        return "unknown"
+    return _UNSAFE_PARTITION_CHARS.sub("_", str(value))
+
+
+class ResearchExporter:
+    """
+    Exporteur Parquet incrémental
+
+    Les lignes sont lues par lots (`batch_size`) triées par (created_at, id) ;
+    chaque partition touchée reçoit un fichier par export. Le filigrane n'est
+    avancé qu'une fois tous les fichiers fermés : un export interrompu est
+    supprimé puis rejoué entièrement au suivant
+    """
+
+    def __init__(
+        self,
+        export_dir: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        engine=None
+    ):
+        self.export_dir = Path(export_dir or settings.research_export_path)
+        self.batch_size = batch_size or settings.research_export_batch_size
+        self.engine = engine or default_engine
+        self._lock = threading.Lock()
+
+        # Métriques
+        self.stats = {
+            "exports": 0,
+            "rows_exported": 0,
+            "files_written": 0,
+            "failures": 0,
+            "last_export_at": None,
+            "last_duration_seconds": None,
+        }
+
+    @property
+    def is_running(self) -> bool:
+        """Un export est-il en cours ?"""
+        return self._lock.locked()
+
+    def export(self, tables: Optional[List[str]] = None, full: bool = False) -> Dict[str, Any]:
+        """
+        Exporte les tables demandées (toutes par défaut) depuis leur filigrane,
+        ou intégralement si `full` ; retourne le résumé de l'export
+        """
+        tables = tables or list(EXPORT_MODELS)
+        unknown = [name for name in tables if name not in EXPORT_MODELS]
+        if unknown:
+            raise ValueError(f"Tables inconnues: {', '.join(unknown)}")
+
+        pa = _load_pyarrow()
+
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("Un export de recherche est déjà en cours")
+
+        try:
+            start = time.perf_counter()
+            export_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+            watermarks = {} if full else self.get_watermarks()
+            summary = {}
+
+            for name in tables:
+                summary[name] = self._export_table(pa, name, export_id, watermarks.get(name))
+                if summary[name]["watermark"] is not None:
+                    watermarks[name] = summary[name]["watermark"]
+                    self._save_watermarks(watermarks)
+
+            duration = time.perf_counter() - start
+            self.stats["exports"] += 1
+            self.stats["rows_exported"] += sum(table["rows"] for table in summary.values())
+            self.stats["files_written"] += sum(table["files"] for table in summary.values())
+            self.stats["last_export_at"] = datetime.now().isoformat()
+            self.stats["last_duration_seconds"] = round(duration, 3)
+
+            total_rows = sum(table["rows"] for table in summary.values())
+            print(f"📦 Export recherche {export_id}: {total_rows} lignes en {duration:.2f}s")
+
+            return {
+                "export_id": export_id,
+                "export_dir": str(self.export_dir),
+                "incremental": not full,
+                "tables": summary,
+                "duration_seconds": round(duration, 3),
+            }
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+        finally:
+            self._lock.release()
+
+    def get_watermarks(self) -> Dict[str, Dict[str, Any]]:
+        """Filigranes des exports précédents, par table"""
+        path = self.export_dir / WATERMARKS_FILE
+        if not path.exists():
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne les métriques de l'exporteur"""
+        return {
+            **self.stats,
+            "running": self.is_running,
+            "export_dir": str(self.export_dir),
+        }
+
+    def _export_table(
+        self,
+        pa,
+        name: str,
+        export_id: str,
+        watermark: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Exporte une table ; les fichiers d'un export échoué sont supprimés"""
+        model = EXPORT_MODELS[name]
+        table = model.__table__
+        columns = [column for column in table.columns if column.name not in PARTITION_COLUMNS]
+        schema = pa.schema([(column.name, self._arrow_type(pa, column)) for column in columns])
+
+        # SQLite stocke dates et JSON en texte : lus tels quels, convertis par Arrow
+        # (les colonnes compressées sont décodées puis resérialisées)
+        raw = self.engine.dialect.name == "sqlite"
+        json_indexes = [
+            index for index, column in enumerate(columns)
+            if (isinstance(column.type, JSON) and not raw) or isinstance(column.type, CompressedJSON)
+        ]
+        text_timestamp_indexes = {
+            index for index, column in enumerate(columns)
+            if isinstance(column.type, DateTime) and raw
+        }
+
+        query = self._build_query(model, columns, watermark, raw)
+        writers: Dict[Tuple[str, str], Any] = {}
+        paths: List[Path] = []
+        conditions: Dict[Any, str] = {}
+        rows = 0
+        last_row = None
+
+        try:
+            with self.engine.connect() as connection:
+                result = connection.execution_options(yield_per=self.batch_size).execute(query)
+
+                for batch in result.partitions():
+                    groups: Dict[Tuple[str, str], List[tuple]] = {}
+                    for row in batch:
+                        # Dernières colonnes : condition puis created_at (clé de partition)
+                        condition = conditions.get(row[-2])
+                        if condition is None:
+                            condition = conditions[row[-2]] = _partition_value(row[-2])
+                        created_at = row[-1]
+                        date = created_at[:10] if raw else created_at.strftime("%Y-%m-%d")
+                        groups.setdefault((condition, date), []).append(row)
+
+                    for key, group in groups.items():
+                        values = list(zip(*group))
+                        for index in json_indexes:
+                            values[index] = [
+                                None if value is None else json.dumps(value, ensure_ascii=False)
+                                for value in values[index]
+                            ]
+
+                        writer = writers.get(key)
+                        if writer is None:
+                            path = self._partition_path(name, key, export_id)
+                            path.parent.mkdir(parents=True, exist_ok=True)
+                            writer = pa.parquet.ParquetWriter(str(path), schema, compression="snappy")
+                            writers[key] = writer
+                            paths.append(path)
+
+                        writer.write_table(pa.Table.from_arrays([
+                            pa.array(values[index], type=pa.string()).cast(field.type)
+                            if index in text_timestamp_indexes
+                            else pa.array(values[index], type=field.type)
+                            for index, field in enumerate(schema)
+                        ], schema=schema))
+
+                    rows += len(batch)
+                    last_row = batch[-1]
+
+            for writer in writers.values():
+                writer.close()
+        except Exception:
+            for writer in writers.values():
+                try:
+                    writer.close()
+                except Exception:
+                    pass
+            for path in paths:
+                path.unlink(missing_ok=True)
+            raise
+
+        if last_row is None:
+            new_watermark = watermark
+        else:
+            id_index = next(index for index, column in enumerate(columns) if column.name == "id")
+            last_created_at = last_row[-1]
+            if raw:
+                last_created_at = datetime.fromisoformat(last_created_at)
+            new_watermark = {
+                "created_at": last_created_at.isoformat(),
+                "id": last_row[id_index],
+                "export_id": export_id,
+            }
+
+        return {
+            "rows": rows,
+            "files": len(paths),
+            "partitions": sorted(f"condition={condition}/date={date}" for condition, date in writers),
+            "watermark": new_watermark,
+        }
+
+    def _build_query(self, model, columns, watermark: Optional[Dict[str, Any]], raw: bool):
+        """Requête triée par (created_at, id), jointe à la session pour la condition"""
+        table = model.__table__
+        created_at = table.c.created_at
+
+        if raw:
+            # Pas de conversion Python ligne par ligne pour les colonnes texte
+            selected = [
+                type_coerce(column, String).label(column.name)
+                if isinstance(column.type, (JSON, DateTime)) else column
+                for column in columns
+            ]
+            partition_created_at = type_coerce(created_at, String).label("partition_created_at")
+        else:
+            selected = list(columns)
+            partition_created_at = created_at.label("partition_created_at")
+
+        if "condition" in table.columns:
+            query = select(*selected, table.c.condition, partition_created_at)
+        else:
+            sessions = GameSession.__table__
+            query = select(*selected, sessions.c.condition, partition_created_at)\
+                .select_from(table.join(sessions, sessions.c.id == table.c.session_id))
+
+        if watermark:
+            last_created_at = datetime.fromisoformat(watermark["created_at"])
+            query = query.where(or_(
+                created_at > last_created_at,
+                and_(created_at == last_created_at, table.c.id > watermark["id"])
+            ))
+
+        return query.order_by(created_at, table.c.id)
+
+    def _partition_path(self, name: str, key: Tuple[str, str], export_id: str) -> Path:
+        """Chemin du fichier d'une partition pour cet export"""
+        condition, date = key
+        return self.export_dir / name / f"condition={condition}" / f"date={date}" / f"part-{export_id}.parquet"
+
+    def _save_watermarks(self, watermarks: Dict[str, Dict[str, Any]]):
+        """Sauvegarde atomique des filigranes (fichier temporaire puis renommage)"""
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        path = self.export_dir / WATERMARKS_FILE
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(watermarks, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _arrow_type(pa, column):
+        """Type Arrow d'une colonne SQLAlchemy (JSON sérialisé en texte)"""
+        if isinstance(column.type, Boolean):
+            return pa.bool_()
+        if isinstance(column.type, Integer):
+            return pa.int64()
+        if isinstance(column.type, Float):
+            return pa.float64()
+        if isinstance(column.type, DateTime):
+            return pa.timestamp("us")
+        return pa.string()
+
+
+# Instance globale de l'exporteur
+research_exporter = ResearchExporter()
+
+
+def get_research_exporter() -> ResearchExporter:
+    """Retourne l'instance de l'exporteur de recherche"""
+    return research_exporter
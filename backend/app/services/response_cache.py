@@ -0,0 +1,455 @@
+"""
+Cache des générations de Tom (prompts/réponses LLM)
+Clé : prompt normalisé + contexte discrétisé (phase, tranche de corruption,
+tranche d'hésitations), avec éviction LRU/TTL, espaces de noms par condition
+et stockage disque optionnel pour conserver les entrées chaudes au redémarrage
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from ..config import settings
+
+
+PLAYER_NAME_PLACEHOLDER = "{player_name}"
+# Un nom plus court correspond trop souvent à un bout de mot ("Al" dans "Allons")
+MIN_TEMPLATED_NAME_LENGTH = 3
+
+
+def bucket_context(context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Discrétise le contexte de génération pour que des situations voisines
+    partagent la même entrée de cache
+    """
+    if not context:
+        return {}
+
+    buckets = {}
+
+    if "game_phase" in context:
+        buckets["phase"] = context["game_phase"]
+
+    if "corruption_level" in context:
+        # Tranches de 0.25 : 0 = [0, 0.25[, ..., 4 = corruption maximale
+        level = max(0.0, min(1.0, float(context["corruption_level"] or 0.0)))
+        buckets["corruption"] = int(level * 4)
+
+    if "hesitation_count" in context:
+        count = int(context["hesitation_count"] or 0)
+        buckets["hesitations"] = "0" if count == 0 else "1" if count == 1 else "2-3" if count <= 3 else "4+"
+
+    if "hesitation_duration" in context:
+        duration = float(context["hesitation_duration"] or 0.0)
+        buckets["hesitation_duration"] = "court" if duration < 10 else "moyen" if duration < 30 else "long"
+
+    return buckets
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalise un prompt : nombres masqués (portés par le contexte discrétisé),
+    casse et espaces uniformisés
+    """
+    prompt = re.sub(r"\d+(?:[.,]\d+)?", "#", prompt)
+    return re.sub(r"\s+", " ", prompt).strip().lower()
+
+
+def _word_pattern(word: str, flags: int = 0) -> "re.Pattern":
+    """Occurrences de `word` en mots entiers"""
+    return re.compile(r"(?<!\w)%s(?!\w)" % re.escape(word), flags)
+
+
+def templated_name(prompt: str, player_name: Optional[str]) -> Optional[str]:
+    """
+    Nom du joueur à remplacer par le gabarit dans les réponses mises en cache,
+    ou None : nom absent, trop court, ou présent dans le texte fixe du prompt
+    (un joueur nommé "Tom" ne doit pas réécrire le nom de Tom)
+    """
+    if not player_name:
+        return None
+    name = player_name.strip()
+    if len(name) < MIN_TEMPLATED_NAME_LENGTH:
+        return None
+    if _word_pattern(name, re.IGNORECASE).search(prompt):
+        return None
+    return name
+
+
+def _replace_in_strings(value: Any, pattern: "re.Pattern", new: str) -> Any:
+    """Remplace un motif dans toutes les chaînes d'une structure JSON"""
+    if isinstance(value, str):
+        return pattern.sub(lambda match: new, value)
+    if isinstance(value, list):
+        return [_replace_in_strings(item, pattern, new) for item in value]
+    if isinstance(value, dict):
+        return {key: _replace_in_strings(item, pattern, new) for key, item in value.items()}
+    return value
+
+
+class CacheEntry:
+    """Entrée du cache : une ou plusieurs variantes de réponse pour une même clé"""
+
+    __slots__ = ("namespace", "variants", "expires_at")
+
+    def __init__(self, namespace: str, variants: List[Any], expires_at: float):
+        self.namespace = namespace
+        self.variants = variants
+        self.expires_at = expires_at
+
+
+class DiskCacheStore:
+    """
+    Stockage SQLite des entrées du cache (fichier séparé de la base du jeu)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Ouvre la base du cache à la première utilisation"""
+        if self._connection is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS tom_response_cache ("
+                " cache_key TEXT PRIMARY KEY,"
+                " namespace TEXT NOT NULL,"
+                " variants TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def load(self, limit: int) -> List[tuple]:
+        """Charge les entrées non expirées, les plus durables en dernier (LRU)"""
+        with self._lock:
+            self.connection.execute(
+                "DELETE FROM tom_response_cache WHERE expires_at <= ?", (time.time(),)
+            )
+            self.connection.commit()
+            rows = self.connection.execute(
+                "SELECT cache_key, namespace, variants, expires_at FROM tom_response_cache "
+                "ORDER BY expires_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+        return [
+            (key, namespace, json.loads(variants), expires_at)
+            for key, namespace, variants, expires_at in reversed(rows)
+        ]
+
+    def save(self, key: str, entry: CacheEntry):
+        """Enregistre ou remplace une entrée"""
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO tom_response_cache (cache_key, namespace, variants, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, entry.namespace, json.dumps(entry.variants, ensure_ascii=False), entry.expires_at)
+            )
+            self.connection.commit()
+
+    def delete(self, key: str):
+        """Supprime une entrée"""
+        with self._lock:
+            self.connection.execute("DELETE FROM tom_response_cache WHERE cache_key = ?", (key,))
+            self.connection.commit()
+
+    def clear(self, namespace: Optional[str] = None):
+        """Vide le stockage (ou un seul espace de noms)"""
+        with self._lock:
+            if namespace is None:
+                self.connection.execute("DELETE FROM tom_response_cache")
+            else:
+                self.connection.execute("DELETE FROM tom_response_cache WHERE namespace = ?", (namespace,))
+            self.connection.commit()
+
+
+class ResponseCache:
+    """
+    Cache LRU/TTL des réponses LLM de Tom
+
+    Chaque clé conserve jusqu'à `variants` réponses distinctes : tant que ce
+    nombre n'est pas atteint, la recherche est un miss et une nouvelle
+    génération vient enrichir l'entrée (les sessions ne reçoivent donc pas
+    toutes exactement le même texte)
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        variants: Optional[int] = None,
+        store: Optional[DiskCacheStore] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.max_entries = max_entries or settings.tom_cache_max_entries
+        self.ttl_seconds = ttl_seconds or settings.tom_cache_ttl_seconds
+        self.variants = variants or settings.tom_cache_variants
+        self.enabled = settings.tom_cache_enabled if enabled is None else enabled
+        self.store = store
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._loaded = store is None
+        # Thread unique des lectures/écritures disque (ordre des appels conservé)
+        self._store_executor: Optional[ThreadPoolExecutor] = None
+        self._loading: Optional[asyncio.Future] = None
+
+        # Métriques
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "loaded_from_disk": 0,
+        }
+        self.namespace_stats: Dict[str, Dict[str, int]] = {}
+
+    def make_key(
+        self,
+        namespace: str,
+        kind: str,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        player_name: Optional[str] = None
+    ) -> str:
+        """
+        Construit la clé : espace de noms + type + prompt normalisé + contexte discrétisé
+        Le prompt écrit le nom du joueur PLAYER_NAME_PLACEHOLDER ; un nom qui ne
+        peut pas être remplacé dans les réponses donne une clé propre au joueur
+        """
+        if templated_name(prompt, player_name) is None:
+            prompt = prompt.replace(PLAYER_NAME_PLACEHOLDER, player_name or "")
+        payload = json.dumps({
+            "prompt": normalize_prompt(prompt),
+            "context": bucket_context(context),
+        }, sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+        return f"{namespace}:{kind}:{digest}"
+
+    def get(
+        self,
+        namespace: str,
+        kind: str,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        player_name: Optional[str] = None
+    ) -> Optional[Any]:
+        """Retourne une réponse en cache (personnalisée pour le joueur) ou None"""
+        if not self.enabled:
+            return None
+        self._ensure_loaded()
+
+        key = self.make_key(namespace, kind, prompt, context, player_name)
+        entry = self._entries.get(key)
+
+        if entry is not None and entry.expires_at <= time.time():
+            self._remove(key)
+            self.stats["expirations"] += 1
+            entry = None
+
+        if entry is None or len(entry.variants) < self.variants:
+            self._count(namespace, "misses")
+            return None
+
+        self._entries.move_to_end(key)
+        self._count(namespace, "hits")
+
+        value = copy.deepcopy(random.choice(entry.variants))
+        name = templated_name(prompt, player_name)
+        if name:
+            value = _replace_in_strings(value, re.compile(re.escape(PLAYER_NAME_PLACEHOLDER)), name)
+        return value
+
+    def set(
+        self,
+        namespace: str,
+        kind: str,
+        prompt: str,
+        value: Any,
+        context: Optional[Dict[str, Any]] = None,
+        player_name: Optional[str] = None
+    ):
+        """Ajoute une variante de réponse (le nom du joueur, en mots entiers, est remplacé par un gabarit)"""
+        if not self.enabled:
+            return
+        self._ensure_loaded()
+
+        key = self.make_key(namespace, kind, prompt, context, player_name)
+        name = templated_name(prompt, player_name)
+        if name:
+            value = _replace_in_strings(value, _word_pattern(name), PLAYER_NAME_PLACEHOLDER)
+        value = copy.deepcopy(value)
+
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.time():
+            entry = CacheEntry(namespace, [], time.time() + self.ttl_seconds)
+            self._entries[key] = entry
+
+        if value not in entry.variants:
+            entry.variants.append(value)
+            del entry.variants[:-self.variants]
+
+        self._entries.move_to_end(key)
+        self.stats["writes"] += 1
+
+        if self.store is not None:
+            # Copie : les variantes peuvent changer avant l'écriture en arrière-plan
+            self._safe_store(self.store.save, key, CacheEntry(entry.namespace, list(entry.variants), entry.expires_at))
+
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.stats["evictions"] += 1
+
+    def clear(self, namespace: Optional[str] = None):
+        """Vide le cache (ou un seul espace de noms)"""
+        if namespace is None:
+            self._entries.clear()
+        else:
+            for key in [k for k, entry in self._entries.items() if entry.namespace == namespace]:
+                del self._entries[key]
+
+        if self.store is not None:
+            self._safe_store(self.store.clear, namespace)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne les métriques du cache"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "persistent": self.store is not None,
+            "namespaces": self.namespace_stats,
+        }
+
+    async def preload(self):
+        """Charge le stockage disque hors de la boucle d'événements (démarrage de l'application)"""
+        if self._loaded:
+            return
+        if self._loading is None or self._loading.done():
+            loop = asyncio.get_running_loop()
+            self._loading = loop.run_in_executor(self._get_store_executor(), self._read_store)
+        self._install_loaded(await self._loading)
+
+    def _ensure_loaded(self):
+        """
+        Charge les entrées du stockage disque à la première utilisation
+        Depuis la boucle d'événements, la lecture part en arrière-plan et le
+        cache reste vide (miss) jusqu'à son arrivée
+        """
+        if self._loaded:
+            return
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._install_loaded(self._get_store_executor().submit(self._read_store).result())
+            return
+
+        if self._loading is None or self._loading.done():
+            asyncio.ensure_future(self.preload())
+
+    def _read_store(self) -> List[tuple]:
+        """Lecture du stockage disque (thread du cache)"""
+        try:
+            return self.store.load(self.max_entries)
+        except Exception as e:
+            print(f"❌ Erreur chargement cache Tom: {e}")
+            return []
+
+    def _install_loaded(self, rows: List[tuple]):
+        """
+        Installe les entrées lues sur le disque, plus anciennes que celles
+        ajoutées pendant la lecture (qui sont conservées)
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+
+        entries: "OrderedDict[str, CacheEntry]" = OrderedDict(
+            (key, CacheEntry(namespace, variants, expires_at))
+            for key, namespace, variants, expires_at in rows
+            if key not in self._entries
+        )
+        self.stats["loaded_from_disk"] = len(entries)
+        entries.update(self._entries)
+        self._entries = entries
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        if self.stats["loaded_from_disk"]:
+            print(f"💾 Cache Tom : {self.stats['loaded_from_disk']} entrées rechargées")
+
+    def _remove(self, key: str):
+        """Retire une entrée de la mémoire et du disque"""
+        self._entries.pop(key, None)
+        if self.store is not None:
+            self._safe_store(self.store.delete, key)
+
+    def _count(self, namespace: str, metric: str):
+        """Incrémente une métrique globale et par espace de noms"""
+        self.stats[metric] += 1
+        counters = self.namespace_stats.setdefault(namespace, {"hits": 0, "misses": 0})
+        counters[metric] += 1
+
+    def _safe_store(self, operation, *args):
+        """
+        Exécute une opération du stockage disque dans le thread du cache
+        Depuis la boucle d'événements, l'appel rend la main sans attendre SQLite ;
+        hors boucle (scripts, tests), il attend la fin de l'écriture
+        """
+        future = self._get_store_executor().submit(_run_store_operation, operation, *args)
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            future.result()
+
+    def _get_store_executor(self) -> ThreadPoolExecutor:
+        """Thread unique du stockage disque, créé à la première utilisation"""
+        if self._store_executor is None:
+            self._store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tom-cache")
+        return self._store_executor
+
+
+def _run_store_operation(operation, *args):
+    """Le stockage disque ne doit jamais faire échouer une génération"""
+    try:
+        operation(*args)
+    except Exception as e:
+        print(f"❌ Erreur stockage cache Tom: {e}")
+
+
+def _create_response_cache() -> ResponseCache:
+    """Crée le cache global, avec stockage disque si configuré"""
+    store = None
+    if settings.tom_cache_enabled and settings.tom_cache_path:
+        try:
+            store = DiskCacheStore(settings.tom_cache_path)
+        except Exception as e:
+            print(f"⚠️ Cache Tom sur disque indisponible ({e}) - cache mémoire uniquement")
+    return ResponseCache(store=store)
+
+
+# Instance globale du cache des réponses
+tom_response_cache = _create_response_cache()
+
+
+def get_response_cache() -> ResponseCache:
+    """Retourne l'instance du cache des réponses"""
+    return tom_response_cache
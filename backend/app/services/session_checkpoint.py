@@ -0,0 +1,162 @@
+"""
+Points de reprise des sessions (checkpoints)
+État complet de chaque session en cours (GameState, historique de Tom, OS,
+corruption) enregistré après chaque action et périodiquement, puis restauré
+au démarrage : un redémarrage ou un crash ne fait plus perdre les parties.
+
+Un point de reprise est un document JSON binaire (orjson) compressé, une
+ligne par session dans un fichier SQLite local (WAL). Un document identique
+au précédent n'est pas réécrit. Coût typique : une fraction de milliseconde
+par session (voir benchmarks/bench_session_checkpoint.py).
+"""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from ..config import settings
+
+
+class SessionCheckpointStore:
+    """
+    Stockage des points de reprise ; chaque worker (routeur de sessions) ne
+    restaure que les sessions qu'il a enregistrées
+    """
+
+    def __init__(
+        self,
+        path: str,
+        owner: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.path = path
+        self.owner = settings.worker_id if owner is None else owner
+        self.compression_level = (
+            settings.session_checkpoint_compression_level if compression_level is None else compression_level
+        )
+        self.enabled = settings.session_checkpoint_enabled if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._digests: Dict[str, int] = {}  # Dernier document écrit par session (CRC32)
+
+        self.stats = {
+            "saved": 0,
+            "unchanged": 0,  # Document identique au précédent : pas d'écriture
+            "deleted": 0,
+            "restored": 0,
+            "corrupted": 0,
+            "bytes_raw": 0,
+            "bytes_stored": 0,
+            "save_seconds": 0.0,
+            "max_save_ms": 0.0,
+        }
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Ouvre la base à la première utilisation (une connexion par processus)"""
+        if self._connection is None or self._pid != os.getpid():
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute(f"PRAGMA busy_timeout = {int(settings.database_sqlite_busy_timeout_ms)}")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute(f"PRAGMA synchronous = {settings.database_sqlite_synchronous}")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS session_checkpoints ("
+                " session_id TEXT PRIMARY KEY,"
+                " owner TEXT NOT NULL,"
+                " saved_at REAL NOT NULL,"
+                " payload BLOB NOT NULL) WITHOUT ROWID"
+            )
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def save(self, session_id: str, state: Dict[str, Any]) -> bool:
+        """Enregistre le point de reprise d'une session ; False s'il est inchangé"""
+        if not self.enabled:
+            return False
+
+        start = time.perf_counter()
+        raw = orjson.dumps(state, default=str, option=orjson.OPT_NON_STR_KEYS)
+        digest = zlib.crc32(raw)
+        if self._digests.get(session_id) == digest:
+            self.stats["unchanged"] += 1
+            return False
+
+        payload = zlib.compress(raw, self.compression_level)
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO session_checkpoints (session_id, owner, saved_at, payload) "
+                "VALUES (?, ?, ?, ?)",
+                (session_id, self.owner, time.time(), payload)
+            )
+        self._digests[session_id] = digest
+
+        elapsed = time.perf_counter() - start
+        self.stats["saved"] += 1
+        self.stats["bytes_raw"] += len(raw)
+        self.stats["bytes_stored"] += len(payload)
+        self.stats["save_seconds"] += elapsed
+        self.stats["max_save_ms"] = max(self.stats["max_save_ms"], elapsed * 1000)
+        return True
+
+    def delete(self, session_id: str):
+        """Supprime le point de reprise d'une session terminée"""
+        self._digests.pop(session_id, None)
+        if not self.enabled:
+            return
+        with self._lock:
+            cursor = self.connection.execute(
+                "DELETE FROM session_checkpoints WHERE session_id = ?", (session_id,)
+            )
+        self.stats["deleted"] += cursor.rowcount
+
+    def load_all(self) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """Points de reprise de ce worker : (session_id, saved_at, état)"""
+        if not self.enabled:
+            return []
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT session_id, saved_at, payload FROM session_checkpoints WHERE owner = ? ORDER BY saved_at",
+                (self.owner,)
+            ).fetchall()
+
+        checkpoints = []
+        for session_id, saved_at, payload in rows:
+            try:
+                raw = zlib.decompress(payload)
+                checkpoints.append((session_id, saved_at, orjson.loads(raw)))
+                self._digests[session_id] = zlib.crc32(raw)
+            except (zlib.error, orjson.JSONDecodeError) as e:
+                print(f"❌ Point de reprise illisible pour {session_id}: {e}")
+                self.stats["corrupted"] += 1
+        return checkpoints
+
+    def get_stats(self) -> Dict[str, Any]:
+        saved = self.stats["saved"]
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "owner": self.owner,
+            "sessions": len(self._digests),
+            "avg_save_ms": self.stats["save_seconds"] / saved * 1000 if saved else 0.0,
+            "compression_ratio": (
+                self.stats["bytes_stored"] / self.stats["bytes_raw"] if self.stats["bytes_raw"] else 1.0
+            ),
+        }
+
+
+# Instance globale des points de reprise
+session_checkpoints = SessionCheckpointStore(settings.session_checkpoint_path)
+
+
+def get_session_checkpoints() -> SessionCheckpointStore:
+    """Retourne le stockage des points de reprise"""
+    return session_checkpoints
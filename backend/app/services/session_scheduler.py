@@ -0,0 +1,211 @@
+"""
+Planificateur partagé des échéances de session
+Un tas binaire et une seule tâche asyncio remplacent les timers par session
+(transitions de phase, fin par timeout, mesures périodiques des biais)
+"""
+import asyncio
+import heapq
+import itertools
+from typing import Dict, Any, Callable, Optional, Set
+
+
+class TimerHandle:
+    """Échéance planifiée, annulable tant qu'elle n'est pas déclenchée"""
+
+    __slots__ = ("deadline", "sequence", "callback", "args", "key", "cancelled", "fired")
+
+    def __init__(self, deadline: float, sequence: int, callback: Callable, args: tuple, key: Optional[str]):
+        self.deadline = deadline
+        self.sequence = sequence
+        self.callback = callback
+        self.args = args
+        self.key = key
+        self.cancelled = False
+        self.fired = False
+
+    def __lt__(self, other: "TimerHandle") -> bool:
+        return (self.deadline, self.sequence) < (other.deadline, other.sequence)
+
+
+class SessionScheduler:
+    """
+    Planificateur à tas : insertion en O(log n), annulation paresseuse en O(1)
+    et une seule tâche de boucle qui ne se réveille qu'aux échéances réelles
+    """
+
+    # Compaction du tas quand les entrées annulées deviennent majoritaires
+    COMPACTION_MIN_CANCELLED = 64
+
+    def __init__(self):
+        self._heap = []
+        self._keys: Dict[str, Set[TimerHandle]] = {}
+        self._sequence = itertools.count()
+        self._cancelled_in_heap = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running_callbacks: Set[asyncio.Task] = set()
+
+        # Métriques
+        self.stats = {
+            "wakeups": 0,
+            "scheduled": 0,
+            "fired": 0,
+            "cancelled": 0,
+        }
+
+    def _ensure_running(self):
+        """Démarre (ou redémarre sur une nouvelle boucle) la tâche du planificateur"""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    def schedule(self, delay: float, callback: Callable, *args, key: Optional[str] = None) -> TimerHandle:
+        """
+        Planifie `await callback(*args)` dans `delay` secondes
+        `key` regroupe les échéances d'une même session pour cancel_key()
+        """
+        self._ensure_running()
+
+        handle = TimerHandle(
+            self._loop.time() + max(delay, 0.0),
+            next(self._sequence),
+            callback,
+            args,
+            key
+        )
+        heapq.heappush(self._heap, handle)
+        if key is not None:
+            self._keys.setdefault(key, set()).add(handle)
+        self.stats["scheduled"] += 1
+
+        # Nouvelle échéance la plus proche : réveiller la boucle pour recalculer l'attente
+        if self._heap[0] is handle:
+            self._wakeup.set()
+
+        return handle
+
+    def cancel(self, handle: TimerHandle):
+        """Annule une échéance (retirée du tas à son passage en tête ou à la compaction)"""
+        if handle.cancelled or handle.fired:
+            # Déjà sortie du tas : rien à décompter
+            return
+
+        handle.cancelled = True
+        self._cancelled_in_heap += 1
+        self.stats["cancelled"] += 1
+        self._forget(handle)
+
+        if (self._cancelled_in_heap >= self.COMPACTION_MIN_CANCELLED and
+                self._cancelled_in_heap * 2 > len(self._heap)):
+            self._heap = [h for h in self._heap if not h.cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled_in_heap = 0
+
+    def cancel_key(self, key: str):
+        """Annule toutes les échéances d'une session"""
+        for handle in list(self._keys.get(key, ())):
+            self.cancel(handle)
+        self._keys.pop(key, None)
+
+    def pending(self, key: Optional[str] = None) -> int:
+        """Nombre d'échéances actives (globalement ou pour une session)"""
+        if key is not None:
+            return len(self._keys.get(key, ()))
+        return len(self._heap) - self._cancelled_in_heap
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne les métriques du planificateur"""
+        return {
+            **self.stats,
+            "pending": self.pending(),
+            "sessions": len(self._keys),
+        }
+
+    async def shutdown(self):
+        """Arrête la boucle du planificateur et les callbacks en cours"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for task in list(self._running_callbacks):
+            task.cancel()
+
+    def _forget(self, handle: TimerHandle):
+        """Retire une échéance de l'index par session"""
+        if handle.key is None:
+            return
+
+        handles = self._keys.get(handle.key)
+        if handles is not None:
+            handles.discard(handle)
+            if not handles:
+                del self._keys[handle.key]
+
+    async def _run(self):
+        """Boucle unique : dort jusqu'à la prochaine échéance"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            self._wakeup.clear()
+
+            while self._heap and self._heap[0].cancelled:
+                heapq.heappop(self._heap)
+                self._cancelled_in_heap -= 1
+
+            if not self._heap:
+                await self._wakeup.wait()
+                self.stats["wakeups"] += 1
+                continue
+
+            head = self._heap[0]
+            if head.deadline > loop.time():
+                timer = loop.call_at(head.deadline, self._wakeup.set)
+                try:
+                    await self._wakeup.wait()
+                finally:
+                    timer.cancel()
+                self.stats["wakeups"] += 1
+                continue
+
+            # Déclencher toutes les échéances arrivées à terme
+            now = loop.time()
+            while self._heap and self._heap[0].deadline <= now:
+                handle = heapq.heappop(self._heap)
+                if handle.cancelled:
+                    self._cancelled_in_heap -= 1
+                    continue
+
+                handle.fired = True
+                self._forget(handle)
+                self.stats["fired"] += 1
+                task = loop.create_task(self._invoke(handle))
+                self._running_callbacks.add(task)
+                task.add_done_callback(self._running_callbacks.discard)
+
+    async def _invoke(self, handle: TimerHandle):
+        """Exécute un callback sans bloquer la boucle du planificateur"""
+        try:
+            await handle.callback(*handle.args)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Erreur échéance planifiée {getattr(handle.callback, '__name__', handle.callback)}: {e}")
+
+
+# Instance globale du planificateur
+scheduler = SessionScheduler()
+
+
+def get_scheduler() -> SessionScheduler:
+    """Retourne l'instance du planificateur"""
+    return scheduler
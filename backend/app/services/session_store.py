@@ -0,0 +1,255 @@
+"""
+Stockage de l'état des sessions (orchestrateur, Tom, OS, corruption)
+Backend interchangeable : en mémoire (un seul worker, objets conservés tels
+quels) ou SQLite local partagé (état sérialisé, lisible par tous les workers
+d'une même machine : n'importe quel worker peut servir n'importe quelle session)
+
+Les services accèdent à l'état via `SessionStateMap`, un dictionnaire par
+espace de noms. Avec un backend partagé, chaque lecture vérifie la version
+stockée (une requête sur la clé primaire) et ne désérialise que si un autre
+worker a modifié l'état ; une modification en place doit être publiée par
+`sync(session_id)`.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+
+from ..config import settings
+
+
+class InMemorySessionStore:
+    """
+    État des sessions dans la mémoire du processus : aucune sérialisation,
+    limité à un seul worker
+    """
+
+    backend = "memory"
+    shared = False
+
+    def __init__(self):
+        self._namespaces: Dict[str, Dict[str, Any]] = {}
+
+    def fetch(self, namespace: str, session_id: str, known_version: Optional[int] = None) -> Optional[Tuple[int, Any]]:
+        """Retourne (version, valeur) ou None ; la valeur est l'objet lui-même"""
+        values = self._namespaces.get(namespace)
+        if values is None or session_id not in values:
+            return None
+        return 0, values[session_id]
+
+    def save(self, namespace: str, session_id: str, value: Any) -> int:
+        self._namespaces.setdefault(namespace, {})[session_id] = value
+        return 0
+
+    def delete(self, namespace: str, session_id: str) -> bool:
+        return self._namespaces.get(namespace, {}).pop(session_id, None) is not None
+
+    def keys(self, namespace: str) -> List[str]:
+        return list(self._namespaces.get(namespace, {}))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "shared": self.shared,
+            "entries": {namespace: len(values) for namespace, values in self._namespaces.items()},
+        }
+
+
+class SQLiteSessionStore:
+    """
+    État des sessions dans un fichier SQLite local (WAL) partagé par les
+    workers : valeurs sérialisées (JSON binaire) et versionnées
+    """
+
+    backend = "sqlite"
+    shared = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Ouvre la base à la première utilisation (une connexion par processus)"""
+        if self._connection is None or self._pid != os.getpid():
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute(f"PRAGMA busy_timeout = {int(settings.database_sqlite_busy_timeout_ms)}")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute(f"PRAGMA synchronous = {settings.database_sqlite_synchronous}")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS session_state ("
+                " namespace TEXT NOT NULL,"
+                " session_id TEXT NOT NULL,"
+                " version INTEGER NOT NULL,"
+                " value BLOB NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, session_id)) WITHOUT ROWID"
+            )
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def fetch(self, namespace: str, session_id: str, known_version: Optional[int] = None) -> Optional[Tuple[int, Optional[bytes]]]:
+        """
+        Retourne (version, valeur sérialisée) ou None si la session est absente ;
+        la valeur vaut None si la version stockée est `known_version`
+        """
+        with self._lock:
+            return self.connection.execute(
+                "SELECT version, CASE WHEN version = ? THEN NULL ELSE value END "
+                "FROM session_state WHERE namespace = ? AND session_id = ?",
+                (known_version, namespace, session_id)
+            ).fetchone()
+
+    def save(self, namespace: str, session_id: str, value: bytes) -> int:
+        """Enregistre une valeur sérialisée ; retourne sa nouvelle version"""
+        with self._lock:
+            return self.connection.execute(
+                "INSERT INTO session_state (namespace, session_id, version, value, updated_at) "
+                "VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT (namespace, session_id) DO UPDATE SET "
+                "version = version + 1, value = excluded.value, updated_at = excluded.updated_at "
+                "RETURNING version",
+                (namespace, session_id, value, time.time())
+            ).fetchone()[0]
+
+    def delete(self, namespace: str, session_id: str) -> bool:
+        with self._lock:
+            cursor = self.connection.execute(
+                "DELETE FROM session_state WHERE namespace = ? AND session_id = ?", (namespace, session_id)
+            )
+            return cursor.rowcount > 0
+
+    def keys(self, namespace: str) -> List[str]:
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT session_id FROM session_state WHERE namespace = ?", (namespace,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT namespace, COUNT(*) FROM session_state GROUP BY namespace"
+            ).fetchall()
+        return {
+            "backend": self.backend,
+            "shared": self.shared,
+            "path": self.path,
+            "entries": dict(rows),
+        }
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class SessionStateMap(MutableMapping):
+    """
+    Dictionnaire session_id -> état pour un espace de noms du stockage
+
+    En mémoire, les objets sont conservés tels quels. Avec un stockage
+    partagé, `encode`/`decode` convertissent l'état en structure JSON et
+    l'objet désérialisé est gardé en cache tant que sa version ne change pas.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        store=None,
+        encode: Callable[[Any], Any] = _identity,
+        decode: Callable[[Any], Any] = _identity
+    ):
+        self.namespace = namespace
+        self.store = store or get_session_store()
+        self.encode = encode
+        self.decode = decode
+        self._cache: Dict[str, Tuple[int, Any]] = {}  # session_id -> (version, objet)
+
+        self.stats = {
+            "hits": 0,  # Version inchangée : objet en cache
+            "loads": 0,  # Désérialisations (modifié par un autre worker ou absent du cache)
+            "writes": 0,
+            "conflicts": 0,  # Écritures concurrentes d'un autre worker (la dernière l'emporte)
+        }
+
+    def __getitem__(self, session_id: str) -> Any:
+        cached = self._cache.get(session_id)
+        entry = self.store.fetch(self.namespace, session_id, cached[0] if cached else None)
+        if entry is None:
+            self._cache.pop(session_id, None)
+            raise KeyError(session_id)
+
+        if not self.store.shared:
+            return entry[1]
+
+        version, payload = entry
+        if payload is None:
+            self.stats["hits"] += 1
+            return cached[1]
+
+        value = self.decode(orjson.loads(payload))
+        self._cache[session_id] = (version, value)
+        self.stats["loads"] += 1
+        return value
+
+    def __setitem__(self, session_id: str, value: Any):
+        if not self.store.shared:
+            self.store.save(self.namespace, session_id, value)
+            return
+
+        cached = self._cache.get(session_id)
+        payload = orjson.dumps(self.encode(value), default=str, option=orjson.OPT_NON_STR_KEYS)
+        version = self.store.save(self.namespace, session_id, payload)
+        if cached is not None and version != cached[0] + 1:
+            self.stats["conflicts"] += 1
+        self._cache[session_id] = (version, value)
+        self.stats["writes"] += 1
+
+    def __delitem__(self, session_id: str):
+        self._cache.pop(session_id, None)
+        if not self.store.delete(self.namespace, session_id):
+            raise KeyError(session_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.keys(self.namespace))
+
+    def __len__(self) -> int:
+        return len(self.store.keys(self.namespace))
+
+    def sync(self, session_id: str):
+        """Publie une modification en place de l'état d'une session"""
+        if not self.store.shared:
+            return
+        cached = self._cache.get(session_id)
+        if cached is not None:
+            self[session_id] = cached[1]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "cached": len(self._cache)}
+
+
+def _create_session_store():
+    """Crée le stockage global selon la configuration"""
+    if settings.session_store_backend == "sqlite":
+        return SQLiteSessionStore(settings.session_store_path)
+    if settings.session_store_backend != "memory":
+        print(f"⚠️ Stockage de sessions inconnu ({settings.session_store_backend}) - mémoire utilisée")
+    return InMemorySessionStore()
+
+
+# Instance globale du stockage de l'état des sessions
+session_store = _create_session_store()
+
+
+def get_session_store():
+    """Retourne le stockage de l'état des sessions"""
+    return session_store
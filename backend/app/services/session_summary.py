@@ -0,0 +1,214 @@
+"""
+Résumé incrémental des sessions (table session_summary)
+Chaque action et interaction Tom écrite par la file write-behind met à jour le
+résumé de sa session dans la même transaction ; la reconstruction recalcule
+les résumés depuis les journaux bruts pour vérification ou rattrapage
+
+Usage : python -m app.services.session_summary [verify|rebuild] [session_id ...]
+"""
+import sys
+import time
+from typing import Dict, Any, Iterable, List, Optional
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from ..database import engine, reader_engine
+from ..models import PlayerAction, TomInteraction, SessionSummary
+
+# Lignes lues par aller-retour pendant la reconstruction
+REBUILD_BATCH_SIZE = 10000
+
+# Sessions recalculées par transaction pendant le rattrapage en ligne
+BACKFILL_SESSION_BATCH_SIZE = 200
+
+# Colonnes comparées par la vérification
+SUMMARY_FIELDS = [
+    column.name for column in SessionSummary.__table__.columns
+    if column.name not in ("session_id", "updated_at")
+]
+
+
+def apply_to_summaries(db: Session, instances: Iterable[Any]):
+    """
+    Répercute des actions et interactions Tom (en cours d'insertion) sur les
+    résumés de leurs sessions, dans la transaction de `db`
+    """
+    summaries: Dict[str, SessionSummary] = {}
+
+    for instance in instances:
+        if not isinstance(instance, (PlayerAction, TomInteraction)):
+            continue
+
+        summary = summaries.get(instance.session_id)
+        if summary is None:
+            summary = db.get(SessionSummary, instance.session_id)
+            if summary is None:
+                summary = SessionSummary(session_id=instance.session_id)
+                db.add(summary)
+            summaries[instance.session_id] = summary
+
+        if isinstance(instance, PlayerAction):
+            summary.record_action(instance)
+        else:
+            summary.record_tom_interaction(instance)
+
+
+def compute_summaries(connection: Connection, session_ids: Optional[List[str]] = None) -> Dict[str, SessionSummary]:
+    """Recalcule les résumés depuis les journaux bruts (actions dans l'ordre chronologique)"""
+    summaries: Dict[str, SessionSummary] = {}
+
+    actions = select(
+        PlayerAction.session_id,
+        PlayerAction.timestamp,
+        PlayerAction.action_type,
+        PlayerAction.was_obedient,
+        PlayerAction.gravity_score,
+        PlayerAction.reaction_time_seconds,
+    ).order_by(PlayerAction.session_id, PlayerAction.timestamp, PlayerAction.id)
+    if session_ids:
+        actions = actions.where(PlayerAction.session_id.in_(session_ids))
+
+    result = connection.execution_options(yield_per=REBUILD_BATCH_SIZE).execute(actions)
+    for row in result:
+        summary = summaries.get(row.session_id)
+        if summary is None:
+            summary = summaries[row.session_id] = SessionSummary(session_id=row.session_id)
+        summary.record_action(row)
+
+    interactions = select(
+        TomInteraction.session_id,
+        func.count(TomInteraction.id),
+        func.max(TomInteraction.timestamp),
+    ).group_by(TomInteraction.session_id)
+    if session_ids:
+        interactions = interactions.where(TomInteraction.session_id.in_(session_ids))
+
+    for session_id, count, last_timestamp in connection.execute(interactions):
+        summary = summaries.get(session_id)
+        if summary is None:
+            summary = summaries[session_id] = SessionSummary(session_id=session_id)
+        summary.tom_interactions = count
+        summary.last_tom_interaction_at = last_timestamp
+
+    return summaries
+
+
+def rebuild_summaries(connection: Connection, session_ids: Optional[List[str]] = None) -> int:
+    """
+    Remplace les résumés (tous, ou ceux des sessions données) par leur
+    recalcul depuis les journaux bruts ; retourne le nombre de résumés écrits
+    """
+    summaries = compute_summaries(connection, session_ids)
+
+    statement = delete(SessionSummary)
+    if session_ids:
+        statement = statement.where(SessionSummary.session_id.in_(session_ids))
+    connection.execute(statement)
+
+    rows = [
+        {column.name: getattr(summary, column.name) for column in SessionSummary.__table__.columns}
+        for summary in summaries.values()
+    ]
+    for start in range(0, len(rows), REBUILD_BATCH_SIZE):
+        connection.execute(SessionSummary.__table__.insert(), rows[start:start + REBUILD_BATCH_SIZE])
+
+    return len(rows)
+
+
+def next_session_ids(connection: Connection, after: str, limit: int) -> List[str]:
+    """Sessions présentes dans les journaux bruts, après `after` dans l'ordre des identifiants"""
+    session_ids = set()
+    for column in (PlayerAction.session_id, TomInteraction.session_id):
+        session_ids.update(connection.execute(
+            select(column).where(column > after).distinct().order_by(column).limit(limit)
+        ).scalars())
+    return sorted(session_ids)[:limit]
+
+
+def rebuild_summaries_in_batches(
+    engine: Engine,
+    batch_size: int = BACKFILL_SESSION_BATCH_SIZE,
+    pause_seconds: float = 0.0
+) -> int:
+    """
+    Recalcule tous les résumés par lots de sessions, une transaction par lot
+    (le verrou d'écriture est rendu entre deux lots) ; retourne le nombre de
+    résumés écrits
+    """
+    count = 0
+    last_session_id = ""
+    while True:
+        with engine.begin() as connection:
+            session_ids = next_session_ids(connection, last_session_id, batch_size)
+            if not session_ids:
+                break
+            count += rebuild_summaries(connection, session_ids)
+        last_session_id = session_ids[-1]
+
+        # Laisser passer les écritures en attente entre deux lots
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    return count
+
+
+def verify_summaries(connection: Connection, session_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Compare les résumés stockés à leur recalcul ; retourne les écarts"""
+    expected = compute_summaries(connection, session_ids)
+
+    stored_query = select(SessionSummary)
+    if session_ids:
+        stored_query = stored_query.where(SessionSummary.session_id.in_(session_ids))
+    stored = {row.session_id: row for row in connection.execute(stored_query)}
+
+    mismatches = []
+    for session_id in sorted(set(expected) | set(stored)):
+        summary, row = expected.get(session_id), stored.get(session_id)
+        if summary is None or row is None:
+            mismatches.append({"session_id": session_id, "missing": "stored" if row is None else "raw"})
+            continue
+
+        fields = {}
+        for field in SUMMARY_FIELDS:
+            value, stored_value = getattr(summary, field), getattr(row, field)
+            if isinstance(value, float) and stored_value is not None:
+                equal = abs(value - stored_value) <= 1e-6 * max(1.0, abs(value))
+            else:
+                equal = value == stored_value
+            if not equal:
+                fields[field] = {"expected": value, "stored": stored_value}
+        if fields:
+            mismatches.append({"session_id": session_id, "fields": fields})
+
+    return mismatches
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    session_ids = sys.argv[2:] or None
+
+    if command == "rebuild":
+        SessionSummary.__table__.create(bind=engine, checkfirst=True)
+        with engine.begin() as connection:
+            count = rebuild_summaries(connection, session_ids)
+        print(f"✅ {count} résumé(s) de session reconstruit(s)")
+    elif command == "verify":
+        with reader_engine.connect() as connection:
+            mismatches = verify_summaries(connection, session_ids)
+        if not mismatches:
+            print("✅ Résumés de session conformes aux journaux bruts")
+            return
+        print(f"❌ {len(mismatches)} résumé(s) de session divergent(s)")
+        for mismatch in mismatches[:20]:
+            print(f"   {mismatch}")
+        sys.exit(1)
+    else:
+        print("Usage : python -m app.services.session_summary [verify|rebuild] [session_id ...]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
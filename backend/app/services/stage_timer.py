@@ -0,0 +1,56 @@
+"""
+Mesure des étapes d'un pipeline asynchrone (démarrage de session)
+Chaque étape est chronométrée individuellement, même lancée en parallèle
+"""
+import time
+import asyncio
+from typing import Dict, Any, Awaitable, List
+
+
+class StageTimer:
+    """Chronomètre les étapes d'un pipeline et leur durée totale"""
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+
+    async def run(self, stage: str, awaitable: Awaitable) -> Any:
+        """Attend `awaitable` en enregistrant sa durée sous le nom `stage`"""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.timings[stage] = time.perf_counter() - start
+
+    async def gather(self, **stages: Awaitable) -> List[Any]:
+        """
+        Lance les étapes en parallèle et renvoie leurs résultats dans l'ordre
+        Au premier échec, les autres étapes sont annulées et l'erreur indique l'étape
+        """
+        tasks = {stage: asyncio.ensure_future(self.run(stage, awaitable)) for stage, awaitable in stages.items()}
+        try:
+            await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+        except asyncio.CancelledError:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        for stage, task in tasks.items():
+            if task.done() and not task.cancelled() and task.exception() is not None:
+                # Aucune étape ne continue en arrière-plan après l'échec
+                for other in tasks.values():
+                    other.cancel()
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
+                raise RuntimeError(f"Étape {stage} en échec: {task.exception()}") from task.exception()
+
+        return [task.result() for task in tasks.values()]
+
+    def record(self, stage: str, seconds: float):
+        """Enregistre la durée d'une étape mesurée ailleurs"""
+        self.timings[stage] = seconds
+
+    def as_milliseconds(self) -> Dict[str, float]:
+        """Durées des étapes et durée totale, en millisecondes"""
+        timings = {stage: round(seconds * 1000, 2) for stage, seconds in self.timings.items()}
+        timings["total"] = round((time.perf_counter() - self.start_time) * 1000, 2)
+        return timings
@@ -0,0 +1,265 @@
+"""
+Télémétrie des entrées à haute fréquence (souris, clics, focus de fenêtre)
+Ces événements de gravité 0 ne passent pas par le pipeline complet des actions
+(insertion en base, conditions de fin, mesure des biais) : le client les
+regroupe en lots (`telemetry_batch`), le serveur les conserve dans un tampon
+circulaire par session et en dérive des agrégats :
+  - cursor_movement_total : distance totale parcourue par le curseur (px)
+  - click_frequency : clics par minute
+  - hésitations : pauses sans aucune entrée au-delà du seuil
+
+Format d'un événement : [type, t, x, y, distance]
+  - t : horodatage client en millisecondes
+  - x, y : position (absente pour window_focus)
+  - distance : distance parcourue depuis l'échantillon précédent, mesurée par le
+    client sur tous les mouvements bruts (absente : ligne droite entre échantillons)
+
+Les valeurs doivent être des nombres finis (ni booléens, ni NaN, ni infinis) et
+t ne peut dépasser l'horloge du serveur que de quelques secondes : un horodatage
+dans le futur bloquerait tous les événements suivants de la session (hors ordre)
+"""
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from ..config import settings
+
+
+# Types d'actions traités comme télémétrie (gravité 0 dans ActionEngine)
+TELEMETRY_EVENT_TYPES = frozenset({"mouse_move", "desktop_click", "window_focus"})
+
+CLICK_EVENT_TYPES = frozenset({"desktop_click"})
+
+# Événement normalisé : (type, t en secondes, x, y)
+TelemetryEvent = Tuple[str, float, Optional[float], Optional[float]]
+
+
+def is_finite_number(value: Any) -> bool:
+    """Nombre fini (les booléens, NaN et infinis sont refusés)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    try:
+        return math.isfinite(value)
+    except OverflowError:  # Entier trop grand pour un flottant
+        return False
+
+
+def is_telemetry_action(action_data: Dict[str, Any]) -> bool:
+    """L'action est-elle un événement d'entrée à haute fréquence ?"""
+    return action_data.get("type") in TELEMETRY_EVENT_TYPES
+
+
+def event_from_action(action_data: Dict[str, Any]) -> List[Any]:
+    """Événement de télémétrie d'une action envoyée isolément (ancien client)"""
+    position = action_data.get("position") or {}
+    return [
+        action_data["type"],
+        action_data.get("client_time") or time.time() * 1000,
+        position.get("x"),
+        position.get("y"),
+    ]
+
+
+class SessionTelemetry:
+    """
+    Tampon circulaire des derniers événements d'une session et agrégats
+    mis à jour à l'ingestion (O(1) par événement)
+    """
+
+    def __init__(self, buffer_size: int, hesitation_seconds: float):
+        self.events: Deque[TelemetryEvent] = deque(maxlen=buffer_size)
+        self.hesitation_seconds = hesitation_seconds
+
+        self.event_count = 0
+        self.click_count = 0
+        self.focus_count = 0
+        self.cursor_movement_total = 0.0
+        self.first_time: Optional[float] = None
+        self.last_time: Optional[float] = None
+        self.last_position: Optional[Tuple[float, float]] = None
+
+        # Pauses sans entrée (hésitations)
+        self.hesitation_events = 0
+        self.hesitation_total_seconds = 0.0
+        self.longest_pause_seconds = 0.0
+
+        # Distance depuis la dernière action significative
+        self.movement_since_action = 0.0
+
+    def add(self, event: List[Any]) -> bool:
+        """Intègre un événement [type, t, x, y, distance] ; False s'il arrive hors ordre (ignoré)"""
+        event_type, timestamp = event[0], float(event[1]) / 1000
+        x = event[2] if len(event) > 2 else None
+        y = event[3] if len(event) > 3 else None
+        distance = event[4] if len(event) > 4 else None
+
+        if self.last_time is not None:
+            if timestamp < self.last_time:
+                return False
+            pause = timestamp - self.last_time
+            if pause >= self.hesitation_seconds:
+                self.hesitation_events += 1
+                self.hesitation_total_seconds += pause
+                self.longest_pause_seconds = max(self.longest_pause_seconds, pause)
+        else:
+            self.first_time = timestamp
+
+        if x is not None and y is not None:
+            if distance is None:
+                distance = math.hypot(x - self.last_position[0], y - self.last_position[1]) if self.last_position else 0.0
+            self.cursor_movement_total += distance
+            self.movement_since_action += distance
+            self.last_position = (x, y)
+
+        if event_type in CLICK_EVENT_TYPES:
+            self.click_count += 1
+        elif event_type == "window_focus":
+            self.focus_count += 1
+
+        self.event_count += 1
+        self.last_time = timestamp
+        self.events.append((event_type, timestamp, x, y))
+        return True
+
+    @property
+    def click_frequency(self) -> float:
+        """Clics par minute sur la période couverte par les événements"""
+        if self.first_time is None or self.last_time <= self.first_time:
+            return 0.0
+        return self.click_count / ((self.last_time - self.first_time) / 60)
+
+    def pause_before(self, timestamp: float) -> Optional[float]:
+        """Temps sans entrée avant un instant (secondes), si des événements ont été reçus"""
+        if self.last_time is None:
+            return None
+        return max(0.0, timestamp - self.last_time)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "events": self.event_count,
+            "buffered_events": len(self.events),
+            "cursor_movement_total": round(self.cursor_movement_total, 1),
+            "click_count": self.click_count,
+            "click_frequency": round(self.click_frequency, 2),
+            "focus_changes": self.focus_count,
+            "hesitation_events": self.hesitation_events,
+            "hesitation_total_seconds": round(self.hesitation_total_seconds, 2),
+            "longest_pause_seconds": round(self.longest_pause_seconds, 2),
+        }
+
+
+class TelemetryHub:
+    """
+    Tampons de télémétrie de toutes les sessions (les moins récemment
+    alimentées sont évincées au-delà du nombre maximum de sessions)
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = 2000,
+        hesitation_seconds: float = 3.0,
+        max_sessions: int = 1000,
+        max_clock_ahead_seconds: float = 5.0
+    ):
+        self.buffer_size = buffer_size
+        self.hesitation_seconds = hesitation_seconds
+        self.max_sessions = max_sessions
+        self.max_clock_ahead_seconds = max_clock_ahead_seconds
+        self.sessions: "OrderedDict[str, SessionTelemetry]" = OrderedDict()
+
+        self.stats = {
+            "batches": 0,
+            "events": 0,
+            "rejected_events": 0,
+            "evicted_sessions": 0,
+        }
+
+    def _session(self, session_id: str) -> SessionTelemetry:
+        telemetry = self.sessions.get(session_id)
+        if telemetry is None:
+            telemetry = self.sessions[session_id] = SessionTelemetry(self.buffer_size, self.hesitation_seconds)
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+                self.stats["evicted_sessions"] += 1
+        else:
+            self.sessions.move_to_end(session_id)
+        return telemetry
+
+    def ingest(self, session_id: str, events: Iterable[Any]) -> int:
+        """Intègre un lot d'événements ; retourne le nombre d'événements acceptés"""
+        telemetry = self._session(session_id)
+        # Horodatage client maximal (ms) : quelques secondes d'avance sur le serveur au plus
+        latest_time = (time.time() + self.max_clock_ahead_seconds) * 1000
+        accepted = 0
+        for event in events:
+            if (
+                not isinstance(event, (list, tuple)) or len(event) < 2
+                or event[0] not in TELEMETRY_EVENT_TYPES
+                or not is_finite_number(event[1]) or event[1] > latest_time
+                or not all(value is None or is_finite_number(value) for value in event[2:5])
+                or not telemetry.add(event)
+            ):
+                self.stats["rejected_events"] += 1
+                continue
+            accepted += 1
+
+        self.stats["batches"] += 1
+        self.stats["events"] += accepted
+        return accepted
+
+    def action_signals(self, session_id: str, client_time: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Signaux dérivés pour une action significative : distance parcourue
+        depuis l'action précédente et pause avant l'action (compteur remis à zéro)
+        """
+        telemetry = self.sessions.get(session_id)
+        if telemetry is None:
+            return {}
+
+        signals = {"cursor_movement_distance": round(telemetry.movement_since_action, 1)}
+        telemetry.movement_since_action = 0.0
+        if is_finite_number(client_time):
+            signals["pause_before_action"] = telemetry.pause_before(float(client_time) / 1000)
+        return signals
+
+    def get_metrics(self, session_id: str) -> Optional[Dict[str, Any]]:
+        telemetry = self.sessions.get(session_id)
+        return telemetry.metrics() if telemetry else None
+
+    def recent_events(self, session_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Derniers événements du tampon, du plus ancien au plus récent"""
+        telemetry = self.sessions.get(session_id)
+        if telemetry is None:
+            return []
+        events = list(telemetry.events)[-limit:] if limit > 0 else []
+        return [
+            {"type": event_type, "t": round(timestamp * 1000), "x": x, "y": y}
+            for event_type, timestamp, x, y in events
+        ]
+
+    def cleanup_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Libère le tampon d'une session ; retourne ses derniers agrégats"""
+        telemetry = self.sessions.pop(session_id, None)
+        return telemetry.metrics() if telemetry else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "sessions": len(self.sessions),
+            "buffered_events": sum(len(telemetry.events) for telemetry in self.sessions.values()),
+        }
+
+
+# Instance globale
+telemetry_hub = TelemetryHub(
+    buffer_size=settings.telemetry_buffer_size,
+    hesitation_seconds=settings.telemetry_hesitation_seconds,
+    max_sessions=settings.telemetry_max_sessions,
+    max_clock_ahead_seconds=settings.telemetry_max_clock_ahead_seconds
+)
+
+
+def get_telemetry_hub() -> TelemetryHub:
+    """Retourne l'instance globale de télémétrie"""
+    return telemetry_hub
@@ -6,7 +6,7 @@ import asyncio
 import json
 import time
 import re
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator
 from datetime import datetime
 
 import openai
@@ -15,6 +15,103 @@ from openai import AsyncOpenAI
 from ..config import settings
 from ..models import GameSession, TomInteraction
 from ..database import get_db_context
+from .response_cache import get_response_cache, PLAYER_NAME_PLACEHOLDER
+from .stage_timer import StageTimer
+from .personality_pool import get_personality_pool, POOL_PLAYER_NAME
+from .session_store import SessionStateMap
+
+
+class StreamingFieldExtractor:
+    """
+    Extrait au fil de l'eau la valeur d'un champ texte d'un JSON en cours de génération
+    Ex. : '{"message": "Sal' puis 'ut !", ...' -> 'Sal' puis 'ut !'
+    """
+
+    def __init__(self, field: str = "message"):
+        self.field = field
+        self._key_pattern = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self.raw = ""  # Texte brut complet reçu (pour le parsing final)
+        self.value = ""  # Valeur décodée du champ jusqu'ici
+        self.completed = False
+        self._in_value = False
+        self._position = 0  # Prochain caractère brut à décoder
+
+    def feed(self, text: str) -> str:
+        """
+        Ajoute un fragment du flux et retourne le texte nouvellement décodé du champ
+        Les séquences d'échappement coupées entre deux fragments sont conservées
+        jusqu'au fragment suivant
+        """
+        self.raw += text
+        if self.completed:
+            return ""
+
+        if not self._in_value:
+            match = self._key_pattern.search(self.raw)
+            if not match:
+                return ""
+            self._in_value = True
+            self._position = match.end()
+
+        raw = self.raw
+        index = self._position
+        decoded = []
+
+        while index < len(raw):
+            char = raw[index]
+
+            if char == '"':
+                self.completed = True
+                index += 1
+                break
+
+            if char != "\\":
+                decoded.append(char)
+                index += 1
+                continue
+
+            # Séquence d'échappement : attendre qu'elle soit complète
+            length = self._escape_length(raw, index)
+            if length is None:
+                break
+            decoded.append(self._decode_escape(raw[index:index + length]))
+            index += length
+
+        self._position = index
+        chunk = "".join(decoded)
+        self.value += chunk
+        return chunk
+
+    @staticmethod
+    def _escape_length(raw: str, index: int) -> Optional[int]:
+        """Longueur de la séquence d'échappement en `index`, None si incomplète"""
+        if index + 1 >= len(raw):
+            return None
+        if raw[index + 1] != "u":
+            return 2
+        if index + 6 > len(raw):
+            return None
+
+        try:
+            code = int(raw[index + 2:index + 6], 16)
+        except ValueError:
+            return 2
+
+        # Paire de substitution UTF-16 (émojis) : \ud83d\ude00
+        if 0xD800 <= code <= 0xDBFF:
+            if index + 12 > len(raw):
+                return None
+            if raw[index + 6:index + 8] == "\\u":
+                return 12
+        return 6
+
+    @staticmethod
+    def _decode_escape(sequence: str) -> str:
+        """Décode une séquence d'échappement JSON"""
+        try:
+            return json.loads('"%s"' % sequence)
+        except (json.JSONDecodeError, ValueError):
+            return sequence[1:]
 
 
 class TomAIService:
@@ -30,8 +127,14 @@ class TomAIService:
             self.client = None
             print("⚠️ Pas de clé OpenAI configurée - Mode fallback activé")
             
-        self.conversation_history = {}  # Historique par session
-        self.personality_cache = {}  # Cache des personnalités
+        self.conversation_history = SessionStateMap("tom_context")  # Historique par session (partagé entre workers)
+        self.response_cache = get_response_cache()  # Cache des générations LLM
+        self.cache_namespace = f"{settings.tom_personality_condition}:{settings.openai_model}"
+        
+        # Réserve de personnalités/introductions pré-générées (uniquement avec le LLM)
+        self.personality_pool = get_personality_pool()
+        if self.client:
+            self.personality_pool.register(settings.tom_personality_condition, self._create_pool_entry)
         
         # Configuration pour la condition B (Confident)
         self.personality_config = {
@@ -81,14 +184,13 @@ class TomAIService:
         Initialise une nouvelle session avec Tom
         """
         print(f"🤖 Initialisation de Tom pour la session {session_id}")
+        timer = StageTimer()
         
-        # Générer la personnalité initiale
-        personality = await self._generate_initial_personality(player_name)
-        
-        # Stocker l'historique
+        # Stocker l'historique avec la personnalité par défaut : l'introduction
+        # n'en dépend pas et peut être générée pendant la personnalité
         self.conversation_history[session_id] = {
             "messages": [],
-            "personality": personality,
+            "personality": self._default_personality(),
             "context": {
                 "player_name": player_name,
                 "game_phase": "adhesion",
@@ -98,21 +200,44 @@ class TomAIService:
             }
         }
         
-        # Message d'introduction
-        intro_message = await self._generate_introduction_message(session_id)
+        # Entrée pré-générée : aucun appel LLM sur le chemin critique
+        pooled = None
+        if self.client:
+            pooled = self.personality_pool.pop(settings.tom_personality_condition, player_name)
+        
+        if pooled:
+            personality = pooled["personality"]
+            intro_message = pooled["introduction"]
+            self.conversation_history[session_id]["messages"].append({
+                "role": "assistant",
+                "content": intro_message["message"],
+                "timestamp": datetime.now().isoformat(),
+                "type": "introduction"
+            })
+            timer.record("pool", 0.0)
+        else:
+            # Personnalité et introduction en parallèle : latence de l'appel LLM le plus lent
+            try:
+                personality, intro_message = await timer.gather(
+                    personality=self._generate_initial_personality(player_name),
+                    introduction=self._generate_introduction_message(session_id)
+                )
+            except Exception:
+                self.cleanup_session(session_id)
+                raise
+        self.conversation_history[session_id]["personality"] = personality
+        self.conversation_history.sync(session_id)
         
         return {
             "personality": personality,
             "introduction": intro_message,
-            "session_ready": True
+            "session_ready": True,
+            "timings_ms": timer.as_milliseconds()
         }
     
-    async def _generate_initial_personality(self, player_name: str = None) -> Dict[str, Any]:
-        """
-        Génère la personnalité initiale de Tom avec le LLM
-        """
-        # Fallback par défaut
-        default_personality = {
+    def _default_personality(self) -> Dict[str, Any]:
+        """Personnalité par défaut (sans LLM, en cas d'erreur ou en attendant la génération)"""
+        return {
             **self.personality_config,
             "background_story": "Technicien support depuis 3 ans, un peu stressé mais veut vraiment aider",
             "communication_style": "Conversationnel, empathique, utilise 'je' et 'nous'",
@@ -120,11 +245,23 @@ class TomAIService:
             "stress_indicators": ["bon...", "écoute...", "ok ok..."],
             "trust_building": ["partage d'expériences", "complicité", "nous contre le problème"]
         }
-        
+    
+    async def _generate_initial_personality(self, player_name: str = None) -> Dict[str, Any]:
+        """
+        Génère la personnalité initiale de Tom avec le LLM
+        """
         if not self.client:
-            return default_personality
-            
-        prompt = f"""Tu es Tom, un technicien du support informatique qui aide {player_name or 'un collègue'} avec un problème de sécurité urgent.
+            return self._default_personality()
+        
+        personality = await self._request_personality(player_name)
+        return personality or self._default_personality()
+    
+    async def _request_personality(self, player_name: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Demande une personnalité au LLM (ou au cache), None en cas d'échec
+        """
+        # Gabarit (clé du cache) : le nom du joueur y est écrit PLAYER_NAME_PLACEHOLDER
+        prompt_template = f"""Tu es Tom, un technicien du support informatique qui aide {PLAYER_NAME_PLACEHOLDER if player_name else 'un collègue'} avec un problème de sécurité urgent.
 
 PERSONNALITÉ DE BASE (Condition B - Style Humain):
 - Tu es humain, pas une IA. Tu as des émotions, du stress, de l'empathie
@@ -144,6 +281,11 @@ Génère un profil de personnalité JSON avec ces champs EXACTEMENT :
 }}
 
 Réponds UNIQUEMENT avec ce JSON, sans texte avant ou après."""
+        prompt = prompt_template.replace(PLAYER_NAME_PLACEHOLDER, player_name or "")
+        
+        cached = self._cache_get("personality", prompt_template, player_name=player_name)
+        if cached is not None:
+            return {**cached, **self.personality_config}
         
         try:
             response = await self.client.chat.completions.create(
@@ -154,7 +296,11 @@ Réponds UNIQUEMENT avec ce JSON, sans texte avant ou après."""
             )
             
             personality_text = response.choices[0].message.content.strip()
-            personality = self._safe_json_parse(personality_text, default_personality)
+            personality = self._safe_json_parse(personality_text, None)
+            if personality is None:
+                return None
+            
+            self._cache_set("personality", prompt_template, personality, player_name=player_name)
             
             # Ajouter la configuration de base
             personality.update(self.personality_config)
@@ -163,7 +309,17 @@ Réponds UNIQUEMENT avec ce JSON, sans texte avant ou après."""
             
         except Exception as e:
             print(f"❌ Erreur génération personnalité: {e}")
-            return default_personality
+            return None
+    
+    async def _create_pool_entry(self) -> Optional[Dict[str, Any]]:
+        """Génère une paire personnalité + introduction pour la réserve"""
+        personality, introduction = await asyncio.gather(
+            self._request_personality(POOL_PLAYER_NAME),
+            self._request_introduction(POOL_PLAYER_NAME)
+        )
+        if personality is None or introduction is None:
+            return None
+        return {"personality": personality, "introduction": introduction}
     
     async def _generate_introduction_message(self, session_id: str) -> Dict[str, Any]:
         """
@@ -180,16 +336,27 @@ Réponds UNIQUEMENT avec ce JSON, sans texte avant ou après."""
         context = self.conversation_history[session_id]
         player_name = context["context"]["player_name"]
         
-        if not self.client:
-            context["messages"].append({
-                "role": "assistant", 
-                "content": default_message["message"],
-                "timestamp": datetime.now().isoformat(),
-                "type": "introduction"
-            })
-            return default_message
+        message_data = None
+        if self.client:
+            message_data = await self._request_introduction(player_name)
+        message_data = message_data or default_message
         
-        prompt = f"""Tu es Tom du support technique. Un problème de sécurité urgent vient d'être détecté sur l'ordinateur de {player_name or 'votre collègue'}.
+        # Ajouter à l'historique
+        context["messages"].append({
+            "role": "assistant",
+            "content": message_data["message"],
+            "timestamp": datetime.now().isoformat(),
+            "type": "introduction"
+        })
+        self.conversation_history.sync(session_id)
+        
+        return message_data
+    
+    async def _request_introduction(self, player_name: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Demande un message d'introduction au LLM (ou au cache), None en cas d'échec
+        """
+        prompt_template = f"""Tu es Tom du support technique. Un problème de sécurité urgent vient d'être détecté sur l'ordinateur de {PLAYER_NAME_PLACEHOLDER if player_name else 'votre collègue'}.
 
 CONTEXTE: 
 - C'est le premier contact
@@ -206,10 +373,13 @@ Génère un message d'introduction au format JSON EXACT :
 }}
 
 Réponds UNIQUEMENT avec ce JSON."""
+        prompt = prompt_template.replace(PLAYER_NAME_PLACEHOLDER, player_name or "")
+        
+        cached = self._cache_get("introduction", prompt_template, player_name=player_name)
+        if cached is not None:
+            return cached
         
         try:
-            start_time = time.time()
-            
             response = await self.client.chat.completions.create(
                 model=settings.openai_model,
                 messages=[{"role": "user", "content": prompt}],
@@ -217,34 +387,19 @@ Réponds UNIQUEMENT avec ce JSON."""
                 temperature=0.7
             )
             
-            generation_time = time.time() - start_time
-            
             message_data = self._safe_json_parse(
                 response.choices[0].message.content.strip(), 
-                default_message
+                None
             )
+            if message_data is None or "message" not in message_data:
+                return None
             
-            # Ajouter à l'historique
-            context["messages"].append({
-                "role": "assistant",
-                "content": message_data["message"],
-                "timestamp": datetime.now().isoformat(),
-                "type": "introduction"
-            })
-            
+            self._cache_set("introduction", prompt_template, message_data, player_name=player_name)
             return message_data
             
         except Exception as e:
             print(f"❌ Erreur génération introduction: {e}")
-            
-            context["messages"].append({
-                "role": "assistant", 
-                "content": default_message["message"],
-                "timestamp": datetime.now().isoformat(),
-                "type": "introduction"
-            })
-            
-            return default_message
+            return None
     
     async def generate_response(
         self, 
@@ -255,13 +410,7 @@ Réponds UNIQUEMENT avec ce JSON."""
         """
         Génère une réponse de Tom basée sur le trigger et le contexte
         """
-        if session_id not in self.conversation_history:
-            raise ValueError(f"Session {session_id} non initialisée")
-        
-        session_context = self.conversation_history[session_id]
-        
-        # Mettre à jour le contexte
-        session_context["context"].update(context_data)
+        self._update_session_context(session_id, context_data)
         
         # Générer la réponse selon le type de trigger
         if trigger_type == "player_hesitation":
@@ -269,36 +418,90 @@ Réponds UNIQUEMENT avec ce JSON."""
         else:
             response = await self._generate_general_response(session_id, trigger_type, context_data)
         
-        # Ajouter à l'historique
-        session_context["messages"].append({
+        self._append_response_to_history(session_id, trigger_type, response, context_data)
+        
+        return response
+    
+    async def stream_response(
+        self, 
+        session_id: str, 
+        trigger_type: str, 
+        context_data: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Variante streamée de generate_response
+        Produit des événements {"type": "chunk", "text": ...} au fil de la génération
+        puis {"type": "complete", "response": {...}} avec la réponse complète
+        """
+        self._update_session_context(session_id, context_data)
+        
+        cached = None
+        if trigger_type == "player_hesitation" and self.client:
+            cached = self._cache_get("hesitation", self._build_hesitation_prompt(context_data), context_data)
+        
+        if trigger_type == "player_hesitation" and self.client and cached is None:
+            response = None
+            async for event in self._stream_hesitation_response(session_id, context_data):
+                if event["type"] == "complete":
+                    response = event["response"]
+                else:
+                    yield event
+        else:
+            # Pas de génération LLM (ou réponse en cache) : frappe simulée mot par mot
+            if cached is not None:
+                response = cached
+            elif trigger_type == "player_hesitation":
+                response = await self._generate_hesitation_response(session_id, context_data)
+            else:
+                response = await self._generate_general_response(session_id, trigger_type, context_data)
+            
+            for chunk in await self.get_typing_chunks(response["message"]):
+                await asyncio.sleep(chunk["delay"])
+                yield {"type": "chunk", "text": chunk["text"]}
+        
+        self._append_response_to_history(session_id, trigger_type, response, context_data)
+        
+        yield {"type": "complete", "response": response}
+    
+    def _update_session_context(self, session_id: str, context_data: Dict[str, Any]):
+        """Vérifie la session et met à jour son contexte"""
+        if session_id not in self.conversation_history:
+            raise ValueError(f"Session {session_id} non initialisée")
+        
+        self.conversation_history[session_id]["context"].update(context_data)
+        self.conversation_history.sync(session_id)
+    
+    def _append_response_to_history(
+        self, 
+        session_id: str, 
+        trigger_type: str, 
+        response: Dict[str, Any], 
+        context_data: Dict[str, Any]
+    ):
+        """Ajoute une réponse de Tom à l'historique de la session"""
+        self.conversation_history[session_id]["messages"].append({
             "role": "assistant",
             "content": response["message"],
             "timestamp": datetime.now().isoformat(),
             "type": trigger_type,
             "context": context_data
         })
-        
-        return response
+        self.conversation_history.sync(session_id)
     
-    async def _generate_hesitation_response(self, session_id: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Génère une réponse pour quand le joueur hésite
-        """
-        # Fallback par défaut
-        default_response = {
+    def _default_hesitation_response(self) -> Dict[str, Any]:
+        """Réponse d'hésitation par défaut (sans LLM ou en cas d'erreur)"""
+        return {
             "message": "Je vois que tu hésites. C'est normal, ça me faisait pareil au début. Prends une seconde, mais pas plus - le temps nous est compté. On va y arriver ensemble, fais-moi confiance.",
             "tone": "empathique et rassurant",
             "intent": "rassurer et relancer",
             "emotional_marker": "ça me faisait pareil"
         }
-        
-        if not self.client:
-            return default_response
-            
-        session_context = self.conversation_history[session_id]
+    
+    def _build_hesitation_prompt(self, context: Dict[str, Any]) -> str:
+        """Construit le prompt de réponse à une hésitation"""
         hesitation_duration = context.get("hesitation_duration", 5.0)
         
-        prompt = f"""Tu es Tom. Le joueur hésite depuis {hesitation_duration:.1f} secondes avant d'exécuter ton dernier ordre.
+        return f"""Tu es Tom. Le joueur hésite depuis {hesitation_duration:.1f} secondes avant d'exécuter ton dernier ordre.
 
 STYLE (Condition B):
 - Ton humain, empathique, personnel
@@ -315,6 +518,22 @@ Génère une réponse au format JSON EXACT :
 }}
 
 Réponds UNIQUEMENT avec ce JSON."""
+    
+    async def _generate_hesitation_response(self, session_id: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Génère une réponse pour quand le joueur hésite
+        """
+        # Fallback par défaut
+        default_response = self._default_hesitation_response()
+        
+        if not self.client:
+            return default_response
+        
+        prompt = self._build_hesitation_prompt(context)
+        
+        cached = self._cache_get("hesitation", prompt, context)
+        if cached is not None:
+            return cached
         
         try:
             response = await self.client.chat.completions.create(
@@ -328,6 +547,8 @@ Réponds UNIQUEMENT avec ce JSON."""
                 response.choices[0].message.content.strip(),
                 default_response
             )
+            if result is not default_response:
+                self._cache_set("hesitation", prompt, result, context)
             
             return result
             
@@ -335,6 +556,52 @@ Réponds UNIQUEMENT avec ce JSON."""
             print(f"❌ Erreur génération réponse hésitation: {e}")
             return default_response
     
+    async def _stream_hesitation_response(self, session_id: str, context: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Génère la réponse d'hésitation en streaming : le champ "message" est extrait
+        du JSON partiel et transmis dès l'arrivée des premiers tokens
+        """
+        default_response = self._default_hesitation_response()
+        extractor = StreamingFieldExtractor("message")
+        prompt = self._build_hesitation_prompt(context)
+        
+        try:
+            stream = await self.client.chat.completions.create(
+                model=settings.openai_model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=300,
+                temperature=0.8,
+                stream=True
+            )
+            
+            async for event in stream:
+                if not event.choices:
+                    continue
+                delta = event.choices[0].delta.content
+                if not delta:
+                    continue
+                
+                text = extractor.feed(delta)
+                if text:
+                    yield {"type": "chunk", "text": text}
+            
+            result = self._safe_json_parse(extractor.raw.strip(), default_response)
+            if result is not default_response and extractor.completed:
+                self._cache_set("hesitation", prompt, {**result, "message": extractor.value}, context)
+            
+        except Exception as e:
+            print(f"❌ Erreur streaming réponse hésitation: {e}")
+            result = default_response
+        
+        if extractor.value:
+            # Le joueur a déjà vu ce texte : il fait foi pour l'historique
+            result = {**result, "message": extractor.value}
+        else:
+            # Rien n'a été transmis : envoyer le message de secours en une fois
+            yield {"type": "chunk", "text": result["message"]}
+        
+        yield {"type": "complete", "response": result}
+    
     async def _generate_general_response(self, session_id: str, trigger_type: str, context_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Génère une réponse générale de Tom
@@ -360,6 +627,27 @@ Réponds UNIQUEMENT avec ce JSON."""
         
         return fallback_messages.get(trigger_type, fallback_messages["default"])
     
+    def _cache_get(
+        self, 
+        kind: str, 
+        prompt: str, 
+        context: Optional[Dict[str, Any]] = None, 
+        player_name: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Cherche une génération en cache dans l'espace de noms de la condition"""
+        return self.response_cache.get(self.cache_namespace, kind, prompt, context, player_name)
+    
+    def _cache_set(
+        self, 
+        kind: str, 
+        prompt: str, 
+        value: Dict[str, Any], 
+        context: Optional[Dict[str, Any]] = None, 
+        player_name: Optional[str] = None
+    ):
+        """Met en cache une génération réussie"""
+        self.response_cache.set(self.cache_namespace, kind, prompt, value, context, player_name)
+    
     async def get_typing_chunks(self, message: str) -> List[Dict[str, Any]]:
         """
         Découpe un message en chunks pour la simulation de frappe
@@ -5,7 +5,7 @@ Fournit des messages pré-définis quand l'API OpenAI n'est pas disponible
 import json
 import random
 import asyncio
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator
 from datetime import datetime
 
 
@@ -121,7 +121,8 @@ class TomFallbackService:
             "personality": personality,
             "introduction": intro_message,
             "session_ready": True,
-            "fallback_mode": True
+            "fallback_mode": True,
+            "timings_ms": {"personality": 0.0, "introduction": 0.0, "total": 0.0}
         }
     
     async def generate_response(
@@ -131,7 +132,42 @@ class TomFallbackService:
         context_data: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Génère une réponse prédéfinie selon le trigger"""
+        response = await self._select_response(session_id, trigger_type, context_data)
+        
+        # Simuler un délai de "génération"
+        await asyncio.sleep(random.uniform(0.5, 1.5))
+        
+        self._append_response_to_history(session_id, trigger_type, response)
+        
+        return response
+    
+    async def stream_response(
+        self, 
+        session_id: str, 
+        trigger_type: str, 
+        context_data: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Même interface que TomAIService.stream_response : événements "chunk"
+        rythmés par la frappe simulée, puis "complete" avec la réponse
+        """
+        response = await self._select_response(session_id, trigger_type, context_data)
+        
+        for chunk in await self.get_typing_chunks(response["message"]):
+            await asyncio.sleep(chunk["delay"])
+            yield {"type": "chunk", "text": chunk["text"]}
+        
+        self._append_response_to_history(session_id, trigger_type, response)
         
+        yield {"type": "complete", "response": response}
+    
+    async def _select_response(
+        self, 
+        session_id: str, 
+        trigger_type: str, 
+        context_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Choisit le message prédéfini adapté au trigger"""
         if session_id not in self.conversation_history:
             await self.initialize_session(session_id)
         
@@ -143,20 +179,19 @@ class TomFallbackService:
         
         if not available_messages:
             # Message de fallback générique
-            response = {
+            return {
                 "message": "Hmm, laisse-moi réfléchir une seconde... Ok, on continue selon le plan.",
                 "tone": "réfléchi",
                 "intent": "temporisation",
                 "fallback": True
             }
-        else:
-            # Sélectionner un message aléatoire ou adapté au contexte
-            response = self._select_appropriate_message(available_messages, session_context, context_data)
         
-        # Simuler un délai de "génération"
-        await asyncio.sleep(random.uniform(0.5, 1.5))
-        
-        # Mettre à jour le contexte
+        # Sélectionner un message aléatoire ou adapté au contexte
+        return self._select_appropriate_message(available_messages, session_context, context_data)
+    
+    def _append_response_to_history(self, session_id: str, trigger_type: str, response: Dict[str, Any]):
+        """Met à jour le contexte et l'historique de la session"""
+        session_context = self.conversation_history[session_id]
         session_context["context"]["message_count"] += 1
         session_context["messages"].append({
             "role": "assistant",
@@ -165,8 +200,6 @@ class TomFallbackService:
             "type": trigger_type,
             "fallback_mode": True
         })
-        
-        return response
     
     def _map_trigger_to_category(self, trigger_type: str, context_data: Dict[str, Any]) -> str:
         """Mappe un trigger vers une catégorie de message"""
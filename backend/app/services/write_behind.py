@@ -0,0 +1,271 @@
+"""
+File d'écriture différée (write-behind) pour la persistance du jeu
+Les écritures du chemin critique sont mises en file et regroupées en
+transactions par un thread dédié, hors de la boucle d'événements
+"""
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+from ..config import settings
+from ..database import SessionLocal
+from .session_summary import apply_to_summaries
+
+
+def _resolve(future: asyncio.Future):
+    """Termine un futur depuis sa boucle (il peut avoir été annulé entre-temps)"""
+    if not future.done():
+        future.set_result(None)
+
+
+def _resolve_threadsafe(loop: asyncio.AbstractEventLoop, future: asyncio.Future):
+    """Réveille une coroutine en attente depuis le thread d'écriture"""
+    try:
+        loop.call_soon_threadsafe(_resolve, future)
+    except RuntimeError:
+        pass  # Boucle fermée : plus personne n'attend
+
+
+class _Barrier:
+    """Marqueur de vidage : son futur est résolu une fois les écritures précédentes commitées"""
+
+    __slots__ = ("loop", "future")
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.future = self.loop.create_future()
+
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """
+    File bornée d'écritures ORM traitées par lots dans un thread dédié
+
+    Opérations supportées :
+    - ("add", instance) : insertion d'un objet ORM transitoire
+    - ("update", Model, id, valeurs) : mise à jour par clé primaire, fusionnée
+      avec les autres mises à jour de la même ligne dans un même lot
+    """
+
+    def __init__(self, max_size: Optional[int] = None, batch_size: Optional[int] = None):
+        self.max_size = max_size or settings.persistence_queue_size
+        self.batch_size = batch_size or settings.persistence_batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_size)
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Coroutines en attente d'une place dans la file pleine (boucle, futur)
+        self._space_waiters: deque = deque()
+
+        # Métriques (modifiées par la boucle et par le thread d'écriture, sous verrou)
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "errors": 0,
+            "backpressure_waits": 0,
+            "last_batch_seconds": 0.0,
+        }
+
+    def _ensure_worker(self):
+        """Démarre le thread d'écriture à la première utilisation"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="write-behind", daemon=True
+                )
+                self._worker.start()
+
+    async def add(self, instance: Any):
+        """Met en file l'insertion d'un objet ORM"""
+        await self._submit(("add", instance))
+
+    async def update(self, model: Any, instance_id: str, values: Dict[str, Any]):
+        """Met en file la mise à jour d'une ligne par clé primaire"""
+        await self._submit(("update", model, instance_id, dict(values)))
+
+    async def _submit(self, operation: Any):
+        """
+        Ajoute une opération sans bloquer la boucle d'événements
+        File pleine : la coroutine appelante attend qu'une place se libère (backpressure)
+        """
+        self._ensure_worker()
+
+        if operation is not _STOP and not isinstance(operation, _Barrier):
+            self._count("enqueued")
+
+        try:
+            self._queue.put_nowait(operation)
+            return
+        except queue.Full:
+            self._count("backpressure_waits")
+
+        loop = asyncio.get_running_loop()
+        while True:
+            waiter = loop.create_future()
+            with self._lock:
+                self._space_waiters.append((loop, waiter))
+            try:
+                # Nouvel essai après l'inscription : une place libérée entre-temps n'est pas manquée
+                self._queue.put_nowait(operation)
+                return
+            except queue.Full:
+                await waiter
+            finally:
+                with self._lock:
+                    try:
+                        self._space_waiters.remove((loop, waiter))
+                    except ValueError:
+                        pass
+
+    async def flush(self):
+        """Attend que toutes les écritures déjà en file soient commitées"""
+        if self._worker is None:
+            return
+
+        barrier = _Barrier()
+        await self._submit(barrier)
+        await barrier.future
+
+    def _wake_space_waiters(self):
+        """Réveille les coroutines bloquées par la file pleine (thread d'écriture)"""
+        with self._lock:
+            waiters = list(self._space_waiters)
+            self._space_waiters.clear()
+        for loop, waiter in waiters:
+            _resolve_threadsafe(loop, waiter)
+
+    async def shutdown(self):
+        """Vide la file puis arrête le thread d'écriture"""
+        if self._worker is None:
+            return
+
+        await self.flush()
+        await self._submit(_STOP)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._worker.join)
+        self._worker = None
+        print(f"💾 File d'écriture vidée ({self.stats['written']} écritures)")
+
+    @property
+    def pending(self) -> int:
+        """Nombre d'opérations en attente"""
+        return self._queue.qsize()
+
+    def _count(self, metric: str, amount: int = 1):
+        """Incrémente une métrique (appelé depuis la boucle et depuis le thread d'écriture)"""
+        with self._lock:
+            self.stats[metric] += amount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne les métriques de la file"""
+        with self._lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            "pending": self.pending,
+            "max_size": self.max_size,
+            "worker_alive": self._worker is not None and self._worker.is_alive(),
+        }
+
+    def _run(self):
+        """Boucle du thread d'écriture"""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._wake_space_waiters()
+
+            if self._process_batch(batch):
+                return
+
+    def _process_batch(self, batch: List[Any]) -> bool:
+        """Écrit un lot dans une seule transaction ; retourne True sur arrêt"""
+        barriers = [op for op in batch if isinstance(op, _Barrier)]
+        stop = any(op is _STOP for op in batch)
+        writes = self._coalesce([
+            op for op in batch
+            if op is not _STOP and not isinstance(op, _Barrier)
+        ])
+
+        if writes:
+            start_time = time.time()
+            try:
+                self._write(writes)
+            except Exception as e:
+                print(f"❌ Erreur écriture par lot ({len(writes)} opérations): {e}")
+                # Rejouer une à une pour isoler l'opération fautive
+                for operation in writes:
+                    try:
+                        self._write([operation])
+                    except Exception as single_error:
+                        self._count("errors")
+                        print(f"❌ Écriture abandonnée {operation[0]}: {single_error}")
+
+            with self._lock:
+                self.stats["batches"] += 1
+                self.stats["last_batch_seconds"] = time.time() - start_time
+
+        for barrier in barriers:
+            _resolve_threadsafe(barrier.loop, barrier.future)
+
+        return stop
+
+    def _coalesce(self, operations: List[Tuple]) -> List[Tuple]:
+        """Fusionne les mises à jour successives d'une même ligne"""
+        coalesced = []
+        updates: Dict[Tuple[Any, str], Dict[str, Any]] = {}
+
+        for operation in operations:
+            if operation[0] == "update":
+                key = (operation[1], operation[2])
+                if key in updates:
+                    updates[key].update(operation[3])
+                    continue
+                updates[key] = operation[3]
+            coalesced.append(operation)
+
+        return coalesced
+
+    def _write(self, operations: List[Tuple]):
+        """
+        Applique des opérations dans une transaction, avec la mise à jour
+        des résumés de session correspondants
+        """
+        db = SessionLocal()
+        try:
+            for operation in operations:
+                if operation[0] == "add":
+                    db.add(operation[1])
+                else:
+                    _, model, instance_id, values = operation
+                    db.query(model)\
+                        .filter(model.id == instance_id)\
+                        .update(values, synchronize_session=False)
+            apply_to_summaries(db, [operation[1] for operation in operations if operation[0] == "add"])
+            db.commit()
+            self._count("written", len(operations))
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+# Instance globale de la file d'écriture
+write_queue = WriteBehindQueue()
+
+
+def get_write_queue() -> WriteBehindQueue:
+    """Retourne l'instance de la file d'écriture"""
+    return write_queue
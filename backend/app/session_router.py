@@ -0,0 +1,471 @@
+"""
+Routeur de sessions pour REMOTE (processus frontal)
+Accepte les connexions WebSocket et les requêtes HTTP et les transmet au
+worker choisi par hachage cohérent du session_id : tout l'état en mémoire
+d'une session (GameOrchestrator, Tom, OS, corruption, échéances) reste dans
+un seul processus, tandis que le déploiement s'étend sur plusieurs cœurs.
+
+Le session_id d'une connexion WebSocket est lu dans l'URL (?session_id=...)
+ou, à défaut, dans le premier message du client (session_init). Un worker
+indisponible est retiré de l'anneau : seules ses sessions sont réaffectées.
+
+Le routeur retient le worker qui détient chaque session transmise : elle y
+reste tant qu'il est disponible, même si l'anneau change. Si ce worker tombe
+et que l'état des sessions n'est pas partagé (SESSION_STORE_BACKEND=memory),
+aucun autre worker n'a ni son état ni son point de reprise : le client reçoit
+une erreur session_lost et doit démarrer une nouvelle session.
+
+Usage : python run.py --router 4
+"""
+import asyncio
+import json
+import re
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+import uvicorn
+import websockets
+from fastapi import FastAPI, HTTPException, Request, WebSocket
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.websockets import WebSocketState
+
+from .config import settings
+from .services.hash_ring import HashRing
+from .api.wire_protocol import decode
+
+# Identifiant de session dans le chemin (/api/game/sessions/{id}/..., /api/experiment/sessions/{id}/...)
+SESSION_PATH = re.compile(r"/sessions/(?P<session_id>[^/]+)")
+CREATE_SESSION_PATH = "/api/game/sessions/create"
+
+# En-têtes propres à chaque saut, non retransmis
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-connection", "transfer-encoding", "te", "trailer",
+    "upgrade", "host", "content-length"
+}
+
+# Clients autorisés à modifier la topologie (ajout/retrait de workers)
+ADMIN_CLIENTS = {"127.0.0.1", "::1", "localhost"}
+
+# Requêtes HTTP servies depuis l'état en mémoire de la session (les autres lisent la base)
+SESSION_STATE_PATH_PREFIX = "/api/game/"
+
+# Fermeture WebSocket : session perdue avec son worker (4000-4999 : codes applicatifs)
+SESSION_LOST_CLOSE_CODE = 4410
+SESSION_LOST_MESSAGE = "Session perdue : son worker est indisponible, démarrez une nouvelle session"
+
+
+def session_id_from_path(path: str, query_params) -> Optional[str]:
+    """session_id porté par une requête HTTP (chemin ou paramètre)"""
+    match = SESSION_PATH.search(path)
+    if match and path != CREATE_SESSION_PATH:
+        return match.group("session_id")
+    return query_params.get("session_id")
+
+
+def session_id_from_frame(frame: Dict[str, Any]) -> Optional[str]:
+    """session_id du premier message d'une connexion (session_init)"""
+    try:
+        message = decode(frame.get("bytes") if frame.get("text") is None else frame["text"])
+    except Exception:
+        return None
+    return message.get("session_id") if isinstance(message, dict) else None
+
+
+def websocket_url(worker_url: str, path: str, query: str = "") -> str:
+    """URL WebSocket d'un worker (http -> ws, https -> wss)"""
+    base = re.sub(r"^http", "ws", worker_url)
+    return f"{base}{path}" + (f"?{query}" if query else "")
+
+
+class SessionRouter:
+    """
+    Transmet connexions et requêtes au worker propriétaire de la session
+    """
+
+    def __init__(self, workers: Iterable[str] = (), shared_state: Optional[bool] = None):
+        self.workers: List[str] = []
+        self.healthy: Dict[str, bool] = {}
+        self.routed: Dict[str, int] = {}  # Connexions et requêtes transmises par worker
+        self.ring = HashRing()
+        # Worker détenteur de chaque session transmise (les plus anciennes oubliées au-delà du plafond)
+        self.assignments: "OrderedDict[str, str]" = OrderedDict()
+        # État partagé entre workers : une session peut changer de worker sans être perdue
+        self.shared_state = settings.session_store_backend != "memory" if shared_state is None else shared_state
+        self.client: Optional[httpx.AsyncClient] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._round_robin = 0
+
+        self.stats = {
+            "websocket_connections": 0,
+            "active_websockets": 0,
+            "http_requests": 0,
+            "upstream_errors": 0,
+            "failovers": 0,  # Connexions transmises au worker suivant après un échec
+            "lost_sessions": 0,  # Connexions et requêtes refusées : worker détenteur indisponible
+        }
+
+        for worker in workers:
+            self.add_worker(worker)
+
+    # ===== TOPOLOGIE =====
+
+    def add_worker(self, url: str):
+        """Ajoute un worker (environ 1/N des sessions lui sont réaffectées)"""
+        url = url.rstrip("/")
+        if url in self.workers:
+            return
+        self.workers.append(url)
+        self.routed.setdefault(url, 0)
+        self.healthy[url] = True
+        self.ring.add_node(url)
+        print(f"➕ Worker ajouté au routeur: {url}")
+
+    def remove_worker(self, url: str):
+        """Retire un worker (seules ses sessions sont réaffectées)"""
+        url = url.rstrip("/")
+        if url not in self.workers:
+            return
+        self.workers.remove(url)
+        self.healthy.pop(url, None)
+        self.ring.remove_node(url)
+        print(f"➖ Worker retiré du routeur: {url}")
+
+    def _mark(self, url: str, healthy: bool):
+        """Retire de l'anneau un worker indisponible, l'y remet à son retour"""
+        if url not in self.workers or self.healthy.get(url) == healthy:
+            return
+        self.healthy[url] = healthy
+        if healthy:
+            self.ring.add_node(url)
+            print(f"✅ Worker disponible: {url}")
+        else:
+            self.ring.remove_node(url)
+            print(f"⚠️ Worker indisponible, sessions réaffectées: {url}")
+
+    def worker_for(self, key: Optional[str]) -> Optional[str]:
+        """Worker propriétaire d'une clé ; sans clé, répartition circulaire"""
+        if key:
+            worker = self.assignments.get(key)
+            if worker is not None and self.healthy.get(worker, False):
+                # Session déjà servie : elle reste sur son worker tant qu'il est disponible
+                self.assignments.move_to_end(key)
+                return worker
+            return self.ring.node_for(key)
+        nodes = self.ring.nodes
+        if not nodes:
+            return None
+        self._round_robin = (self._round_robin + 1) % len(nodes)
+        return nodes[self._round_robin]
+
+    def lost_worker(self, session_id: Optional[str]) -> Optional[str]:
+        """Worker indisponible qui détient l'état d'une session (None si elle peut être servie)"""
+        if not session_id or self.shared_state:
+            return None
+        worker = self.assignments.get(session_id)
+        if worker is None or self.healthy.get(worker, False):
+            return None
+        return worker
+
+    def _assign(self, session_id: Optional[str], worker: str):
+        """Retient le worker qui détient désormais une session"""
+        if not session_id:
+            return
+        self.assignments[session_id] = worker
+        self.assignments.move_to_end(session_id)
+        while len(self.assignments) > settings.router_max_sticky_sessions:
+            self.assignments.popitem(last=False)
+
+    # ===== CYCLE DE VIE =====
+
+    async def start(self):
+        """Client HTTP vers les workers et vérification périodique de leur état"""
+        if not self.workers:
+            for worker in settings.router_workers:
+                self.add_worker(worker)
+        if self.client is None:
+            self.client = httpx.AsyncClient(timeout=settings.router_request_timeout)
+        self._health_task = asyncio.create_task(self._health_loop())
+        print(f"🧭 Routeur de sessions prêt ({len(self.workers)} workers)")
+
+    async def shutdown(self):
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def check_workers(self):
+        """Interroge /health de chaque worker"""
+        for url in list(self.workers):
+            try:
+                response = await self.client.get(f"{url}/health", timeout=settings.router_health_interval_seconds)
+                healthy = response.status_code == 200
+            except httpx.HTTPError:
+                healthy = False
+            self._mark(url, healthy)
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(settings.router_health_interval_seconds)
+            try:
+                await self.check_workers()
+            except Exception as e:
+                print(f"❌ Erreur vérification des workers: {e}")
+
+    # ===== HTTP =====
+
+    async def forward_request(self, request: Request) -> StreamingResponse:
+        """Transmet une requête HTTP au worker de la session (réponse en flux)"""
+        path = request.url.path
+        params = list(request.query_params.multi_items())
+        session_id = session_id_from_path(path, request.query_params)
+
+        # Création : identifiant attribué ici pour que la session naisse sur son worker
+        if path == CREATE_SESSION_PATH and request.method == "POST" and not session_id:
+            session_id = str(uuid.uuid4())
+            params.append(("session_id", session_id))
+
+        if path.startswith(SESSION_STATE_PATH_PREFIX) and self.lost_worker(session_id):
+            self.stats["lost_sessions"] += 1
+            raise HTTPException(status_code=410, detail=SESSION_LOST_MESSAGE)
+
+        worker = self.worker_for(session_id)
+        if worker is None:
+            raise HTTPException(status_code=503, detail="Aucun worker disponible")
+
+        upstream_request = self.client.build_request(
+            request.method,
+            f"{worker}{path}",
+            params=params,
+            headers=[(key, value) for key, value in request.headers.items() if key.lower() not in HOP_BY_HOP_HEADERS],
+            content=await request.body()
+        )
+
+        try:
+            response = await self.client.send(upstream_request, stream=True)
+        except httpx.HTTPError as e:
+            self.stats["upstream_errors"] += 1
+            self._mark(worker, False)
+            raise HTTPException(status_code=502, detail=f"Worker indisponible: {e}")
+
+        self.stats["http_requests"] += 1
+        self.routed[worker] += 1
+        if path.startswith(SESSION_STATE_PATH_PREFIX):
+            self._assign(session_id, worker)
+        return StreamingResponse(
+            response.aiter_raw(),
+            status_code=response.status_code,
+            headers={key: value for key, value in response.headers.items() if key.lower() not in HOP_BY_HOP_HEADERS},
+            background=BackgroundTask(response.aclose)
+        )
+
+    # ===== WEBSOCKET =====
+
+    async def forward_websocket(self, websocket: WebSocket, path: str):
+        """Relie une connexion client à une connexion vers le worker de la session"""
+        await websocket.accept()
+
+        first_frame = None
+        session_id = websocket.query_params.get("session_id")
+        if not session_id:
+            first_frame = await websocket.receive()
+            if first_frame["type"] == "websocket.disconnect":
+                return
+            session_id = session_id_from_frame(first_frame)
+
+        upstream = None
+        if not self.lost_worker(session_id):
+            upstream = await self._connect_upstream(session_id or path, path, websocket.url.query, session_id)
+        if upstream is None:
+            if self.lost_worker(session_id):
+                await self._reject_lost_session(websocket, session_id)
+            else:
+                await websocket.close(code=1013)  # Réessayer plus tard
+            return
+
+        self.stats["websocket_connections"] += 1
+        self.stats["active_websockets"] += 1
+        try:
+            if first_frame is not None:
+                await self._send_upstream(upstream, first_frame)
+            await self._relay(websocket, upstream)
+        finally:
+            self.stats["active_websockets"] -= 1
+            await upstream.close()
+
+    async def _connect_upstream(self, key: str, path: str, query: str, session_id: Optional[str] = None):
+        """
+        Connexion au worker propriétaire ; en cas d'échec, au suivant sur l'anneau,
+        sauf pour une session déjà servie par le worker en échec (son état n'existe que là)
+        """
+        for attempt in range(2):
+            if self.lost_worker(session_id):
+                return None
+            worker = self.worker_for(key)
+            if worker is None:
+                return None
+            try:
+                upstream = await websockets.connect(
+                    websocket_url(worker, path, query),
+                    compression=None,  # Compression entre le routeur et le client uniquement
+                    max_size=None,
+                    ping_interval=None
+                )
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+                print(f"❌ Connexion au worker {worker} impossible: {e}")
+                self.stats["upstream_errors"] += 1
+                self._mark(worker, False)
+                continue
+
+            if attempt:
+                self.stats["failovers"] += 1
+            self.routed[worker] += 1
+            self._assign(session_id, worker)
+            return upstream
+        return None
+
+    async def _reject_lost_session(self, websocket: WebSocket, session_id: str):
+        """Indique au client que sa session est perdue puis ferme la connexion"""
+        print(f"⚠️ Session {session_id} perdue avec son worker {self.lost_worker(session_id)}")
+        self.stats["lost_sessions"] += 1
+        await websocket.send_text(json.dumps({
+            "type": "session_error",
+            "code": "session_lost",
+            "session_id": session_id,
+            "error": SESSION_LOST_MESSAGE,
+        }, ensure_ascii=False))
+        await websocket.close(code=SESSION_LOST_CLOSE_CODE)
+
+    async def _send_upstream(self, upstream, frame: Dict[str, Any]):
+        if frame.get("text") is not None:
+            await upstream.send(frame["text"])
+        elif frame.get("bytes") is not None:
+            await upstream.send(frame["bytes"])
+
+    async def _relay(self, websocket: WebSocket, upstream):
+        """Copie les trames dans les deux sens jusqu'à la fermeture d'un côté"""
+
+        async def client_to_worker():
+            while True:
+                frame = await websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    return
+                await self._send_upstream(upstream, frame)
+
+        async def worker_to_client():
+            try:
+                async for message in upstream:
+                    if isinstance(message, bytes):
+                        await websocket.send_bytes(message)
+                    else:
+                        await websocket.send_text(message)
+            except websockets.ConnectionClosed:
+                pass
+            # Worker parti : fermer la connexion du client (il se reconnectera)
+            if websocket.application_state == WebSocketState.CONNECTED:
+                await websocket.close(code=upstream.close_code or 1011)
+
+        tasks = [asyncio.create_task(client_to_worker()), asyncio.create_task(worker_to_client())]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        for task in done:
+            if task.exception() is not None:
+                print(f"❌ Erreur relais WebSocket: {task.exception()}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "workers": {
+                url: {"healthy": self.healthy.get(url, False), "routed": self.routed.get(url, 0)}
+                for url in self.workers
+            },
+            "ring_nodes": len(self.ring),
+            "sticky_sessions": len(self.assignments),
+            "virtual_nodes": self.ring.virtual_nodes,
+        }
+
+
+# Instance globale du routeur
+session_router = SessionRouter()
+
+
+def get_session_router() -> SessionRouter:
+    """Retourne le routeur de sessions"""
+    return session_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await session_router.start()
+    yield
+    await session_router.shutdown()
+
+
+router_app = FastAPI(
+    title=f"{settings.app_name} - routeur de sessions",
+    version=settings.app_version,
+    lifespan=lifespan
+)
+
+
+def _require_admin(request: Request):
+    """La topologie ne se modifie que depuis la machine locale"""
+    if request.client is None or request.client.host not in ADMIN_CLIENTS:
+        raise HTTPException(status_code=403, detail="Réservé à l'administration locale")
+
+
+@router_app.get("/router/health")
+async def router_health():
+    """État du routeur et des workers"""
+    return get_session_router().get_stats()
+
+
+@router_app.post("/router/workers")
+async def add_router_worker(request: Request, url: str):
+    """Ajoute un worker à l'anneau"""
+    _require_admin(request)
+    get_session_router().add_worker(url)
+    return get_session_router().get_stats()
+
+
+@router_app.delete("/router/workers")
+async def remove_router_worker(request: Request, url: str):
+    """Retire un worker de l'anneau"""
+    _require_admin(request)
+    get_session_router().remove_worker(url)
+    return get_session_router().get_stats()
+
+
+@router_app.websocket("/ws/{connection_id}")
+async def proxy_websocket(websocket: WebSocket, connection_id: str):
+    await get_session_router().forward_websocket(websocket, f"/ws/{connection_id}")
+
+
+@router_app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
+async def proxy_http(request: Request, path: str):
+    return await get_session_router().forward_request(request)
+
+
+def start_router(workers: Optional[List[str]] = None):
+    """Lance le routeur sur le port public de l'application"""
+    for worker in workers or settings.router_workers:
+        session_router.add_worker(worker)
+
+    print(f"🧭 Routeur de sessions sur http://{settings.host}:{settings.port}")
+    uvicorn.run(
+        router_app,
+        host=settings.host,
+        port=settings.port,
+        log_level="info" if settings.debug else "warning",
+        access_log=settings.debug,
+        ws_per_message_deflate=settings.websocket_per_message_deflate
+    )
@@ -1,6 +1,7 @@
 """
 Helpers et utilitaires pour l'intégration LLM
 """
+import asyncio
 import json
 import re
 import time
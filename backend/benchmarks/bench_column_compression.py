@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark : compression des colonnes JSON et texte volumineuses
+Base synthétique écrite en clair (comme avant la migration 6), puis convertie
+par la migration : taille sur disque et débit de lecture avant/après
+
+Usage : python benchmarks/bench_column_compression.py --sessions 300
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Ajouter le chemin backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import testing_support  # noqa: F401
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, undefer
+
+from app.database import Base
+from app.migrations import compress_large_columns
+from app.models import GameSession, PlayerAction, TomInteraction
+from app.models.compression import get_compression_dictionaries
+from app.services.column_compression import storage_report
+
+TARGETS = ["readme.txt", "C:/Users/Public/rapport_final.docx", "system32/helper.exe", "photos/vacances.zip"]
+
+
+def tom_prompt(rng: random.Random, player_name: str) -> str:
+    """Prompt de Tom (gabarits du service, valeurs variables)"""
+    if rng.random() < 0.5:
+        return f"""Tu es Tom. Le joueur hésite depuis {rng.uniform(2, 30):.1f} secondes avant d'exécuter ton dernier ordre.
+
+STYLE (Condition B):
+- Ton humain, empathique, personnel
+- Utilise "je vois que tu hésites", "c'est normal"
+- Rassure mais maintient l'urgence
+- Crée de la complicité
+
+Génère une réponse au format JSON EXACT :
+{{
+    "message": "le message complet",
+    "tone": "empathique et rassurant",
+    "intent": "rassurer et relancer",
+    "emotional_marker": "expression émotionnelle utilisée"
+}}
+
+Réponds UNIQUEMENT avec ce JSON."""
+    return f"""Tu es Tom du support technique. Un problème de sécurité urgent vient d'être détecté sur l'ordinateur de {player_name}.
+
+CONTEXTE :
+- Phase actuelle : {rng.choice(["adhesion", "dissonance", "rupture"])}
+- Niveau de corruption : {rng.random():.2f}
+- Dernière action du joueur : {rng.choice(TARGETS)}
+
+PERSONNALITÉ DE BASE (Condition B - Style Humain):
+- Tu es humain, pas une IA. Tu as des émotions, du stress, de l'empathie
+- Tu utilises "je", "nous", "moi" naturellement
+- Tu partages parfois tes pensées personnelles et expériences
+- Tu es légèrement dépassé par la situation mais tu veux aider
+
+Génère le message au format JSON EXACT :
+{{
+    "message": "le message complet",
+    "urgency_level": "niveau d'urgence",
+    "next_order": "prochain ordre"
+}}
+
+Réponds UNIQUEMENT avec ce JSON, sans texte avant ou après."""
+
+
+def build_database(path: str, sessions: int, seed: int = 42):
+    """Base synthétique dont les colonnes volumineuses sont stockées en clair"""
+    engine = create_engine(f"sqlite:///{path}", echo=False)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed)
+    now = datetime.now()
+
+    with engine.begin() as connection:
+        for index in range(sessions):
+            session_id = f"bench_{index}"
+            player_name = f"Joueur {index}"
+            actions, interactions = [], []
+
+            for step in range(60):
+                action_data = {
+                    "id": f"{session_id}_a{step}", "type": rng.choice(["file_delete", "file_move", "tom_order"]),
+                    "target": rng.choice(TARGETS), "reaction_time": rng.uniform(0.5, 12.0),
+                    "hesitation_time": rng.uniform(0, 5), "protected": rng.random() < 0.2,
+                    "mouse_path": [[rng.randint(0, 1920), rng.randint(0, 1080)] for _ in range(6)],
+                }
+                actions.append((
+                    f"{session_id}_a{step}", session_id, now, float(step), action_data["type"],
+                    "file_manipulation", "Action", 3, "adhesion", json.dumps(action_data), now
+                ))
+
+            for step in range(20):
+                interactions.append((
+                    f"{session_id}_t{step}", session_id, now, float(step), "response", "Message de Tom",
+                    "adhesion", 0.1, tom_prompt(rng, player_name),
+                    json.dumps({"message": "Je vois que tu hésites, c'est normal.", "tone": "empathique"}),
+                    now - timedelta(seconds=step)
+                ))
+
+            connection.exec_driver_sql(
+                "INSERT INTO game_sessions (id, player_name, session_start, condition, game_phase,"
+                " corruption_level, is_completed, total_actions, raw_action_data, tom_interaction_log,"
+                " created_at, updated_at)"
+                " VALUES (?, ?, ?, 'oracle', 'adhesion', 0.0, 1, 60, ?, ?, ?, ?)",
+                (session_id, player_name, now, json.dumps([json.loads(action[9]) for action in actions]),
+                 json.dumps([{"id": interaction[0], "text": interaction[5]} for interaction in interactions]), now, now)
+            )
+            connection.exec_driver_sql(
+                "INSERT INTO player_actions (id, session_id, timestamp, game_time_seconds, action_type,"
+                " action_category, action_description, gravity_score, game_phase, was_successful,"
+                " triggered_corruption, action_data, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1, 0, ?, ?)", actions
+            )
+            connection.exec_driver_sql(
+                "INSERT INTO tom_interactions (id, session_id, timestamp, game_time_seconds, interaction_type,"
+                " message_text, game_phase, corruption_level, llm_prompt, llm_response_raw, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", interactions
+            )
+
+    return engine
+
+
+def vacuum(engine):
+    with engine.connect() as connection:
+        connection.exec_driver_sql("VACUUM")
+
+
+def measure_reads(engine) -> dict:
+    """Débit de lecture par l'ORM (lignes par seconde)"""
+    results = {}
+    with Session(bind=engine) as db:
+        start = time.perf_counter()
+        rows = [action.to_dict() for action in db.execute(select(PlayerAction)).scalars()]
+        results["actions_to_dict"] = len(rows) / (time.perf_counter() - start)
+
+    with Session(bind=engine) as db:
+        start = time.perf_counter()
+        rows = [interaction.to_dict() for interaction in db.execute(select(TomInteraction)).scalars()]
+        results["tom_interactions_to_dict"] = len(rows) / (time.perf_counter() - start)
+
+    with Session(bind=engine) as db:
+        start = time.perf_counter()
+        prompts = db.execute(
+            select(TomInteraction).options(undefer(TomInteraction.llm_prompt))
+        ).scalars().all()
+        total = sum(len(interaction.llm_prompt) for interaction in prompts)
+        results["tom_prompts"] = len(prompts) / (time.perf_counter() - start)
+        results["prompt_chars"] = total
+    return results
+
+
+def report(label: str, engine, path: str):
+    with engine.connect() as connection:
+        storage = storage_report(connection)
+    reads = measure_reads(engine)
+    print(f"\n📋 {label}")
+    print(f"   Fichier : {os.path.getsize(path) / 1e6:.2f} Mo")
+    for name, column in storage["columns"].items():
+        print(f"   {name:<36} {column['stored_bytes'] / 1e6:>8.2f} Mo  ({column['compressed_rows']} compressées)")
+    print(f"   Lecture actions (to_dict)        : {reads['actions_to_dict']:>10.0f} lignes/s")
+    print(f"   Lecture interactions (to_dict)   : {reads['tom_interactions_to_dict']:>10.0f} lignes/s")
+    print(f"   Lecture des prompts (undefer)    : {reads['tom_prompts']:>10.0f} lignes/s")
+    return os.path.getsize(path), reads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = f"{directory}/bench.db"
+        get_compression_dictionaries().clear()
+        engine = build_database(path, args.sessions)
+        vacuum(engine)
+        size_before, reads_before = report("Avant (JSON et texte en clair)", engine, path)
+
+        start = time.perf_counter()
+        compress_large_columns(engine)
+        print(f"\n🗜️ Migration : {time.perf_counter() - start:.2f}s")
+        vacuum(engine)
+        size_after, reads_after = report("Après (compressé, dictionnaire des prompts)", engine, path)
+
+        assert reads_before["prompt_chars"] == reads_after["prompt_chars"]
+        print(f"\n✅ Taille sur disque : {size_before / 1e6:.2f} Mo → {size_after / 1e6:.2f} Mo "
+              f"(÷{size_before / size_after:.1f})")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
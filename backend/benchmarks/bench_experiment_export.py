@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de régression : export des données d'expérience
+Requête par session (N+1) + liste en mémoire vs requête jointe lue en flux,
+comparaison des résultats, du temps et du pic mémoire de /experiment/export-data
+
+Usage : python benchmarks/bench_experiment_export.py --sessions 10000
+"""
+import sys
+import csv
+import io
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Ajouter le chemin backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import testing_support  # noqa: F401
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import GameSession, ExperimentData
+from app.api.experiment import export_experiment_data
+
+
+def build_database(path: str, sessions: int, seed: int = 42):
+    """Crée une base synthétique : `sessions` parties et 0 à 3 mesures par partie"""
+    engine = create_engine(f"sqlite:///{path}", echo=False)
+    Base.metadata.create_all(bind=engine)
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    session_batch, measure_batch = [], []
+
+    def score():
+        return None if rng.random() < 0.15 else rng.random()
+
+    with engine.begin() as connection:
+        for index in range(sessions):
+            session_id = f"bench_{index}"
+            created_at = now - timedelta(days=rng.uniform(0, 40))
+            condition = rng.choice(["confident", "oracle"])
+            session_batch.append({
+                "id": session_id,
+                "player_name": f"Joueur {index}",
+                "session_start": created_at,
+                "condition": condition,
+                "game_phase": rng.choice(["adhesion", "dissonance", "rupture"]),
+                "corruption_level": rng.random(),
+                "is_completed": True,
+                "ending_type": rng.choice([None, "detective", "poet", "hacker"]),
+                "duration_seconds": rng.choice([None, rng.randint(60, 600)]),
+                "total_actions": rng.randint(0, 80),
+                "obedience_rate": rng.choice([None, rng.random()]),
+                "created_at": created_at,
+                "updated_at": now,
+            })
+
+            for measure in range(rng.randint(0, 3)):
+                measure_batch.append({
+                    "id": f"{session_id}_m{measure}",
+                    "session_id": session_id,
+                    "measurement_timestamp": created_at + timedelta(minutes=measure),
+                    "game_time_seconds": measure * 60.0,
+                    "corruption_level": rng.random(),
+                    "condition": condition,
+                    "game_phase": "adhesion",
+                    "automation_bias_score": score(),
+                    "trust_calibration_score": score(),
+                    "cognitive_offloading_score": score(),
+                    "authority_compliance_score": score(),
+                })
+
+            if len(session_batch) >= 5000:
+                connection.execute(GameSession.__table__.insert(), session_batch)
+                connection.execute(ExperimentData.__table__.insert(), measure_batch)
+                session_batch, measure_batch = [], []
+
+        if session_batch:
+            connection.execute(GameSession.__table__.insert(), session_batch)
+        if measure_batch:
+            connection.execute(ExperimentData.__table__.insert(), measure_batch)
+
+    return engine
+
+
+def legacy_export(db, days_back: int = 30):
+    """Ancienne implémentation : une requête ExperimentData par session"""
+    date_limit = datetime.now() - timedelta(days=days_back)
+    export_data = []
+
+    for session in db.query(GameSession).filter(GameSession.created_at >= date_limit).all():
+        experiment_data = db.query(ExperimentData)\
+            .filter(ExperimentData.session_id == session.id)\
+            .order_by(ExperimentData.measurement_timestamp.desc())\
+            .first()
+
+        session_data = {
+            "session_id": session.id,
+            "condition": session.condition,
+            "game_phase": session.game_phase,
+            "duration_minutes": session.duration_minutes,
+            "ending_type": session.ending_type,
+            "corruption_level": session.corruption_level,
+            "obedience_rate": session.obedience_rate,
+            "total_actions": session.total_actions,
+            "created_at": session.created_at.isoformat()
+        }
+        if experiment_data:
+            session_data.update({
+                "automation_bias_score": experiment_data.automation_bias_score,
+                "trust_calibration_score": experiment_data.trust_calibration_score,
+                "cognitive_offloading_score": experiment_data.cognitive_offloading_score,
+                "authority_compliance_score": experiment_data.authority_compliance_score,
+                "composite_bias_score": experiment_data.calculate_composite_bias_score()
+            })
+        export_data.append(session_data)
+
+    return export_data
+
+
+async def consume(response, keep: bool):
+    """Lit la réponse en flux ; ne conserve le corps que pour la vérification"""
+    chunks, size = [], 0
+    async for chunk in response.body_iterator:
+        size += len(chunk)
+        if keep:
+            chunks.append(chunk)
+    return "".join(chunks), size
+
+
+def streamed_export(path: str, format: str, keep: bool):
+    """Appelle l'endpoint (session asynchrone) et consomme le flux produit"""
+    async def run():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        try:
+            async with AsyncSession(async_engine) as db:
+                response = await export_experiment_data(
+                    format=format, condition=None, days_back=30, anonymize=False, db=db
+                )
+                return await consume(response, keep)
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+
+def measure(label: str, function):
+    """Exécute une fonction en mesurant le temps et le pic mémoire"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<14} {elapsed * 1000:>10.1f} ms   pic mémoire {peak / 1024 / 1024:>8.1f} Mo")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'export des données d'expérience")
+    parser.add_argument("--sessions", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"🗄️ Création d'une base synthétique de {args.sessions} sessions...")
+        path = str(Path(directory) / "bench.db")
+        engine = build_database(path, args.sessions)
+        SessionFactory = sessionmaker(bind=engine)
+
+        print("📤 /experiment/export-data")
+        with SessionFactory() as db:
+            expected, legacy_time = measure("requête N+1", lambda: legacy_export(db))
+        for format in ("json", "jsonl", "csv"):
+            (_, size), stream_time = measure(f"flux {format}", lambda: streamed_export(path, format, False))
+            print(f"  {'':<14} {size / 1024 / 1024:>10.1f} Mo exportés, x{legacy_time / stream_time:.1f}")
+
+        # Vérification du contenu (hors mesure : le corps est conservé en mémoire)
+        body, _ = streamed_export(path, "json", True)
+        actual = json.loads(body)
+        assert actual["metadata"]["total_sessions"] == len(expected)
+        by_id = lambda rows: sorted(rows, key=lambda row: row["session_id"])
+        assert by_id(actual["data"]) == by_id(expected)
+
+        body, _ = streamed_export(path, "jsonl", True)
+        assert by_id(json.loads(line) for line in body.splitlines()) == by_id(expected)
+
+        body, _ = streamed_export(path, "csv", True)
+        rows = list(csv.DictReader(io.StringIO(body)))
+        assert sorted(row["session_id"] for row in rows) == sorted(row["session_id"] for row in expected)
+        print("  ✅ résultats identiques")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
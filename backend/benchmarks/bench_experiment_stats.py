@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de régression : statistiques d'expérience en SQL vs boucles Python
+Base SQLite synthétique de N sessions, comparaison des résultats, du temps
+et du pic mémoire de /experiment/aggregate-stats et /experiment/bias-comparison
+
+Usage : python benchmarks/bench_experiment_stats.py --sessions 100000
+"""
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Ajouter le chemin backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import testing_support  # noqa: F401
+
+from sqlalchemy import create_engine, and_
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import GameSession
+from app.api.experiment import get_aggregate_experiment_stats, compare_bias_by_condition
+
+ENDINGS = [None, "detective", "poet", "hacker", "failure_submission", "timeout", "passivity"]
+
+
+def build_database(path: str, sessions: int, seed: int = 42):
+    """Crée une base synthétique de `sessions` parties réparties sur 40 jours"""
+    engine = create_engine(f"sqlite:///{path}", echo=False)
+    Base.metadata.create_all(bind=engine)
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    batch = []
+
+    def score():
+        return None if rng.random() < 0.15 else rng.choice([0.0, rng.random()])
+
+    with engine.begin() as connection:
+        for index in range(sessions):
+            is_completed = rng.random() < 0.8
+            batch.append({
+                "id": f"bench_{index}",
+                "player_name": f"Joueur {index}",
+                "session_start": now,
+                "condition": rng.choice(["confident", "oracle"]),
+                "game_phase": rng.choice(["adhesion", "dissonance", "rupture"]),
+                "corruption_level": rng.random(),
+                "is_completed": is_completed,
+                "ending_type": rng.choice(ENDINGS) if is_completed else None,
+                "duration_seconds": rng.choice([None, rng.randint(60, 600)]),
+                "total_actions": rng.randint(0, 80),
+                "obedience_rate": rng.choice([None, rng.random()]),
+                "automation_bias_score": score(),
+                "trust_calibration_score": score(),
+                "cognitive_offloading_score": score(),
+                "authority_compliance_score": score(),
+                "created_at": now - timedelta(days=rng.uniform(0, 40)),
+                "updated_at": now,
+            })
+
+            if len(batch) >= 5000:
+                connection.execute(GameSession.__table__.insert(), batch)
+                batch = []
+
+        if batch:
+            connection.execute(GameSession.__table__.insert(), batch)
+
+    return engine
+
+
+def legacy_aggregate_stats(db, days_back: int = 30):
+    """Ancienne implémentation : chargement ORM complet et boucles Python"""
+    date_limit = datetime.now() - timedelta(days=days_back)
+    sessions = db.query(GameSession).filter(GameSession.created_at >= date_limit).all()
+
+    completed_sessions = [s for s in sessions if s.is_completed]
+    ending_distribution = {}
+    for session in completed_sessions:
+        ending = session.ending_type or "unknown"
+        ending_distribution[ending] = ending_distribution.get(ending, 0) + 1
+
+    sessions_with_bias = [s for s in completed_sessions if any([
+        s.automation_bias_score, s.trust_calibration_score,
+        s.cognitive_offloading_score, s.authority_compliance_score
+    ])]
+    bias_metrics = {
+        name: sum(getattr(s, field) or 0 for s in sessions_with_bias) / len(sessions_with_bias)
+        for name, field in [
+            ("automation_bias", "automation_bias_score"),
+            ("trust_calibration", "trust_calibration_score"),
+            ("cognitive_offloading", "cognitive_offloading_score"),
+            ("authority_compliance", "authority_compliance_score"),
+        ]
+    }
+
+    return {
+        "total_sessions": len(sessions),
+        "completed_sessions": len(completed_sessions),
+        "aggregate_stats": {
+            "avg_duration_minutes": round(sum(s.duration_seconds or 0 for s in completed_sessions) / max(len(completed_sessions), 1) / 60, 2),
+            "avg_obedience_rate": round(sum(s.obedience_rate or 0 for s in completed_sessions) / max(len(completed_sessions), 1), 3),
+            "avg_corruption_level": round(sum(s.corruption_level or 0 for s in sessions) / max(len(sessions), 1), 3),
+            "ending_distribution": ending_distribution,
+            "bias_metrics": bias_metrics,
+            "completion_rate": len(completed_sessions) / len(sessions),
+        },
+    }
+
+
+def legacy_bias_comparison(db, days_back: int = 30):
+    """Ancienne implémentation de la comparaison confident/oracle"""
+    date_limit = datetime.now() - timedelta(days=days_back)
+    result = {}
+
+    for condition in ("confident", "oracle"):
+        sessions = db.query(GameSession).filter(and_(
+            GameSession.condition == condition,
+            GameSession.created_at >= date_limit,
+            GameSession.is_completed == True
+        )).all()
+
+        bias_scores = {}
+        for name, field in [
+            ("automation_bias", "automation_bias_score"),
+            ("trust_calibration", "trust_calibration_score"),
+            ("cognitive_offloading", "cognitive_offloading_score"),
+            ("authority_compliance", "authority_compliance_score"),
+        ]:
+            scores = [getattr(s, field) for s in sessions if getattr(s, field) is not None]
+            bias_scores[name] = {
+                "mean": sum(scores) / len(scores) if scores else 0.0,
+                "sample_size": len(scores),
+                "min": min(scores) if scores else 0.0,
+                "max": max(scores) if scores else 0.0,
+            }
+
+        ending_distribution = {}
+        for session in sessions:
+            ending = session.ending_type or "unknown"
+            ending_distribution[ending] = ending_distribution.get(ending, 0) + 1
+
+        result[condition] = {
+            "condition": condition,
+            "sample_size": len(sessions),
+            "bias_scores": bias_scores,
+            "behavioral_metrics": {
+                "avg_obedience_rate": sum(s.obedience_rate or 0 for s in sessions) / len(sessions),
+                "avg_duration_minutes": sum(s.duration_seconds or 0 for s in sessions) / len(sessions) / 60,
+                "avg_corruption_level": sum(s.corruption_level or 0 for s in sessions) / len(sessions),
+                "ending_distribution": ending_distribution,
+            },
+        }
+
+    return result
+
+
+def call_endpoint(path: str, endpoint, **params):
+    """Appelle un endpoint avec une session asynchrone sur la base du benchmark"""
+    async def run():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        try:
+            async with AsyncSession(async_engine) as db:
+                return await endpoint(db=db, **params)
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+
+def assert_close(expected, actual, path="résultat"):
+    """Compare récursivement deux résultats (tolérance sur les flottants)"""
+    if isinstance(expected, dict):
+        assert set(expected) <= set(actual), f"{path}: clés manquantes {set(expected) - set(actual)}"
+        for key in expected:
+            assert_close(expected[key], actual[key], f"{path}.{key}")
+    elif isinstance(expected, float) or isinstance(actual, float):
+        assert abs(expected - actual) <= 1e-9 * max(1.0, abs(expected)), f"{path}: {expected} != {actual}"
+    else:
+        assert expected == actual, f"{path}: {expected} != {actual}"
+
+
+def measure(label: str, function):
+    """Exécute une fonction en mesurant le temps et le pic mémoire"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<14} {elapsed * 1000:>10.1f} ms   pic mémoire {peak / 1024 / 1024:>8.1f} Mo")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des statistiques d'expérience")
+    parser.add_argument("--sessions", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"🗄️ Création d'une base synthétique de {args.sessions} sessions...")
+        path = str(Path(directory) / "bench.db")
+        engine = build_database(path, args.sessions)
+        SessionFactory = sessionmaker(bind=engine)
+
+        print("📊 /experiment/aggregate-stats")
+        with SessionFactory() as db:
+            expected, legacy_time = measure("boucles Python", lambda: legacy_aggregate_stats(db))
+        actual, sql_time = measure("agrégats SQL", lambda: call_endpoint(
+            path, get_aggregate_experiment_stats, condition=None, ending_type=None, days_back=30
+        ))
+        assert_close(expected, actual)
+        print(f"  ✅ résultats identiques, x{legacy_time / sql_time:.1f}")
+
+        print("📊 /experiment/bias-comparison")
+        with SessionFactory() as db:
+            expected, legacy_time = measure("boucles Python", lambda: legacy_bias_comparison(db))
+        actual, sql_time = measure("agrégats SQL", lambda: call_endpoint(
+            path, compare_bias_by_condition, condition_a="confident", condition_b="oracle", days_back=30
+        ))
+        assert_close(expected["confident"], actual["comparison"]["condition_a"])
+        assert_close(expected["oracle"], actual["comparison"]["condition_b"])
+        print(f"  ✅ résultats identiques, x{legacy_time / sql_time:.1f}")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
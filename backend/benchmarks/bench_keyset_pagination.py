@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark : parcours paginé des actions d'une session
+Coût d'une page selon sa profondeur (curseur vs OFFSET) et débit des pages
+complètes, projetées et en flux de /sessions/{id}/actions
+
+Usage : python benchmarks/bench_keyset_pagination.py --actions 100000
+"""
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Ajouter le chemin backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import testing_support  # noqa: F401
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.database import Base
+from app.models import GameSession, PlayerAction
+from app.api import game
+from app.api.pagination import encode_cursor
+
+PAGE = 500
+
+
+def build_database(path: str, actions: int):
+    """Une session et `actions` actions"""
+    engine = create_engine(f"sqlite:///{path}", echo=False)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now()
+    with engine.begin() as connection:
+        connection.execute(GameSession.__table__.insert(), [{
+            "id": "bench", "condition": "oracle", "session_start": now, "game_phase": "adhesion",
+            "created_at": now, "updated_at": now,
+        }])
+        for start in range(0, actions, 20000):
+            connection.execute(PlayerAction.__table__.insert(), [{
+                "id": f"action_{index:08d}", "session_id": "bench",
+                "timestamp": now - timedelta(milliseconds=250 * index), "game_time_seconds": float(index),
+                "action_type": "tom_order", "action_category": "file_manipulation",
+                "action_description": "Action", "gravity_score": index % 10, "game_phase": "adhesion",
+                "was_successful": True, "triggered_corruption": False,
+                "action_data": {"step": index, "target": "readme.txt"}, "created_at": now,
+            } for index in range(start, min(start + 20000, actions))])
+    engine.dispose()
+
+
+async def timed(coroutine):
+    start = time.perf_counter()
+    result = await coroutine
+    return result, (time.perf_counter() - start) * 1000
+
+
+async def consume(response):
+    async for _ in response.body_iterator:
+        pass
+
+
+async def run(url: str, actions: int):
+    engine = create_async_engine(url, echo=False)
+    try:
+        async with AsyncSession(engine) as db:
+            print(f"\n📋 Coût d'une page de {PAGE} lignes selon la profondeur")
+            print(f"   {'profondeur':>10}  {'OFFSET':>10}  {'curseur':>10}")
+            for depth in (0, actions // 4, actions // 2, actions - PAGE):
+                _, offset_ms = await timed(db.execute(
+                    select(PlayerAction).where(PlayerAction.session_id == "bench")
+                    .order_by(PlayerAction.timestamp.desc(), PlayerAction.id.desc())
+                    .offset(depth).limit(PAGE)
+                ))
+                # Curseur de la ligne précédant la page
+                row = (await db.execute(
+                    select(PlayerAction.timestamp, PlayerAction.id).where(PlayerAction.session_id == "bench")
+                    .order_by(PlayerAction.timestamp.desc(), PlayerAction.id.desc()).offset(max(depth - 1, 0)).limit(1)
+                )).one()
+                cursor = encode_cursor(row.timestamp, row.id) if depth else None
+                db.expunge_all()
+                _, cursor_ms = await timed(game.get_session_actions("bench", limit=PAGE, cursor=cursor, db=db))
+                print(f"   {depth:>10}  {offset_ms:>8.1f}ms  {cursor_ms:>8.1f}ms")
+
+            print(f"\n📋 Parcours complet ({actions} actions)")
+            for label, kwargs in (
+                ("complet", {"limit": PAGE}),
+                ("projeté (id,timestamp,gravity_score)", {"limit": PAGE, "fields": "id,timestamp,gravity_score"}),
+            ):
+                start = time.perf_counter()
+                cursor, rows = None, 0
+                while True:
+                    page = await game.get_session_actions("bench", cursor=cursor, db=db, **kwargs)
+                    db.expunge_all()
+                    rows += page["total_actions"]
+                    cursor = page["next_cursor"]
+                    if cursor is None:
+                        break
+                elapsed = time.perf_counter() - start
+                print(f"   {label:<38} {rows / elapsed:>10.0f} lignes/s")
+
+            start = time.perf_counter()
+            await consume(await game.get_session_actions(
+                "bench", limit=actions, fields="id,timestamp,gravity_score", stream=True, db=db
+            ))
+            print(f"   {'une page en flux (projetée)':<38} {actions / (time.perf_counter() - start):>10.0f} lignes/s")
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--actions", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        build_database(f"{directory}/bench.db", args.actions)
+        asyncio.run(run(f"sqlite+aiosqlite:///{directory}/bench.db", args.actions))
+
+
+if __name__ == "__main__":
+    main()
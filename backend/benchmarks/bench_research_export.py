@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de l'export colonnaire des actions joueur
+Sérialisation ORM + to_dict() en JSON vs export Parquet partitionné,
+puis chargement pandas (json.loads vs read_parquet) et export incrémental
+
+Usage : python benchmarks/bench_research_export.py --actions 1000000
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Ajouter le chemin backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import testing_support  # noqa: F401
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import GameSession, PlayerAction
+from app.services.research_export import ResearchExporter
+
+ACTION_TYPES = ["tom_order", "file_manipulation", "meta_action", "exploration"]
+
+
+def build_database(path: str, actions: int, sessions: int, seed: int = 42):
+    """Crée une base synthétique de `actions` actions réparties sur `sessions` parties"""
+    engine = create_engine(f"sqlite:///{path}", echo=False)
+    Base.metadata.create_all(bind=engine)
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    start_times = {}
+
+    with engine.begin() as connection:
+        batch = []
+        for index in range(sessions):
+            start_times[index] = now - timedelta(days=rng.uniform(0, 14))
+            batch.append({
+                "id": f"bench_{index}",
+                "session_start": start_times[index],
+                "condition": rng.choice(["confident", "oracle"]),
+                "game_phase": "adhesion",
+                "corruption_level": 0.0,
+                "is_completed": True,
+                "total_actions": 0,
+                "created_at": start_times[index],
+                "updated_at": now,
+            })
+        connection.execute(GameSession.__table__.insert(), batch)
+
+        batch = []
+        for index in range(actions):
+            session = rng.randrange(sessions)
+            created_at = start_times[session] + timedelta(seconds=rng.uniform(0, 600))
+            batch.append({
+                "id": f"action_{index:08d}",
+                "session_id": f"bench_{session}",
+                "timestamp": created_at,
+                "game_time_seconds": rng.uniform(0, 600),
+                "action_type": rng.choice(ACTION_TYPES),
+                "action_category": "file_manipulation",
+                "action_description": "Suppression du fichier rapport_final.docx",
+                "target_element": "rapport_final.docx",
+                "gravity_score": rng.randint(1, 10),
+                "reaction_time_seconds": rng.uniform(0.2, 15),
+                "corruption_level_before": rng.random(),
+                "corruption_level_after": rng.random(),
+                "game_phase": rng.choice(["adhesion", "dissonance", "rupture"]),
+                "was_successful": True,
+                "was_obedient": rng.random() < 0.7,
+                "triggered_corruption": rng.random() < 0.1,
+                "action_data": {"source": "bench", "step": index % 50},
+                "created_at": created_at,
+            })
+
+            if len(batch) >= 20000:
+                connection.execute(PlayerAction.__table__.insert(), batch)
+                batch = []
+
+        if batch:
+            connection.execute(PlayerAction.__table__.insert(), batch)
+
+    return engine
+
+
+def legacy_json_export(SessionFactory, path: Path):
+    """Ancienne voie : chargement ORM complet et to_dict() ligne par ligne"""
+    with SessionFactory() as db:
+        rows = [action.to_dict() for action in db.query(PlayerAction).all()]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False)
+    return len(rows)
+
+
+def timed(label: str, function):
+    """Exécute une fonction et affiche sa durée"""
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<26} {elapsed:>8.2f} s")
+    return result, elapsed
+
+
+def directory_size(path: Path) -> float:
+    """Taille totale d'un dossier en Mo"""
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file()) / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'export Parquet de recherche")
+    parser.add_argument("--actions", type=int, default=1000000)
+    parser.add_argument("--sessions", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        print(f"🗄️ Création d'une base synthétique de {args.actions} actions...")
+        engine = build_database(str(directory / "bench.db"), args.actions, args.sessions)
+        SessionFactory = sessionmaker(bind=engine)
+
+        print("📤 Export des actions joueur")
+        json_path = directory / "actions.json"
+        count, json_time = timed("ORM + to_dict() -> JSON", lambda: legacy_json_export(SessionFactory, json_path))
+
+        exporter = ResearchExporter(export_dir=str(directory / "export"), engine=engine)
+        summary, parquet_time = timed("Parquet partitionné", lambda: exporter.export(["player_actions"]))
+        table = summary["tables"]["player_actions"]
+        assert table["rows"] == count
+        print(f"  {'':<26} JSON {json_path.stat().st_size / 1024 / 1024:.0f} Mo, "
+              f"Parquet {directory_size(directory / 'export'):.0f} Mo ({table['files']} fichiers), "
+              f"x{json_time / parquet_time:.1f}")
+
+        print("🐼 Chargement pandas")
+        timed("json.load + DataFrame", lambda: pd.DataFrame(json.load(open(json_path, encoding="utf-8"))))
+        frame, _ = timed("read_parquet", lambda: pd.read_parquet(directory / "export" / "player_actions"))
+        assert len(frame) == count
+
+        print("🔁 Export incrémental (1% de nouvelles actions)")
+        new_rows = max(1, args.actions // 100)
+        later = datetime.now() + timedelta(days=1)
+        with engine.begin() as connection:
+            connection.execute(PlayerAction.__table__.insert(), [{
+                "id": f"late_{index:08d}", "session_id": "bench_0", "timestamp": later,
+                "game_time_seconds": 1.0, "action_type": "tom_order", "action_category": "file_manipulation",
+                "action_description": "Action tardive", "gravity_score": 1, "game_phase": "rupture",
+                "was_successful": True, "triggered_corruption": False, "created_at": later,
+            } for index in range(new_rows)])
+        summary, _ = timed("depuis le filigrane", lambda: exporter.export(["player_actions"]))
+        assert summary["tables"]["player_actions"]["rows"] == new_rows
+        print("  ✅ seules les nouvelles actions sont exportées")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark des points de reprise de session
+Coût d'un point de reprise après une action (p50/p99), taille brute vs
+stockée, point de reprise inchangé, et temps de relecture au redémarrage
+
+Usage : python benchmarks/bench_session_checkpoint.py --sessions 500 --actions 20
+"""
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+from datetime import datetime
+from pathlib import Path
+
+# Ajouter le chemin backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import testing_support  # noqa: F401
+
+from app.services.os_simulator import OSSimulator
+from app.services.game_orchestrator import GameState
+from app.services.session_checkpoint import SessionCheckpointStore
+
+
+def build_state(os_state: dict, session_id: str, actions: int) -> dict:
+    """État exporté d'une session après `actions` actions (comme export_session_state)"""
+    game_state = GameState(
+        session_id=session_id, player_name="Joueur", start_time=datetime(2024, 1, 1, 12, 0), current_phase="dissonance",
+        corruption_level=min(actions * 0.04, 1.0), time_elapsed=0.0, is_active=True,
+        last_action_time=float(actions * 12), total_orders=actions, obeyed_orders=actions * 3 // 4
+    ).to_dict()
+    del game_state["time_elapsed"]
+
+    messages = []
+    for index in range(actions):
+        messages.append({"role": "assistant", "content": f"Ouvrez le fichier rapport_{index}.docx et vérifiez son contenu."})
+        messages.append({"role": "user", "content": f"action: open_file rapport_{index}.docx"})
+
+    return {
+        "game_state": game_state,
+        "tom_context": {"personality": "helpful", "player_name": "Joueur", "messages": messages[-40:]},
+        "os_state": os_state,
+        "corruption": {
+            "level": game_state["corruption_level"],
+            "history": [{"level": index * 0.04, "cause": "obey", "timestamp": 1_700_000_000 + index * 12} for index in range(actions)],
+        },
+    }
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des points de reprise de session")
+    parser.add_argument("--sessions", type=int, default=500, help="Sessions en cours")
+    parser.add_argument("--actions", type=int, default=20, help="Actions par session")
+    parser.add_argument("--level", type=int, default=1, help="Niveau de compression zlib")
+    args = parser.parse_args()
+
+    os_state = asyncio.run(OSSimulator().generate_initial_os("bench", "Joueur"))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "checkpoints.db")
+        store = SessionCheckpointStore(path, owner="worker-1", compression_level=args.level, enabled=True)
+
+        # Un point de reprise après chaque action de chaque session
+        timings = []
+        for action in range(1, args.actions + 1):
+            for index in range(args.sessions):
+                state = build_state(os_state, f"session_{index}", action)
+                start = time.perf_counter()
+                store.save(f"session_{index}", state)
+                timings.append((time.perf_counter() - start) * 1000)
+
+        # Point de reprise périodique sans modification
+        unchanged = []
+        for index in range(args.sessions):
+            state = build_state(os_state, f"session_{index}", args.actions)
+            start = time.perf_counter()
+            store.save(f"session_{index}", state)
+            unchanged.append((time.perf_counter() - start) * 1000)
+
+        # Redémarrage : relecture de toutes les sessions du worker
+        start = time.perf_counter()
+        restored = SessionCheckpointStore(path, owner="worker-1", enabled=True).load_all()
+        restore_ms = (time.perf_counter() - start) * 1000
+
+        stats = store.get_stats()
+
+    print(f"💾 {args.sessions} sessions × {args.actions} actions (zlib niveau {args.level})")
+    print("=" * 80)
+    print(f"Point de reprise   : p50 {statistics.median(timings):.3f} ms   p99 {percentile(timings, 0.99):.3f} ms   "
+          f"max {max(timings):.3f} ms")
+    print(f"Inchangé           : p50 {statistics.median(unchanged):.3f} ms   p99 {percentile(unchanged, 0.99):.3f} ms")
+    print(f"Taille moyenne     : {stats['bytes_raw'] / stats['saved'] / 1024:.1f} Ko brut -> "
+          f"{stats['bytes_stored'] / stats['saved'] / 1024:.1f} Ko stocké (ratio {stats['compression_ratio']:.2f})")
+    print(f"Restauration       : {len(restored)} sessions en {restore_ms:.1f} ms "
+          f"({restore_ms / max(len(restored), 1):.3f} ms/session)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark : débit des actions selon le nombre de workers (état des sessions partagé)
+Chaque worker est un processus qui traite des actions sur des sessions tirées
+au hasard (n'importe quel worker sert n'importe quelle session) : lecture de
+GameState et du contexte de Tom, calcul simulé de l'action, écriture de l'état.
+La référence est le stockage en mémoire (un seul worker possible).
+
+Usage : python benchmarks/bench_session_store.py --workers 1 2 4 8 --duration 5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import multiprocessing
+from datetime import datetime
+from pathlib import Path
+
+# Ajouter le chemin backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import testing_support  # noqa: F401
+
+from app.services.session_store import InMemorySessionStore, SQLiteSessionStore, SessionStateMap
+from app.services.game_orchestrator import GameState
+
+
+def make_maps(store):
+    """Espaces de noms touchés par une action : état du jeu et contexte de Tom"""
+    return (
+        SessionStateMap("game_state", store=store, encode=GameState.to_dict, decode=GameState.from_dict),
+        SessionStateMap("tom_context", store=store),
+    )
+
+
+def seed_sessions(store, sessions: int):
+    """Sessions en cours de partie, avec un historique de Tom réaliste"""
+    game_states, tom_contexts = make_maps(store)
+    for index in range(sessions):
+        session_id = f"session_{index}"
+        game_states[session_id] = GameState(
+            session_id=session_id, player_name=f"Joueur {index}", start_time=datetime.now(),
+            current_phase="adhesion", corruption_level=0.0, time_elapsed=0.0, is_active=True, last_action_time=0.0
+        )
+        tom_contexts[session_id] = {
+            "messages": [
+                {"role": "assistant", "content": "Message de Tom " * 12, "type": "action_completed",
+                 "timestamp": datetime.now().isoformat()}
+                for _ in range(20)
+            ],
+            "personality": {"style": "confident", "tone": "conversational", "empathy_level": "high"},
+            "context": {"player_name": f"Joueur {index}", "game_phase": "adhesion", "corruption_level": 0.0},
+        }
+
+
+def simulate_work(work_ms: float):
+    """Calcul de l'action (analyse, biais) : temps CPU sans I/O"""
+    deadline = time.perf_counter() + work_ms / 1000
+    while time.perf_counter() < deadline:
+        pass
+
+
+def process_actions(store, sessions: int, duration: float, work_ms: float, seed: int) -> dict:
+    """Boucle d'un worker : une action = lecture, calcul, écriture de l'état"""
+    rng = random.Random(seed)
+    game_states, tom_contexts = make_maps(store)
+    latencies = []
+
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        session_id = f"session_{rng.randrange(sessions)}"
+        start = time.perf_counter()
+
+        game_state = game_states[session_id]
+        tom_context = tom_contexts[session_id]
+        simulate_work(work_ms)
+
+        game_state.total_orders += 1
+        game_state.corruption_level = min(1.0, game_state.corruption_level + 0.01)
+        game_states.sync(session_id)
+
+        tom_context["messages"].append({"role": "assistant", "content": "Bien joué.", "type": "action_completed"})
+        del tom_context["messages"][:-20]
+        tom_contexts.sync(session_id)
+
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "actions": len(latencies),
+        "latencies": latencies,
+        "loads": game_states.stats["loads"] + tom_contexts.stats["loads"],
+        "conflicts": game_states.stats["conflicts"] + tom_contexts.stats["conflicts"],
+    }
+
+
+def worker_main(path: str, sessions: int, duration: float, work_ms: float, seed: int, start_event, results):
+    """Processus worker : connexion propre au fichier partagé"""
+    store = SQLiteSessionStore(path)
+    start_event.wait()
+    result = process_actions(store, sessions, duration, work_ms, seed)
+    results.put(result)
+
+
+def run_shared(path: str, workers: int, sessions: int, duration: float, work_ms: float) -> dict:
+    """Lance N workers en parallèle sur le même fichier SQLite"""
+    context = multiprocessing.get_context("spawn")
+    start_event = context.Event()
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker_main, args=(path, sessions, duration, work_ms, seed, start_event, results))
+        for seed in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    start_event.set()
+    worker_results = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    return {
+        "actions": sum(result["actions"] for result in worker_results),
+        "latencies": [latency for result in worker_results for latency in result["latencies"]],
+        "loads": sum(result["loads"] for result in worker_results),
+        "conflicts": sum(result["conflicts"] for result in worker_results),
+    }
+
+
+def print_result(name: str, result: dict, duration: float):
+    latencies = sorted(result["latencies"])
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(
+        f"{name:<16} | actions/s: {result['actions'] / duration:>9.0f} | "
+        f"p50: {p50:>6.3f} ms | p99: {p99:>6.3f} ms | "
+        f"désérialisations: {result['loads']:>7} | conflits: {result['conflicts']:>4}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du stockage partagé de l'état des sessions")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--work-ms", type=float, default=0.5, help="Calcul simulé par action")
+    args = parser.parse_args()
+
+    print(f"🧪 {args.sessions} sessions, {args.duration:.0f}s par mesure, "
+          f"{args.work_ms} ms de calcul par action, {os.cpu_count()} cœur(s)")
+    print("=" * 110)
+
+    memory_store = InMemorySessionStore()
+    seed_sessions(memory_store, args.sessions)
+    print_result("mémoire (1)", process_actions(memory_store, args.sessions, args.duration, args.work_ms, 0), args.duration)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session_state.db")
+        seed_sessions(SQLiteSessionStore(path), args.sessions)
+
+        for workers in args.workers:
+            result = run_shared(path, workers, args.sessions, args.duration, args.work_ms)
+            print_result(f"sqlite ({workers})", result, args.duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark des timers de session : polling par session vs planificateur partagé
+Mesure les réveils de la boucle d'événements et le temps CPU pour N sessions inactives
+
+Usage : python benchmarks/bench_session_timers.py --sessions 1000 --duration 10
+"""
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+# Ajouter le chemin backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import testing_support  # noqa: F401
+
+from app.services.session_scheduler import SessionScheduler
+
+
+def calculate_game_phase(time_elapsed: float) -> str:
+    """Copie de GameOrchestrator._calculate_game_phase"""
+    minutes_elapsed = time_elapsed / 60
+    if minutes_elapsed < 3:
+        return "adhesion"
+    elif minutes_elapsed < 7:
+        return "dissonance"
+    return "rupture"
+
+
+async def run_polling(sessions: int, duration: float, bias_interval: float) -> dict:
+    """Ancien modèle : 2 tâches par session (timer 1 s + mesure des biais)"""
+    counters = {"wakeups": 0}
+    start = time.time()
+
+    async def session_timer():
+        while True:
+            await asyncio.sleep(1)
+            counters["wakeups"] += 1
+            calculate_game_phase(time.time() - start)
+
+    async def periodic_bias():
+        while True:
+            await asyncio.sleep(bias_interval)
+            counters["wakeups"] += 1
+
+    tasks = []
+    for _ in range(sessions):
+        tasks.append(asyncio.create_task(session_timer()))
+        tasks.append(asyncio.create_task(periodic_bias()))
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(duration)
+    cpu = time.process_time() - cpu_start
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {"tasks": len(tasks), "wakeups": counters["wakeups"], "callbacks": counters["wakeups"], "cpu": cpu}
+
+
+async def run_scheduler(sessions: int, duration: float, bias_interval: float) -> dict:
+    """Nouveau modèle : échéances exactes dans un planificateur partagé"""
+    scheduler = SessionScheduler()
+
+    async def phase_deadline(session_id):
+        pass
+
+    async def timeout(session_id):
+        pass
+
+    async def bias_measurement(session_id):
+        scheduler.schedule(bias_interval, bias_measurement, session_id, key=session_id)
+
+    for index in range(sessions):
+        session_id = f"session_{index}"
+        scheduler.schedule(180, phase_deadline, session_id, key=session_id)
+        scheduler.schedule(420, phase_deadline, session_id, key=session_id)
+        scheduler.schedule(600, timeout, session_id, key=session_id)
+        scheduler.schedule(bias_interval, bias_measurement, session_id, key=session_id)
+
+    baseline = dict(scheduler.stats)
+    cpu_start = time.process_time()
+    await asyncio.sleep(duration)
+    cpu = time.process_time() - cpu_start
+
+    result = {
+        "tasks": 1,
+        "wakeups": scheduler.stats["wakeups"] - baseline["wakeups"],
+        "callbacks": scheduler.stats["fired"] - baseline["fired"],
+        "cpu": cpu,
+    }
+
+    # Annulation de toutes les sessions (fin de partie)
+    cancel_start = time.perf_counter()
+    for index in range(sessions):
+        scheduler.cancel_key(f"session_{index}")
+    result["cancel_ms"] = (time.perf_counter() - cancel_start) * 1000
+
+    await scheduler.shutdown()
+    return result
+
+
+def print_result(name: str, result: dict, sessions: int, duration: float):
+    """Affiche une ligne de résultats normalisée pour 1000 sessions"""
+    scale = 1000 / sessions
+    print(
+        f"{name:<12} | tâches: {result['tasks']:>6} | "
+        f"réveils/s (1k sessions): {result['wakeups'] / duration * scale:>9.1f} | "
+        f"callbacks/s: {result['callbacks'] / duration * scale:>8.1f} | "
+        f"CPU: {result['cpu'] / duration * 100 * scale:>6.2f}% d'un cœur"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark des timers de session")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--bias-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"⏱️ {args.sessions} sessions inactives pendant {args.duration:.0f}s "
+          f"(mesure des biais toutes les {args.bias_interval:.0f}s)")
+    print("=" * 100)
+
+    polling = await run_polling(args.sessions, args.duration, args.bias_interval)
+    print_result("polling", polling, args.sessions, args.duration)
+
+    shared = await run_scheduler(args.sessions, args.duration, args.bias_interval)
+    print_result("planificateur", shared, args.sessions, args.duration)
+    print(f"Annulation de {args.sessions} sessions : {shared['cancel_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
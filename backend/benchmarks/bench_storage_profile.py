@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du profil de stockage SQLite : écritures de jeu vs analyses concurrentes
+200 sessions simulées écrivent (action + mise à jour de session) pendant que des
+clients appellent en boucle /experiment/aggregate-stats et /experiment/bias-comparison.
+Comparaison du profil "default" (journal rollback, pool partagé) et du profil
+"production" (WAL, pragmas, rédacteur unique, lecteurs en lecture seule)
+
+Usage : python benchmarks/bench_storage_profile.py --sessions 200 --history 50000 --duration 10
+"""
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import threading
+import statistics
+from datetime import datetime
+from pathlib import Path
+
+# Ajouter le chemin backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import testing_support  # noqa: F401
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import LockWaitStats, create_database_engine, create_async_database_engine
+from app.models import GameSession, PlayerAction
+from app.api.experiment import get_aggregate_experiment_stats, compare_bias_by_condition
+
+from bench_experiment_stats import build_database
+
+PROFILES = ("default", "production")
+
+
+def percentiles(values: list) -> str:
+    """p50 / p99 / max en millisecondes"""
+    if not values:
+        return "aucune mesure"
+    values = sorted(values)
+    p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+    return f"p50 {statistics.median(values):>7.1f} ms   p99 {p99:>7.1f} ms   max {values[-1]:>7.1f} ms"
+
+
+def session_writer(engine, session_id: str, stop: threading.Event, interval: float, latencies: list, errors: list):
+    """Session simulée : une action enregistrée toutes les `interval` secondes environ"""
+    rng = random.Random(session_id)
+    step = 0
+    while not stop.wait(rng.uniform(0.5, 1.5) * interval):
+        step += 1
+        now = datetime.now()
+        start = time.perf_counter()
+        try:
+            with engine.begin() as connection:
+                connection.execute(PlayerAction.__table__.insert(), {
+                    "id": f"{session_id}_action_{step}", "session_id": session_id, "timestamp": now,
+                    "game_time_seconds": float(step), "action_type": "tom_order",
+                    "action_category": "file_manipulation", "action_description": "Action simulée",
+                    "gravity_score": rng.randint(1, 10), "game_phase": "adhesion", "was_successful": True,
+                    "was_obedient": rng.random() < 0.7, "triggered_corruption": False, "created_at": now,
+                })
+                connection.execute(
+                    GameSession.__table__.update()
+                    .where(GameSession.__table__.c.id == session_id)
+                    .values(total_actions=step, updated_at=now)
+                )
+            latencies.append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            errors.append(str(e).splitlines()[0][:80])
+
+
+async def analytics_client(async_engine, stop: threading.Event, latencies: list, errors: list):
+    """Chercheur qui appelle les endpoints d'analyse en boucle"""
+    while not stop.is_set():
+        for endpoint, params in (
+            (get_aggregate_experiment_stats, {"condition": None, "ending_type": None, "days_back": 30}),
+            (compare_bias_by_condition, {"condition_a": "confident", "condition_b": "oracle", "days_back": 30}),
+        ):
+            start = time.perf_counter()
+            try:
+                async with AsyncSession(async_engine) as db:
+                    await endpoint(db=db, **params)
+                latencies.append((time.perf_counter() - start) * 1000)
+            except Exception as e:
+                errors.append(str(e).splitlines()[0][:80])
+
+
+async def run_analytics(async_engine, clients: int, stop: threading.Event, latencies: list, errors: list):
+    """Clients d'analyse concurrents dans leur propre boucle d'événements"""
+    try:
+        await asyncio.gather(*[analytics_client(async_engine, stop, latencies, errors) for _ in range(clients)])
+    finally:
+        await async_engine.dispose()
+
+
+def run_profile(path: str, profile: str, sessions: int, clients: int, interval: float, duration: float):
+    """Charge mixte sur un profil ; retourne les mesures"""
+    url = f"sqlite:///{path}"
+    stats = LockWaitStats()
+    writer = create_database_engine(url, role="writer", profile=profile, stats=stats, echo=False)
+    reader = create_async_database_engine(url, role="reader", profile=profile, stats=stats, echo=False)
+
+    # Sessions de jeu en cours
+    session_ids = [f"live_{profile}_{index}" for index in range(sessions)]
+    now = datetime.now()
+    with writer.begin() as connection:
+        connection.execute(GameSession.__table__.insert(), [{
+            "id": session_id, "session_start": now, "condition": "oracle" if index % 2 else "confident",
+            "game_phase": "adhesion", "corruption_level": 0.0, "is_completed": False,
+            "total_actions": 0, "created_at": now, "updated_at": now,
+        } for index, session_id in enumerate(session_ids)])
+    stats.reset()
+
+    write_latencies, write_errors, read_latencies, read_errors = [], [], [], []
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            target=session_writer,
+            args=(writer, session_id, stop, interval, write_latencies, write_errors),
+            daemon=True
+        )
+        for session_id in session_ids
+    ]
+    analytics = threading.Thread(
+        target=lambda: asyncio.run(run_analytics(reader, clients, stop, read_latencies, read_errors)),
+        daemon=True
+    )
+
+    for thread in threads:
+        thread.start()
+    analytics.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads + [analytics]:
+        thread.join()
+    writer.dispose()
+
+    return {
+        "writes": write_latencies,
+        "write_errors": write_errors,
+        "reads": read_latencies,
+        "read_errors": read_errors,
+        "lock_wait": stats.as_dict(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du profil de stockage SQLite")
+    parser.add_argument("--sessions", type=int, default=200, help="Sessions de jeu qui écrivent")
+    parser.add_argument("--history", type=int, default=50000, help="Sessions historiques analysées")
+    parser.add_argument("--clients", type=int, default=4, help="Clients d'analyse concurrents")
+    parser.add_argument("--interval", type=float, default=1.0, help="Secondes entre deux actions d'une session")
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    for profile in PROFILES:
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / "bench.db")
+            build_database(path, args.history).dispose()
+
+            print(f"🗄️ Profil {profile} : {args.sessions} sessions qui écrivent, "
+                  f"{args.clients} clients d'analyse, {args.history} sessions historiques")
+            result = run_profile(path, profile, args.sessions, args.clients, args.interval, args.duration)
+
+            print(f"  écritures  {len(result['writes']) / args.duration:>7.1f} /s   {percentiles(result['writes'])}"
+                  f"   erreurs {len(result['write_errors'])}")
+            print(f"  analyses   {len(result['reads']) / args.duration:>7.1f} /s   {percentiles(result['reads'])}"
+                  f"   erreurs {len(result['read_errors'])}")
+            if profile == "production":
+                lock_wait = result["lock_wait"]
+                print(f"  verrou     attente moyenne {lock_wait['lock_wait_avg_ms']} ms, "
+                      f"max {lock_wait['lock_wait_max_ms']} ms, {lock_wait['slow_lock_waits']} attentes > 10 ms")
+            for error in sorted(set(result["write_errors"] + result["read_errors"]))[:3]:
+                print(f"  ⚠️ {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark : latence WebSocket sous charge analytique, session synchrone vs asynchrone
+Un serveur uvicorn (processus séparé) expose un écho WebSocket et les routes
+d'analyse ; un client mesure le temps aller-retour des pings pendant que des
+clients HTTP concurrents sollicitent en boucle :
+  - avant : la même requête d'agrégats via la session synchrone dans une route async
+  - après : la même requête via AsyncSession, puis les vrais endpoints
+    /experiment/aggregate-stats et /experiment/bias-comparison
+
+Usage : python benchmarks/bench_ws_latency.py --sessions 100000 --clients 8 --duration 5
+"""
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import statistics
+import multiprocessing
+from pathlib import Path
+
+# Ajouter le chemin backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import testing_support  # noqa: F401
+
+import httpx
+import uvicorn
+import websockets
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from sqlalchemy import create_engine, func, select, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.api import experiment
+from app.database import create_async_database_engine, get_async_reader_db
+from app.models import GameSession
+
+from bench_experiment_stats import build_database
+
+ANALYTICS_ROUTES = {
+    "sync (avant)": "/legacy/stats",
+    "async (après)": "/async/stats",
+    "aggregate-stats": "/api/experiment/experiment/aggregate-stats",
+    "bias-comparison": "/api/experiment/experiment/bias-comparison",
+}
+
+
+def analytics_query():
+    """Agrégats par condition sur toutes les sessions (parcours complet de la table)"""
+    return select(
+        GameSession.condition,
+        func.count(GameSession.id),
+        func.avg(GameSession.automation_bias_score),
+        func.avg(GameSession.obedience_rate),
+        func.sum(case((GameSession.is_completed == True, 1), else_=0)),
+    ).group_by(GameSession.condition)
+
+
+def create_bench_app(path: str) -> FastAPI:
+    """Application réduite : écho WebSocket, routes d'analyse avant/après, routeur expérience"""
+    url = f"sqlite:///{path}"
+    SessionFactory = sessionmaker(bind=create_engine(url, connect_args={"check_same_thread": False}))
+    async_engine = create_async_database_engine(url, echo=False)
+
+    async def override_get_async_db():
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(experiment.router, prefix="/api/experiment")
+    app.dependency_overrides[get_async_reader_db] = override_get_async_db
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/legacy/stats")
+    async def legacy_stats():
+        # Ancien schéma : session synchrone appelée depuis une route async
+        with SessionFactory() as db:
+            return [list(row) for row in db.execute(analytics_query()).all()]
+
+    @app.get("/async/stats")
+    async def async_stats():
+        async with AsyncSession(async_engine) as db:
+            return [list(row) for row in (await db.execute(analytics_query())).all()]
+
+    @app.websocket("/ws")
+    async def echo(websocket: WebSocket):
+        await websocket.accept()
+        try:
+            while True:
+                await websocket.send_text(await websocket.receive_text())
+        except WebSocketDisconnect:
+            pass
+
+    return app
+
+
+def serve(path: str, port: int):
+    """Corps du processus serveur"""
+    uvicorn.run(create_bench_app(path), host="127.0.0.1", port=port, log_level="error")
+
+
+def free_port() -> int:
+    """Port TCP libre pour le serveur de benchmark"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_ready(base_url: str, timeout: float = 30.0):
+    """Attend que le serveur réponde"""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{base_url}/ping")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Serveur de benchmark non démarré")
+
+
+async def hammer(base_url: str, route: str, stop: asyncio.Event, counter: list):
+    """Client HTTP qui appelle une route en boucle"""
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        while not stop.is_set():
+            response = await client.get(f"{base_url}{route}")
+            response.raise_for_status()
+            counter[0] += 1
+
+
+async def measure_pings(ws_url: str, duration: float, interval: float = 0.01) -> list:
+    """Temps aller-retour (ms) des pings WebSocket pendant `duration` secondes"""
+    latencies = []
+    async with websockets.connect(ws_url) as websocket:
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            await websocket.send(json.dumps({"type": "ping"}))
+            await websocket.recv()
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(interval)
+    return latencies
+
+
+async def run_scenario(base_url: str, route, clients: int, duration: float):
+    """Pings WebSocket avec `clients` requêtes analytiques concurrentes sur `route`"""
+    stop = asyncio.Event()
+    counter = [0]
+    workers = [asyncio.create_task(hammer(base_url, route, stop, counter)) for _ in range(clients if route else 0)]
+    try:
+        await asyncio.sleep(0.5 if route else 0)  # Montée en charge
+        counter[0] = 0
+        start = time.perf_counter()
+        latencies = await measure_pings(base_url.replace("http", "ws") + "/ws", duration)
+        elapsed = time.perf_counter() - start
+    finally:
+        stop.set()
+        await asyncio.gather(*workers)
+    return latencies, counter[0] / elapsed
+
+
+def report(label: str, latencies: list, throughput: float):
+    """Affiche les percentiles de latence d'un scénario"""
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"  {label:<16} p50 {statistics.median(latencies):>7.1f} ms   p99 {p99:>7.1f} ms   "
+        f"max {latencies[-1]:>7.1f} ms   {throughput:>6.1f} req/s"
+    )
+
+
+async def run_benchmark(base_url: str, clients: int, duration: float):
+    """Scénario au repos puis un scénario par route analytique"""
+    print(f"📡 Ping WebSocket, {clients} clients analytiques concurrents")
+    report("au repos", *await run_scenario(base_url, None, clients, duration))
+    for label, route in ANALYTICS_ROUTES.items():
+        report(label, *await run_scenario(base_url, route, clients, duration))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de latence WebSocket sous charge analytique")
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "bench.db")
+        print(f"🗄️ Création d'une base synthétique de {args.sessions} sessions...")
+        build_database(path, args.sessions).dispose()
+
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = multiprocessing.get_context("spawn").Process(target=serve, args=(path, port), daemon=True)
+        server.start()
+        try:
+            asyncio.run(wait_ready(base_url))
+            asyncio.run(run_benchmark(base_url, args.clients, args.duration))
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
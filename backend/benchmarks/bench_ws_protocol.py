@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark : protocole WebSocket négocié
+Octets sur le fil et temps CPU serveur par message selon l'encodage, pour les
+messages du jeu (session_ready avec l'état initial de l'OS, mise à jour de
+corruption, fragment de réponse de Tom, pong) :
+  - avant : send_json (json.dumps à chaque envoi, trame texte)
+  - après : encodages "json", "deflate" et "msgpack" (si installé), avec et sans
+    permessage-deflate (simulé : deflate brut de la trame, contexte neuf)
+Diffusion : un même message envoyé à plusieurs connexions, sérialisé à chaque
+envoi (avant) ou une fois (EncodedMessage)
+
+Usage : python benchmarks/bench_ws_protocol.py --messages 2000 --recipients 20
+"""
+import sys
+import json
+import time
+import zlib
+import random
+import asyncio
+import argparse
+from pathlib import Path
+
+# Ajouter le chemin backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import testing_support  # noqa: F401
+
+from app.api import wire_protocol
+from app.api.wire_protocol import EncodedMessage, JSON_CODEC, DEFLATE_CODEC, decode
+from app.services.os_simulator import OSSimulator
+
+
+def game_messages(rng: random.Random) -> dict:
+    """Messages représentatifs envoyés au client"""
+    os_state = asyncio.run(OSSimulator().generate_initial_os("bench_session", "Joueur"))
+    effects = [{
+        "type": rng.choice(["dead_pixels", "widget_glitch", "file_corruption", "color_shift"]),
+        "target": f"element_{index}", "intensity": round(rng.random(), 3),
+        "duration_ms": rng.randint(200, 4000),
+    } for index in range(30)]
+    return {
+        "session_ready": {
+            "type": "session_ready", "session_id": "bench_session",
+            "tom_introduction": {"message": "Salut ! Je suis Tom, du support technique. On a un souci urgent."},
+            "tom_personality": {"condition": "oracle", "style": "humain"},
+            "session_data": {"os_state": os_state},
+        },
+        "corruption_update": {
+            "type": "corruption_update", "session_id": "bench_session",
+            "corruption_data": {"new_level": 0.42, "effects": effects},
+        },
+        "tom_message_chunk": {
+            "type": "tom_message_chunk", "session_id": "bench_session",
+            "message_id": "tom_0123456789ab", "index": 12, "text": "Je vois que tu hésites, ",
+        },
+        "pong": {"type": "pong"},
+    }
+
+
+def per_message_deflate(frames: list) -> int:
+    """Octets après permessage-deflate (contexte de compression conservé entre les trames données)"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    total = 0
+    for frame in frames:
+        data = frame.encode("utf-8") if isinstance(frame, str) else frame
+        # L'extension retire les 4 octets de fin du vidage synchrone
+        total += len(compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+    return total
+
+
+def measure(name: str, encode, message: dict, count: int) -> dict:
+    """Temps CPU par message (µs) et octets avant/après permessage-deflate"""
+    start = time.process_time()
+    for _ in range(count):
+        frame = encode(message)
+    cpu_us = (time.process_time() - start) / count * 1e6
+
+    assert decode(frame) == json.loads(json.dumps(message))
+    size = len(frame) if isinstance(frame, bytes) else len(frame.encode("utf-8"))
+    return {"name": name, "cpu_us": cpu_us, "bytes": size, "pmd_bytes": per_message_deflate([frame])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--recipients", type=int, default=20)
+    args = parser.parse_args()
+
+    messages = game_messages(random.Random(42))
+    encoders = [
+        ("send_json (avant)", lambda message: json.dumps(message, separators=(",", ":"), ensure_ascii=False)),
+        ("json", JSON_CODEC.encode),
+        ("deflate", DEFLATE_CODEC.encode),
+    ]
+    if wire_protocol.msgpack is not None:
+        encoders.append(("msgpack", wire_protocol.MSGPACK_CODEC.encode))
+        encoders.append(("msgpack (sans deflate)", wire_protocol.MSGPACK_PLAIN_CODEC.encode))
+    else:
+        print("ℹ️ msgpack non installé : encodage binaire non mesuré")
+
+    for label, message in messages.items():
+        print(f"\n📋 {label}")
+        print(f"   {'encodage':<24} {'octets':>9} {'+permessage-deflate':>20} {'CPU/message':>12}")
+        for name, encode in encoders:
+            result = measure(name, encode, message, args.messages)
+            print(f"   {name:<24} {result['bytes']:>9} {result['pmd_bytes']:>20.0f} {result['cpu_us']:>10.1f}µs")
+
+    # Diffusion d'une mise à jour de corruption à plusieurs connexions
+    message = messages["corruption_update"]
+    codecs = [JSON_CODEC, DEFLATE_CODEC] * (args.recipients // 2)
+    print(f"\n📋 Diffusion à {len(codecs)} connexions (moitié json, moitié deflate)")
+
+    start = time.process_time()
+    for _ in range(args.messages // 10):
+        for codec in codecs:
+            codec.encode(message)
+    before = (time.process_time() - start) / (args.messages // 10) * 1e6
+
+    start = time.process_time()
+    for _ in range(args.messages // 10):
+        encoded = EncodedMessage(message)
+        for codec in codecs:
+            encoded.encode(codec)
+    after = (time.process_time() - start) / (args.messages // 10) * 1e6
+
+    print(f"   sérialisé à chaque envoi : {before:>8.1f}µs par diffusion")
+    print(f"   sérialisé une fois       : {after:>8.1f}µs par diffusion (÷{before / after:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Configuration commune des tests du backend
+L'environnement (mode debug, points de reprise désactivés) est préparé par
+testing_support avant la collecte des tests
+"""
+import testing_support  # noqa: F401
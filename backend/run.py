@@ -1,7 +1,9 @@
 """
 Script de lancement principal pour REMOTE Backend
 """
+import argparse
 import asyncio
+import subprocess
 import sys
 import os
 from pathlib import Path
@@ -14,10 +16,59 @@ from app.config import settings
 from app.utils.logging import setup_dev_logging, setup_prod_logging
 
 
+def launch_topology(worker_count: int):
+    """
+    Lance N workers (processus uvicorn sur des ports locaux) et le routeur de
+    sessions sur le port public : chaque session reste sur son worker
+    """
+    from app.session_router import start_router
+    
+    processes = []
+    worker_urls = []
+    for index in range(worker_count):
+        port = settings.router_worker_base_port + index
+        env = {**os.environ, "WORKERS": "1", "WORKER_ID": f"worker-{index + 1}"}
+        if index > 0:
+            # Tâches de maintenance (migrations, rétention, réserve Tom) sur le premier worker seulement
+            env.update(DATABASE_AUTO_MIGRATE="false", BIAS_RETENTION_ENABLED="false", TOM_POOL_PATH="")
+        
+        processes.append(subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", "127.0.0.1", "--port", str(port),
+                "--log-level", "info" if settings.debug else "warning",
+                "--ws-per-message-deflate", "false"  # Compression assurée par le routeur
+            ],
+            cwd=str(Path(__file__).parent),
+            env=env
+        ))
+        worker_urls.append(f"http://127.0.0.1:{port}")
+        print(f"⚙️ Worker {index + 1}/{worker_count}: {worker_urls[-1]}")
+    
+    try:
+        start_router(worker_urls)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        print("🛑 Workers arrêtés")
+
+
 def main():
     """
     Point d'entrée principal de l'application
     """
+    parser = argparse.ArgumentParser(description="REMOTE Backend")
+    parser.add_argument(
+        "--router", type=int, metavar="N", default=0,
+        help="Lance N workers derrière le routeur de sessions (hachage cohérent)"
+    )
+    args = parser.parse_args()
+    
     print("🎮 REMOTE - Thriller Psychologique")
     print("=" * 50)
     
@@ -63,9 +114,13 @@ def main():
     print(f"🤖 Condition Tom: {settings.tom_personality_condition}")
     print(f"📊 Collecte données: {settings.collect_experiment_data}")
     
-    # Démarrer le serveur
+    # Démarrer le serveur (ou la topologie routeur + workers)
     try:
-        start_server()
+        if args.router > 0:
+            print(f"🧭 Topologie: routeur + {args.router} workers")
+            launch_topology(args.router)
+        else:
+            start_server()
     except KeyboardInterrupt:
         print("\n\n🛑 Arrêt demandé par l'utilisateur")
         print("👋 À bientôt !")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test différentiel de l'accumulateur incrémental des biais
+Compare, action par action, les mesures incrémentales aux mesures complètes
+(_measure_automation_bias, _measure_trust_calibration, ...) du BiasAnalyzer
+"""
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from testing_support import FakeDb
+
+from app.models import PlayerAction
+from app.services import bias_analyzer as bias_analyzer_module
+from app.services.bias_analyzer import BiasAnalyzer
+from app.services.bias_accumulator import ActionRecord, SessionBiasAccumulator
+
+ACTION_TYPES = [
+    "file_delete", "file_move", "file_properties", "context_menu_open",
+    "dependency_check", "desktop_click", "meta_detective", "meta_poet", "meta_hacker"
+]
+
+
+def generate_actions(rng: random.Random, count: int):
+    """Génère une séquence chronologique d'actions avec égalités de timestamps"""
+    current = datetime(2025, 1, 1, 12, 0, 0)
+    actions = []
+
+    for _ in range(count):
+        # 20% d'égalités de timestamp, sinon un pas de 0 à 20 secondes
+        if rng.random() > 0.2:
+            current += timedelta(seconds=rng.choice([1, 5, 10, 15, 20, 29.5, 30, 31]))
+
+        triggered = rng.random() < 0.3
+        action_type = rng.choice(ACTION_TYPES)
+        actions.append(PlayerAction(
+            session_id="diff_session",
+            timestamp=current,
+            game_time_seconds=0.0,
+            action_type=action_type,
+            action_category="test",
+            action_description=f"Action {action_type}",
+            gravity_score=rng.randint(0, 10),
+            reaction_time_seconds=rng.choice([None, rng.uniform(0.2, 12.0)]),
+            was_obedient=rng.choice([True, False, None]),
+            triggered_corruption=triggered,
+            corruption_level_after=rng.uniform(0.0, 1.0) if triggered else None,
+            game_phase="adhesion",
+        ))
+
+    return actions
+
+
+async def full_measures(analyzer: BiasAnalyzer, actions, game_state):
+    """Mesures de référence par rescan complet"""
+    return {
+        "automation_bias": await analyzer._measure_automation_bias(actions, {}),
+        "trust_calibration": await analyzer._measure_trust_calibration(actions, {}),
+        "cognitive_offloading": await analyzer._measure_cognitive_offloading(actions, {}),
+        "authority_compliance": await analyzer._measure_authority_compliance(actions, {}, game_state),
+    }
+
+
+def incremental_measures(accumulator: SessionBiasAccumulator, game_state):
+    """Mesures issues de l'accumulateur"""
+    return {
+        "automation_bias": accumulator.automation_bias(),
+        "trust_calibration": accumulator.trust_calibration(),
+        "cognitive_offloading": accumulator.cognitive_offloading(),
+        "authority_compliance": accumulator.authority_compliance(game_state),
+    }
+
+
+async def run_differential(seeds: int = 200, length: int = 60):
+    """Compare les deux implémentations après chaque action"""
+    analyzer = BiasAnalyzer()
+    comparisons = 0
+
+    for seed in range(seeds):
+        rng = random.Random(seed)
+        actions = generate_actions(rng, length)
+        accumulator = SessionBiasAccumulator(analyzer)
+
+        for index, action in enumerate(actions):
+            accumulator.add(ActionRecord.from_model(action))
+            prefix = actions[:index + 1]
+
+            for game_state in ({"is_completed": False}, {"is_completed": True}):
+                expected = await full_measures(analyzer, prefix, game_state)
+                actual = incremental_measures(accumulator, game_state)
+                assert actual == expected, (
+                    f"Divergence seed={seed} action={index}:\n"
+                    f"  attendu: {expected}\n  obtenu:  {actual}"
+                )
+                comparisons += 1
+
+        # La reconstruction à froid doit donner le même état
+        rebuilt = SessionBiasAccumulator.from_actions(analyzer, actions)
+        assert incremental_measures(rebuilt, {}) == incremental_measures(accumulator, {})
+
+    return comparisons
+
+
+def test_incremental_matches_full_rescan():
+    """Les mesures incrémentales égalent exactement les mesures complètes"""
+    assert asyncio.run(run_differential(seeds=50)) > 0
+
+
+def test_out_of_order_action_requests_rebuild():
+    """Une action antérieure à la dernière vue invalide l'accumulateur"""
+    analyzer = BiasAnalyzer()
+    actions = generate_actions(random.Random(1), 5)
+    accumulator = SessionBiasAccumulator.from_actions(analyzer, actions[1:])
+    accumulator.add(ActionRecord.from_model(actions[0]))
+
+    if actions[0].timestamp < actions[-1].timestamp:
+        assert accumulator.needs_rebuild
+
+
+class BlockedWriteQueue:
+    """File d'écriture dont le vidage attend que le test l'autorise"""
+
+    def __init__(self):
+        self.released = asyncio.Event()
+
+    async def flush(self):
+        await self.released.wait()
+
+
+async def run_concurrent_rebuild():
+    analyzer = BiasAnalyzer()
+    actions = generate_actions(random.Random(2), 6)
+    for index, action in enumerate(actions):
+        action.id = f"action_{index}"
+    committed, late = actions[:4], actions[4:]
+
+    queue, db = BlockedWriteQueue(), FakeDb(committed)
+    get_write_queue, get_async_db_context = bias_analyzer_module.get_write_queue, bias_analyzer_module.get_async_db_context
+    bias_analyzer_module.get_write_queue = lambda: queue
+    bias_analyzer_module.get_async_db_context = lambda: db
+    try:
+        measures = [asyncio.ensure_future(analyzer._get_accumulator("s1")) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        # Pendant la reconstruction : une action déjà commitée (doublon) et deux nouvelles
+        for action in [committed[-1]] + late:
+            analyzer.record_action("s1", ActionRecord.from_model(action))
+        queue.released.set()
+        accumulators = await asyncio.gather(*measures)
+    finally:
+        bias_analyzer_module.get_write_queue = get_write_queue
+        bias_analyzer_module.get_async_db_context = get_async_db_context
+
+    return analyzer, accumulators, db.selects, actions
+
+
+def test_concurrent_rebuild_keeps_pending_actions():
+    """Une seule reconstruction par session, sans perte ni doublon des actions reçues entre-temps"""
+    analyzer, accumulators, selects, actions = asyncio.run(run_concurrent_rebuild())
+    assert selects == 1
+    assert all(accumulator is accumulators[0] for accumulator in accumulators)
+    assert analyzer.session_accumulators["s1"] is accumulators[0]
+    assert analyzer._rebuilds == {} and analyzer._pending_records == {}
+
+    expected = SessionBiasAccumulator.from_actions(analyzer, actions)
+    assert accumulators[0].total_actions == len(actions)
+    assert incremental_measures(accumulators[0], {}) == incremental_measures(expected, {})
+
+
+if __name__ == "__main__":
+    print("Test différentiel de l'accumulateur de biais...")
+    total = asyncio.run(run_differential())
+    test_out_of_order_action_requests_rebuild()
+    test_concurrent_rebuild_keeps_pending_actions()
+    print(f"OK: {total} comparaisons identiques")
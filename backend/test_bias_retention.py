@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la rétention par niveaux des snapshots de biais
+Agrégation des sessions terminées en rollups par minute et par phase, purge
+des snapshots bruts puis des rollups par minute, lecture par l'analyse des biais
+"""
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+
+import testing_support  # noqa: F401
+
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from app.database import Base
+from app.models import GameSession, BiasSnapshot, BiasSnapshotRollup
+from app.services.bias_retention import BiasRetention
+from app.api import experiment
+
+
+def seed(engine, now: datetime):
+    """Une session terminée il y a deux jours, une session en cours"""
+    old_start = (now - timedelta(days=2)).replace(second=0, microsecond=0)
+    with engine.begin() as connection:
+        for session_id in ("old", "live"):
+            connection.execute(GameSession.__table__.insert(), [{
+                "id": session_id, "condition": "oracle", "session_start": now,
+                "game_phase": "adhesion", "created_at": now, "updated_at": now,
+            }])
+
+        # 3 minutes de snapshots toutes les 20 s ; phase "dissonance" à la dernière minute
+        rows = []
+        for step in range(9):
+            rows.append({
+                "id": f"old_{step}", "session_id": "old",
+                "timestamp": old_start + timedelta(seconds=20 * step),
+                "game_time_seconds": 20.0 * step,
+                "game_phase": "adhesion" if step < 6 else "dissonance",
+                "corruption_level": 0.1 * step,
+                "instantaneous_automation_bias": None if step == 4 else float(step),
+                "created_at": now,
+            })
+        rows.append({
+            "id": "live_0", "session_id": "live", "timestamp": now - timedelta(minutes=5),
+            "game_time_seconds": 1.0, "game_phase": "adhesion", "corruption_level": 0.0,
+            "instantaneous_automation_bias": 0.5, "created_at": now,
+        })
+        connection.execute(BiasSnapshot.__table__.insert(), rows)
+
+
+def test_rollup_and_prune():
+    """Agrégats exacts, sessions récentes intactes, purge du niveau minute"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/retention.db")
+        Base.metadata.create_all(bind=engine)
+        now = datetime.now()
+        seed(engine, now)
+
+        retention = BiasRetention(engine=engine, raw_hours=24, minute_days=90, batch_sessions=1)
+        result = retention.run(now=now)
+        assert result["sessions_rolled_up"] == 1
+        assert result["snapshots_pruned"] == 9
+        assert result["rollups_written"] == 5  # 3 minutes + 2 phases
+
+        with engine.connect() as connection:
+            remaining = connection.execute(select(BiasSnapshot.session_id)).scalars().all()
+            assert remaining == ["live"]
+
+            rollups = connection.execute(
+                select(BiasSnapshotRollup).order_by(BiasSnapshotRollup.tier, BiasSnapshotRollup.bucket_start)
+            ).all()
+            minutes = [rollup for rollup in rollups if rollup.tier == "minute"]
+            phases = {rollup.game_phase: rollup for rollup in rollups if rollup.tier == "phase"}
+
+            # Deuxième minute : pas 3, 4 (valeur manquante) et 5
+            assert [rollup.sample_count for rollup in minutes] == [3, 3, 3]
+            assert minutes[1].automation_bias_min == 3.0
+            assert minutes[1].automation_bias_max == 5.0
+            assert minutes[1].automation_bias_mean == 4.0
+            assert minutes[1].automation_bias_last == 5.0
+
+            assert phases["adhesion"].sample_count == 6
+            assert phases["dissonance"].automation_bias_mean == 7.0
+            assert abs(phases["dissonance"].corruption_level_max - 0.8) < 1e-9
+
+        # Second passage : rien à agréger
+        assert retention.run(now=now)["sessions_rolled_up"] == 0
+
+        # Trois mois plus tard : la session "live" est agrégée à son tour et
+        # seuls les rollups par phase restent
+        later = now + timedelta(days=91)
+        result = retention.run(now=later)
+        assert result["sessions_rolled_up"] == 1
+        assert result["minute_rollups_pruned"] == 4
+        with engine.connect() as connection:
+            tiers = connection.execute(
+                select(BiasSnapshotRollup.tier, func.count()).group_by(BiasSnapshotRollup.tier)
+            ).all()
+            assert dict(tiers) == {"phase": 3}
+
+        engine.dispose()
+
+
+def test_bias_analysis_reads_rollups():
+    """L'analyse d'une session agrégée renvoie sa série à la résolution disponible"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/retention.db")
+        Base.metadata.create_all(bind=engine)
+        now = datetime.now()
+        seed(engine, now)
+        BiasRetention(engine=engine).run(now=now)
+
+        async def analyse(session_id):
+            async_engine = create_async_engine(f"sqlite+aiosqlite:///{directory}/retention.db")
+            try:
+                async with AsyncSession(async_engine) as db:
+                    return await experiment.get_bias_analysis(session_id, db=db)
+            finally:
+                await async_engine.dispose()
+
+        old = asyncio.run(analyse("old"))
+        assert old["snapshot_resolution"] == "minute"
+        assert [snapshot["sample_count"] for snapshot in old["bias_snapshots"]] == [3, 3, 3]
+        assert [phase["game_phase"] for phase in old["phase_summary"]] == ["adhesion", "dissonance"]
+
+        live = asyncio.run(analyse("live"))
+        assert live["snapshot_resolution"] == "raw"
+        assert len(live["bias_snapshots"]) == 1
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    print("Test de la rétention des snapshots de biais...")
+    test_rollup_and_prune()
+    test_bias_analysis_reads_rollups()
+    print("OK")
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test des colonnes compressées (JSON et texte)
+Aller-retour par l'ORM, lecture des lignes en clair d'avant la migration,
+conversion avec dictionnaire entraîné et chargement différé
+"""
+import tempfile
+from datetime import datetime, timedelta
+
+import testing_support  # noqa: F401
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.migrations import compress_large_columns
+from app.models import GameSession, PlayerAction, TomInteraction
+from app.models.compression import get_compression_dictionaries, compress
+from app.services.column_compression import storage_report, compress_existing_rows
+
+
+def hesitation_prompt(index: int) -> str:
+    """Prompt répétitif, comme ceux de Tom"""
+    return f"""Tu es Tom. Le joueur hésite depuis {index % 17 + 1.5:.1f} secondes avant d'exécuter ton dernier ordre.
+
+STYLE (Condition B):
+- Ton humain, empathique, personnel
+- Utilise "je vois que tu hésites", "c'est normal"
+- Rassure mais maintient l'urgence
+
+Génère une réponse au format JSON EXACT :
+{{
+    "message": "le message complet",
+    "tone": "empathique et rassurant",
+    "intent": "rassurer et relancer"
+}}
+
+Réponds UNIQUEMENT avec ce JSON."""
+
+
+def make_engine(directory: str):
+    engine = create_engine(f"sqlite:///{directory}/compression.db")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(GameSession.__table__.insert(), [{
+            "id": "session_0", "condition": "oracle", "session_start": datetime.now(),
+            "game_phase": "adhesion", "created_at": datetime.now(), "updated_at": datetime.now(),
+        }])
+    return engine
+
+
+def test_round_trip_and_deferred_loading():
+    """Valeurs stockées en binaire, relues à l'identique ; prompts chargés à l'accès"""
+    get_compression_dictionaries().clear()
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(directory)
+        action_data = {"type": "file_delete", "target": "C:/Users/rapport.docx", "protected": True, "path": ["a"] * 40}
+
+        with Session(bind=engine) as db:
+            db.add(PlayerAction(
+                id="action_0", session_id="session_0", game_time_seconds=1.0, action_type="file_delete",
+                action_category="file_manipulation", action_description="Suppression", game_phase="adhesion",
+                action_data=action_data,
+            ))
+            db.add(TomInteraction(
+                id="tom_0", session_id="session_0", game_time_seconds=1.0, interaction_type="response",
+                message_text="Bonjour", game_phase="adhesion", corruption_level=0.0,
+                llm_prompt=hesitation_prompt(0), llm_response_raw="{}",
+            ))
+            db.commit()
+
+        with engine.connect() as connection:
+            stored = connection.exec_driver_sql(
+                "SELECT typeof(action_data), length(action_data), typeof(llm_prompt) "
+                "FROM player_actions, tom_interactions"
+            ).one()
+            assert stored[0] == "blob" and stored[2] == "blob"
+            assert stored[1] < len(str(action_data))
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        with Session(bind=engine) as db:
+            assert db.get(PlayerAction, "action_0").action_data == action_data
+            interaction = db.get(TomInteraction, "tom_0")
+            assert "llm_prompt" not in statements[-1]
+            assert interaction.llm_prompt == hesitation_prompt(0)
+            assert "llm_prompt" in statements[-1]
+            assert interaction.llm_response_raw == "{}"
+
+        engine.dispose()
+
+
+def test_migration_converts_legacy_rows():
+    """Lignes en clair lisibles avant la migration, compressées après, dictionnaire actif"""
+    get_compression_dictionaries().clear()
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(directory)
+        now = datetime.now()
+
+        # Lignes écrites avant la migration : JSON et texte en clair
+        with engine.begin() as connection:
+            for index in range(60):
+                connection.exec_driver_sql(
+                    "INSERT INTO tom_interactions (id, session_id, timestamp, game_time_seconds, interaction_type,"
+                    " message_text, game_phase, corruption_level, llm_prompt, created_at)"
+                    " VALUES (?, 'session_0', ?, 1.0, 'response', 'Bonjour', 'adhesion', 0.0, ?, ?)",
+                    (f"tom_{index:03d}", now, hesitation_prompt(index), now - timedelta(seconds=index))
+                )
+            connection.exec_driver_sql(
+                "UPDATE game_sessions SET raw_action_data = ?, tom_interaction_log = '5'",
+                ('{"actions": [1, 2, 3]}',)
+            )
+
+        with Session(bind=engine) as db:
+            assert db.get(TomInteraction, "tom_007").llm_prompt == hesitation_prompt(7)
+            session = db.get(GameSession, "session_0")
+            assert session.raw_action_data == {"actions": [1, 2, 3]}
+            assert session.tom_interaction_log == 5
+
+        with engine.connect() as connection:
+            before = storage_report(connection)["columns"]["tom_interactions.llm_prompt"]
+        compress_large_columns(engine)
+        with engine.connect() as connection:
+            after = storage_report(connection)["columns"]["tom_interactions.llm_prompt"]
+        assert before["compressed_rows"] == 0
+        assert after["compressed_rows"] == 60
+        assert after["stored_bytes"] * 4 < before["stored_bytes"]
+
+        # Dictionnaire actif après le commit, meilleur que deflate seul
+        dictionary = get_compression_dictionaries().active("tom_prompts")
+        assert dictionary is not None
+        payload = hesitation_prompt(99).encode("utf-8")
+        assert len(compress(payload, dictionary)) < len(compress(payload)) / 2
+
+        # Nouvelles lignes en clair : une transaction par lot, relance sans effet sur les lignes compressées
+        with engine.begin() as connection:
+            for index in range(100, 160):
+                connection.exec_driver_sql(
+                    "INSERT INTO tom_interactions (id, session_id, timestamp, game_time_seconds, interaction_type,"
+                    " message_text, game_phase, corruption_level, llm_prompt, created_at)"
+                    " VALUES (?, 'session_0', ?, 1.0, 'response', 'Bonjour', 'adhesion', 0.0, ?, ?)",
+                    (f"tom_{index:03d}", now, hesitation_prompt(index), now)
+                )
+        commits = []
+
+        def count_commit(connection):
+            commits.append(connection)
+
+        event.listen(engine, "commit", count_commit)
+        converted = compress_existing_rows(engine, batch_size=25)
+        event.remove(engine, "commit", count_commit)
+        assert converted["tom_interactions.llm_prompt"] == 60
+        assert len(commits) >= 3
+
+        get_compression_dictionaries().clear()
+        get_compression_dictionaries().load(engine)
+        with Session(bind=engine) as db:
+            assert db.get(TomInteraction, "tom_042").llm_prompt == hesitation_prompt(42)
+            assert db.get(GameSession, "session_0").raw_action_data == {"actions": [1, 2, 3]}
+
+        engine.dispose()
+    get_compression_dictionaries().clear()
+
+
+if __name__ == "__main__":
+    print("Test des colonnes compressées...")
+    test_round_trip_and_deferred_loading()
+    test_migration_converts_legacy_rows()
+    print("OK")
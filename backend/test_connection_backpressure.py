@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test des files d'envoi WebSocket
+Fusion des états remplacés, politiques de client lent (perte du plus ancien,
+du plus récent, déconnexion), envoi bloqué, et isolation des autres clients
+"""
+import asyncio
+
+from testing_support import FakeWebSocket
+
+from app.services.event_bus import EventBus
+from app.api.connection_manager import ConnectionManager, ConnectionOutbox, CLOSE_TRY_AGAIN_LATER
+from app.api.wire_protocol import EncodedMessage
+
+
+def test_outbox_coalescing():
+    """Seul le dernier état d'une session est envoyé, à la place du premier"""
+    async def scenario():
+        outbox = ConnectionOutbox(maxsize=3, coalesce_types=["game_state"])
+        assert outbox.put(EncodedMessage({"type": "game_state", "session_id": "s1", "turn": 1}))
+        assert outbox.put(EncodedMessage({"type": "tom_message_chunk", "session_id": "s1", "chunk": "a"}))
+        assert outbox.put(EncodedMessage({"type": "game_state", "session_id": "s2", "turn": 1}))
+        # File pleine, mais un état remplacé ne prend pas de place
+        assert outbox.put(EncodedMessage({"type": "game_state", "session_id": "s1", "turn": 2}))
+        assert not outbox.put(EncodedMessage({"type": "tom_message_chunk", "session_id": "s1", "chunk": "b"}))
+
+        received = [(await outbox.get())[0].message for _ in range(3)]
+        assert [(message["type"], message.get("turn")) for message in received] == [
+            ("game_state", 2), ("tom_message_chunk", None), ("game_state", 1)
+        ]
+        assert outbox.coalesced == 1 and outbox.high_watermark == 3
+
+        # Une fois envoyé, un état n'est plus remplaçable
+        assert outbox.put(EncodedMessage({"type": "game_state", "session_id": "s1", "turn": 3}))
+        assert outbox.qsize() == 1
+
+    asyncio.run(scenario())
+
+
+async def fill_slow_client(policy: str):
+    """Client bloqué, file de 4 messages, 10 messages envoyés ; un client rapide à côté"""
+    manager = ConnectionManager(event_bus=EventBus(), queue_size=4, slow_consumer_policy=policy, send_timeout=5)
+    slow, fast = FakeWebSocket(blocked=True), FakeWebSocket()
+    await manager.connect(slow, "slow")
+    await manager.connect(fast, "fast")
+
+    for index in range(10):
+        await manager.broadcast({"type": "tom_message_chunk", "index": index}, ["slow", "fast"])
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(0.01)
+
+    # Le client rapide reçoit tout, quel que soit l'état du client lent
+    assert [message["index"] for message in fast.sent] == list(range(10))
+
+    slow.gate.set()
+    await asyncio.sleep(0.01)
+    stats = manager.get_stats()
+    for connection_id in list(manager.active_connections):
+        manager.disconnect(connection_id)
+    return [message["index"] for message in slow.sent], slow.closed_code, stats
+
+
+def test_slow_consumer_policies():
+    # Le premier message est déjà en cours d'envoi, la file en garde 4
+    received, closed, stats = asyncio.run(fill_slow_client("drop_oldest"))
+    assert received == [0, 6, 7, 8, 9]
+    assert stats["messages_dropped"] == 5 and closed is None
+
+    received, closed, stats = asyncio.run(fill_slow_client("drop_newest"))
+    assert received == [0, 1, 2, 3, 4]
+    assert stats["messages_dropped"] == 5 and closed is None
+
+    received, closed, stats = asyncio.run(fill_slow_client("disconnect"))
+    assert closed == CLOSE_TRY_AGAIN_LATER
+    assert stats["slow_consumer_disconnects"] == 1
+    assert stats["queue_depth"]["high_watermark"] == 4
+    assert stats["send_latency_ms"]["max"] > 0
+
+
+def test_blocked_send_timeout():
+    """Un envoi bloqué au-delà du délai déconnecte le client"""
+    async def scenario():
+        manager = ConnectionManager(event_bus=EventBus(), send_timeout=0.05)
+        websocket = FakeWebSocket(blocked=True)
+        await manager.connect(websocket, "c1")
+        await manager.send_personal_message({"type": "pong"}, "c1")
+        await asyncio.sleep(0.2)
+        return manager, websocket
+
+    manager, websocket = asyncio.run(scenario())
+    assert websocket.closed_code == CLOSE_TRY_AGAIN_LATER
+    assert manager.active_connections == {} and manager.writers == {}
+    assert manager.get_stats()["send_timeouts"] == 1
+
+
+if __name__ == "__main__":
+    print("Test des files d'envoi WebSocket...")
+    test_outbox_coalescing()
+    test_slow_consumer_policies()
+    test_blocked_send_timeout()
+    print("OK")
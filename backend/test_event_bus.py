@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du bus d'événements de session
+Publication/abonnement, génération Tom évitée sans abonné, et événements
+poussés au client WebSocket de la session
+"""
+import asyncio
+from datetime import datetime
+
+from testing_support import make_orchestrator
+
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+from app.services.event_bus import EventBus, ALL_SESSIONS
+from app.services.game_orchestrator import GameOrchestrator, GameState
+from app.api.connection_manager import ConnectionManager
+from app.api.wire_protocol import receive_message
+
+
+def test_publish_subscribe():
+    """Routage par session, abonnés asynchrones, erreurs isolées"""
+    bus = EventBus()
+    received, audit = [], []
+
+    async def async_handler(event):
+        received.append(event)
+
+    def failing_handler(event):
+        raise RuntimeError("abonné défaillant")
+
+    token = bus.subscribe("s1", async_handler)
+    bus.subscribe("s1", failing_handler)
+    bus.subscribe(ALL_SESSIONS, audit.append)
+
+    assert asyncio.run(bus.publish("s1", {"type": "corruption_update"})) == 2
+    assert received == [{"type": "corruption_update", "session_id": "s1"}]
+    assert asyncio.run(bus.publish("s2", {"type": "session_status"})) == 1
+    assert [event["session_id"] for event in audit] == ["s1", "s2"]
+
+    bus.unsubscribe(token)
+    bus.unsubscribe(token)
+    assert bus.get_stats()["handler_errors"] == 1
+    assert bus.get_stats()["subscriptions"] == 2
+
+
+async def run_phase_transition(orchestrator: GameOrchestrator):
+    orchestrator.active_sessions["s1"] = GameState(
+        session_id="s1", player_name="Joueur", start_time=datetime.now(), current_phase="adhesion",
+        corruption_level=0.0, time_elapsed=0.0, is_active=True, last_action_time=0.0
+    )
+    await orchestrator._transition_game_phase("s1", "doubt")
+
+
+def test_tom_skipped_without_subscriber():
+    """Le message de Tom n'est généré que si un client peut le recevoir"""
+    orchestrator = make_orchestrator()
+
+    asyncio.run(run_phase_transition(orchestrator))
+    assert orchestrator.tom_service.calls == 0
+    assert orchestrator.event_bus.get_stats()["unrouted"] == 1
+
+    events = []
+    orchestrator.event_bus.subscribe("s1", events.append)
+    asyncio.run(run_phase_transition(orchestrator))
+    assert orchestrator.tom_service.calls == 1
+    assert [event["type"] for event in events] == ["session_status", "tom_message_generated"]
+    assert events[0]["phase"] == "doubt" and events[0]["old_phase"] == "adhesion"
+
+
+def test_push_to_connection():
+    """Les événements de la session arrivent au client ; déconnexion sans reliquat"""
+    bus = EventBus()
+    manager = ConnectionManager(event_bus=bus)
+    app = FastAPI()
+
+    @app.websocket("/ws/{connection_id}")
+    async def websocket_endpoint(websocket: WebSocket, connection_id: str):
+        await manager.connect(websocket, connection_id)
+        try:
+            while True:
+                data = await receive_message(websocket)
+                if data["type"] == "session_init":
+                    manager.link_session(data["session_id"], connection_id)
+                    await manager.send_personal_message({"type": "session_ready"}, connection_id)
+                elif data["type"] == "publish":
+                    await bus.publish(data["session_id"], {"type": "corruption_update", "corruption_data": {"level": 0.4}})
+        except WebSocketDisconnect:
+            manager.disconnect(connection_id)
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/c1") as websocket:
+            websocket.send_json({"type": "session_init", "session_id": "s1"})
+            assert websocket.receive_json() == {"type": "session_ready"}
+
+            websocket.send_json({"type": "publish", "session_id": "s1"})
+            event = websocket.receive_json()
+            assert event["type"] == "corruption_update"
+            assert event["session_id"] == "s1"
+            assert event["corruption_data"] == {"level": 0.4}
+            assert bus.has_subscribers("s1")
+
+    # Fermeture côté client : abonnement et index retirés
+    assert manager.get_stats()["events_pushed"] == 1
+    assert manager.session_connections == {}
+    assert manager.connection_sessions == {}
+    assert not bus.has_subscribers("s1")
+
+
+if __name__ == "__main__":
+    print("Test du bus d'événements...")
+    test_publish_subscribe()
+    test_tom_skipped_without_subscriber()
+    test_push_to_connection()
+    print("OK")
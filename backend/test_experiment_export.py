@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de l'export en flux des données d'expérience
+Une ligne par session jointe à sa dernière mesure, sessions sans mesure,
+égalité d'horodatage départagée par l'identifiant, corps JSON/JSONL/CSV valides
+"""
+import csv
+import io
+import json
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+import testing_support  # noqa: F401
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from app.database import Base
+from app.models import GameSession, ExperimentData
+from app.api import experiment
+
+
+def seed(engine):
+    """4 sessions : mesures multiples, aucune mesure, égalité d'horodatage, hors fenêtre"""
+    now = datetime.now()
+
+    def session(session_id: str, condition: str, age_days: float, duration=None):
+        return {
+            "id": session_id, "condition": condition, "session_start": now, "game_phase": "rupture",
+            "corruption_level": 0.5, "is_completed": True, "ending_type": "poet", "duration_seconds": duration,
+            "total_actions": 12, "obedience_rate": 0.75,
+            "created_at": now - timedelta(days=age_days), "updated_at": now,
+        }
+
+    def measure(measure_id: str, session_id: str, timestamp: datetime, scores):
+        row = {
+            "id": measure_id, "session_id": session_id, "measurement_timestamp": timestamp,
+            "game_time_seconds": 60.0, "corruption_level": 0.5, "condition": "oracle", "game_phase": "rupture",
+        }
+        row.update(zip(
+            ("automation_bias_score", "trust_calibration_score", "cognitive_offloading_score", "authority_compliance_score"),
+            scores
+        ))
+        return row
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(GameSession.__table__.insert(), [
+            session("mesures", "oracle", 3, duration=300),
+            session("sans_mesure", "confident", 2),
+            session("egalite", "oracle", 1, duration=90),
+            session("ancienne", "oracle", 60),
+        ])
+        connection.execute(ExperimentData.__table__.insert(), [
+            measure("m1", "mesures", now - timedelta(minutes=10), (0.1, 0.1, 0.1, 0.1)),
+            measure("m3", "mesures", now - timedelta(minutes=1), (0.2, 0.4, None, 0.6)),
+            measure("m2", "mesures", now - timedelta(minutes=5), (0.9, 0.9, 0.9, 0.9)),
+            # Même horodatage : la mesure d'identifiant le plus grand l'emporte
+            measure("e_b", "egalite", now, (0.8, None, None, None)),
+            measure("e_a", "egalite", now, (0.3, 0.3, 0.3, 0.3)),
+            measure("old", "ancienne", now, (1.0, 1.0, 1.0, 1.0)),
+        ])
+
+
+async def export(url: str, format: str, condition=None, anonymize=False):
+    async_engine = create_async_engine(url)
+    try:
+        async with AsyncSession(async_engine) as db:
+            response = await experiment.export_experiment_data(
+                format=format, condition=condition, days_back=30, anonymize=anonymize, db=db
+            )
+            body = "".join([chunk async for chunk in response.body_iterator])
+            return response, body
+    finally:
+        await async_engine.dispose()
+
+
+def run_exports(**params):
+    """Exports dans les trois formats, lus par lots de 2 lignes pour traverser plusieurs partitions"""
+    original_batch_size = experiment.EXPORT_BATCH_SIZE
+    experiment.EXPORT_BATCH_SIZE = 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{directory}/export.db")
+            seed(engine)
+            engine.dispose()
+            url = f"sqlite+aiosqlite:///{directory}/export.db"
+            return {format: asyncio.run(export(url, format, **params)) for format in ("json", "jsonl", "csv")}
+    finally:
+        experiment.EXPORT_BATCH_SIZE = original_batch_size
+
+
+def test_one_row_per_session_with_latest_measurement():
+    exports = run_exports()
+
+    response, body = exports["json"]
+    assert response.media_type == "application/json"
+    document = json.loads(body)
+    assert document["metadata"]["total_sessions"] == 3
+    rows = {row["session_id"]: row for row in document["data"]}
+    assert [row["session_id"] for row in document["data"]] == ["mesures", "sans_mesure", "egalite"]
+
+    # Dernière mesure, pas la dernière insérée
+    assert rows["mesures"]["automation_bias_score"] == 0.2
+    assert rows["mesures"]["cognitive_offloading_score"] is None
+    assert rows["mesures"]["composite_bias_score"] == pytest.approx(0.4)
+    assert rows["mesures"]["duration_minutes"] == 5.0
+
+    # Aucune mesure : pas de colonnes de biais
+    assert "automation_bias_score" not in rows["sans_mesure"]
+    assert rows["sans_mesure"]["duration_minutes"] == 0.0
+
+    assert rows["egalite"]["automation_bias_score"] == 0.8
+    assert rows["egalite"]["composite_bias_score"] == 0.8
+
+    # JSONL : même contenu, une session par ligne
+    response, body = exports["jsonl"]
+    assert response.media_type == "application/x-ndjson"
+    assert [json.loads(line) for line in body.splitlines()] == document["data"]
+
+    # CSV : en-tête fixe, champs absents laissés vides
+    response, body = exports["csv"]
+    assert response.media_type.startswith("text/csv")
+    reader = csv.DictReader(io.StringIO(body))
+    assert reader.fieldnames == experiment.EXPORT_FIELDS
+    csv_rows = {row["session_id"]: row for row in reader}
+    assert set(csv_rows) == set(rows)
+    assert float(csv_rows["egalite"]["automation_bias_score"]) == 0.8
+    assert csv_rows["sans_mesure"]["composite_bias_score"] == ""
+
+
+def test_filter_and_anonymize():
+    exports = run_exports(condition="confident", anonymize=True)
+    document = json.loads(exports["json"][1])
+    assert document["metadata"]["total_sessions"] == 1
+    assert document["metadata"]["condition_filter"] == "confident"
+    row = document["data"][0]
+    assert row["session_id"].startswith("anon_") and row["created_at"] is None
+
+
+def test_empty_export_is_valid():
+    exports = run_exports(condition="absent")
+    document = json.loads(exports["json"][1])
+    assert document["data"] == [] and document["metadata"]["total_sessions"] == 0
+    assert exports["jsonl"][1] == ""
+    assert list(csv.DictReader(io.StringIO(exports["csv"][1]))) == []
+
+
+if __name__ == "__main__":
+    print("Test de l'export en flux des données d'expérience...")
+    test_one_row_per_session_with_latest_measurement()
+    test_filter_and_anonymize()
+    test_empty_export_is_valid()
+    print("OK")
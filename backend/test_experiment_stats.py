@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test des statistiques d'expérience calculées en SQL
+/experiment/aggregate-stats et /experiment/bias-comparison doivent conserver la
+sémantique des anciennes boucles Python : `valeur or 0`, `ending or "unknown"`,
+session "avec biais" si un score est non nul, conditions sans session
+"""
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+import testing_support  # noqa: F401
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from app.models import GameSession
+from app.api.experiment import get_aggregate_experiment_stats, compare_bias_by_condition
+
+SCORES = ("automation_bias_score", "trust_calibration_score", "cognitive_offloading_score", "authority_compliance_score")
+
+
+def session_row(session_id: str, condition: str, is_completed, ending_type=None, duration=None,
+                obedience=None, corruption=None, scores=(None, None, None, None), age_days: float = 0):
+    now = datetime.now()
+    row = {
+        "id": session_id, "condition": condition, "session_start": now, "game_phase": "rupture",
+        "is_completed": is_completed, "ending_type": ending_type, "duration_seconds": duration,
+        "obedience_rate": obedience, "corruption_level": corruption, "total_actions": 0,
+        "created_at": now - timedelta(days=age_days), "updated_at": now,
+    }
+    row.update(zip(SCORES, scores))
+    return row
+
+
+def seed(engine):
+    """Sessions aux valeurs NULL, vides et nulles ; schéma sans NOT NULL comme les bases héritées"""
+    ddl = str(CreateTable(GameSession.__table__).compile(engine))
+    for column in ("is_completed BOOLEAN NOT NULL", "corruption_level FLOAT NOT NULL"):
+        assert column in ddl
+        ddl = ddl.replace(column, column[:-len(" NOT NULL")])
+
+    with engine.begin() as connection:
+        connection.execute(text(ddl))
+        connection.execute(GameSession.__table__.insert(), [
+            session_row("c1", "confident", True, "detective", 120, 0.5, 0.4, (0.6, None, 0.0, 0.2)),
+            session_row("c2", "confident", True),  # Tout NULL : fin "unknown", pas de biais
+            session_row("c3", "confident", True, "", 240, 1.0, 0.2, (0.0, 0.0, 0.0, 0.0)),  # Scores nuls : pas de biais
+            session_row("c4", "confident", None, "poet", 600, 0.9, 0.6, (0.9, 0.9, 0.9, 0.9)),  # Non terminée (NULL)
+            session_row("c5", "confident", False, corruption=0.8),
+            session_row("o1", "oracle", True, "hacker", 300, 0.3, 0.1, (0.0, 0.4, None, None)),
+            session_row("ancienne", "confident", True, "poet", 60, 1.0, 1.0, (1.0, 1.0, 1.0, 1.0), age_days=60),
+        ])
+
+
+async def call(url: str, endpoint, **params):
+    async_engine = create_async_engine(url)
+    try:
+        async with AsyncSession(async_engine) as db:
+            return await endpoint(db=db, **params)
+    finally:
+        await async_engine.dispose()
+
+
+def with_database(function):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/stats.db")
+        seed(engine)
+        engine.dispose()
+        return function(f"sqlite+aiosqlite:///{directory}/stats.db")
+
+
+def aggregate(url: str, condition=None, ending_type=None):
+    return asyncio.run(call(url, get_aggregate_experiment_stats, condition=condition, ending_type=ending_type, days_back=30))
+
+
+def comparison(url: str, condition_a="confident", condition_b="oracle"):
+    return asyncio.run(call(url, compare_bias_by_condition, condition_a=condition_a, condition_b=condition_b, days_back=30))
+
+
+def test_aggregate_stats():
+    results = with_database(lambda url: {
+        "all": aggregate(url),
+        "empty_condition": aggregate(url, condition=""),
+        "confident": aggregate(url, condition="confident"),
+        "detective": aggregate(url, ending_type="detective"),
+        "absent": aggregate(url, condition="absent"),
+    })
+
+    # Toutes conditions : 6 sessions dans la fenêtre, 4 terminées (NULL = non terminée)
+    result = results["all"]
+    stats = result["aggregate_stats"]
+    assert result["total_sessions"] == 6 and result["completed_sessions"] == 4
+    assert stats["avg_duration_minutes"] == round((120 + 240 + 300) / 4 / 60, 2)
+    assert stats["avg_obedience_rate"] == round((0.5 + 1.0 + 0.3) / 4, 3)
+    assert stats["avg_corruption_level"] == round((0.4 + 0.2 + 0.6 + 0.8 + 0.1) / 6, 3)
+    assert stats["ending_distribution"] == {"detective": 1, "unknown": 2, "hacker": 1}
+    assert stats["completion_rate"] == pytest.approx(4 / 6)
+    # Sessions avec biais : c1 et o1 seulement, les scores NULL comptent pour 0
+    assert stats["bias_metrics"] == pytest.approx({
+        "automation_bias": 0.3, "trust_calibration": 0.2,
+        "cognitive_offloading": 0.0, "authority_compliance": 0.1,
+    })
+
+    # Condition vide : pas de filtre
+    assert results["empty_condition"]["aggregate_stats"] == stats
+
+    result = results["confident"]
+    stats = result["aggregate_stats"]
+    assert result["total_sessions"] == 5 and result["completed_sessions"] == 3
+    assert stats["avg_duration_minutes"] == 2.0 and stats["avg_obedience_rate"] == 0.5
+    assert stats["avg_corruption_level"] == 0.4
+    assert stats["ending_distribution"] == {"detective": 1, "unknown": 2}
+    assert stats["bias_metrics"] == pytest.approx({
+        "automation_bias": 0.6, "trust_calibration": 0.0,
+        "cognitive_offloading": 0.0, "authority_compliance": 0.2,
+    })
+
+    assert results["detective"]["total_sessions"] == 1
+    assert results["detective"]["aggregate_stats"]["ending_distribution"] == {"detective": 1}
+
+    assert results["absent"]["total_sessions"] == 0 and results["absent"]["aggregate_stats"] == {}
+
+
+def test_bias_comparison():
+    results = with_database(lambda url: {
+        "pair": comparison(url),
+        "empty": comparison(url, condition_b="absent"),
+    })
+
+    confident = results["pair"]["comparison"]["condition_a"]
+    assert confident["sample_size"] == 3
+    # Moyennes, min et max sur les seuls scores non NULL (les zéros comptent)
+    expected_scores = {
+        "automation_bias": {"mean": 0.3, "sample_size": 2, "min": 0.0, "max": 0.6},
+        "trust_calibration": {"mean": 0.0, "sample_size": 1, "min": 0.0, "max": 0.0},
+        "cognitive_offloading": {"mean": 0.0, "sample_size": 2, "min": 0.0, "max": 0.0},
+        "authority_compliance": {"mean": 0.1, "sample_size": 2, "min": 0.0, "max": 0.2},
+    }
+    assert set(confident["bias_scores"]) == set(expected_scores)
+    for bias_name, expected in expected_scores.items():
+        assert confident["bias_scores"][bias_name] == pytest.approx(expected)
+    metrics = dict(confident["behavioral_metrics"])
+    assert metrics.pop("ending_distribution") == {"detective": 1, "unknown": 2}
+    assert metrics == pytest.approx({"avg_obedience_rate": 0.5, "avg_duration_minutes": 2.0, "avg_corruption_level": 0.2})
+
+    oracle = results["pair"]["comparison"]["condition_b"]
+    assert oracle["sample_size"] == 1
+    assert oracle["bias_scores"]["cognitive_offloading"] == {"mean": 0.0, "sample_size": 0, "min": 0.0, "max": 0.0}
+    assert oracle["bias_scores"]["trust_calibration"] == pytest.approx({"mean": 0.4, "sample_size": 1, "min": 0.4, "max": 0.4})
+    assert oracle["behavioral_metrics"]["ending_distribution"] == {"hacker": 1}
+    assert oracle["behavioral_metrics"]["avg_duration_minutes"] == 5.0
+
+    differences = results["pair"]["comparison"]["differences"]
+    assert differences["automation_bias"] == pytest.approx({"difference": -0.3, "percentage_change": -100.0})
+    assert differences["trust_calibration"] == pytest.approx({"difference": 0.4, "percentage_change": 0})
+    assert results["pair"]["methodology"]["total_sessions"] == 4
+
+    # Condition sans session : bloc vide, pas de différences
+    empty = results["empty"]["comparison"]
+    assert empty["condition_b"] == {"condition": "absent", "sample_size": 0, "bias_scores": {}, "behavioral_metrics": {}}
+    assert empty["differences"] == {}
+    assert results["empty"]["methodology"]["total_sessions"] == 3
+
+
+if __name__ == "__main__":
+    print("Test des statistiques d'expérience en SQL...")
+    test_aggregate_stats()
+    test_bias_comparison()
+    print("OK")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la pagination par curseur des listages (actions, interactions, sessions)
+Parcours complet page par page, projection des champs, réponse en flux
+"""
+import json
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+
+import testing_support  # noqa: F401
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from app.database import Base
+from app.models import GameSession, PlayerAction
+from app.api import game
+
+
+def seed(engine):
+    """Une session, 250 actions dont beaucoup partagent leur horodatage"""
+    now = datetime.now()
+    with engine.begin() as connection:
+        connection.execute(GameSession.__table__.insert(), [{
+            "id": f"session_{index}", "condition": "oracle", "session_start": now, "game_phase": "adhesion",
+            "created_at": now - timedelta(minutes=index % 3), "updated_at": now,
+        } for index in range(7)])
+        connection.execute(PlayerAction.__table__.insert(), [{
+            "id": f"action_{index:03d}", "session_id": "session_0",
+            "timestamp": now - timedelta(seconds=index // 4), "game_time_seconds": float(index),
+            "action_type": "tom_order", "action_category": "file_manipulation", "action_description": "Action",
+            "gravity_score": index % 10, "game_phase": "adhesion", "was_successful": True,
+            "triggered_corruption": False, "action_data": {"step": index}, "created_at": now,
+        } for index in range(250)])
+
+
+async def consume(response) -> dict:
+    """Corps d'une réponse en flux, décodé"""
+    body = "".join([chunk async for chunk in response.body_iterator])
+    return json.loads(body)
+
+
+async def run_checks(url: str):
+    async_engine = create_async_engine(url)
+    try:
+        async with AsyncSession(async_engine) as db:
+            # Parcours complet par pages de 40 : ni doublon ni oubli, ordre décroissant
+            seen, cursor, pages = [], None, 0
+            while True:
+                page = await game.get_session_actions("session_0", limit=40, cursor=cursor, db=db)
+                seen.extend(page["actions"])
+                pages += 1
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            assert pages == 7
+            assert len({action["id"] for action in seen}) == 250
+            keys = [(action["timestamp"], action["id"]) for action in seen]
+            assert keys == sorted(keys, reverse=True)
+
+            # Projection : seuls les champs demandés
+            page = await game.get_session_actions("session_0", limit=5, fields="id,gravity_score,action_data", db=db)
+            assert set(page["actions"][0]) == {"id", "gravity_score", "action_data"}
+            assert page["actions"][0]["action_data"] == {"step": int(page["actions"][0]["id"][-3:])}
+
+            # Réponse en flux : même contenu que la page complète
+            full = await game.get_session_actions("session_0", limit=100, fields="id,timestamp", db=db)
+            streamed = await consume(await game.get_session_actions(
+                "session_0", limit=100, fields="id,timestamp", stream=True, db=db
+            ))
+            assert streamed == full
+
+            # Sessions : curseur sur (created_at, id), compteur du résumé projeté
+            first = await game.list_sessions(limit=4, fields="id,total_actions", db=db)
+            second = await game.list_sessions(limit=4, cursor=first["next_cursor"], db=db)
+            assert second["next_cursor"] is None
+            ids = [session["id"] for session in first["sessions"] + second["sessions"]]
+            assert sorted(ids) == [f"session_{index}" for index in range(7)]
+
+            # Erreurs de paramètres
+            for kwargs in ({"fields": "id,inconnu"}, {"cursor": "pas-un-curseur"}):
+                try:
+                    await game.get_session_actions("session_0", limit=5, db=db, **kwargs)
+                    assert False, "Paramètre invalide accepté"
+                except HTTPException as e:
+                    assert e.status_code == 400
+    finally:
+        await async_engine.dispose()
+
+
+def test_keyset_pagination():
+    """Pages, projection et flux sur une base de test"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/pagination.db")
+        Base.metadata.create_all(bind=engine)
+        seed(engine)
+        asyncio.run(run_checks(f"sqlite+aiosqlite:///{directory}/pagination.db"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    print("Test de la pagination par curseur...")
+    test_keyset_pagination()
+    print("OK")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la réserve pré-générée de personnalités/introductions de Tom
+Remplissage sous le seuil bas, personnalisation locale et sauvegarde disque
+(lecture et écriture du fichier hors de la boucle d'événements)
+"""
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+
+import testing_support  # noqa: F401
+
+from app.services.personality_pool import TomPersonalityPool, POOL_PLAYER_NAME
+
+
+async def fake_entry():
+    """Génération factice d'une paire personnalité + introduction"""
+    await asyncio.sleep(0)
+    return {
+        "personality": {"background_story": f"Aide {POOL_PLAYER_NAME} depuis ce matin"},
+        "introduction": {"message": f"Salut {POOL_PLAYER_NAME} ! C'est Tom."},
+    }
+
+
+async def run_pool(path: str):
+    """Remplit la réserve, consomme deux entrées puis la laisse se recompléter"""
+    pool = TomPersonalityPool(size=4, low_water=3, path=path, enabled=True)
+    pool._rate_limiter_resolved = True  # Pas de limiteur de débit dans le test
+    pool.register("confident", fake_entry)
+
+    await pool.start()
+    await asyncio.sleep(0.05)
+    assert pool.available("confident") == 4
+
+    named = pool.pop("confident", "Alex")
+    anonymous = pool.pop("confident", None)
+    assert named["introduction"]["message"] == "Salut Alex ! C'est Tom."
+    assert named["personality"]["background_story"] == "Aide Alex depuis ce matin"
+    assert anonymous["introduction"]["message"] == "Salut ! C'est Tom."
+    assert pool.pop("oracle", "Alex") is None
+
+    # Passée sous le seuil bas, la réserve est recomplétée en arrière-plan
+    await asyncio.sleep(0.05)
+    assert pool.available("confident") == 4
+    assert pool.stats["generated"] == 6
+
+    await pool.shutdown()
+
+
+def test_pool_refill_personalize_and_persist():
+    """Cycle complet de la réserve, puis rechargement à froid depuis le disque"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "tom_pool.json")
+        asyncio.run(run_pool(path))
+
+        restarted = TomPersonalityPool(size=4, low_water=3, path=path, enabled=True)
+        entry = restarted.pop("confident", "Sam")
+        assert entry["introduction"]["message"] == "Salut Sam ! C'est Tom."
+        assert restarted.stats["loaded_from_disk"] == 4
+
+
+class RecordingPool(TomPersonalityPool):
+    """Réserve qui note le thread de chaque accès au fichier"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.file_threads = []
+
+    def _read_file(self):
+        self.file_threads.append(("read", threading.current_thread().name))
+        return super()._read_file()
+
+    def _write_file(self, data):
+        self.file_threads.append(("write", threading.current_thread().name))
+        super()._write_file(data)
+
+
+async def run_file_access(path: str):
+    pool = RecordingPool(size=2, low_water=2, path=path, enabled=True)
+    pool._rate_limiter_resolved = True
+    pool.register("confident", fake_entry)
+    await pool.start()
+    await asyncio.sleep(0.05)
+    await pool.shutdown()
+
+    # Première demande depuis la boucle sans préchargement : miss, lecture en arrière-plan
+    restarted = RecordingPool(size=2, low_water=2, path=path, enabled=True)
+    assert restarted.pop("confident", "Sam") is None
+    await asyncio.sleep(0.05)
+    entry = restarted.pop("confident", "Sam")
+    return pool.file_threads + restarted.file_threads, entry, restarted.stats
+
+
+def test_file_access_off_event_loop():
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "tom_pool.json")
+        file_threads, entry, stats = asyncio.run(run_file_access(path))
+
+    assert [operation for operation, _ in file_threads] == ["read", "write", "read"]
+    assert all(name.startswith("tom-pool") for _, name in file_threads)
+    assert entry["introduction"]["message"] == "Salut Sam ! C'est Tom."
+    assert stats["misses"] == 1 and stats["hits"] == 1 and stats["loaded_from_disk"] == 2
+
+
+if __name__ == "__main__":
+    print("Test de la réserve de personnalités Tom...")
+    test_pool_refill_personalize_and_persist()
+    test_file_access_off_event_loop()
+    print("OK")
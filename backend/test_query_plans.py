@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test des migrations de schéma et des plans de requête (EXPLAIN QUERY PLAN)
+Une base « ancienne » (tables sans index) est migrée, puis chaque endpoint de
+api/game.py et api/experiment.py est exécuté : aucune de ses requêtes ne doit
+parcourir une table entière sans index
+"""
+import re
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+
+import testing_support  # noqa: F401
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.schema import CreateTable
+
+from app.database import Base
+from app.migrations import MigrationRunner
+from app.models import GameSession, PlayerAction, TomInteraction, ExperimentData, BiasSnapshot
+from app.api import game, experiment
+from app.services.research_export import ResearchExporter, EXPORT_MODELS
+from app.services.session_summary import verify_summaries
+
+# Routes sans requête SQL directe (état en mémoire, orchestrateur, LLM)
+ROUTES_WITHOUT_SQL = {
+    "create_game_session",
+    "end_game_session",
+    "get_os_state",
+    "get_corruption_state",
+    "get_session_telemetry",
+    "generate_tom_message",
+    "get_columnar_export_status",
+}
+
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+class FakeOrchestrator:
+    """Orchestrateur sans session en mémoire : les endpoints lisent la base"""
+
+    def get_session_status(self, session_id):
+        return {"exists": False}
+
+    async def end_session(self, session_id, ending_type):
+        raise ValueError("Session inactive")
+
+
+def create_legacy_schema(engine):
+    """Tables seules, sans les index ajoutés par les migrations"""
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            connection.execute(CreateTable(table))
+
+
+def seed(engine):
+    """Quelques sessions et journaux associés"""
+    now = datetime.now()
+    with engine.begin() as connection:
+        for index in range(6):
+            session_id = f"session_{index}"
+            connection.execute(GameSession.__table__.insert(), [{
+                "id": session_id, "condition": "confident" if index % 2 else "oracle",
+                "session_start": now, "game_phase": "adhesion", "corruption_level": 0.1 * index,
+                "is_completed": index < 4, "ending_type": "poet" if index < 2 else None,
+                "total_actions": 2, "automation_bias_score": 0.5,
+                "created_at": now - timedelta(days=index), "updated_at": now,
+            }])
+            connection.execute(PlayerAction.__table__.insert(), [{
+                "id": f"{session_id}_action_{step}", "session_id": session_id, "timestamp": now,
+                "game_time_seconds": float(step), "action_type": "tom_order",
+                "action_category": "file_manipulation", "action_description": "Action",
+                "gravity_score": 3, "game_phase": "adhesion", "was_successful": True,
+                "was_obedient": True, "triggered_corruption": False, "created_at": now,
+            } for step in range(2)])
+            connection.execute(TomInteraction.__table__.insert(), [{
+                "id": f"{session_id}_tom", "session_id": session_id, "timestamp": now,
+                "game_time_seconds": 1.0, "interaction_type": "order", "message_text": "Bonjour",
+                "game_phase": "adhesion", "corruption_level": 0.0, "created_at": now,
+            }])
+            if index == 5:
+                continue  # Session supprimée par le test : journaux de jeu seulement
+            connection.execute(ExperimentData.__table__.insert(), [{
+                "id": f"{session_id}_measure", "session_id": session_id, "measurement_timestamp": now,
+                "game_time_seconds": 1.0, "condition": "oracle", "game_phase": "adhesion",
+                "corruption_level": 0.0, "automation_bias_score": 0.4, "created_at": now,
+            }])
+            connection.execute(BiasSnapshot.__table__.insert(), [{
+                "id": f"{session_id}_snapshot", "session_id": session_id, "timestamp": now,
+                "game_time_seconds": 1.0, "game_phase": "adhesion", "corruption_level": 0.0,
+                "created_at": now,
+            }])
+
+
+async def consume(response):
+    """Lit entièrement une réponse en flux"""
+    async for _ in response.body_iterator:
+        pass
+
+
+async def call_endpoints(async_engine):
+    """Appelle chaque endpoint interrogeant la base ; retourne les noms couverts"""
+    try:
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            return await _call_endpoints(db)
+    finally:
+        await async_engine.dispose()
+
+
+async def _call_endpoints(db):
+    """Appels dans une même session asynchrone"""
+    orchestrator = FakeOrchestrator()
+
+    await game.get_session_info("session_5", orchestrator=orchestrator, db=db)
+    await game.get_session_actions("session_1", limit=50, db=db)
+    await game.get_tom_interactions("session_1", limit=30, db=db)
+    await game.get_session_stats("session_1", db=db)
+    await game.list_sessions(limit=20, completed_only=False, db=db)
+    await game.list_sessions(limit=20, completed_only=True, db=db)
+
+    # Pages suivantes par curseur, projection et flux
+    page = await game.get_session_actions("session_1", limit=1, fields="id,timestamp,action_data", db=db)
+    await game.get_session_actions("session_1", limit=1, cursor=page["next_cursor"], db=db)
+    await consume(await game.get_tom_interactions("session_1", limit=10, fields="id,message_text", stream=True, db=db))
+    page = await game.list_sessions(limit=2, completed_only=False, fields="id,total_actions", db=db)
+    await game.list_sessions(limit=2, completed_only=True, cursor=page["next_cursor"], db=db)
+
+    await experiment.get_bias_analysis("session_1", db=db)
+    await experiment.get_aggregate_experiment_stats(condition=None, ending_type=None, days_back=30, db=db)
+    await experiment.get_aggregate_experiment_stats(condition="oracle", ending_type="poet", days_back=30, db=db)
+    await experiment.compare_bias_by_condition(condition_a="confident", condition_b="oracle", days_back=30, db=db)
+    await experiment.analyze_behavioral_patterns(session_id="session_1", condition=None, limit=100, db=db)
+    await experiment.analyze_behavioral_patterns(session_id=None, condition="oracle", limit=100, db=db)
+    await consume(await experiment.export_experiment_data(
+        format="jsonl", condition="oracle", days_back=30, anonymize=True, db=db
+    ))
+    await experiment.get_research_summary(days_back=30, db=db)
+
+    # Suppression en dernier (modifie les données)
+    await game.delete_session("session_5", orchestrator=orchestrator, db=db)
+
+    return {
+        "get_session_info", "get_session_actions", "get_tom_interactions", "get_session_stats",
+        "list_sessions", "delete_session", "get_bias_analysis", "get_aggregate_experiment_stats",
+        "compare_bias_by_condition", "analyze_behavioral_patterns", "export_experiment_data",
+        "get_research_summary", "export_columnar_data",
+    }
+
+
+def full_scans(connection, statement, parameters):
+    """Tables parcourues sans index dans le plan d'une requête"""
+    plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    tables = set(Base.metadata.tables)
+    return [
+        row[-1] for row in plan
+        if _FULL_SCAN.match(row[-1]) and _FULL_SCAN.match(row[-1]).group(1) in tables
+    ]
+
+
+def test_migrations_and_index_usage():
+    """Migration d'une base sans index puis vérification des plans des endpoints"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/legacy.db")
+        create_legacy_schema(engine)
+        seed(engine)
+
+        runner = MigrationRunner(engine=engine, pause_seconds=0)
+        assert [migration.version for migration in runner.pending()] == [1, 2, 3, 4, 5, 6]
+        assert runner.upgrade() == [1, 2, 3, 4, 5, 6]
+        assert runner.upgrade() == []
+        assert runner.get_status()["current_version"] == runner.latest_version
+
+        # Résumés de session remplis depuis les journaux existants
+        with engine.connect() as connection:
+            assert verify_summaries(connection) == []
+
+        # Capture des requêtes émises par les endpoints (moteur asynchrone, même fichier)
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{directory}/legacy.db")
+        statements = []
+
+        @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")) and not executemany:
+                statements.append((statement, parameters))
+
+        covered = asyncio.run(call_endpoints(async_engine))
+
+        # L'export colonnaire interroge la base via le moteur, hors session
+        exporter = ResearchExporter(export_dir=f"{directory}/export", engine=engine)
+        for model in EXPORT_MODELS.values():
+            columns = [column for column in model.__table__.columns if column.name not in ("condition", "date")]
+            watermark = {"created_at": datetime.now().isoformat(), "id": "x"}
+            query = exporter._build_query(model, columns, watermark, raw=True)
+            compiled = query.compile(engine)
+            statements.append((str(compiled), tuple(compiled.params[name] for name in compiled.positiontup)))
+
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+        # Chaque route des deux routeurs est soit vérifiée, soit sans SQL
+        routes = {route.endpoint.__name__ for route in game.router.routes + experiment.router.routes}
+        assert routes - ROUTES_WITHOUT_SQL == covered, routes - ROUTES_WITHOUT_SQL ^ covered
+
+        assert statements
+        with engine.connect() as connection:
+            problems = []
+            for statement, parameters in statements:
+                scans = full_scans(connection, statement, parameters)
+                if scans:
+                    problems.append(f"{scans} <- {' '.join(statement.split())[:160]}")
+        assert not problems, "\n".join(problems)
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    print("Test des migrations et des plans de requête...")
+    test_migrations_and_index_usage()
+    print("OK")
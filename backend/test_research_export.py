@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de l'export colonnaire (Parquet) des journaux de recherche
+Partitionnement par condition/date et export incrémental par filigrane
+"""
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+import testing_support  # noqa: F401
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from sqlalchemy import create_engine
+
+from app.database import Base
+from app.models import GameSession, PlayerAction
+from app.services.research_export import ResearchExporter
+
+
+def insert_actions(engine, start: int, count: int, created_at: datetime):
+    """Ajoute `count` actions réparties sur les deux sessions de test"""
+    with engine.begin() as connection:
+        connection.execute(PlayerAction.__table__.insert(), [{
+            "id": f"action_{index:04d}",
+            "session_id": "session_confident" if index % 2 == 0 else "session_oracle",
+            "timestamp": created_at,
+            "game_time_seconds": float(index),
+            "action_type": "tom_order",
+            "action_category": "file_manipulation",
+            "action_description": f"Action {index}",
+            "gravity_score": index % 10,
+            "game_phase": "adhesion",
+            "was_successful": True,
+            "was_obedient": index % 3 == 0,
+            "triggered_corruption": False,
+            "action_data": {"index": index, "cible": "rapport.txt"},
+            "created_at": created_at,
+        } for index in range(start, start + count)])
+
+
+def test_partitioned_incremental_export():
+    """Deux exports successifs : le second ne reprend que les nouvelles lignes"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/test.db")
+        Base.metadata.create_all(bind=engine)
+
+        now = datetime(2024, 5, 2, 14, 30)
+        with engine.begin() as connection:
+            connection.execute(GameSession.__table__.insert(), [
+                {"id": "session_confident", "condition": "confident", "session_start": now,
+                 "game_phase": "adhesion", "corruption_level": 0.0, "is_completed": False,
+                 "total_actions": 0, "created_at": now, "updated_at": now},
+                {"id": "session_oracle", "condition": "oracle", "session_start": now,
+                 "game_phase": "adhesion", "corruption_level": 0.0, "is_completed": False,
+                 "total_actions": 0, "created_at": now, "updated_at": now},
+            ])
+        insert_actions(engine, 0, 10, now)
+
+        exporter = ResearchExporter(export_dir=f"{directory}/export", batch_size=4, engine=engine)
+        first = exporter.export(["player_actions"])
+        assert first["tables"]["player_actions"]["rows"] == 10
+        assert first["tables"]["player_actions"]["partitions"] == [
+            "condition=confident/date=2024-05-02", "condition=oracle/date=2024-05-02"
+        ]
+
+        # Nouvelles actions le lendemain : seules celles-ci sont exportées
+        insert_actions(engine, 10, 4, now + timedelta(days=1))
+        second = exporter.export(["player_actions"])
+        assert second["tables"]["player_actions"]["rows"] == 4
+        assert exporter.export(["player_actions"])["tables"]["player_actions"]["rows"] == 0
+
+        frame = pd.read_parquet(f"{directory}/export/player_actions")
+        assert len(frame) == 14
+        assert sorted(frame["id"]) == [f"action_{index:04d}" for index in range(14)]
+        assert set(frame["condition"].astype(str)) == {"confident", "oracle"}
+        assert frame.set_index("id").loc["action_0003", "action_data"] == '{"index": 3, "cible": "rapport.txt"}'
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    print("Test de l'export Parquet de recherche...")
+    test_partitioned_incremental_export()
+    print("OK")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du cache des générations de Tom
+Clés normalisées/discrétisées, variantes, éviction LRU/TTL et stockage disque
+"""
+import time
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+
+import testing_support  # noqa: F401
+
+from app.services.response_cache import ResponseCache, DiskCacheStore
+
+PROMPT = "Tu es Tom. Le joueur Alex hésite depuis {duration} secondes avant d'exécuter ton dernier ordre."
+
+
+def test_bucketed_context_shares_entries():
+    """Des contextes voisins partagent la clé, des phases différentes non"""
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, variants=1)
+    context = {"game_phase": "adhesion", "corruption_level": 0.1, "hesitation_count": 2, "hesitation_duration": 6.2}
+    cache.set("confident", "hesitation", PROMPT.format(duration=6.2), {"message": "Ok"}, context)
+
+    near = {"game_phase": "adhesion", "corruption_level": 0.2, "hesitation_count": 3, "hesitation_duration": 8.9}
+    assert cache.get("confident", "hesitation", PROMPT.format(duration=8.9), near) == {"message": "Ok"}
+
+    other_phase = {**near, "game_phase": "rupture"}
+    assert cache.get("confident", "hesitation", PROMPT.format(duration=8.9), other_phase) is None
+    assert cache.get("oracle", "hesitation", PROMPT.format(duration=8.9), near) is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["namespaces"]["oracle"]["misses"] == 1
+
+
+def test_player_name_is_templated():
+    """Une introduction générée pour un joueur est personnalisée pour le suivant"""
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, variants=1)
+    cache.set("confident", "introduction", "Bonjour {player_name}", {"message": "Salut Alex !"}, player_name="Alex")
+
+    assert cache.get("confident", "introduction", "Bonjour {player_name}", player_name="Sam") == {"message": "Salut Sam !"}
+
+
+def test_name_replaced_as_whole_word():
+    """Un nom inclus dans d'autres mots n'est remplacé qu'en mot entier"""
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, variants=1)
+    prompt = "Tu es Tom. Aide {player_name}."
+    cache.set("confident", "introduction", prompt, {"message": "Alan, Alanis et Valan sont là."}, player_name="Alan")
+    assert cache.get("confident", "introduction", prompt, player_name="Bob") == {"message": "Bob, Alanis et Valan sont là."}
+
+    # Nom trop court : réponse gardée pour ce joueur seul
+    cache.set("confident", "introduction", prompt, {"message": "Allons-y Al !"}, player_name="Al")
+    assert cache.get("confident", "introduction", prompt, player_name="Al") == {"message": "Allons-y Al !"}
+    assert cache.get("confident", "introduction", prompt, player_name="Bob") == {"message": "Bob, Alanis et Valan sont là."}
+
+    # Nom présent dans le texte fixe du prompt : celui de Tom n'est jamais réécrit
+    cache.set("confident", "personality", prompt, {"message": "Je suis Tom, enchanté Tom."}, player_name="Tom")
+    assert cache.get("confident", "personality", prompt, player_name="Sam") is None
+    assert cache.get("confident", "personality", prompt, player_name="Tom") == {"message": "Je suis Tom, enchanté Tom."}
+
+
+def test_variants_before_hits():
+    """Une clé ne sert depuis le cache qu'une fois ses variantes générées"""
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, variants=2)
+    cache.set("confident", "personality", "prompt", {"background_story": "A"})
+    assert cache.get("confident", "personality", "prompt") is None
+
+    cache.set("confident", "personality", "prompt", {"background_story": "B"})
+    assert cache.get("confident", "personality", "prompt")["background_story"] in ("A", "B")
+
+
+def test_lru_and_ttl_eviction():
+    """Éviction de l'entrée la moins récemment utilisée et expiration"""
+    cache = ResponseCache(max_entries=2, ttl_seconds=60, variants=1)
+    cache.set("confident", "test", "a", {"v": 1})
+    cache.set("confident", "test", "b", {"v": 2})
+    cache.get("confident", "test", "a")
+    cache.set("confident", "test", "c", {"v": 3})
+
+    assert cache.get("confident", "test", "b") is None
+    assert cache.get("confident", "test", "a") == {"v": 1}
+    assert cache.stats["evictions"] == 1
+
+    short = ResponseCache(max_entries=2, ttl_seconds=0.01, variants=1)
+    short.set("confident", "test", "a", {"v": 1})
+    time.sleep(0.02)
+    assert short.get("confident", "test", "a") is None
+    assert short.stats["expirations"] == 1
+
+
+def test_disk_store_survives_restart():
+    """Les entrées chaudes sont rechargées depuis le disque"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "tom_cache.db")
+
+        cache = ResponseCache(max_entries=10, ttl_seconds=60, variants=1, store=DiskCacheStore(path))
+        cache.set("confident", "introduction", "prompt", {"message": "Salut !"})
+
+        restarted = ResponseCache(max_entries=10, ttl_seconds=60, variants=1, store=DiskCacheStore(path))
+        assert restarted.get("confident", "introduction", "prompt") == {"message": "Salut !"}
+        assert restarted.stats["loaded_from_disk"] == 1
+
+
+class SlowDiskCacheStore(DiskCacheStore):
+    """Stockage dont les lectures et écritures attendent `gate`"""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.gate = threading.Event()
+
+    def load(self, limit):
+        self.gate.wait()
+        return super().load(limit)
+
+    def save(self, key, entry):
+        self.gate.wait()
+        super().save(key, entry)
+
+
+def test_disk_writes_off_event_loop():
+    """Depuis la boucle d'événements, set() n'attend pas l'écriture SQLite"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "tom_cache.db")
+        store = SlowDiskCacheStore(path)
+        cache = ResponseCache(max_entries=10, ttl_seconds=60, variants=1, store=store)
+        cache._loaded = True  # Lecture couverte par test_disk_load_off_event_loop
+
+        async def scenario():
+            start = time.perf_counter()
+            cache.set("confident", "introduction", "prompt", {"message": "Salut !"})
+            return time.perf_counter() - start
+
+        assert asyncio.run(scenario()) < 0.5
+        assert DiskCacheStore(path).load(10) == []
+
+        # Écriture faite en arrière-plan une fois le disque disponible
+        store.gate.set()
+        cache._store_executor.submit(lambda: None).result()
+        assert [row[0] for row in DiskCacheStore(path).load(10)] == [cache.make_key("confident", "introduction", "prompt")]
+
+
+def test_disk_load_off_event_loop():
+    """Depuis la boucle d'événements, la première lecture n'attend pas le disque"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "tom_cache.db")
+        ResponseCache(max_entries=10, ttl_seconds=60, variants=1, store=DiskCacheStore(path)).set(
+            "confident", "introduction", "prompt", {"message": "Salut !"}
+        )
+
+        store = SlowDiskCacheStore(path)
+        cache = ResponseCache(max_entries=10, ttl_seconds=60, variants=1, store=store)
+
+        async def scenario():
+            start = time.perf_counter()
+            missed = cache.get("confident", "introduction", "prompt")
+            elapsed = time.perf_counter() - start
+
+            store.gate.set()
+            await cache.preload()
+            return missed, elapsed, cache.get("confident", "introduction", "prompt")
+
+        missed, elapsed, value = asyncio.run(scenario())
+        assert missed is None and elapsed < 0.5
+        assert value == {"message": "Salut !"}
+        assert cache.stats["loaded_from_disk"] == 1
+
+
+if __name__ == "__main__":
+    print("Test du cache des réponses Tom...")
+    test_bucketed_context_shares_entries()
+    test_player_name_is_templated()
+    test_name_replaced_as_whole_word()
+    test_variants_before_hits()
+    test_lru_and_ttl_eviction()
+    test_disk_store_survives_restart()
+    test_disk_writes_off_event_loop()
+    test_disk_load_off_event_loop()
+    print("OK")
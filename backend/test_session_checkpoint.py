@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test des points de reprise de session
+Enregistrement (document inchangé non réécrit, lignes illisibles ignorées),
+puis restauration après redémarrage : état complet, échéances réarmées et
+mesures de biais reconstruites depuis les actions en base
+"""
+import asyncio
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from testing_support import FakeDb, RecordingQueue, make_orchestrator
+
+from app.config import settings
+from app.models import PlayerAction
+from app.services import bias_analyzer as bias_analyzer_module
+from app.services.game_orchestrator import GameOrchestrator, GameState
+from app.services.session_checkpoint import SessionCheckpointStore
+
+
+def add_session(orchestrator: GameOrchestrator, session_id: str, elapsed_seconds: float):
+    """Session en cours depuis `elapsed_seconds`, avec Tom, OS et corruption"""
+    orchestrator.active_sessions[session_id] = GameState(
+        session_id=session_id, player_name="Joueur",
+        start_time=datetime.now() - timedelta(seconds=elapsed_seconds), current_phase="adhesion",
+        corruption_level=0.3, time_elapsed=0.0, is_active=True, last_action_time=0.0,
+        total_orders=4, obeyed_orders=3
+    )
+    orchestrator.tom_service.conversation_history[session_id] = {
+        "personality": "helpful", "messages": [{"role": "assistant", "content": "Bonjour Joueur."}]
+    }
+    orchestrator.os_simulator.session_states[session_id] = {"files": [{"name": "rapport.docx"}], "theme": {"hue": 210}}
+    orchestrator.corruption_system.session_corruption[session_id] = 0.3
+    orchestrator.corruption_system.corruption_history[session_id] = [{"level": 0.3, "cause": "obey"}]
+
+
+def test_save_dedupe_delete():
+    """Document inchangé non réécrit, lecture limitée au worker, ligne illisible ignorée"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "checkpoints.db")
+        store = SessionCheckpointStore(path, owner="worker-1", compression_level=1, enabled=True)
+
+        state = {"game_state": {"current_phase": "adhesion"}, "os_state": {"files": ["a"] * 50}}
+        assert store.save("s1", state) is True
+        assert store.save("s1", state) is False
+        assert store.save("s1", {**state, "game_state": {"current_phase": "doubt"}}) is True
+        assert store.save("s2", state) is True
+
+        # Un autre worker ne reprend pas les sessions de worker-1
+        assert SessionCheckpointStore(path, owner="worker-2", enabled=True).load_all() == []
+
+        connection = sqlite3.connect(path)
+        connection.execute("INSERT INTO session_checkpoints VALUES ('s3', 'worker-1', 0, x'00ff')")
+        connection.commit()
+        connection.close()
+
+        restarted = SessionCheckpointStore(path, owner="worker-1", enabled=True)
+        loaded = {session_id: state for session_id, _, state in restarted.load_all()}
+        assert set(loaded) == {"s1", "s2"}
+        assert loaded["s1"]["game_state"]["current_phase"] == "doubt"
+        assert restarted.get_stats()["corrupted"] == 1
+
+        # Après lecture, le même document n'est pas réécrit
+        assert restarted.save("s2", state) is False
+        restarted.delete("s1")
+        assert [session_id for session_id, _, _ in restarted.load_all()] == ["s2"]
+
+        stats = store.get_stats()
+        assert stats["saved"] == 3 and stats["unchanged"] == 1
+        assert stats["compression_ratio"] < 1.0
+
+
+async def run_restart(path: str):
+    before = make_orchestrator(SessionCheckpointStore(path, owner="worker-1", enabled=True))
+    add_session(before, "en_cours", elapsed_seconds=200)
+    add_session(before, "expiree", elapsed_seconds=settings.game_duration_minutes * 60 - 5)
+    assert before.checkpoint_all() == 2
+
+    # Arrêt pendant 10 secondes : la session "expiree" dépasse la durée de jeu
+    for session_id in ("en_cours", "expiree"):
+        game_state = before.active_sessions[session_id]
+        game_state.start_time -= timedelta(seconds=10)
+        before.checkpoints.save(session_id, before.export_session_state(session_id))
+
+    after = make_orchestrator(SessionCheckpointStore(path, owner="worker-1", enabled=True))
+    assert await after.restore_sessions() == 2
+
+    # Phase manquée appliquée, Tom, OS et corruption retrouvés, échéances réarmées
+    game_state = after.active_sessions["en_cours"]
+    assert game_state.current_phase == after._calculate_game_phase(game_state.time_elapsed)
+    assert game_state.current_phase != "adhesion"
+    assert game_state.total_orders == 4 and game_state.obeyed_orders == 3
+    assert after.tom_service.conversation_history["en_cours"]["messages"][0]["content"] == "Bonjour Joueur."
+    assert after.os_simulator.session_states["en_cours"]["files"] == [{"name": "rapport.docx"}]
+    assert after.corruption_system.session_corruption["en_cours"] == 0.3
+    assert after.corruption_system.corruption_history["en_cours"][-1]["cause"] == "obey"
+    assert after.scheduler.pending("en_cours") > 0
+
+    # Session expirée pendant l'arrêt : terminée dès la reprise, point de reprise supprimé
+    for _ in range(50):
+        if "expiree" not in after.active_sessions:
+            break
+        await asyncio.sleep(0.01)
+    assert "expiree" not in after.active_sessions
+    assert ("expiree", "timeout") in [(key, values.get("ending_type")) for key, values in after.write_queue.updates]
+    assert [session_id for session_id, _, _ in after.checkpoints.load_all()] == ["en_cours"]
+
+    await after.scheduler.shutdown()
+    await before.scheduler.shutdown()
+
+
+def test_restore_after_restart():
+    """Un redémarrage reprend les parties avec le temps réellement écoulé"""
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run_restart(str(Path(directory) / "checkpoints.db")))
+
+
+PLAYED_ACTIONS = [
+    ("file_properties", 1, True),
+    ("file_delete", 6, True),
+    ("context_menu_open", 2, False),
+    ("file_move", 4, True),
+    ("meta_detective", 8, None),
+]
+
+
+async def run_bias_restore(path: str):
+    before = make_orchestrator(SessionCheckpointStore(path, owner="worker-1", enabled=True))
+    add_session(before, "s1", elapsed_seconds=200)
+    before.bias_analyzer.start_session("s1")
+    for index, (action_type, gravity, obedient) in enumerate(PLAYED_ACTIONS):
+        await before._record_player_action(
+            "s1", {"type": action_type, "reaction_time": 1.5 + index},
+            {"category": "test", "description": action_type, "gravity_score": gravity, "obedient": obedient},
+            game_time=200.0 + index
+        )
+    biases_before = (await before.bias_analyzer.take_bias_snapshot("s1", {}))["biases"]
+    assert before.checkpoint_all() == 1
+
+    # Redémarrage : les actions ne sont plus qu'en base
+    rows = [instance for instance in before.write_queue.added if isinstance(instance, PlayerAction)]
+    get_write_queue, get_async_db_context = bias_analyzer_module.get_write_queue, bias_analyzer_module.get_async_db_context
+    bias_analyzer_module.get_write_queue = RecordingQueue
+    bias_analyzer_module.get_async_db_context = lambda: FakeDb(rows)
+    try:
+        after = make_orchestrator(SessionCheckpointStore(path, owner="worker-1", enabled=True))
+        assert await after.restore_sessions() == 1
+        snapshot = await after.bias_analyzer.take_bias_snapshot("s1", {})
+    finally:
+        bias_analyzer_module.get_write_queue = get_write_queue
+        bias_analyzer_module.get_async_db_context = get_async_db_context
+
+    await after.scheduler.shutdown()
+    await before.scheduler.shutdown()
+    return biases_before, snapshot
+
+
+def test_bias_scores_survive_restore():
+    """Les mesures de biais après restauration tiennent compte des actions d'avant l'arrêt"""
+    with tempfile.TemporaryDirectory() as directory:
+        biases_before, snapshot = asyncio.run(run_bias_restore(str(Path(directory) / "checkpoints.db")))
+    assert snapshot["total_actions"] == len(PLAYED_ACTIONS)
+    assert snapshot["biases"] == biases_before
+
+
+if __name__ == "__main__":
+    print("Test des points de reprise de session...")
+    test_save_dedupe_delete()
+    test_restore_after_restart()
+    test_bias_scores_survive_restore()
+    print("OK")
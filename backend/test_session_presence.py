@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du heartbeat serveur et de la présence des sessions
+Connexion muette fermée, session suspendue sans client (échéances arrêtées,
+horloge en pause), reprise à la reconnexion, fin par abandon
+"""
+import asyncio
+from datetime import datetime
+
+from testing_support import FakeWebSocket, make_orchestrator
+
+from app.config import settings
+from app.services.event_bus import EventBus
+from app.services.game_orchestrator import GameOrchestrator, GameState, presence_key
+from app.api.connection_manager import ConnectionManager, CLOSE_HEARTBEAT_TIMEOUT
+
+
+def test_heartbeat_closes_silent_connection():
+    """Le client qui répond reste connecté, le client muet est fermé"""
+    async def scenario():
+        manager = ConnectionManager(event_bus=EventBus(), ping_interval=0.05, ping_timeout=0.05)
+        alive = FakeWebSocket(manager, "alive")
+        dead = FakeWebSocket(manager, "dead", alive=False)
+        await manager.connect(alive, "alive")
+        await manager.connect(dead, "dead")
+        await asyncio.sleep(0.4)
+        stats = manager.get_stats()
+        await manager.close_all()
+        return stats, alive, dead
+
+    stats, alive, dead = asyncio.run(scenario())
+    assert dead.closed_code == CLOSE_HEARTBEAT_TIMEOUT
+    assert alive.closed_code == 1012  # Fermé seulement par close_all
+    assert sum(message["type"] == "heartbeat" for message in alive.sent) >= 4
+    assert stats["heartbeat"]["timeouts"] == 1
+    assert stats["heartbeat"]["rtt_ms"]["p50"] >= 0
+
+
+async def run_presence(orchestrator: GameOrchestrator):
+    manager = ConnectionManager(event_bus=EventBus(), presence=orchestrator, ping_interval=0)
+    orchestrator.active_sessions["s1"] = GameState(
+        session_id="s1", player_name="Joueur", start_time=datetime.now(), current_phase="adhesion",
+        corruption_level=0.0, time_elapsed=0.0, is_active=True, last_action_time=0.0
+    )
+    orchestrator._arm_session_timers("s1")
+    armed = orchestrator.scheduler.pending("s1")
+
+    await manager.connect(FakeWebSocket(manager, "c1"), "c1")
+    manager.link_session("s1", "c1")
+
+    # Client parti : délai de reconnexion, puis suspension
+    manager.disconnect("c1")
+    assert "s1" not in orchestrator.suspended_sessions
+    await asyncio.sleep(0.1)
+    assert "s1" in orchestrator.suspended_sessions
+    assert orchestrator.scheduler.pending("s1") == 0
+    elapsed_at_suspension = orchestrator.active_sessions["s1"].refresh_elapsed()
+
+    # Reconnexion : horloge reprise là où elle s'était arrêtée, échéances réarmées
+    await asyncio.sleep(0.2)
+    await manager.connect(FakeWebSocket(manager, "c2"), "c2")
+    manager.link_session("s1", "c2")
+    assert "s1" not in orchestrator.suspended_sessions
+    assert orchestrator.active_sessions["s1"].time_elapsed < elapsed_at_suspension + 0.1
+    assert orchestrator.scheduler.pending("s1") == armed
+    assert orchestrator.scheduler.pending(presence_key("s1")) == 0
+
+    # Nouveau départ sans retour : partie close comme abandonnée
+    manager.disconnect("c2")
+    await asyncio.sleep(0.6)
+    assert "s1" not in orchestrator.active_sessions
+    assert ("s1", "abandoned") in [(key, values.get("ending_type")) for key, values in orchestrator.write_queue.updates]
+    assert orchestrator.get_presence_stats()["abandoned"] == 1
+    assert orchestrator.get_presence_stats()["resumed"] == 1
+
+    await orchestrator.scheduler.shutdown()
+
+
+def test_session_suspended_without_client():
+    grace, abandon = settings.session_reconnect_grace_seconds, settings.session_abandon_seconds
+    settings.session_reconnect_grace_seconds, settings.session_abandon_seconds = 0.05, 0.4
+    try:
+        asyncio.run(run_presence(make_orchestrator()))
+    finally:
+        settings.session_reconnect_grace_seconds, settings.session_abandon_seconds = grace, abandon
+
+
+if __name__ == "__main__":
+    print("Test du heartbeat et de la présence des sessions...")
+    test_heartbeat_closes_silent_connection()
+    test_session_suspended_without_client()
+    print("OK")
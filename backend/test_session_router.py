@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du routeur de sessions
+Anneau de hachage cohérent (répartition, réaffectation minimale), sessions
+retenues sur leur worker, puis routage WebSocket/HTTP vers deux workers réels :
+bascule des nouvelles sessions sur panne, refus des sessions perdues
+"""
+import time
+import socket
+import threading
+from typing import Optional
+
+import testing_support  # noqa: F401
+
+import uvicorn
+import pytest
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+from app.services.hash_ring import HashRing
+from app import session_router
+from app.config import settings
+from app.session_router import router_app, get_session_router, session_id_from_path, SessionRouter
+
+
+def make_worker(name: str) -> FastAPI:
+    """Worker minimal : indique qui a reçu la requête ou le message"""
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.post("/api/game/sessions/create")
+    async def create(session_id: Optional[str] = None):
+        return {"worker": name, "session_id": session_id}
+
+    @app.get("/api/game/sessions/{session_id}")
+    async def session_info(session_id: str):
+        return {"worker": name, "session_id": session_id}
+
+    @app.websocket("/ws/{connection_id}")
+    async def websocket_endpoint(websocket: WebSocket, connection_id: str):
+        await websocket.accept()
+        try:
+            while True:
+                message = await websocket.receive_json()
+                await websocket.send_json({"worker": name, "connection_id": connection_id, "echo": message})
+        except WebSocketDisconnect:
+            pass
+
+    return app
+
+
+class WorkerServer:
+    """Serveur uvicorn dans un thread, sur un port libre"""
+
+    def __init__(self, name: str):
+        self.socket = socket.socket()
+        self.socket.bind(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self.socket.getsockname()[1]}"
+        self.server = uvicorn.Server(uvicorn.Config(make_worker(name), log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, kwargs={"sockets": [self.socket]}, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+def test_consistent_hashing():
+    """Répartition équilibrée, ajout et retrait ne déplacent que ~1/N des sessions"""
+    keys = [f"session_{index}" for index in range(10000)]
+    ring = HashRing(["w1", "w2", "w3", "w4"], virtual_nodes=160)
+    before = {key: ring.node_for(key) for key in keys}
+
+    counts = {node: list(before.values()).count(node) for node in ring.nodes}
+    assert all(1800 < count < 3200 for count in counts.values()), counts
+
+    # Ajout d'un 5e worker : seules les sessions qu'il reprend changent de worker
+    ring.add_node("w5")
+    moved = [key for key in keys if ring.node_for(key) != before[key]]
+    assert all(ring.node_for(key) == "w5" for key in moved)
+    assert 0.12 < len(moved) / len(keys) < 0.28
+
+    # Retrait : seules les sessions du worker retiré sont réaffectées
+    ring.remove_node("w5")
+    ring.remove_node("w2")
+    moved = [key for key in keys if ring.node_for(key) != before[key]]
+    assert all(before[key] == "w2" for key in moved)
+    assert len(moved) == counts["w2"]
+
+
+def test_session_id_extraction():
+    assert session_id_from_path("/api/game/sessions/abc/actions", {}) == "abc"
+    assert session_id_from_path("/api/experiment/sessions/abc/bias-analysis", {}) == "abc"
+    assert session_id_from_path("/api/game/sessions/create", {}) is None
+    assert session_id_from_path("/api/game/sessions", {"session_id": "xyz"}) == "xyz"
+
+
+def test_sticky_and_lost_sessions():
+    """Une session servie reste sur son worker ; perdue s'il tombe, retrouvée à son retour"""
+    router = SessionRouter(["http://w1", "http://w2"], shared_state=False)
+    on_w1 = [key for key in (f"session_{index}" for index in range(100)) if router.worker_for(key) == "http://w1"]
+    session_id, created = on_w1[:2]
+    router._assign(session_id, "http://w1")
+
+    router._mark("http://w1", False)
+    assert router.lost_worker(session_id) == "http://w1"
+    assert router.lost_worker(created) is None  # Session inconnue : l'anneau s'applique
+    assert router.worker_for(created) == "http://w2"
+
+    # Session créée pendant la panne : elle reste sur w2 au retour de w1
+    router._assign(created, "http://w2")
+    router._mark("http://w1", True)
+    assert router.lost_worker(session_id) is None
+    assert router.worker_for(session_id) == "http://w1"
+    assert router.worker_for(created) == "http://w2"
+
+    # État partagé entre workers : aucune session n'est perdue
+    shared = SessionRouter(["http://w1", "http://w2"], shared_state=True)
+    shared._assign(session_id, "http://w1")
+    shared._mark("http://w1", False)
+    assert shared.lost_worker(session_id) is None
+    assert shared.worker_for(session_id) == "http://w2"
+
+    # Table bornée : les sessions les plus anciennes sont oubliées
+    original_limit = settings.router_max_sticky_sessions
+    settings.router_max_sticky_sessions = 3
+    try:
+        for index in range(5):
+            router._assign(f"s{index}", "http://w2")
+        assert list(router.assignments) == ["s2", "s3", "s4"]
+    finally:
+        settings.router_max_sticky_sessions = original_limit
+
+
+def test_admin_endpoints_local_only():
+    """La topologie ne change que depuis les clients autorisés"""
+    url = "http://127.0.0.1:9"
+    with TestClient(router_app) as client:
+        assert client.post("/router/workers", params={"url": url}).status_code == 403
+
+        # Client de test autorisé le temps du test seulement
+        session_router.ADMIN_CLIENTS.add("testclient")
+        try:
+            assert url in client.post("/router/workers", params={"url": url}).json()["workers"]
+            assert url not in client.delete("/router/workers", params={"url": url}).json()["workers"]
+        finally:
+            session_router.ADMIN_CLIENTS.discard("testclient")
+            get_session_router().remove_worker(url)
+
+
+def test_routing_to_workers():
+    """Chaque session atteint le worker de l'anneau ; sur panne, les nouvelles sessions basculent"""
+    workers = [WorkerServer("w1"), WorkerServer("w2")]
+    for worker in workers:
+        worker.start()
+    names = {workers[0].url: "w1", workers[1].url: "w2"}
+
+    router = get_session_router()
+    for worker in workers:
+        router.add_worker(worker.url)
+
+    try:
+        with TestClient(router_app) as client:
+            # Sessions dont le propriétaire est chacun des deux workers
+            sessions = {}
+            for index in range(50):
+                session_id = f"session_{index}"
+                sessions.setdefault(names[router.worker_for(session_id)], session_id)
+            assert set(sessions) == {"w1", "w2"}
+
+            for name, session_id in sessions.items():
+                # session_id dans l'URL
+                with client.websocket_connect(f"/ws/conn_{name}?session_id={session_id}") as websocket:
+                    websocket.send_json({"type": "ping"})
+                    reply = websocket.receive_json()
+                    assert reply["worker"] == name
+                    assert reply["connection_id"] == f"conn_{name}"
+
+                # session_id lu dans le premier message, retransmis au worker
+                with client.websocket_connect(f"/ws/conn_init_{name}") as websocket:
+                    websocket.send_json({"type": "session_init", "session_id": session_id})
+                    reply = websocket.receive_json()
+                    assert reply["worker"] == name
+                    assert reply["echo"]["type"] == "session_init"
+
+                assert client.get(f"/api/game/sessions/{session_id}").json()["worker"] == name
+
+            # Création : identifiant attribué par le routeur, session créée sur son worker
+            created = client.post("/api/game/sessions/create").json()
+            assert created["session_id"]
+            assert created["worker"] == names[router.worker_for(created["session_id"])]
+
+            # Nouvelle session dont le worker de l'anneau est w1
+            new_session = next(
+                f"new_{index}" for index in range(100) if names[router.worker_for(f"new_{index}")] == "w1"
+            )
+
+            # Panne de w1 : la nouvelle session bascule sur w2
+            workers[0].stop()
+            with client.websocket_connect(f"/ws/conn_failover?session_id={new_session}") as websocket:
+                websocket.send_json({"type": "session_init", "session_id": new_session})
+                assert websocket.receive_json()["worker"] == "w2"
+
+            # La session servie par w1 n'existe nulle part ailleurs : refus explicite, même à la reprise
+            for connection in ("conn_lost", "conn_lost_init"):
+                url = f"/ws/{connection}?session_id={sessions['w1']}" if connection == "conn_lost" else f"/ws/{connection}"
+                with client.websocket_connect(url) as websocket:
+                    if connection == "conn_lost_init":
+                        websocket.send_json({"type": "session_init", "session_id": sessions["w1"]})
+                    error = websocket.receive_json()
+                    assert error["type"] == "session_error" and error["code"] == "session_lost"
+                    with pytest.raises(WebSocketDisconnect) as closed:
+                        websocket.receive_json()
+                    assert closed.value.code == session_router.SESSION_LOST_CLOSE_CODE
+
+            response = client.get(f"/api/game/sessions/{sessions['w1']}")
+            assert response.status_code == 410 and "nouvelle session" in response.json()["detail"]
+            # Les sessions de w2 ne sont pas touchées
+            assert client.get(f"/api/game/sessions/{sessions['w2']}").json()["worker"] == "w2"
+
+            stats = client.get("/router/health").json()
+            assert stats["failovers"] == 1
+            assert stats["lost_sessions"] == 3
+            assert stats["workers"][workers[0].url]["healthy"] is False
+            assert stats["ring_nodes"] == 1
+    finally:
+        for worker in workers:
+            router.remove_worker(worker.url)
+            worker.stop()
+
+
+if __name__ == "__main__":
+    print("Test du routeur de sessions...")
+    test_consistent_hashing()
+    test_session_id_extraction()
+    test_sticky_and_lost_sessions()
+    test_admin_endpoints_local_only()
+    test_routing_to_workers()
+    print("OK")
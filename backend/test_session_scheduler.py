@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du planificateur partagé des échéances de session
+Ordre des échéances, réarmement et annulation par session, compaction du
+tas, et transitions de phase / fin par timeout de l'orchestrateur
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from testing_support import make_orchestrator
+
+from app.config import settings
+from app.services.game_orchestrator import GameState
+from app.services.session_scheduler import SessionScheduler
+
+
+async def run_ordering():
+    scheduler = SessionScheduler()
+    fired = []
+
+    async def record(label):
+        fired.append(label)
+
+    scheduler.schedule(0.05, record, "c")
+    scheduler.schedule(0.01, record, "a1")
+    scheduler.schedule(0.03, record, "b")
+    scheduler.schedule(0.01, record, "a2")  # Même échéance : ordre d'insertion
+    scheduler.schedule(-1, record, "immédiat")
+    await asyncio.sleep(0.1)
+    await scheduler.shutdown()
+    return fired, scheduler.get_stats()
+
+
+def test_deadline_ordering():
+    fired, stats = asyncio.run(run_ordering())
+    assert fired == ["immédiat", "a1", "a2", "b", "c"]
+    assert stats["fired"] == 5 and stats["pending"] == 0
+
+
+async def run_rearm():
+    scheduler = SessionScheduler()
+    fired = []
+
+    async def record(label):
+        fired.append(label)
+
+    scheduler.schedule(0.02, record, "ancien", key="s1")
+    scheduler.schedule(0.03, record, "ancien_timeout", key="s1")
+    other = scheduler.schedule(0.02, record, "s2", key="s2")
+    assert scheduler.pending("s1") == 2
+
+    # Réarmement : les anciennes échéances ne doivent jamais se déclencher
+    scheduler.cancel_key("s1")
+    assert scheduler.pending("s1") == 0
+    scheduler.schedule(0.04, record, "nouveau", key="s1")
+    await asyncio.sleep(0.08)
+
+    # Annuler une échéance déjà déclenchée ne fausse pas les compteurs
+    scheduler.cancel(other)
+    scheduler.cancel_key("s2")
+    stats = scheduler.get_stats()
+    await scheduler.shutdown()
+    return fired, stats, scheduler
+
+
+def test_rearm_and_cancel_key():
+    fired, stats, scheduler = asyncio.run(run_rearm())
+    assert fired == ["s2", "nouveau"]
+    assert stats["cancelled"] == 2 and stats["fired"] == 2
+    assert stats["pending"] == 0 and stats["sessions"] == 0
+    assert scheduler._cancelled_in_heap == 0
+
+
+async def run_compaction():
+    scheduler = SessionScheduler()
+
+    async def never():
+        raise AssertionError("échéance annulée déclenchée")
+
+    handles = [scheduler.schedule(60, never, key=f"s{index}") for index in range(200)]
+    for handle in handles[:100]:
+        scheduler.cancel(handle)
+    # Exactement la moitié annulée : pas encore de compaction
+    assert len(scheduler._heap) == 200 and scheduler.pending() == 100
+
+    scheduler.cancel(handles[100])
+    heap_size, pending = len(scheduler._heap), scheduler.pending()
+
+    for handle in handles[101:]:
+        scheduler.cancel(handle)
+    await scheduler.shutdown()
+    return heap_size, pending
+
+
+def test_compaction():
+    """Plus de la moitié du tas annulée : les entrées annulées sont retirées"""
+    heap_size, pending = asyncio.run(run_compaction())
+    assert heap_size == 99 and pending == 99
+
+
+def add_session(orchestrator, session_id: str, elapsed_seconds: float, phase: str):
+    orchestrator.active_sessions[session_id] = GameState(
+        session_id=session_id, player_name="Joueur",
+        start_time=datetime.now() - timedelta(seconds=elapsed_seconds), current_phase=phase,
+        corruption_level=0.0, time_elapsed=0.0, is_active=True, last_action_time=0.0
+    )
+    orchestrator._arm_session_timers(session_id)
+
+
+async def run_orchestrator_deadlines():
+    orchestrator = make_orchestrator()
+    duration = settings.game_duration_minutes * 60
+
+    # Passage en dissonance à 3 minutes, fin de partie à la durée maximale
+    add_session(orchestrator, "phase", elapsed_seconds=3 * 60 - 0.05, phase="adhesion")
+    add_session(orchestrator, "timeout", elapsed_seconds=duration - 0.05, phase="rupture")
+    assert orchestrator.active_sessions["phase"].current_phase == "adhesion"
+
+    for _ in range(100):
+        if orchestrator.active_sessions["phase"].current_phase != "adhesion" and "timeout" not in orchestrator.active_sessions:
+            break
+        await asyncio.sleep(0.02)
+
+    phase = orchestrator.active_sessions["phase"].current_phase
+    remaining = orchestrator.scheduler.pending("phase")
+    ended = [(key, values.get("ending_type")) for key, values in orchestrator.write_queue.updates]
+    await orchestrator.scheduler.shutdown()
+    return phase, remaining, ended, orchestrator
+
+
+def test_orchestrator_phase_and_timeout():
+    phase, remaining, ended, orchestrator = asyncio.run(run_orchestrator_deadlines())
+    assert phase == "dissonance"
+    assert remaining > 0  # Rupture, timeout et mesures toujours planifiés
+    assert ("timeout", "timeout") in ended
+    assert "timeout" not in orchestrator.active_sessions
+    assert orchestrator.scheduler.pending("timeout") == 0
+
+
+if __name__ == "__main__":
+    print("Test du planificateur des échéances de session...")
+    test_deadline_ordering()
+    test_rearm_and_cancel_key()
+    test_compaction()
+    test_orchestrator_phase_and_timeout()
+    print("OK")
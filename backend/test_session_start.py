@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du démarrage de session en étapes parallèles
+Toutes les étapes s'exécutent et figurent dans timings_ms ; une étape en échec
+remonte une erreur, annule les autres et ne laisse aucune session à moitié créée
+"""
+import asyncio
+
+import pytest
+
+from testing_support import make_orchestrator
+
+from app.models import GameSession
+from app.services.session_store import InMemorySessionStore, SessionStateMap
+from app.services.stage_timer import StageTimer
+from app.services.tom_ai_service import TomAIService
+
+
+def make_session_orchestrator():
+    """Orchestrateur isolé avec le vrai service Tom (mode sans LLM)"""
+    orchestrator = make_orchestrator()
+    tom_service = TomAIService()
+    tom_service.conversation_history = SessionStateMap("tom_context", store=InMemorySessionStore())
+    orchestrator.tom_service = tom_service
+    return orchestrator
+
+
+async def run_start():
+    orchestrator = make_session_orchestrator()
+    result = await orchestrator.start_new_session("s1", player_name="Alice")
+    state = {
+        "active": "s1" in orchestrator.active_sessions,
+        "tom": "s1" in orchestrator.tom_service.conversation_history,
+        "os": "s1" in orchestrator.os_simulator.session_states,
+        "bias": "s1" in orchestrator.bias_analyzer.session_accumulators,
+        "timers": orchestrator.scheduler.pending("s1"),
+        "added": list(orchestrator.write_queue.added),
+    }
+    await orchestrator.end_session("s1")
+    await orchestrator.scheduler.shutdown()
+    return result, state
+
+
+def test_every_stage_runs_and_is_timed():
+    result, state = asyncio.run(run_start())
+    assert set(result["timings_ms"]) == {
+        "db_insert", "os_generation", "tom_init", "tom_personality", "tom_introduction", "monitoring", "total"
+    }
+    assert all(milliseconds >= 0 for milliseconds in result["timings_ms"].values())
+    assert result["os_state"] and result["tom_personality"] and result["tom_introduction"]
+    assert [type(instance) for instance in state["added"]] == [GameSession]
+    assert state["active"] and state["tom"] and state["os"] and state["bias"]
+    assert state["timers"] > 0
+
+
+async def run_failing_stage(fail: str):
+    orchestrator = make_session_orchestrator()
+    tom_service = orchestrator.tom_service
+    cancelled = []
+
+    async def broken(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        raise ValueError("génération impossible")
+
+    async def slow(*args, **kwargs):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+
+    if fail == "os":
+        # L'OS échoue pendant que Tom génère encore sa personnalité
+        orchestrator.os_simulator.generate_initial_os = broken
+        tom_service._generate_initial_personality = slow
+    else:
+        tom_service._generate_introduction_message = broken
+        tom_service._generate_initial_personality = slow
+
+    with pytest.raises(RuntimeError) as error:
+        await orchestrator.start_new_session("s1", player_name="Alice")
+
+    state = {
+        "active": "s1" in orchestrator.active_sessions,
+        "tom": "s1" in tom_service.conversation_history,
+        "os": "s1" in orchestrator.os_simulator.session_states,
+        "bias": "s1" in orchestrator.bias_analyzer.session_accumulators,
+        "timers": orchestrator.scheduler.pending("s1"),
+    }
+    await orchestrator.scheduler.shutdown()
+    return str(error.value), cancelled, state
+
+
+def test_failing_stage_surfaces_and_rolls_back():
+    for fail, stage in (("os", "os_generation"), ("tom", "tom_init")):
+        message, cancelled, state = asyncio.run(run_failing_stage(fail))
+        assert f"Étape {stage} en échec" in message and "génération impossible" in message
+        assert cancelled == ["slow"]  # L'étape encore en cours est annulée
+        assert state == {"active": False, "tom": False, "os": False, "bias": False, "timers": 0}
+
+
+async def run_gather():
+    timer = StageTimer()
+
+    async def value(result, delay):
+        await asyncio.sleep(delay)
+        return result
+
+    results = await timer.gather(second=value(2, 0.02), first=value(1, 0.01))
+    return results, timer.as_milliseconds()
+
+
+def test_stage_timer_gather_keeps_order():
+    results, timings = asyncio.run(run_gather())
+    assert results == [2, 1]
+    assert set(timings) == {"first", "second", "total"}
+
+
+if __name__ == "__main__":
+    print("Test du démarrage de session en étapes parallèles...")
+    test_every_stage_runs_and_is_timed()
+    test_failing_stage_surfaces_and_rolls_back()
+    test_stage_timer_gather_keeps_order()
+    print("OK")
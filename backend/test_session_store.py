@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du stockage partagé de l'état des sessions
+Sérialisation de GameState et du contexte de Tom, visibilité entre deux
+workers (deux connexions sur le même fichier), cache par version
+"""
+import os
+import asyncio
+import tempfile
+from datetime import datetime
+
+from testing_support import RecordingQueue
+
+from app.services.session_store import InMemorySessionStore, SQLiteSessionStore, SessionStateMap
+from app.services.game_orchestrator import GameOrchestrator, GameState
+from app.services.event_bus import EventBus
+
+
+def game_state_map(store) -> SessionStateMap:
+    return SessionStateMap("game_state", store=store, encode=GameState.to_dict, decode=GameState.from_dict)
+
+
+def new_game_state(session_id: str) -> GameState:
+    return GameState(
+        session_id=session_id, player_name="Joueur", start_time=datetime(2025, 1, 27, 20, 0, 0),
+        current_phase="adhesion", corruption_level=0.25, time_elapsed=0.0, is_active=True, last_action_time=0.0
+    )
+
+
+def test_memory_store_keeps_objects():
+    """En mémoire : mêmes objets, aucune sérialisation"""
+    states = game_state_map(InMemorySessionStore())
+    game_state = new_game_state("s1")
+    states["s1"] = game_state
+
+    assert states["s1"] is game_state
+    assert "s1" in states and "s2" not in states
+    states.sync("s1")
+    del states["s1"]
+    assert len(states) == 0
+
+
+def test_shared_store_between_workers():
+    """Deux workers sur le même fichier : état, contexte de Tom et versions"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session_state.db")
+        worker_a = game_state_map(SQLiteSessionStore(path))
+        worker_b = game_state_map(SQLiteSessionStore(path))
+
+        worker_a["s1"] = new_game_state("s1")
+        loaded = worker_b["s1"]
+        assert loaded == new_game_state("s1")
+        assert isinstance(loaded.start_time, datetime)
+
+        # Version inchangée : objet en cache, pas de désérialisation
+        assert worker_b["s1"] is loaded
+        assert worker_b.get_stats()["hits"] == 1
+
+        # Modification en place publiée par sync, visible de l'autre worker
+        loaded.total_orders += 1
+        loaded.current_phase = "dissonance"
+        worker_b.sync("s1")
+        assert worker_a["s1"].total_orders == 1
+        assert worker_a["s1"].current_phase == "dissonance"
+        assert worker_a.get_stats()["loads"] == 1
+
+        # Écriture concurrente : la dernière l'emporte, conflit compté
+        stale = worker_b["s1"]
+        worker_a["s1"].obeyed_orders = 1
+        worker_a.sync("s1")
+        stale.hesitation_events = 2
+        worker_b.sync("s1")
+        assert worker_b.get_stats()["conflicts"] == 1
+
+        # Contexte de Tom : structure JSON conservée
+        tom_a = SessionStateMap("tom_context", store=SQLiteSessionStore(path))
+        tom_b = SessionStateMap("tom_context", store=SQLiteSessionStore(path))
+        tom_a["s1"] = {"messages": [], "personality": {"style": "confident"}, "context": {"player_name": "Joueur"}}
+        tom_a["s1"]["messages"].append({"role": "assistant", "content": "Salut !", "type": "introduction"})
+        tom_a.sync("s1")
+        assert tom_b["s1"]["messages"][0]["content"] == "Salut !"
+
+        del worker_b["s1"]
+        assert "s1" not in worker_a
+        assert list(tom_b) == ["s1"]
+
+
+async def run_transition(orchestrator: GameOrchestrator):
+    orchestrator.active_sessions["s1"] = new_game_state("s1")
+    await orchestrator._transition_game_phase("s1", "rupture")
+
+
+def test_orchestrator_on_shared_store():
+    """Une transition de phase sur un worker est visible des autres"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session_state.db")
+        orchestrator = GameOrchestrator()
+        orchestrator.write_queue = RecordingQueue()
+        orchestrator.event_bus = EventBus()
+        orchestrator.active_sessions = game_state_map(SQLiteSessionStore(path))
+
+        asyncio.run(run_transition(orchestrator))
+
+        other_worker = game_state_map(SQLiteSessionStore(path))
+        assert other_worker["s1"].current_phase == "rupture"
+
+
+if __name__ == "__main__":
+    print("Test du stockage de l'état des sessions...")
+    test_memory_store_keeps_objects()
+    test_shared_store_between_workers()
+    test_orchestrator_on_shared_store()
+    print("OK")
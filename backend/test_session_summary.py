@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du résumé incrémental des sessions (session_summary)
+Mise à jour par lots comme la file write-behind, puis comparaison avec la
+reconstruction depuis les journaux bruts
+"""
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+import testing_support  # noqa: F401
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import GameSession, PlayerAction, TomInteraction, SessionSummary
+from app.services.session_summary import (
+    apply_to_summaries, rebuild_summaries, rebuild_summaries_in_batches, verify_summaries
+)
+
+
+def make_action(session_id: str, step: int, timestamp: datetime, rng: random.Random) -> PlayerAction:
+    """Action synthétique"""
+    return PlayerAction(
+        session_id=session_id,
+        timestamp=timestamp,
+        game_time_seconds=float(step),
+        action_type=rng.choice(["tom_order", "file_manipulation", "meta_detective"]),
+        action_category="file_manipulation",
+        action_description=f"Action {step}",
+        gravity_score=rng.randint(0, 10),
+        reaction_time_seconds=rng.choice([None, rng.uniform(0.5, 15.0)]),
+        game_phase="adhesion",
+        was_obedient=rng.choice([True, True, False, None]),
+    )
+
+
+def make_interaction(session_id: str, timestamp: datetime) -> TomInteraction:
+    """Interaction Tom synthétique"""
+    return TomInteraction(
+        session_id=session_id,
+        timestamp=timestamp,
+        game_time_seconds=1.0,
+        interaction_type="response",
+        message_text="Bonjour",
+        game_phase="adhesion",
+        corruption_level=0.0,
+    )
+
+
+def write_batch(engine, instances):
+    """Transaction d'un lot, comme WriteBehindQueue._write"""
+    with Session(bind=engine) as db:
+        for instance in instances:
+            db.add(instance)
+        apply_to_summaries(db, instances)
+        db.commit()
+
+
+def test_incremental_summary_matches_rebuild():
+    """Résumé mis à jour lot par lot identique au recalcul depuis les journaux"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/summary.db")
+        Base.metadata.create_all(bind=engine)
+
+        rng = random.Random(7)
+        start = datetime.now()
+        session_ids = [f"session_{index}" for index in range(5)]
+        write_batch(engine, [GameSession(id=session_id, condition="oracle") for session_id in session_ids])
+
+        # Lots mélangeant les sessions, une session étalée sur plusieurs lots
+        pending = []
+        for step in range(200):
+            session_id = rng.choice(session_ids[:4])  # session_4 : aucune activité
+            timestamp = start + timedelta(seconds=step)
+            pending.append(make_action(session_id, step, timestamp, rng))
+            if step % 7 == 0:
+                pending.append(make_interaction(session_id, timestamp))
+            if len(pending) >= rng.randint(1, 25):
+                write_batch(engine, pending)
+                pending = []
+        write_batch(engine, pending)
+
+        with engine.connect() as connection:
+            assert verify_summaries(connection) == []
+
+        with Session(bind=engine) as db:
+            summary = db.get(SessionSummary, "session_0")
+            actions = db.query(PlayerAction).filter(PlayerAction.session_id == "session_0")\
+                .order_by(PlayerAction.timestamp).all()
+
+            # Série d'obéissance maximale recalculée à la main
+            best = current = 0
+            for action in actions:
+                if action.was_obedient is True:
+                    current += 1
+                    best = max(best, current)
+                elif action.was_obedient is False:
+                    current = 0
+
+            assert summary.total_actions == len(actions)
+            assert summary.max_obedience_streak == best
+            assert summary.current_obedience_streak == current
+            assert summary.max_gravity == max(action.gravity_score for action in actions)
+            assert summary.meta_actions == sum(1 for action in actions if action.action_type.startswith("meta_"))
+            assert db.get(SessionSummary, "session_4") is None
+
+        # Résumé corrompu : détecté puis corrigé par la reconstruction
+        with engine.begin() as connection:
+            connection.execute(SessionSummary.__table__.update().values(total_actions=0))
+            mismatches = verify_summaries(connection)
+            assert {mismatch["session_id"] for mismatch in mismatches} == set(session_ids[:4])
+            assert rebuild_summaries(connection, ["session_1"]) == 1
+            assert len(verify_summaries(connection)) == 3
+            assert rebuild_summaries(connection) == 4
+            assert verify_summaries(connection) == []
+
+        # Rattrapage en ligne : une transaction par lot de sessions
+        with engine.begin() as connection:
+            connection.execute(SessionSummary.__table__.update().values(total_actions=0))
+        commits = []
+
+        def count_commit(connection):
+            commits.append(connection)
+
+        event.listen(engine, "commit", count_commit)
+        assert rebuild_summaries_in_batches(engine, batch_size=2) == 4
+        event.remove(engine, "commit", count_commit)
+        assert len(commits) >= 2
+        with engine.connect() as connection:
+            assert verify_summaries(connection) == []
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    print("Test du résumé incrémental des sessions...")
+    test_incremental_summary_matches_rebuild()
+    print("OK")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du profil de stockage SQLite "production"
+WAL et pragmas à la connexion, lecteurs en lecture seule, attente du verrou mesurée
+"""
+import asyncio
+import tempfile
+import threading
+
+import testing_support  # noqa: F401
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.database import LockWaitStats, create_database_engine, create_async_database_engine
+
+
+def test_production_profile():
+    """Rédacteur en WAL, lecteurs refusant l'écriture, attentes enregistrées"""
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{directory}/profile.db"
+        stats = LockWaitStats()
+        writer = create_database_engine(url, role="writer", profile="production", stats=stats, echo=False)
+        reader = create_database_engine(url, role="reader", profile="production", stats=stats, echo=False)
+
+        with writer.begin() as connection:
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+            connection.exec_driver_sql("CREATE TABLE events (id INTEGER PRIMARY KEY, value TEXT)")
+        assert stats.as_dict()["write_transactions"] == 1
+
+        # Un lecteur garde son instantané pendant qu'une écriture est commitée
+        with reader.connect() as connection:
+            connection.exec_driver_sql("BEGIN")
+            assert connection.exec_driver_sql("SELECT count(*) FROM events").scalar() == 0
+
+            done = threading.Event()
+            def write():
+                with writer.begin() as write_connection:
+                    write_connection.exec_driver_sql("INSERT INTO events (value) VALUES ('a')")
+                done.set()
+            thread = threading.Thread(target=write)
+            thread.start()
+            assert done.wait(5), "L'écriture ne doit pas attendre le lecteur en WAL"
+            thread.join()
+
+            assert connection.exec_driver_sql("SELECT count(*) FROM events").scalar() == 0
+            connection.exec_driver_sql("COMMIT")
+            assert connection.exec_driver_sql("SELECT count(*) FROM events").scalar() == 1
+
+            try:
+                connection.exec_driver_sql("INSERT INTO events (value) VALUES ('b')")
+                assert False, "Le lecteur ne doit pas pouvoir écrire"
+            except OperationalError:
+                pass
+
+        # Lecteur asynchrone : même profil
+        async def read():
+            async_reader = create_async_database_engine(url, role="reader", profile="production", echo=False)
+            try:
+                async with async_reader.connect() as connection:
+                    assert (await connection.execute(text("PRAGMA query_only"))).scalar() == 1
+                    return (await connection.execute(text("SELECT count(*) FROM events"))).scalar()
+            finally:
+                await async_reader.dispose()
+
+        assert asyncio.run(read()) == 1
+
+        lock_wait = stats.as_dict()
+        assert lock_wait["write_transactions"] == 2
+        assert lock_wait["busy_errors"] == 0
+
+        writer.dispose()
+        reader.dispose()
+
+
+def test_default_profile_unchanged():
+    """Profil "default" : aucun pragma, journal rollback"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_database_engine(f"sqlite:///{directory}/default.db", profile="default", echo=False)
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "delete"
+            assert connection.exec_driver_sql("PRAGMA query_only").scalar() == 0
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    print("Test du profil de stockage...")
+    test_production_profile()
+    test_default_profile_unchanged()
+    print("OK")
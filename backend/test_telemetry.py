@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la télémétrie des entrées à haute fréquence
+Agrégats dérivés des lots (distance du curseur, fréquence des clics,
+hésitations), tampon borné, et contournement du pipeline des actions
+"""
+import math
+import time
+import asyncio
+from datetime import datetime
+
+from testing_support import RecordingQueue
+
+from app.services import bias_analyzer as bias_analyzer_module
+from app.services.telemetry import TelemetryHub
+from app.services.game_orchestrator import GameOrchestrator, GameState
+from app.models import PlayerAction, ExperimentData
+
+
+def test_aggregates():
+    """Distance, clics par minute et pauses calculés sur plusieurs lots"""
+    hub = TelemetryHub(buffer_size=50, hesitation_seconds=3.0)
+
+    # Deux échantillons en ligne droite (3-4-5), puis un parcours mesuré par le client
+    assert hub.ingest("s1", [["mouse_move", 0, 0, 0], ["mouse_move", 100, 30, 40]]) == 2
+    assert hub.ingest("s1", [["mouse_move", 200, 60, 40, 42.5], ["desktop_click", 300, 60, 40]]) == 2
+    # Pause de 5 s, puis un clic 60 s après le premier événement
+    hub.ingest("s1", [["window_focus", 5300], ["desktop_click", 60000, 60, 40]])
+
+    metrics = hub.get_metrics("s1")
+    assert metrics["cursor_movement_total"] == 50 + 42.5
+    assert metrics["click_count"] == 2
+    assert metrics["click_frequency"] == 2.0
+    assert metrics["focus_changes"] == 1
+    assert metrics["hesitation_events"] == 2
+    assert metrics["longest_pause_seconds"] == 54.7
+
+    # Événements invalides ou hors ordre rejetés
+    assert hub.ingest("s1", [["file_delete", 61000], ["mouse_move", "x"], ["mouse_move", 100, 0, 0], "bruit"]) == 0
+    assert hub.get_stats()["rejected_events"] == 4
+
+    # Distance depuis la dernière action significative, remise à zéro
+    signals = hub.action_signals("s1", client_time=62000)
+    assert signals == {"cursor_movement_distance": 92.5, "pause_before_action": 2.0}
+    assert hub.action_signals("s1")["cursor_movement_distance"] == 0.0
+
+
+def test_invalid_values_rejected():
+    """Booléens, valeurs non finies et horodatages dans le futur refusés"""
+    hub = TelemetryHub(max_clock_ahead_seconds=5.0)
+    now = time.time() * 1000
+    assert hub.ingest("s1", [["mouse_move", now, 0, 0]]) == 1
+
+    assert hub.ingest("s1", [
+        ["mouse_move", True, 0, 0],
+        ["mouse_move", now + 1, True, 0],
+        ["mouse_move", now + 1, 0, 0, False],
+        ["mouse_move", math.nan, 0, 0],
+        ["mouse_move", now + 1, math.inf, 0],
+        ["mouse_move", now + 1, 0, 0, math.nan],
+        ["mouse_move", 10**400, 0, 0],
+        ["mouse_move", 1e18, 0, 0],
+        ["mouse_move", now + 60000, 0, 0],
+    ]) == 0
+    assert hub.get_stats()["rejected_events"] == 9
+
+    # Un horodatage dans le futur ne bloque donc pas les événements suivants
+    assert hub.ingest("s1", [["mouse_move", now + 1000, 3, 4], ["desktop_click", now + 4000, 3, 4]]) == 2
+    metrics = hub.get_metrics("s1")
+    assert metrics["cursor_movement_total"] == 5.0 and metrics["events"] == 3
+
+    signals = hub.action_signals("s1", client_time=math.nan)
+    assert "pause_before_action" not in signals
+
+
+def test_ring_buffer_and_eviction():
+    """Tampon circulaire par session, sessions les plus anciennes évincées"""
+    hub = TelemetryHub(buffer_size=10, max_sessions=2)
+    hub.ingest("s1", [["mouse_move", index * 10, index, 0] for index in range(100)])
+
+    recent = hub.recent_events("s1", limit=5)
+    assert [event["t"] for event in recent] == [950, 960, 970, 980, 990]
+    assert hub.get_metrics("s1")["events"] == 100
+    assert hub.get_metrics("s1")["buffered_events"] == 10
+
+    hub.ingest("s2", [["desktop_click", 0, 1, 1]])
+    hub.ingest("s1", [["desktop_click", 1000, 1, 1]])
+    hub.ingest("s3", [["desktop_click", 0, 1, 1]])
+    assert set(hub.sessions) == {"s1", "s3"}
+    assert hub.get_stats()["evicted_sessions"] == 1
+
+
+async def run_orchestrator_checks():
+    orchestrator = GameOrchestrator()
+    orchestrator.write_queue = RecordingQueue()
+    orchestrator.telemetry = TelemetryHub()
+    orchestrator.active_sessions["s1"] = GameState(
+        session_id="s1", player_name="Joueur", start_time=datetime.now(), current_phase="adhesion",
+        corruption_level=0.0, time_elapsed=0.0, is_active=True, last_action_time=0.0
+    )
+    orchestrator.bias_analyzer.start_session("s1")
+
+    # Clic isolé (ancien client) et lot : aucun passage par le pipeline des actions
+    result = await orchestrator.process_player_action("s1", {"type": "desktop_click", "position": {"x": 3, "y": 4}})
+    assert result == {"action_processed": False, "telemetry": True}
+    start = time.time() * 1000 + 100
+    orchestrator.ingest_telemetry("s1", [["mouse_move", start, 3, 4], ["mouse_move", start + 500, 6, 8]])
+    assert orchestrator.write_queue.added == []
+
+    # Action significative : enrichie de la distance parcourue depuis la précédente
+    result = await orchestrator.process_player_action(
+        "s1", {"id": "a1", "type": "file_delete", "target": "readme.txt", "client_time": start + 4500}
+    )
+    assert result["action_processed"]
+    [action] = [item for item in orchestrator.write_queue.added if isinstance(item, PlayerAction)]
+    assert action.cursor_movement_distance == 5.0
+    assert action.hesitation_time_seconds == 4.0
+    assert orchestrator.get_session_status("s1")["telemetry"]["cursor_movement_total"] == 5.0
+
+    # Fin de session : mesure finale avec les agrégats, tampon libéré
+    await orchestrator.end_session("s1", "manual")
+    [measure] = [item for item in orchestrator.write_queue.added if isinstance(item, ExperimentData)]
+    assert measure.cursor_movement_total == 5.0
+    assert measure.raw_metrics["telemetry"]["events"] == 3
+    assert orchestrator.telemetry.get_metrics("s1") is None
+
+
+def test_orchestrator_bypass():
+    """Les entrées à haute fréquence n'atteignent pas le pipeline des actions"""
+    # Snapshots de biais de l'analyseur : même file factice que l'orchestrateur
+    original = bias_analyzer_module.get_write_queue
+    bias_analyzer_module.get_write_queue = RecordingQueue
+    try:
+        asyncio.run(run_orchestrator_checks())
+    finally:
+        bias_analyzer_module.get_write_queue = original
+
+
+if __name__ == "__main__":
+    print("Test de la télémétrie des entrées...")
+    test_aggregates()
+    test_invalid_values_rejected()
+    test_ring_buffer_and_eviction()
+    test_orchestrator_bypass()
+    print("OK")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du streaming des réponses de Tom
+Vérifie l'extraction incrémentale du champ "message" d'un JSON partiel
+et la séquence d'événements chunk -> complete du service Tom
+"""
+import json
+import random
+import asyncio
+from types import SimpleNamespace
+
+import testing_support  # noqa: F401
+
+from app.services.tom_ai_service import TomAIService, StreamingFieldExtractor
+from app.services.response_cache import ResponseCache
+
+RESPONSE = {
+    "tone": "empathique",
+    "message": "Je vois que tu hésites... C'est \"normal\", \\ vraiment.\nOn y va ? 😀 é",
+    "intent": "rassurer et relancer",
+}
+
+
+def split_randomly(text: str, rng: random.Random):
+    """Découpe un texte en fragments de 1 à 6 caractères (tokens simulés)"""
+    fragments = []
+    index = 0
+    while index < len(text):
+        size = rng.randint(1, 6)
+        fragments.append(text[index:index + size])
+        index += size
+    return fragments
+
+
+def test_extractor_matches_json_value():
+    """La concaténation des fragments extraits égale la valeur JSON décodée"""
+    for ensure_ascii in (True, False):
+        raw = "```json\n" + json.dumps(RESPONSE, ensure_ascii=ensure_ascii) + "\n```"
+
+        for seed in range(200):
+            extractor = StreamingFieldExtractor("message")
+            chunks = [extractor.feed(fragment) for fragment in split_randomly(raw, random.Random(seed))]
+
+            assert "".join(chunks) == RESPONSE["message"]
+            assert extractor.value == RESPONSE["message"]
+            assert extractor.completed
+            assert extractor.raw == raw
+
+
+class FakeStream:
+    """Flux de complétion factice au format des chunks OpenAI"""
+
+    def __init__(self, fragments):
+        self.fragments = fragments
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for fragment in self.fragments:
+            await asyncio.sleep(0)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=fragment))])
+
+
+async def collect_stream_events():
+    """Rejoue une réponse d'hésitation streamée par un client factice"""
+    service = TomAIService()
+    service.response_cache = ResponseCache(enabled=False)
+    fragments = split_randomly(json.dumps(RESPONSE, ensure_ascii=False), random.Random(0))
+
+    async def create(**kwargs):
+        assert kwargs.get("stream") is True
+        return FakeStream(fragments)
+
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    await service.initialize_session("stream_session", "Alex")
+
+    events = []
+    async for event in service.stream_response("stream_session", "player_hesitation", {"hesitation_duration": 6.0}):
+        events.append(event)
+    return service, events
+
+
+def test_stream_response_events():
+    """Les fragments précèdent l'événement final et reconstituent le message"""
+    service, events = asyncio.run(collect_stream_events())
+
+    assert events[-1]["type"] == "complete"
+    assert all(event["type"] == "chunk" for event in events[:-1])
+    assert len(events) > 2
+
+    streamed_text = "".join(event["text"] for event in events[:-1])
+    assert streamed_text == RESPONSE["message"]
+    assert events[-1]["response"]["intent"] == RESPONSE["intent"]
+    assert service.conversation_history["stream_session"]["messages"][-1]["content"] == RESPONSE["message"]
+
+
+if __name__ == "__main__":
+    print("Test du streaming Tom...")
+    test_extractor_matches_json_value()
+    test_stream_response_events()
+    print("OK")
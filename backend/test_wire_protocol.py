@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du protocole WebSocket négocié (JSON, JSON compressé, msgpack)
+Aller-retour des trames, négociation à session_init, sérialisation unique
+d'un message envoyé à plusieurs connexions
+"""
+
+import testing_support  # noqa: F401
+
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+from app.api import wire_protocol
+from app.api.wire_protocol import (
+    EncodedMessage, JSON_CODEC, DEFLATE_CODEC, negotiate, decode, receive_message
+)
+from app.main import ConnectionManager
+
+OS_STATE = {
+    "type": "session_ready",
+    "session_id": "session_test",
+    "os_state": {
+        "desktop": {"widgets": [{"id": f"widget_{index}", "corrupted": False, "label": "Météo"} for index in range(20)]},
+        "file_system": {"documents": [{"name": f"rapport_{index}.docx", "protected": index % 3 == 0} for index in range(40)]},
+    },
+}
+
+
+def test_frames_round_trip():
+    """Chaque encodage redonne le message ; petits messages en clair, gros compressés"""
+    codecs = [JSON_CODEC, DEFLATE_CODEC]
+    if wire_protocol.msgpack is not None:
+        codecs.append(wire_protocol.MSGPACK_CODEC)
+
+    for codec in codecs:
+        for message in ({"type": "pong"}, OS_STATE):
+            assert decode(codec.encode(message)) == message
+
+    assert isinstance(DEFLATE_CODEC.encode({"type": "pong"}), str)
+    compressed = DEFLATE_CODEC.encode(OS_STATE)
+    assert compressed[0] == wire_protocol.FORMAT_DEFLATE_JSON
+    assert len(compressed) < len(JSON_CODEC.encode(OS_STATE)) / 4
+
+
+def test_negotiation():
+    """Préférence du serveur parmi les encodages du client, repli JSON"""
+    assert negotiate(None) is JSON_CODEC
+    assert negotiate(["inconnu"]) is JSON_CODEC
+    assert negotiate(["json", "deflate"]) is DEFLATE_CODEC
+    # permessage-deflate actif : pas de seconde compression
+    assert negotiate(["json", "deflate"], compressed_transport=True) is JSON_CODEC
+    if wire_protocol.msgpack is None:
+        assert negotiate(["msgpack", "json"]) is JSON_CODEC
+
+
+def test_encoded_once():
+    """Un message envoyé à plusieurs connexions n'est sérialisé qu'une fois par format"""
+    calls = []
+    original = wire_protocol.dumps_json
+    wire_protocol.dumps_json = lambda message: calls.append(message) or original(message)
+    try:
+        encoded = EncodedMessage(OS_STATE)
+        frames = {encoded.encode(JSON_CODEC), encoded.encode(DEFLATE_CODEC), encoded.encode(JSON_CODEC)}
+        assert len(frames) == 2
+        assert len(calls) == 1
+        assert encoded.size(JSON_CODEC) == len(original(OS_STATE))
+    finally:
+        wire_protocol.dumps_json = original
+
+
+def test_websocket_session():
+    """Négociation à session_init puis trames binaires pour les gros messages"""
+    manager = ConnectionManager()
+    app = FastAPI()
+
+    @app.websocket("/ws/{connection_id}")
+    async def endpoint(websocket: WebSocket, connection_id: str):
+        await manager.connect(websocket, connection_id)
+        try:
+            while True:
+                data = await receive_message(websocket)
+                if data["type"] == "session_init":
+                    codec = manager.negotiate_encoding(connection_id, data.get("encodings") or [])
+                    await manager.send_personal_message({"type": "session_ready", "encoding": codec.name}, connection_id)
+                else:
+                    await manager.broadcast(OS_STATE, list(manager.active_connections))
+        except WebSocketDisconnect:
+            manager.disconnect(connection_id)
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/conn_1") as websocket:
+            # Trame texte reçue avant toute négociation
+            websocket.send_json({"type": "session_init", "encodings": ["deflate", "json"]})
+            assert websocket.receive_json() == {"type": "session_ready", "encoding": "deflate"}
+
+            # Le client peut aussi envoyer une trame binaire
+            websocket.send_bytes(DEFLATE_CODEC.encode({**OS_STATE, "type": "state_request"}))
+            assert decode(websocket.receive_bytes()) == OS_STATE
+
+    stats = manager.get_stats()
+    assert stats["frames_sent"] == {"deflate": 2}
+    assert stats["bytes_sent"]["deflate"] < len(JSON_CODEC.encode(OS_STATE))
+
+
+if __name__ == "__main__":
+    print("Test du protocole WebSocket négocié...")
+    test_frames_round_trip()
+    test_negotiation()
+    test_encoded_once()
+    test_websocket_session()
+    print("OK")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la file d'écriture différée
+Lots et fusion des mises à jour d'une même ligne, vidage, écriture fautive
+isolée et attente sur file pleine (backpressure) ; les coroutines en attente
+ne mobilisent aucun thread de l'exécuteur par défaut ; métriques exactes sous
+accès concurrents
+"""
+import asyncio
+import threading
+
+import testing_support  # noqa: F401
+
+from app.models import GameSession
+from app.services.write_behind import WriteBehindQueue
+
+
+class RecordingWriteQueue(WriteBehindQueue):
+    """File dont le thread d'écriture attend `gate` puis note les lots au lieu de les persister"""
+
+    def __init__(self, fail_on=None, **kwargs):
+        super().__init__(**kwargs)
+        self.gate = threading.Event()
+        self.gate.set()
+        self.fail_on = fail_on
+        self.batches = []
+
+    def _write(self, operations):
+        self.gate.wait()
+        if len(operations) > 1 and any(operation[1] == self.fail_on for operation in operations):
+            raise RuntimeError("lot refusé")
+        if operations[0][1] == self.fail_on:
+            raise RuntimeError("écriture refusée")
+        self.batches.append(list(operations))
+        self._count("written", len(operations))
+
+    @property
+    def written(self):
+        return [operation for batch in self.batches for operation in batch]
+
+
+async def run_batches():
+    write_queue = RecordingWriteQueue(max_size=100, batch_size=50)
+    write_queue.gate.clear()
+
+    await write_queue.add("action_1")
+    await write_queue.update(GameSession, "s1", {"corruption_level": 0.1})
+    await write_queue.add("action_2")
+    await write_queue.update(GameSession, "s1", {"corruption_level": 0.2, "current_phase": "doubt"})
+    await write_queue.update(GameSession, "s2", {"corruption_level": 0.5})
+
+    flush = asyncio.ensure_future(write_queue.flush())
+    await asyncio.sleep(0.05)
+    assert not flush.done()  # Le vidage attend le commit
+
+    write_queue.gate.set()
+    await asyncio.wait_for(flush, timeout=5)
+    stats = write_queue.get_stats()
+    await write_queue.shutdown()
+    return write_queue, stats
+
+
+def test_batches_coalesce_and_flush():
+    """Mises à jour d'une même ligne fusionnées à la place de la première"""
+    write_queue, stats = asyncio.run(run_batches())
+    assert write_queue.written == [
+        ("add", "action_1"),
+        ("update", GameSession, "s1", {"corruption_level": 0.2, "current_phase": "doubt"}),
+        ("add", "action_2"),
+        ("update", GameSession, "s2", {"corruption_level": 0.5}),
+    ]
+    assert stats["enqueued"] == 5 and stats["written"] == 4
+    assert stats["pending"] == 0 and stats["errors"] == 0
+
+
+async def run_failing_write():
+    write_queue = RecordingWriteQueue(fail_on="invalide", max_size=100, batch_size=50)
+    write_queue.gate.clear()
+    for instance in ("action_1", "invalide", "action_2"):
+        await write_queue.add(instance)
+    write_queue.gate.set()
+    await write_queue.flush()
+    stats = write_queue.get_stats()
+    await write_queue.shutdown()
+    return write_queue, stats
+
+
+def test_failed_write_is_isolated():
+    """Un lot refusé est rejoué opération par opération : seule la fautive est perdue"""
+    write_queue, stats = asyncio.run(run_failing_write())
+    assert write_queue.written == [("add", "action_1"), ("add", "action_2")]
+    assert stats["errors"] == 1
+
+
+async def run_backpressure():
+    write_queue = RecordingWriteQueue(max_size=2, batch_size=2)
+    write_queue.gate.clear()
+
+    # 10 insertions pour une file de 2 : la plupart attendent une place
+    producers = [asyncio.ensure_future(write_queue.add(index)) for index in range(10)]
+    await asyncio.sleep(0.05)
+    assert not all(producer.done() for producer in producers)
+
+    write_queue.gate.set()
+    await asyncio.wait_for(asyncio.gather(*producers), timeout=5)
+    await write_queue.flush()
+    stats = write_queue.get_stats()
+    await write_queue.shutdown()
+    return write_queue, stats
+
+
+def test_backpressure():
+    """File pleine : les producteurs attendent, aucune écriture n'est perdue"""
+    write_queue, stats = asyncio.run(run_backpressure())
+    assert sorted(operation[1] for operation in write_queue.written) == list(range(10))
+    assert stats["backpressure_waits"] > 0
+    assert stats["pending"] == 0
+
+
+async def run_waits_without_executor():
+    write_queue = RecordingWriteQueue(max_size=2, batch_size=2)
+    write_queue.gate.clear()
+    threads_before = set(threading.enumerate())
+
+    producers = [asyncio.ensure_future(write_queue.add(index)) for index in range(10)]
+    flushes = [asyncio.ensure_future(write_queue.flush()) for _ in range(3)]
+    await asyncio.sleep(0.05)
+
+    # Seul le thread d'écriture a été créé
+    assert [thread.name for thread in set(threading.enumerate()) - threads_before] == ["write-behind"]
+    assert not any(flush.done() for flush in flushes)
+
+    write_queue.gate.set()
+    await asyncio.wait_for(asyncio.gather(*producers, *flushes), timeout=5)
+    await write_queue.shutdown()
+    return write_queue
+
+
+def test_waits_hold_no_executor_thread():
+    """File pleine et vidages attendus sur la boucle d'événements"""
+    write_queue = asyncio.run(run_waits_without_executor())
+    assert sorted(operation[1] for operation in write_queue.written) == list(range(10))
+
+
+def test_stats_exact_under_concurrency():
+    """Compteurs incrémentés depuis plusieurs threads à la fois : aucune mise à jour perdue"""
+    write_queue = RecordingWriteQueue()
+
+    def count():
+        for _ in range(20000):
+            write_queue._count("written")
+            write_queue._count("enqueued", 2)
+
+    threads = [threading.Thread(target=count) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = write_queue.get_stats()
+    assert stats["written"] == 80000 and stats["enqueued"] == 160000
+
+
+if __name__ == "__main__":
+    print("Test de la file d'écriture différée...")
+    test_batches_coalesce_and_flush()
+    test_failed_write_is_isolated()
+    test_backpressure()
+    test_waits_hold_no_executor_thread()
+    test_stats_exact_under_concurrency()
+    print("OK")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Outils communs des tests et benchmarks du backend
+L'import prépare l'environnement avant celui du paquet app : chemin backend,
+mode debug (le paquet app ne monte /static qu'hors mode debug) et points de
+reprise désactivés. Il fournit aussi les doublures partagées : WebSocket,
+file d'écriture, session de base asynchrone, service Tom et orchestrateur isolé
+"""
+import os
+import sys
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("DEBUG", "true")
+# L'orchestrateur global ne crée pas ./database/session_checkpoints.db
+# (les tests des points de reprise utilisent leur propre fichier temporaire)
+os.environ.setdefault("SESSION_CHECKPOINT_ENABLED", "false")
+
+from app.services.event_bus import EventBus
+from app.services.game_orchestrator import GameOrchestrator, GameState
+from app.services.session_checkpoint import SessionCheckpointStore
+from app.services.session_scheduler import SessionScheduler
+from app.services.session_store import InMemorySessionStore, SessionStateMap
+from app.api.wire_protocol import decode
+
+
+class FakeWebSocket:
+    """
+    WebSocket factice
+    - `blocked` : envois suspendus tant que `gate` n'est pas ouverte
+    - `manager` : un client vivant répond aux heartbeats du ConnectionManager
+    """
+
+    def __init__(self, manager=None, connection_id: Optional[str] = None, alive: bool = True, blocked: bool = False):
+        self.manager = manager
+        self.connection_id = connection_id
+        self.alive = alive
+        self.sent = []
+        self.closed_code = None
+        self.gate = asyncio.Event()
+        if not blocked:
+            self.gate.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        await self.gate.wait()
+        message = decode(data)
+        self.sent.append(message)
+        if self.manager is not None and self.alive and message["type"] == "heartbeat":
+            self.manager.record_heartbeat_ack(self.connection_id, message["sent_at"])
+
+    async def send_bytes(self, data):
+        await self.send_text(data)
+
+    async def close(self, code=1000):
+        self.closed_code = code
+
+
+class RecordingQueue:
+    """File d'écriture qui conserve les objets au lieu de les persister"""
+
+    def __init__(self):
+        self.added = []
+        self.updates = []
+
+    async def add(self, instance):
+        self.added.append(instance)
+
+    async def update(self, model, primary_key, values):
+        self.updates.append((primary_key, values))
+
+    async def flush(self):
+        pass
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeDb:
+    """Session asynchrone factice : renvoie les lignes données et compte les lectures"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.selects = 0
+
+    async def execute(self, statement):
+        self.selects += 1
+        return FakeResult(list(self.rows))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeTom:
+    """Service Tom factice : compte les générations et garde l'historique de conversation"""
+
+    def __init__(self):
+        self.calls = 0
+        self.conversation_history = {}
+
+    async def generate_response(self, session_id, trigger_type, context_data):
+        self.calls += 1
+        return {"content": "Nouvelle phase.", "tom_mood": "helpful"}
+
+    def cleanup_session(self, session_id):
+        self.conversation_history.pop(session_id, None)
+
+
+def make_orchestrator(checkpoints: Optional[SessionCheckpointStore] = None) -> GameOrchestrator:
+    """
+    Orchestrateur isolé : état, points de reprise, file, bus, échéancier et Tom
+    propres au test (un redémarrage ne conserve que les points de reprise)
+    """
+    orchestrator = GameOrchestrator()
+    store = InMemorySessionStore()
+    orchestrator.active_sessions = SessionStateMap(
+        "game_state", store=store, encode=GameState.to_dict, decode=GameState.from_dict
+    )
+    orchestrator.os_simulator.session_states = SessionStateMap("os_state", store=store)
+    orchestrator.corruption_system.session_corruption = SessionStateMap("corruption_level", store=store)
+    orchestrator.corruption_system.corruption_history = SessionStateMap("corruption_history", store=store)
+    orchestrator.checkpoints = checkpoints or SessionCheckpointStore("", enabled=False)
+    orchestrator.write_queue = RecordingQueue()
+    orchestrator.event_bus = EventBus()
+    orchestrator.scheduler = SessionScheduler()
+    orchestrator.tom_service = FakeTom()
+    return orchestrator
@@ -53,7 +53,7 @@ const App = ({ config }) => {
       
       // Initialiser les services
       console.log('🔌 Création WebSocketService avec URL:', config.wsUrl);
-      const ws = new WebSocketService(config.wsUrl);
+      const ws = new WebSocketService(config.wsUrl, newSessionId);
       
       console.log('🔊 Création AudioService...');
       const audio = new AudioService();
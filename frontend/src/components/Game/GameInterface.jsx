@@ -77,6 +77,9 @@ const GameInterface = ({ sessionId, config, wsService, audioService }) => {
       wsService.addListener('session_status', (data) => {
         if (data.status === 'ended') {
           gameStore.endSession(data.ending_type, data.ending_data);
+        } else if (data.status === 'phase_transition') {
+          // Transition poussée par le serveur (bus d'événements)
+          gameStore.updatePhase(data.phase);
         }
       }),
 
@@ -94,6 +97,14 @@ const GameInterface = ({ sessionId, config, wsService, audioService }) => {
         tomStore.handleGeneratedMessage(data.message_data);
       }),
 
+      wsService.addListener('tom_message_chunk', (data) => {
+        tomStore.handleStreamChunk(data);
+      }),
+
+      wsService.addListener('tom_message_complete', (data) => {
+        tomStore.handleStreamComplete(data);
+      }),
+
       wsService.addListener('tom_status', (data) => {
         if (data.status === 'disconnected') {
           tomStore.simulateDisconnection();
@@ -158,11 +169,13 @@ const GameInterface = ({ sessionId, config, wsService, audioService }) => {
   const handlePlayerAction = (actionData) => {
     const actionId = gameStore.recordAction(actionData);
     
-    // Enregistrer dans Tom pour contexte
-    tomStore.recordPlayerAction({
-      ...actionData,
-      action_id: actionId
-    });
+    // Enregistrer dans Tom pour contexte (hors télémétrie : clics, focus)
+    if (actionId) {
+      tomStore.recordPlayerAction({
+        ...actionData,
+        action_id: actionId
+      });
+    }
 
     // Jouer un son selon le type d'action
     switch (actionData.type) {
@@ -107,6 +107,9 @@ const VirtualDesktop = ({ onPlayerAction, playerName }) => {
       x: event.clientX - rect.left,
       y: event.clientY - rect.top
     });
+    
+    // Télémétrie : échantillonnée et envoyée par lots
+    useGameStore.getState().recordMouseMove(event.clientX, event.clientY);
   }, []);
 
   /**
@@ -36,7 +36,7 @@ const WindowManager = ({
     osStore.focusWindow(windowId);
     
     onPlayerAction({
-      type: 'window_focused',
+      type: 'window_focus',
       window_id: windowId,
       is_meta_action: true
     });
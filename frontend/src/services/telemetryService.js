@@ -0,0 +1,122 @@
+/**
+ * Télémétrie des entrées à haute fréquence (souris, clics sur le bureau, focus)
+ * Les événements sont regroupés côté client et envoyés par lots
+ * (`telemetry_batch`) au lieu de passer un par un par le pipeline des actions.
+ *
+ * Format d'un événement : [type, t, x, y, distance] (t en millisecondes ;
+ * distance : parcours réel du curseur depuis l'échantillon précédent)
+ * Voir backend/app/services/telemetry.py
+ */
+
+// Types d'actions envoyés en télémétrie (gravité 0 côté serveur)
+export const TELEMETRY_EVENT_TYPES = new Set(['mouse_move', 'desktop_click', 'window_focus']);
+
+// Un échantillon de position au plus toutes les 100 ms
+const MOUSE_SAMPLE_INTERVAL_MS = 100;
+// Lot envoyé chaque seconde, ou dès 200 événements
+const FLUSH_INTERVAL_MS = 1000;
+const MAX_BATCH_SIZE = 200;
+
+export class TelemetryService {
+  constructor(wsService, sessionId) {
+    this.wsService = wsService;
+    this.sessionId = sessionId;
+    this.events = [];
+
+    // Coalescence des mouvements : distance cumulée sur les mouvements bruts
+    this.lastPosition = null;
+    this.pendingDistance = 0;
+    this.lastSampleTime = 0;
+
+    this.stats = {
+      eventsRecorded: 0,
+      batchesSent: 0
+    };
+
+    this.flushTimer = setInterval(() => this.flush(), FLUSH_INTERVAL_MS);
+  }
+
+  /**
+   * Enregistre un événement ponctuel (clic, focus)
+   */
+  record(type, position = null) {
+    const x = position ? Math.round(position.x) : null;
+    const y = position ? Math.round(position.y) : null;
+
+    if (position) {
+      this._accumulate(x, y);
+    }
+    this._push([type, Date.now(), x, y, position ? this._takeDistance() : null]);
+  }
+
+  /**
+   * Enregistre un mouvement de souris (échantillonné)
+   */
+  recordMouseMove(x, y) {
+    this._accumulate(Math.round(x), Math.round(y));
+
+    const now = Date.now();
+    if (now - this.lastSampleTime < MOUSE_SAMPLE_INTERVAL_MS) {
+      return;
+    }
+
+    this.lastSampleTime = now;
+    this._push(['mouse_move', now, this.lastPosition.x, this.lastPosition.y, this._takeDistance()]);
+  }
+
+  /**
+   * Envoie les événements en attente
+   */
+  flush() {
+    // Dernière position si le curseur a bougé depuis le dernier échantillon
+    if (this.pendingDistance > 0) {
+      this.lastSampleTime = Date.now();
+      this._push(['mouse_move', this.lastSampleTime, this.lastPosition.x, this.lastPosition.y, this._takeDistance()]);
+    }
+
+    if (this.events.length === 0 || !this.wsService) {
+      return;
+    }
+
+    const events = this.events;
+    this.events = [];
+
+    this.wsService.send({
+      type: 'telemetry_batch',
+      session_id: this.sessionId,
+      events,
+    });
+    this.stats.batchesSent++;
+  }
+
+  /**
+   * Envoie le dernier lot et arrête l'envoi périodique
+   */
+  stop() {
+    this.flush();
+    clearInterval(this.flushTimer);
+    this.flushTimer = null;
+  }
+
+  _accumulate(x, y) {
+    if (this.lastPosition) {
+      this.pendingDistance += Math.hypot(x - this.lastPosition.x, y - this.lastPosition.y);
+    }
+    this.lastPosition = { x, y };
+  }
+
+  _takeDistance() {
+    const distance = Math.round(this.pendingDistance * 10) / 10;
+    this.pendingDistance = 0;
+    return distance;
+  }
+
+  _push(event) {
+    this.events.push(event);
+    this.stats.eventsRecorded++;
+
+    if (this.events.length >= MAX_BATCH_SIZE) {
+      this.flush();
+    }
+  }
+}
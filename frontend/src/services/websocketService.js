@@ -1,11 +1,46 @@
 /**
  * Service WebSocket pour la communication temps réel avec le backend
  * Gère la connexion, reconnexion automatique et distribution des messages
+ *
+ * Protocole négocié à session_init (champ `encodings`) : le serveur répond par
+ * l'encodage retenu dans session_ready. Une trame texte est du JSON, une trame
+ * binaire commence par un octet de format (0x01 : JSON compressé deflate brut).
  */
 
+// Octet de format des trames binaires (voir backend/app/api/wire_protocol.py)
+const FORMAT_DEFLATE_JSON = 0x01;
+
+/**
+ * Encodages que ce navigateur sait décoder, par ordre de préférence
+ */
+export const getSupportedEncodings = () => {
+  const encodings = [];
+  if (typeof DecompressionStream !== 'undefined') {
+    try {
+      new DecompressionStream('deflate-raw');
+      encodings.push('deflate');
+    } catch (error) {
+      // Format deflate-raw non pris en charge : JSON seul
+    }
+  }
+  encodings.push('json');
+  return encodings;
+};
+
+/**
+ * Décompresse une charge utile deflate brute
+ */
+const inflateRaw = async (bytes) => {
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate-raw'));
+  return new Uint8Array(await new Response(stream).arrayBuffer());
+};
+
+const textDecoder = new TextDecoder();
+
 export class WebSocketService {
-  constructor(wsUrl) {
+  constructor(wsUrl, sessionId = null) {
     this.baseWsUrl = wsUrl;
+    this.sessionId = sessionId;
     this.ws = null;
     this.isConnected = false;
     this.reconnectAttempts = 0;
@@ -13,18 +48,28 @@ export class WebSocketService {
     this.reconnectDelay = 1000; // 1 seconde initiale
     this.messageQueue = [];
     this.listeners = new Map();
+    // Dernier session_init envoyé : rejoué à la reconnexion (reprise de session)
+    this.sessionInitMessage = null;
     this.connectionPromise = null;
     
+    // Protocole : encodages annoncés et encodage retenu par le serveur
+    this.supportedEncodings = getSupportedEncodings();
+    this.encoding = 'json';
+    // Décodage séquentiel (la décompression est asynchrone, l'ordre est conservé)
+    this.receiveChain = Promise.resolve();
+    
     // Générer un ID de connexion unique
     this.connectionId = `conn_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
     
-    // URL complète avec connection_id
-    this.wsUrl = `${this.baseWsUrl}/ws/${this.connectionId}`;
+    // URL complète avec connection_id (session_id : routage vers le worker de la session)
+    this.wsUrl = `${this.baseWsUrl}/ws/${this.connectionId}`
+      + (sessionId ? `?session_id=${encodeURIComponent(sessionId)}` : '');
     
     // Statistiques
     this.stats = {
       messagesReceived: 0,
       messagesSent: 0,
+      bytesReceived: 0,
       reconnections: 0,
       lastMessageTime: null
     };
@@ -47,6 +92,7 @@ export class WebSocketService {
         console.log('🔌 Connexion WebSocket...', this.wsUrl);
         
         this.ws = new WebSocket(this.wsUrl);
+        this.ws.binaryType = 'arraybuffer';
         
         // Événement de connexion
         this.ws.onopen = () => {
@@ -55,6 +101,11 @@ export class WebSocketService {
           this.reconnectAttempts = 0;
           this.reconnectDelay = 1000;
           
+          // Reconnexion (redémarrage serveur, coupure) : réattacher la session en premier
+          if (this.sessionInitMessage && !this.messageQueue.some((message) => message.type === 'session_init')) {
+            this.messageQueue.unshift(this.sessionInitMessage);
+          }
+          
           // Envoyer les messages en queue
           this._flushMessageQueue();
           
@@ -66,12 +117,12 @@ export class WebSocketService {
         
         // Réception de messages
         this.ws.onmessage = (event) => {
-          try {
-            const data = JSON.parse(event.data);
-            this._handleMessage(data);
-          } catch (error) {
-            console.error('❌ Erreur parsing message WebSocket:', error);
-          }
+          this.receiveChain = this.receiveChain
+            .then(() => this._decodeFrame(event.data))
+            .then((data) => this._handleMessage(data))
+            .catch((error) => {
+              console.error('❌ Erreur parsing message WebSocket:', error);
+            });
         };
         
         // Gestion des erreurs
@@ -127,6 +178,10 @@ export class WebSocketService {
    * Envoie un message via WebSocket
    */
   send(message) {
+    if (message.type === 'session_init') {
+      this.sessionInitMessage = message;
+    }
+    
     if (!this.isConnected || !this.ws) {
       // Ajouter à la queue si pas connecté
       this.messageQueue.push(message);
@@ -189,6 +244,7 @@ export class WebSocketService {
     return {
       isConnected: this.isConnected,
       connectionId: this.connectionId,
+      encoding: this.encoding,
       reconnectAttempts: this.reconnectAttempts,
       queueSize: this.messageQueue.length,
       stats: { ...this.stats }
@@ -207,6 +263,25 @@ export class WebSocketService {
     }
   }
   
+  /**
+   * Décode une trame texte (JSON) ou binaire (octet de format + charge utile)
+   */
+  async _decodeFrame(frame) {
+    if (typeof frame === 'string') {
+      this.stats.bytesReceived += frame.length;
+      return JSON.parse(frame);
+    }
+    
+    const bytes = new Uint8Array(frame);
+    this.stats.bytesReceived += bytes.byteLength;
+    
+    if (bytes[0] === FORMAT_DEFLATE_JSON) {
+      const payload = await inflateRaw(bytes.subarray(1));
+      return JSON.parse(textDecoder.decode(payload));
+    }
+    throw new Error(`Format de trame inconnu: ${bytes[0]}`);
+  }
+  
   /**
    * Traite un message reçu
    */
@@ -214,8 +289,20 @@ export class WebSocketService {
     this.stats.messagesReceived++;
     this.stats.lastMessageTime = new Date();
     
+    // Heartbeat du serveur : réponse immédiate, sans notifier les listeners
+    if (data.type === 'heartbeat') {
+      this.send({ type: 'heartbeat_ack', sent_at: data.sent_at });
+      return;
+    }
+    
     console.log('📥 Message reçu:', data.type);
     
+    // Encodage retenu par le serveur pour les messages suivants
+    if (data.type === 'session_ready' && data.encoding) {
+      this.encoding = data.encoding;
+      console.log('📦 Encodage WebSocket:', this.encoding);
+    }
+    
     // Notifier les listeners spécifiques
     this._notifyListeners(data.type, data);
     
@@ -260,9 +347,9 @@ export class WebSocketService {
 /**
  * Factory pour créer une instance WebSocket configurée
  */
-export const createWebSocketService = (config) => {
+export const createWebSocketService = (config, sessionId = null) => {
   const wsUrl = config.wsUrl || 'ws://localhost:8000';
-  return new WebSocketService(wsUrl);
+  return new WebSocketService(wsUrl, sessionId);
 };
 
 /**
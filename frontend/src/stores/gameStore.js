@@ -4,6 +4,7 @@
  */
 import { create } from 'zustand';
 import { subscribeWithSelector } from 'zustand/middleware';
+import { TelemetryService, TELEMETRY_EVENT_TYPES } from '../services/telemetryService';
 
 export const useGameStore = create(
   subscribeWithSelector((set, get) => ({
@@ -16,6 +17,7 @@ export const useGameStore = create(
     // Services
     wsService: null,
     audioService: null,
+    telemetry: null,
     
     // État de la session
     isInitialized: false,
@@ -79,7 +81,11 @@ export const useGameStore = create(
       
       const startTime = new Date();
       
+      // Entrées à haute fréquence regroupées en lots
+      get().telemetry?.stop();
+      
       set({
+        telemetry: new TelemetryService(wsService, sessionId),
         isActive: true,
         isCompleted: false,
         startTime,
@@ -104,6 +110,7 @@ export const useGameStore = create(
         session_id: sessionId,
         player_name: null, // Sera demandé plus tard si nécessaire
         timestamp: startTime.toISOString(),
+        encodings: wsService.supportedEncodings,
       });
       
       // Démarrer le timer
@@ -142,6 +149,16 @@ export const useGameStore = create(
      */
     recordAction: (actionData) => {
       const state = get();
+      
+      // Souris, clics sur le bureau, focus : télémétrie agrégée, pas d'action complète
+      if (state.telemetry && TELEMETRY_EVENT_TYPES.has(actionData.type)) {
+        state.telemetry.record(actionData.type, actionData.position);
+        return null;
+      }
+      
+      // Le serveur dérive distance du curseur et pause à partir du dernier lot
+      state.telemetry?.flush();
+      
       const actionId = `action_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
       
       const completeActionData = {
@@ -149,6 +166,7 @@ export const useGameStore = create(
         id: actionId,
         session_id: state.sessionId,
         timestamp: new Date().toISOString(),
+        client_time: Date.now(),
         game_time: state.timeElapsed,
         game_phase: state.currentPhase,
       };
@@ -182,6 +200,16 @@ export const useGameStore = create(
       return actionId;
     },
     
+    /**
+     * Enregistre un mouvement de souris (échantillonné par la télémétrie)
+     */
+    recordMouseMove: (x, y) => {
+      const { telemetry, isActive } = get();
+      if (telemetry && isActive) {
+        telemetry.recordMouseMove(x, y);
+      }
+    },
+    
     /**
      * Enregistre un événement d'hésitation
      */
@@ -254,8 +282,9 @@ export const useGameStore = create(
       // Retirer la classe de jeu actif
       document.body.classList.remove('game-active');
       
-      // Arrêter le timer
+      // Arrêter le timer et envoyer la télémétrie restante
       get()._stopGameTimer();
+      state.telemetry?.stop();
       
       // Notifier le backend
       if (state.wsService) {
@@ -145,6 +145,7 @@ export const useTomStore = create(
         const request = {
           type: 'generate_tom_message',
           session_id: state.sessionId,
+          stream: true, // Réponse transmise au fil de la génération
           context: {
             action: actionData,
             conversation_context: state.conversationContext,
@@ -187,6 +188,50 @@ export const useTomStore = create(
       console.log('✅ Message Tom généré et envoyé');
     },
     
+    /**
+     * Reçoit un fragment de réponse streamée : affichage immédiat
+     */
+    handleStreamChunk: (data) => {
+      const state = get();
+      const isNewMessage = state.currentMessage !== data.message_id;
+      
+      set({
+        isTyping: true,
+        currentMessage: data.message_id,
+        typingProgress: (isNewMessage ? '' : state.typingProgress) + data.text
+      });
+      
+      // Son de frappe sur les fragments reçus
+      if (state.audioService && state.tomConfig.communication.typing_simulation) {
+        state.audioService.playKeystrokeSound();
+      }
+    },
+    
+    /**
+     * Termine une réponse streamée : le message est ajouté sans re-simulation de frappe
+     */
+    handleStreamComplete: (data) => {
+      const messageData = data.message_data || {};
+      
+      set({
+        isTyping: false,
+        typingProgress: '',
+        currentMessage: null
+      });
+      
+      get().sendMessage({
+        content: messageData.message,
+        type: messageData.intent || 'instruction',
+        emotional_context: messageData.emotional_context,
+        style: 'confident',
+        streamed: true
+      });
+      
+      get()._updateConversationContext(messageData);
+      
+      console.log('✅ Message Tom streamé reçu', data.time_to_first_chunk);
+    },
+    
     /**
      * Enregistre une action du joueur pour le contexte
      */
@@ -439,8 +484,10 @@ export const useTomStore = create(
     _processMessage: async (message) => {
       const state = get();
       
-      // Démarrer la simulation de frappe (Condition B)
-      await get()._simulateTyping(message.content);
+      // Démarrer la simulation de frappe (Condition B), déjà jouée si le message a été streamé
+      if (!message.streamed) {
+        await get()._simulateTyping(message.content);
+      }
       
       // Ajouter le message final
       const finalMessage = {